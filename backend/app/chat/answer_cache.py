@@ -0,0 +1,163 @@
+"""
+Two-tier cache of chat answers.
+"""
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+from app.common.cache import LRUCache
+from app.infrastructure.dynamodb.repository import DynamoDBRepository
+from app.infrastructure.config import settings
+from .models import AnswerCacheEntry, ChatAnswer
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the cache items in the shared table; it must not look like a file ID
+# followed by ":" so cached answers never show up in a file's chat history
+ANSWER_CACHE_PK_PREFIX = "answer-cache#"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a query so trivially different spellings share a cache entry.
+
+    Case and runs of whitespace are ignored, as is punctuation at either end.
+
+    Args:
+        query: The chat query
+
+    Returns:
+        The normalized query
+    """
+    return " ".join(query.casefold().split()).strip(" ?!.,;:")
+
+
+class AnswerCache:
+    """
+    Cache of chat answers in front of the file explorer.
+
+    Answers are keyed by (file pk, model name, normalized query, prompt version).
+    Lookups go to an in-process LRU with a time-to-live first, then to items in
+    the DynamoDB table shared by every worker; persisted hits are copied into the
+    in-process tier. Failures of the persisted tier are logged and count as
+    misses, so the cache never fails a chat request.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[DynamoDBRepository] = None,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        persist: Optional[bool] = None
+    ):
+        """
+        Initializes the answer cache.
+
+        Args:
+            repository: Repository used for the persisted tier
+            max_size: Number of answers kept in memory (defaults to settings.ANSWER_CACHE_SIZE)
+            ttl_seconds: Lifetime of an answer in both tiers (defaults to settings.ANSWER_CACHE_TTL_SECONDS)
+            persist: Whether to use the persisted tier (defaults to settings.ANSWER_CACHE_PERSIST)
+        """
+        self.repository = repository or DynamoDBRepository()
+        self.ttl_seconds = settings.ANSWER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.memory = LRUCache(max_size or settings.ANSWER_CACHE_SIZE, self.ttl_seconds)
+        self.persist = settings.ANSWER_CACHE_PERSIST if persist is None else persist
+        self.memory_hits = 0
+        self.persisted_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(file_id: str, model_name: str, query: str, prompt_version: str) -> str:
+        """
+        Builds the cache key of a query.
+
+        Args:
+            file_id: The ID of the file
+            model_name: The model answering the query
+            query: The chat query
+            prompt_version: Version of the prompt template
+
+        Returns:
+            A hex digest identifying the answer
+        """
+        parts = [file_id, model_name, normalize_query(query), prompt_version]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    async def get(self, file_id: str, model_name: str, query: str, prompt_version: str) -> Optional[ChatAnswer]:
+        """
+        Looks up the cached answer to a query.
+
+        Args:
+            file_id: The ID of the file
+            model_name: The model answering the query
+            query: The chat query
+            prompt_version: Version of the prompt template
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        key = self.key(file_id, model_name, query, prompt_version)
+        answer = self.memory.get(key)
+        if answer is not None:
+            self.memory_hits += 1
+            return answer
+
+        if self.persist:
+            try:
+                entry = await self.repository.get_item({"pk": ANSWER_CACHE_PK_PREFIX + key}, AnswerCacheEntry)
+            except Exception as e:
+                logger.error(f"Error reading cached answer for file {file_id}: {str(e)}")
+                entry = None
+            # DynamoDB removes expired items lazily, so the expiry is checked here too
+            if entry is not None and entry.expires_at > time.time():
+                answer = ChatAnswer.model_validate_json(entry.answer)
+                self.memory.put(key, answer)
+                self.persisted_hits += 1
+                return answer
+
+        self.misses += 1
+        return None
+
+    async def put(self, file_id: str, model_name: str, query: str, prompt_version: str, answer: ChatAnswer) -> None:
+        """
+        Caches the answer to a query in both tiers.
+
+        Args:
+            file_id: The ID of the file
+            model_name: The model that answered the query
+            query: The chat query
+            prompt_version: Version of the prompt template
+            answer: The answer
+        """
+        key = self.key(file_id, model_name, query, prompt_version)
+        self.memory.put(key, answer)
+        if not self.persist:
+            return
+        try:
+            await self.repository.put_item(AnswerCacheEntry(
+                pk=ANSWER_CACHE_PK_PREFIX + key,
+                file_id=file_id,
+                model_name=model_name,
+                query=normalize_query(query),
+                prompt_version=prompt_version,
+                # Stored as JSON: DynamoDB does not accept the float scores of the sources
+                answer=answer.model_dump_json(),
+                expires_at=int(time.time() + self.ttl_seconds)
+            ))
+        except Exception as e:
+            logger.error(f"Error caching answer for file {file_id}: {str(e)}")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the hit and miss counters since the process started.
+        """
+        hits = self.memory_hits + self.persisted_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "persisted_hits": self.persisted_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "size": len(self.memory)
+        }
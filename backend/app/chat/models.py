@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+from app.common.schemas import Source
 
 class ChatHistory(BaseModel):
     """
@@ -11,4 +12,56 @@ class ChatHistory(BaseModel):
     query: str = Field(..., description="Search query or instructions")
     response: str = Field(..., description="AI response to the query")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Time of chat interaction")
-    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata about the chat") 
\ No newline at end of file
+    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata about the chat")
+
+class ChatAnswer(BaseModel):
+    """
+    An answer to a chat query with the passages of the file it was built from.
+    """
+    content: str = Field(..., description="AI response to the query")
+    sources: List[Source] = Field(default_factory=list, description="Exact spans of the file supporting the response")
+
+class ChatStreamEvent(BaseModel):
+    """
+    An event of a streamed chat answer.
+    """
+    event: str = Field(..., description="'delta' for a part of the response, 'done' once it is complete")
+    content: str = Field("", description="The new part of the response, or the whole response when done")
+    sources: List[Source] = Field(default_factory=list, description="Exact spans of the file supporting the response, when done")
+
+class FileSource(Source):
+    """
+    A source of a multi-file answer, attributed to its file.
+    """
+    pk: str = Field(..., description="The ID of the file the span belongs to")
+    filename: str = Field(..., description="The name of the file the span belongs to")
+
+class MultiFileChatAnswer(BaseModel):
+    """
+    The answer to a chat query about several files.
+    """
+    content: str = Field(..., description="The AI's response, citing the excerpts it relies on as [S1], [S2], ...")
+    sources: List[FileSource] = Field(default_factory=list, description="Exact spans of the files supporting the response")
+
+class BatchChatAnswer(BaseModel):
+    """
+    The answer to one question of a batch.
+    """
+    question: str = Field(..., description="The question as asked")
+    content: str = Field("", description="The AI's response, empty if the question failed")
+    sources: List[Source] = Field(default_factory=list, description="Exact spans of the file supporting the response")
+    cached: bool = Field(False, description="Whether the answer came from the answer cache")
+    duration_ms: float = Field(..., description="Time spent answering the question, excluding the wait for a free slot")
+    error: Optional[str] = Field(None, description="Why the question could not be answered")
+
+class AnswerCacheEntry(BaseModel):
+    """
+    Model representing a cached chat answer in DynamoDB.
+    """
+    pk: str = Field(..., description="Primary key - 'answer-cache#' followed by the digest of the cache key")
+    file_id: str = Field(..., description="ID of the file the answer is about")
+    model_name: str = Field(..., description="Model that produced the answer")
+    query: str = Field(..., description="Normalized query")
+    prompt_version: str = Field(..., description="Version of the prompt template")
+    answer: str = Field(..., description="The ChatAnswer serialized as JSON")
+    expires_at: int = Field(..., description="Expiry time in epoch seconds (the table's TTL attribute)")
@@ -0,0 +1,119 @@
+"""
+Grouping of concurrent questions about the same file into one model call.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.common.schemas import FileDTO
+
+logger = logging.getLogger(__name__)
+
+
+class _Group:
+    """
+    The questions about one file waiting for the window to close.
+    """
+    def __init__(self):
+        self.searches: List[str] = []
+        self.file_dtos: List[FileDTO] = []
+        self.futures: List[asyncio.Future] = []
+        self.full = asyncio.Event()
+        # The loop only keeps weak references to tasks
+        self.task: Optional[asyncio.Task] = None
+
+
+class QuestionGrouper:
+    """
+    Groups questions about the same file that arrive within a short window.
+
+    The first question about a file opens a window; questions about the same
+    file arriving before it closes join it, up to max_questions. The group is
+    then answered by one call to explore_many, and each caller gets its own
+    answer back. A group of one question costs the caller the window only.
+    """
+    def __init__(
+        self,
+        explore_many: Callable[[List[str], List[FileDTO]], Awaitable[List[str]]],
+        window_seconds: float,
+        max_questions: int
+    ):
+        """
+        Initializes the grouper.
+
+        Args:
+            explore_many: Answers several questions, each with its own FileDTO, in order
+            window_seconds: How long a group waits for more questions
+            max_questions: Size at which a group is answered without waiting for the window
+        """
+        self.explore_many = explore_many
+        self.window_seconds = window_seconds
+        self.max_questions = max_questions
+        self._open: Dict[str, _Group] = {}
+        self.groups = 0
+        self.grouped_questions = 0
+
+    async def explore(self, search: str, file_dto: FileDTO) -> str:
+        """
+        Answer a question as part of the open group of its file.
+
+        Args:
+            search: The question
+            file_dto: The file, with the passages retrieved for this question
+
+        Returns:
+            The answer to the question
+        """
+        group = self._open.get(file_dto.pk)
+        if group is None:
+            group = _Group()
+            self._open[file_dto.pk] = group
+            group.task = asyncio.ensure_future(self._answer_group(file_dto.pk, group))
+
+        future = asyncio.get_running_loop().create_future()
+        group.searches.append(search)
+        group.file_dtos.append(file_dto)
+        group.futures.append(future)
+        if len(group.searches) >= self.max_questions:
+            self._close(file_dto.pk, group)
+        return await future
+
+    def _close(self, pk: str, group: _Group) -> None:
+        """
+        Stops the group from taking more questions.
+        """
+        if self._open.get(pk) is group:
+            del self._open[pk]
+        group.full.set()
+
+    async def _answer_group(self, pk: str, group: _Group) -> None:
+        """
+        Waits for the window to close, then answers the group and fans the answers out.
+        """
+        try:
+            await asyncio.wait_for(group.full.wait(), self.window_seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._close(pk, group)
+
+        self.groups += 1
+        if len(group.searches) > 1:
+            self.grouped_questions += len(group.searches)
+            logger.info(f"Answering {len(group.searches)} questions about file {pk} together")
+        try:
+            answers = await self.explore_many(group.searches, group.file_dtos)
+            if len(answers) != len(group.futures):
+                raise ValueError(f"Expected {len(group.futures)} answers for file {pk}, got {len(answers)}")
+        except Exception as e:
+            for future in group.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, answer in zip(group.futures, answers):
+            if not future.done():
+                future.set_result(answer)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the counters since the process started.
+        """
+        return {"groups": self.groups, "grouped_questions": self.grouped_questions}
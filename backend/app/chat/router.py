@@ -1,9 +1,15 @@
-from typing import Dict, Any, List
+import logging
+import time
+from typing import Dict, Any, AsyncIterator, List
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
 from .service import ChatService
-from .models import ChatHistory
+from .models import BatchChatAnswer, ChatHistory, ChatStreamEvent, FileSource
+from app.common.schemas import Source
+
+logger = logging.getLogger(__name__)
 
 # Request and response models
 class ChatRequest(BaseModel):
@@ -12,6 +18,48 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     content: str
+    sources: List[Source] = []
+
+class MultiFileChatRequest(BaseModel):
+    pks: List[str]
+    search: str
+
+class MultiFileChatResponse(BaseModel):
+    content: str
+    sources: List[FileSource] = []
+
+class BatchChatRequest(BaseModel):
+    pk: str
+    questions: List[str]
+
+class BatchChatResponse(BaseModel):
+    pk: str
+    answers: List[BatchChatAnswer]
+    duration_ms: float
+
+class AnswerCacheStatsResponse(BaseModel):
+    memory_hits: int
+    persisted_hits: int
+    misses: int
+    hit_rate: float
+    size: int
+
+class SemanticCacheStatsResponse(BaseModel):
+    enabled: bool
+    hits: int = 0
+    misses: int = 0
+    hit_rate: float = 0.0
+    llm_calls_avoided: int = 0
+    mean_hit_similarity: float = 0.0
+    evictions: int = 0
+    files: int = 0
+
+class CoalescingStatsResponse(BaseModel):
+    shared_requests: int
+    in_flight: int
+    grouping_enabled: bool
+    groups: int = 0
+    grouped_questions: int = 0
 
 class ChatHistoryResponse(BaseModel):
     pk: str
@@ -48,24 +96,155 @@ class ChatRouter:
                 request: The chat request containing file PK and search query
                 
             Returns:
-                A response containing the AI's answer
+                A response containing the AI's answer and the passages it is based on
                 
             Raises:
                 HTTPException: If the file is not found or there is an error
             """
             try:
-                result = await self.service.process_chat_query(request.pk, request.search)
-                return ChatResponse(content=result)
+                answer = await self.service.answer_chat_query(request.pk, request.search)
+                return ChatResponse(content=answer.content, sources=answer.sources)
             except ValueError as e:
                 # Handle expected errors with appropriate status codes
                 if "not found" in str(e):
                     raise HTTPException(status_code=404, detail=str(e))
                 else:
                     raise HTTPException(status_code=400, detail=str(e))
+            except TimeoutError:
+                raise HTTPException(status_code=504, detail="The model did not answer in time")
             except Exception as e:
                 # Handle unexpected errors
                 raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
         
+        @self.router.post("/multi", response_model=MultiFileChatResponse)
+        async def chat_with_files(request: MultiFileChatRequest) -> MultiFileChatResponse:
+            """
+            Chat with several files at once using AI.
+            
+            Args:
+                request: The chat request containing the file PKs and search query
+                
+            Returns:
+                A response containing the AI's answer and the passages it is based on, per file
+                
+            Raises:
+                HTTPException: If a file is not found or not ready, or there is an error
+            """
+            try:
+                answer = await self.service.answer_multi_file_query(request.pks, request.search)
+                return MultiFileChatResponse(content=answer.content, sources=answer.sources)
+            except ValueError as e:
+                if "not found" in str(e):
+                    raise HTTPException(status_code=404, detail=str(e))
+                raise HTTPException(status_code=400, detail=str(e))
+            except TimeoutError:
+                raise HTTPException(status_code=504, detail="The model did not answer in time")
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
+        
+        @self.router.post("/batch", response_model=BatchChatResponse)
+        async def chat_with_file_batch(request: BatchChatRequest) -> BatchChatResponse:
+            """
+            Ask several questions about a file at once.
+            
+            Args:
+                request: The file PK and the questions
+                
+            Returns:
+                The answer, sources and timing of each question, in order
+                
+            Raises:
+                HTTPException: If the file is not found or not ready, the batch is invalid, or there is an error
+            """
+            start = time.perf_counter()
+            try:
+                answers = await self.service.answer_chat_batch(request.pk, request.questions)
+            except ValueError as e:
+                if "not found" in str(e):
+                    raise HTTPException(status_code=404, detail=str(e))
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
+            return BatchChatResponse(
+                pk=request.pk,
+                answers=answers,
+                duration_ms=(time.perf_counter() - start) * 1e3
+            )
+        
+        @self.router.post("/stream")
+        async def stream_chat_with_file(request: ChatRequest) -> StreamingResponse:
+            """
+            Chat with a file using AI, streaming the response as Server-Sent Events.
+            
+            The response is sent as 'delta' events as it is generated, followed by a
+            'done' event with the whole response and its sources, or an 'error' event.
+            
+            Args:
+                request: The chat request containing file PK and search query
+                
+            Returns:
+                A text/event-stream response
+                
+            Raises:
+                HTTPException: If the file is not found or not ready, or there is an error
+            """
+            try:
+                events = await self.service.open_chat_stream(request.pk, request.search)
+            except ValueError as e:
+                if "not found" in str(e):
+                    raise HTTPException(status_code=404, detail=str(e))
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
+            
+            return StreamingResponse(
+                self._format_events(events),
+                media_type="text/event-stream",
+                # Keep proxies from buffering the stream
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
+        @self.router.get("/cache/stats", response_model=AnswerCacheStatsResponse)
+        async def get_answer_cache_stats() -> AnswerCacheStatsResponse:
+            """
+            Get the hit and miss counters of the answer cache of this worker.
+            
+            Returns:
+                The answer cache counters
+            """
+            return AnswerCacheStatsResponse(**self.service.answer_cache.stats())
+        
+        @self.router.get("/cache/semantic/stats", response_model=SemanticCacheStatsResponse)
+        async def get_semantic_cache_stats() -> SemanticCacheStatsResponse:
+            """
+            Get the counters of the semantic cache of this worker, including the
+            number of LLM calls avoided by reusing the answer to a paraphrase.
+            
+            Returns:
+                The semantic cache counters
+            """
+            semantic_cache = self.service.file_exploration_service.semantic_cache
+            if semantic_cache is None:
+                return SemanticCacheStatsResponse(enabled=False)
+            return SemanticCacheStatsResponse(enabled=True, **semantic_cache.stats())
+        
+        @self.router.get("/coalescing/stats", response_model=CoalescingStatsResponse)
+        async def get_coalescing_stats() -> CoalescingStatsResponse:
+            """
+            Get the counters of request coalescing in this worker: requests that
+            joined an identical one in flight, and questions answered in groups.
+            
+            Returns:
+                The coalescing counters
+            """
+            grouper = self.service.question_grouper
+            return CoalescingStatsResponse(
+                shared_requests=self.service.in_flight.shared,
+                in_flight=len(self.service.in_flight),
+                grouping_enabled=grouper is not None,
+                **(grouper.stats() if grouper is not None else {})
+            )
+        
         @self.router.get("/history/{file_id}", response_model=List[ChatHistoryResponse])
         async def get_chat_history(
             file_id: str, 
@@ -108,6 +287,24 @@ class ChatRouter:
                 raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Error fetching chat history: {str(e)}")
+    
+    async def _format_events(self, events: AsyncIterator[ChatStreamEvent]) -> AsyncIterator[str]:
+        """
+        Format chat stream events as Server-Sent Events.
+        
+        Errors raised once the stream has started are sent as an 'error' event.
+        """
+        try:
+            async for event in events:
+                yield f"event: {event.event}\ndata: {event.model_dump_json(exclude={'event'})}\n\n"
+        except TimeoutError:
+            logger.error("Chat response stream timed out")
+            detail = ChatStreamEvent(event="error", content="The model did not answer in time")
+            yield f"event: error\ndata: {detail.model_dump_json(exclude={'event'})}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {str(e)}", exc_info=True)
+            detail = ChatStreamEvent(event="error", content=f"Error processing chat request: {str(e)}")
+            yield f"event: error\ndata: {detail.model_dump_json(exclude={'event'})}\n\n"
 
 # Create router instance
 router = ChatRouter().router 
\ No newline at end of file
@@ -1,18 +1,38 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, AsyncIterator, Optional, List
+import asyncio
 import logging
+import re
+import time
 from datetime import datetime
-from app.common.schemas import FileDTO
+from app.common.schemas import FileDTO, Passage
 from app.file_processing.repository import FileProcessingRepository
 from app.file_processing.models import FileProcessingRecord
+from app.file_exploration.file_explorer import number_sources
 from app.file_exploration.service import FileExplorationService
+from app.retrieval.service import RetrievalService
+from app.retrieval.passage_locator import PassageLocator
 from app.infrastructure.dynamodb.repository import DynamoDBRepository
-from .models import ChatHistory
+from app.infrastructure.config import settings
+from app.text_chunking.service import CHARS_PER_TOKEN, estimate_tokens
+from app.common.single_flight import SingleFlight
+from .answer_cache import AnswerCache, normalize_query
+from .question_grouper import QuestionGrouper
+from .models import BatchChatAnswer, ChatAnswer, ChatHistory, ChatStreamEvent, FileSource, MultiFileChatAnswer
 
 logger = logging.getLogger(__name__)
 
+# Bracketed citations of a multi-file answer, e.g. [S2] or [S1, S3]
+CITATION = re.compile(r"\[([^\]]*)\]")
+CITED_SOURCE = re.compile(r"\bS(\d+)\b")
+
 class ChatService:
     """
     Service responsible for handling chat interactions with files.
+    
+    Concurrent requests are coalesced: identical in-flight queries about a file,
+    and concurrent reads of the same file record, share one call. When
+    settings.CHAT_GROUP_WINDOW_MS is set, different questions about the same
+    file arriving within that window are also answered by one model call.
     """
     
     def __init__(self):
@@ -21,7 +41,18 @@ class ChatService:
         """
         self.file_repository = FileProcessingRepository()
         self.file_exploration_service = FileExplorationService()
+        self.retrieval_service = RetrievalService()
+        self.passage_locator = PassageLocator()
         self.dynamodb_repository = DynamoDBRepository()
+        self.answer_cache = AnswerCache()
+        self.in_flight = SingleFlight()
+        self.question_grouper = None
+        if settings.CHAT_GROUP_WINDOW_MS > 0:
+            self.question_grouper = QuestionGrouper(
+                lambda searches, file_dtos: self.file_exploration_service.explore_many_async(searches, file_dtos),
+                window_seconds=settings.CHAT_GROUP_WINDOW_MS / 1000,
+                max_questions=settings.CHAT_GROUP_MAX_QUESTIONS
+            )
     
     async def get_file_by_id(self, file_id: str) -> Optional[FileProcessingRecord]:
         """
@@ -143,11 +174,363 @@ class ChatService:
         Returns:
             The AI's response to the query
             
+        Raises:
+            ValueError: If the file is not found or not ready
+            TimeoutError: If the explorer does not answer in time
+        """
+        answer = await self.answer_chat_query(file_id, search_query)
+        return answer.content
+    
+    async def answer_chat_query(self, file_id: str, search_query: str) -> ChatAnswer:
+        """
+        Answer a chat query for a specific file, with the sources of the answer.
+        
+        Repeated queries are answered from the answer cache without loading the
+        file or calling the explorer, and a query identical to one in flight
+        waits for its answer.
+        
+        Args:
+            file_id: The ID of the file to chat with
+            search_query: The query or instructions for the chat
+            
+        Returns:
+            The AI's response and the exact spans of the file it is based on
+            
+        Raises:
+            ValueError: If the file is not found or not ready
+            TimeoutError: If the explorer does not answer in time
+        """
+        model_name = self.file_exploration_service.model_name
+        prompt_version = self.file_exploration_service.prompt_version
+        answer = await self.in_flight.do(
+            self.answer_cache.key(file_id, model_name, search_query, prompt_version),
+            lambda: self._cached_or_answer(file_id, search_query, model_name, prompt_version)
+        )
+        await self._save_history_safely(file_id, search_query, answer.content)
+        return answer
+    
+    async def answer_chat_batch(self, file_id: str, questions: List[str]) -> List[BatchChatAnswer]:
+        """
+        Answer several chat queries about the same file.
+        
+        The file is loaded once for the whole batch and the questions are answered
+        concurrently, at most settings.CHAT_BATCH_CONCURRENCY at a time. Cached
+        answers are returned without waiting for a slot, and questions that only
+        differ in case, spacing or end punctuation are answered once. A question
+        that fails (e.g. a model timeout) gets an error instead of failing the batch.
+        
+        Args:
+            file_id: The ID of the file to chat with
+            questions: The queries, answered in this order
+            
+        Returns:
+            One BatchChatAnswer per question
+            
+        Raises:
+            ValueError: If there are no or too many questions, or the file is not found or not ready
+        """
+        if not questions:
+            raise ValueError("At least one question is required")
+        if len(questions) > settings.CHAT_BATCH_MAX_QUESTIONS:
+            raise ValueError(f"At most {settings.CHAT_BATCH_MAX_QUESTIONS} questions can be asked at once")
+        
+        model_name = self.file_exploration_service.model_name
+        prompt_version = self.file_exploration_service.prompt_version
+        distinct = list(dict.fromkeys(normalize_query(question) for question in questions))
+        first_asked = {}
+        for question in questions:
+            first_asked.setdefault(normalize_query(question), question)
+        
+        cached = await asyncio.gather(*(
+            self.answer_cache.get(file_id, model_name, first_asked[key], prompt_version) for key in distinct
+        ))
+        file_dto = None
+        if any(answer is None for answer in cached):
+            file_dto = await self._load_file(file_id)
+        
+        slots = asyncio.Semaphore(settings.CHAT_BATCH_CONCURRENCY)
+        
+        async def answer_one(question: str, cached_answer: Optional[ChatAnswer]) -> BatchChatAnswer:
+            if cached_answer is not None:
+                await self._save_history_safely(file_id, question, cached_answer.content)
+                return BatchChatAnswer(
+                    question=question, content=cached_answer.content, sources=cached_answer.sources,
+                    cached=True, duration_ms=0.0
+                )
+            async with slots:
+                start = time.perf_counter()
+                try:
+                    answer = await self.in_flight.do(
+                        self.answer_cache.key(file_id, model_name, question, prompt_version),
+                        lambda: self._answer(file_dto, question, model_name, prompt_version)
+                    )
+                    await self._save_history_safely(file_id, question, answer.content)
+                except Exception as e:
+                    logger.error(f"Error answering batch question for file {file_id}: {repr(e)}")
+                    return BatchChatAnswer(
+                        question=question, duration_ms=(time.perf_counter() - start) * 1e3,
+                        error=str(e) or type(e).__name__
+                    )
+                return BatchChatAnswer(
+                    question=question, content=answer.content, sources=answer.sources,
+                    duration_ms=(time.perf_counter() - start) * 1e3
+                )
+        
+        answers = await asyncio.gather(*(
+            answer_one(first_asked[key], cached_answer) for key, cached_answer in zip(distinct, cached)
+        ))
+        by_key = dict(zip(distinct, answers))
+        return [by_key[normalize_query(question)].model_copy(update={"question": question}) for question in questions]
+    
+    async def answer_multi_file_query(self, file_ids: List[str], search_query: str) -> MultiFileChatAnswer:
+        """
+        Answer a chat query about several files at once, e.g. a contract and its amendments.
+        
+        The records are loaded with one batch read and the passages of every file
+        are retrieved concurrently. The best passages of the files, taken in turn
+        by rank, share one prompt token budget, so the prompt stays bounded however
+        many files are selected. The answer cites the passages it relies on, and
+        each source is attributed to its file.
+        
+        Args:
+            file_ids: The IDs of the files to chat with
+            search_query: The query or instructions for the chat
+            
+        Returns:
+            The AI's response and the exact spans of the files it is based on
+            
+        Raises:
+            ValueError: If there are no or too many files, or a file is not found or not ready
+            TimeoutError: If the explorer does not answer in time
+        """
+        file_ids = list(dict.fromkeys(file_ids))
+        if not file_ids:
+            raise ValueError("At least one file is required")
+        if len(file_ids) > settings.CHAT_MULTI_MAX_FILES:
+            raise ValueError(f"At most {settings.CHAT_MULTI_MAX_FILES} files can be chatted with at once")
+        
+        records = await self.file_repository.batch_get([{"pk": file_id} for file_id in file_ids], FileProcessingRecord)
+        by_id = {record.pk: record for record in records}
+        missing = [file_id for file_id in file_ids if file_id not in by_id]
+        if missing:
+            raise ValueError(f"Files not found: {', '.join(missing)}")
+        not_ready = [file_id for file_id in file_ids if by_id[file_id].processing_status != "completed"]
+        if not_ready:
+            raise ValueError(f"File processing is not complete for: {', '.join(not_ready)}")
+        
+        file_dtos = [self.create_file_dto(by_id[file_id]) for file_id in file_ids]
+        ranked = await asyncio.gather(*(
+            self.retrieval_service.retrieve(search_query, file_dto, retriever=self.file_exploration_service.retriever)
+            for file_dto in file_dtos
+        ))
+        selected = self._share_token_budget(file_dtos, ranked, settings.PROMPT_TOKEN_BUDGET)
+        file_dtos = [file_dto.model_copy(update={"passages": passages}) for file_dto, passages in zip(file_dtos, selected)]
+        logger.info(f"Processing chat query for {len(file_dtos)} files with {sum(map(len, selected))} passages")
+        
+        response = await self.file_exploration_service.explore_files_async(search_query, file_dtos)
+        sources = []
+        if not self.file_exploration_service.is_error_response(response):
+            sources = await self._attribute_sources(file_dtos, search_query, response)
+        
+        for file_id in file_ids:
+            await self._save_history_safely(file_id, search_query, response)
+        return MultiFileChatAnswer(content=response, sources=sources)
+    
+    @staticmethod
+    def _share_token_budget(
+        file_dtos: List[FileDTO],
+        ranked: List[List[Passage]],
+        token_budget: int
+    ) -> List[List[Passage]]:
+        """
+        Selects the passages of several files that fit in one token budget.
+        
+        Files take turns, best passage first, so every file is represented before
+        any file gets its second passage; passages that no longer fit are skipped.
+        A file without retrieved passages gets the start of its document, cut to an
+        equal share of the budget.
+        
+        Args:
+            file_dtos: The files
+            ranked: The retrieved passages of each file, best first
+            token_budget: Maximum number of passage tokens in total
+            
+        Returns:
+            The selected passages of each file, in document order
+        """
+        share = max(token_budget // len(file_dtos), 1)
+        ranked = [
+            passages or [Passage(
+                ordinal=0,
+                text=file_dto.markdown_content[:share * CHARS_PER_TOKEN],
+                start_offset=0,
+                end_offset=min(len(file_dto.markdown_content), share * CHARS_PER_TOKEN),
+                token_estimate=estimate_tokens(file_dto.markdown_content[:share * CHARS_PER_TOKEN])
+            )]
+            for file_dto, passages in zip(file_dtos, ranked)
+        ]
+        
+        selected: List[List[Passage]] = [[] for _ in ranked]
+        remaining = token_budget
+        for rank in range(max(len(passages) for passages in ranked)):
+            for passages, chosen in zip(ranked, selected):
+                if rank < len(passages) and passages[rank].token_estimate <= remaining:
+                    chosen.append(passages[rank])
+                    remaining -= passages[rank].token_estimate
+        return [sorted(chosen, key=lambda passage: passage.start_offset) for chosen in selected]
+    
+    async def _attribute_sources(self, file_dtos: List[FileDTO], search_query: str, response: str) -> List[FileSource]:
+        """
+        Locates the spans of the passages cited by a multi-file answer, per file.
+        
+        When the answer cites no valid label, every passage of the prompt is a candidate.
+        """
+        labelled = number_sources(file_dtos)
+        cited = {
+            int(number) for citation in CITATION.findall(response) for number in CITED_SOURCE.findall(citation)
+        } & set(range(1, len(labelled) + 1))
+        if not cited:
+            cited = set(range(1, len(labelled) + 1))
+        
+        async def locate(file_dto: FileDTO) -> List[FileSource]:
+            passages = [
+                passage for label, (owner, passage) in enumerate(labelled, start=1)
+                if label in cited and owner is file_dto
+            ]
+            sources = await self.passage_locator.locate(file_dto, passages, search_query, response)
+            return [FileSource(pk=file_dto.pk, filename=file_dto.filename, **source.model_dump()) for source in sources]
+        
+        per_file = await asyncio.gather(*(locate(file_dto) for file_dto in file_dtos))
+        return [source for sources in per_file for source in sources]
+    
+    async def open_chat_stream(self, file_id: str, search_query: str) -> AsyncIterator[ChatStreamEvent]:
+        """
+        Start answering a chat query for a specific file as a stream of events.
+        
+        The file is loaded and checked before the stream is returned, so errors
+        are raised here rather than in the middle of the stream. The stream yields
+        a 'delta' event per part of the response as the explorer produces it, then
+        a 'done' event with the whole response and its sources; the answer is
+        cached and saved to the history before the 'done' event.
+        
+        Args:
+            file_id: The ID of the file to chat with
+            search_query: The query or instructions for the chat
+            
+        Returns:
+            An async iterator of ChatStreamEvent
+            
+        Raises:
+            ValueError: If the file is not found or not ready
+        """
+        model_name = self.file_exploration_service.model_name
+        prompt_version = self.file_exploration_service.prompt_version
+        cached = await self.answer_cache.get(file_id, model_name, search_query, prompt_version)
+        if cached is not None:
+            logger.info(f"Streaming chat query for file {file_id} from the answer cache")
+            return self._replay_answer(file_id, search_query, cached)
+        
+        file_dto = await self._with_passages(await self._load_file(file_id), search_query)
+        return self._stream_answer(file_dto, search_query, model_name, prompt_version)
+    
+    async def _replay_answer(self, file_id: str, search_query: str, answer: ChatAnswer) -> AsyncIterator[ChatStreamEvent]:
+        """
+        Streams a cached answer as a single part.
+        """
+        yield ChatStreamEvent(event="delta", content=answer.content)
+        await self._save_history_safely(file_id, search_query, answer.content)
+        yield ChatStreamEvent(event="done", content=answer.content, sources=answer.sources)
+    
+    async def _stream_answer(
+        self,
+        file_dto: FileDTO,
+        search_query: str,
+        model_name: str,
+        prompt_version: str
+    ) -> AsyncIterator[ChatStreamEvent]:
+        """
+        Streams the explorer's response, then caches and saves the assembled answer.
+        
+        Raises:
+            TimeoutError: If the explorer stops producing parts, once the stream has started
+        """
+        parts = []
+        failed = False
+        async for part in self.file_exploration_service.explore_stream_async(search_query, file_dto):
+            failed = failed or self.file_exploration_service.is_error_response(part)
+            parts.append(part)
+            yield ChatStreamEvent(event="delta", content=part)
+        
+        response = "".join(parts)
+        sources = await self.passage_locator.locate(file_dto, file_dto.passages, search_query, response)
+        answer = ChatAnswer(content=response, sources=sources)
+        if not failed:
+            await self.answer_cache.put(file_dto.pk, model_name, search_query, prompt_version, answer)
+        
+        await self._save_history_safely(file_dto.pk, search_query, response)
+        yield ChatStreamEvent(event="done", content=response, sources=sources)
+    
+    async def _cached_or_answer(
+        self,
+        file_id: str,
+        search_query: str,
+        model_name: str,
+        prompt_version: str
+    ) -> ChatAnswer:
+        """
+        Answer a chat query from the answer cache, or load the file and answer it.
+        """
+        cached = await self.answer_cache.get(file_id, model_name, search_query, prompt_version)
+        if cached is not None:
+            logger.info(f"Answering chat query for file {file_id} from the answer cache")
+            return cached
+        
+        file_dto = await self._load_file(file_id)
+        return await self._answer(file_dto, search_query, model_name, prompt_version)
+    
+    async def _answer(
+        self,
+        file_dto: FileDTO,
+        search_query: str,
+        model_name: str,
+        prompt_version: str
+    ) -> ChatAnswer:
+        """
+        Answer a chat query about a loaded file and cache the answer.
+        """
+        file_dto = await self._with_passages(file_dto, search_query)
+        
+        # Get response from AI, together with other questions about the file when grouping
+        if self.question_grouper is not None:
+            response = await self.question_grouper.explore(search_query, file_dto)
+        else:
+            response = await self.file_exploration_service.explore_async(search_query, file_dto)
+        
+        # Map the passages back to exact spans of the document
+        sources = await self.passage_locator.locate(file_dto, file_dto.passages, search_query, response)
+        
+        answer = ChatAnswer(content=response, sources=sources)
+        if not self.file_exploration_service.is_error_response(response):
+            await self.answer_cache.put(file_dto.pk, model_name, search_query, prompt_version, answer)
+        return answer
+    
+    async def _load_file(self, file_id: str) -> FileDTO:
+        """
+        Load a file that is ready to chat with.
+        
+        Concurrent loads of the same file share one read of the record.
+        
+        Args:
+            file_id: The ID of the file to chat with
+            
+        Returns:
+            The FileDTO of the file
+            
         Raises:
             ValueError: If the file is not found or not ready
         """
         # Get the file record
-        file_record = await self.get_file_by_id(file_id)
+        file_record = await self.in_flight.do(("file", file_id), lambda: self.get_file_by_id(file_id))
         if not file_record:
             raise ValueError(f"File with ID {file_id} not found")
         
@@ -157,17 +540,28 @@ class ChatService:
                 f"File processing is not complete. Current status: {file_record.processing_status}"
             )
         
-        # Convert to DTO and process
-        file_dto = self.create_file_dto(file_record)
         logger.info(f"Processing chat query for file: {file_record.file_name}")
+        return self.create_file_dto(file_record)
+    
+    async def _with_passages(self, file_dto: FileDTO, search_query: str) -> FileDTO:
+        """
+        Returns a copy of the FileDTO with the passages relevant to the query.
         
-        # Get response from AI
-        response = self.file_exploration_service.explore(search_query, file_dto)
-        
-        # Save chat history (don't wait for this to complete)
+        The passages are set on a copy so concurrent queries can share the loaded file.
+        """
+        # Pick the passages relevant to the query, ranked the way the explorer expects
+        passages = await self.retrieval_service.retrieve(
+            search_query,
+            file_dto,
+            retriever=self.file_exploration_service.retriever
+        )
+        return file_dto.model_copy(update={"passages": passages})
+    
+    async def _save_history_safely(self, file_id: str, query: str, response: str) -> None:
+        """
+        Save a chat interaction to the history, logging instead of failing the request.
+        """
         try:
-            await self.save_chat_history(file_id, search_query, response)
+            await self.save_chat_history(file_id, query, response)
         except Exception as e:
-            logger.error(f"Error saving chat history: {str(e)}")
-        
-        return response 
\ No newline at end of file
+            logger.error(f"Error saving chat history: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,94 @@
+import time
+import pytest
+from unittest.mock import AsyncMock
+from app.chat.answer_cache import AnswerCache, normalize_query, ANSWER_CACHE_PK_PREFIX
+from app.chat.models import AnswerCacheEntry, ChatAnswer
+from app.common.schemas import Source
+
+ANSWER = ChatAnswer(
+    content="The total is 120 USD.",
+    sources=[Source(ordinal=0, text="Total: 120 USD", start_offset=10, end_offset=24, page=1, score=0.42)]
+)
+
+@pytest.fixture
+def repository():
+    repository = AsyncMock()
+    repository.get_item.return_value = None
+    return repository
+
+@pytest.fixture
+def cache(repository):
+    return AnswerCache(repository=repository, max_size=4, ttl_seconds=60, persist=True)
+
+def test_normalize_query():
+    """Test that case, whitespace and surrounding punctuation are ignored"""
+    assert normalize_query("  What is   the TOTAL? ") == "what is the total"
+    assert normalize_query("C++ version") == "c++ version"
+
+def test_key_depends_on_every_part():
+    """Test that the file, model and prompt version are part of the key"""
+    key = AnswerCache.key("file1", "gemini", "What is the total?", "1")
+    
+    assert key == AnswerCache.key("file1", "gemini", "what is the total", "1")
+    assert key != AnswerCache.key("file2", "gemini", "What is the total?", "1")
+    assert key != AnswerCache.key("file1", "other", "What is the total?", "1")
+    assert key != AnswerCache.key("file1", "gemini", "What is the total?", "2")
+
+@pytest.mark.asyncio
+async def test_put_then_get_from_memory(cache, repository):
+    """Test that a cached answer is served from memory"""
+    await cache.put("file1", "gemini", "What is the total?", "1", ANSWER)
+    
+    assert await cache.get("file1", "gemini", "what is the total", "1") == ANSWER
+    repository.get_item.assert_not_called()
+    entry = repository.put_item.call_args.args[0]
+    assert entry.pk.startswith(ANSWER_CACHE_PK_PREFIX)
+    assert ChatAnswer.model_validate_json(entry.answer) == ANSWER
+    assert cache.stats()["memory_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_get_from_persisted_tier(cache, repository):
+    """Test that an answer cached by another worker is served and copied into memory"""
+    key = AnswerCache.key("file1", "gemini", "What is the total?", "1")
+    repository.get_item.return_value = AnswerCacheEntry(
+        pk=ANSWER_CACHE_PK_PREFIX + key, file_id="file1", model_name="gemini", query="what is the total",
+        prompt_version="1", answer=ANSWER.model_dump_json(), expires_at=int(time.time()) + 60
+    )
+    
+    assert await cache.get("file1", "gemini", "What is the total?", "1") == ANSWER
+    assert await cache.get("file1", "gemini", "What is the total?", "1") == ANSWER
+    repository.get_item.assert_called_once_with({"pk": ANSWER_CACHE_PK_PREFIX + key}, AnswerCacheEntry)
+    assert cache.stats()["persisted_hits"] == 1
+    assert cache.stats()["memory_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_expired_persisted_answer_is_a_miss(cache, repository):
+    """Test that expired items not yet removed by DynamoDB are ignored"""
+    repository.get_item.return_value = AnswerCacheEntry(
+        pk="x", file_id="file1", model_name="gemini", query="q", prompt_version="1",
+        answer=ANSWER.model_dump_json(), expires_at=int(time.time()) - 1
+    )
+    
+    assert await cache.get("file1", "gemini", "q", "1") is None
+    assert cache.stats()["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_persisted_tier_failures_are_misses(cache, repository):
+    """Test that DynamoDB errors never fail a lookup or a store"""
+    repository.get_item.side_effect = Exception("throttled")
+    repository.put_item.side_effect = Exception("throttled")
+    
+    assert await cache.get("file1", "gemini", "q", "1") is None
+    await cache.put("file1", "gemini", "q", "1", ANSWER)
+    assert await cache.get("file1", "gemini", "q", "1") == ANSWER
+    assert cache.stats() == {"memory_hits": 1, "persisted_hits": 0, "misses": 1, "hit_rate": 0.5, "size": 1}
+
+@pytest.mark.asyncio
+async def test_memory_only(repository):
+    """Test that the persisted tier can be turned off"""
+    cache = AnswerCache(repository=repository, max_size=4, ttl_seconds=60, persist=False)
+    
+    await cache.put("file1", "gemini", "q", "1", ANSWER)
+    assert await cache.get("file2", "gemini", "q", "1") is None
+    repository.put_item.assert_not_called()
+    repository.get_item.assert_not_called()
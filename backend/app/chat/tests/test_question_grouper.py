@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from datetime import datetime, UTC
+from app.chat.question_grouper import QuestionGrouper
+from app.common.schemas import FileDTO
+
+def make_file_dto(pk):
+    """Create a FileDTO for a file"""
+    return FileDTO(
+        pk=pk,
+        filename="test.pdf",
+        url="https://example.com/test.pdf",
+        content="Test content",
+        markdown_content="# Test Document",
+        file_size=1024,
+        file_type="application/pdf",
+        processing_status="completed",
+        embedding_status="completed",
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+        metadata={},
+        history={}
+    )
+
+@pytest.fixture
+def calls():
+    """Record of the grouped calls"""
+    return []
+
+@pytest.fixture
+def grouper(calls):
+    """Grouper recording its calls and answering every question"""
+    async def explore_many(searches, file_dtos):
+        calls.append((file_dtos[0].pk, list(searches)))
+        return [f"Answer to {search}" for search in searches]
+    return QuestionGrouper(explore_many, window_seconds=0.02, max_questions=3)
+
+@pytest.mark.asyncio
+async def test_questions_within_window_share_one_call(grouper, calls):
+    """Test that questions about a file arriving within the window are answered together and fanned out"""
+    answers = await asyncio.gather(
+        grouper.explore("When?", make_file_dto("a")),
+        grouper.explore("Who?", make_file_dto("a")),
+        grouper.explore("Where?", make_file_dto("b"))
+    )
+    
+    assert answers == ["Answer to When?", "Answer to Who?", "Answer to Where?"]
+    assert sorted(calls) == [("a", ["When?", "Who?"]), ("b", ["Where?"])]
+    assert grouper.stats() == {"groups": 2, "grouped_questions": 2}
+
+@pytest.mark.asyncio
+async def test_full_group_is_answered_without_waiting(calls):
+    """Test that a group reaching max_questions is answered at once and later questions open a new group"""
+    async def explore_many(searches, file_dtos):
+        calls.append(list(searches))
+        return list(searches)
+    grouper = QuestionGrouper(explore_many, window_seconds=10, max_questions=2)
+    
+    first = await asyncio.wait_for(asyncio.gather(
+        grouper.explore("q1", make_file_dto("a")),
+        grouper.explore("q2", make_file_dto("a"))
+    ), timeout=1)
+    
+    assert first == ["q1", "q2"]
+    assert calls == [["q1", "q2"]]
+
+@pytest.mark.asyncio
+async def test_group_failure_reaches_every_caller():
+    """Test that a failed call fails every question of the group"""
+    async def explore_many(searches, file_dtos):
+        raise TimeoutError()
+    grouper = QuestionGrouper(explore_many, window_seconds=0.01, max_questions=3)
+    
+    results = await asyncio.gather(
+        grouper.explore("q1", make_file_dto("a")),
+        grouper.explore("q2", make_file_dto("a")),
+        return_exceptions=True
+    )
+    
+    assert all(isinstance(result, TimeoutError) for result in results)
+
+@pytest.mark.asyncio
+async def test_missing_answers_fail_the_group():
+    """Test that callers are not left waiting when fewer answers than questions come back"""
+    async def explore_many(searches, file_dtos):
+        return ["Only one answer"]
+    grouper = QuestionGrouper(explore_many, window_seconds=0.01, max_questions=3)
+    
+    results = await asyncio.wait_for(asyncio.gather(
+        grouper.explore("q1", make_file_dto("a")),
+        grouper.explore("q2", make_file_dto("a")),
+        return_exceptions=True
+    ), 1)
+    
+    assert all(isinstance(result, ValueError) for result in results)
+
+@pytest.mark.asyncio
+async def test_group_keeps_its_task(grouper):
+    """Test that the task answering a group is referenced until it is done"""
+    answer = asyncio.ensure_future(grouper.explore("q1", make_file_dto("a")))
+    await asyncio.sleep(0)
+    
+    task = grouper._open["a"].task
+    assert task is not None and not task.done()
+    assert await answer == "Answer to q1"
@@ -1,10 +1,12 @@
+import json
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 from datetime import datetime
 from app.chat.router import ChatRouter, ChatRequest, ChatResponse, ChatHistoryResponse
-from app.chat.models import ChatHistory
+from app.chat.models import BatchChatAnswer, ChatAnswer, ChatHistory, ChatStreamEvent, FileSource, MultiFileChatAnswer
+from app.common.schemas import Source
 
 @pytest.fixture
 def mock_chat_service():
@@ -43,7 +45,7 @@ def test_chat_router_initialization():
 async def test_chat_with_file(client, mock_chat_service):
     """Test the chat_with_file endpoint"""
     # Configure the mock service
-    mock_chat_service.process_chat_query.return_value = "This is an AI response"
+    mock_chat_service.answer_chat_query.return_value = ChatAnswer(content="This is an AI response")
     
     # Make the request
     response = client.post("/chat/", json={
@@ -53,18 +55,177 @@ async def test_chat_with_file(client, mock_chat_service):
     
     # Check the response
     assert response.status_code == 200
-    assert response.json() == {"content": "This is an AI response"}
+    assert response.json() == {"content": "This is an AI response", "sources": []}
     
     # Verify the service was called correctly
-    mock_chat_service.process_chat_query.assert_called_once_with(
+    mock_chat_service.answer_chat_query.assert_called_once_with(
         "file123", "Tell me about this document"
     )
 
+@pytest.mark.asyncio
+async def test_chat_with_file_returns_sources(client, mock_chat_service):
+    """Test that the located sources are returned with the answer"""
+    source = Source(ordinal=2, text="Invoice 4411 was paid.", start_offset=120, end_offset=142, page=3, score=0.8)
+    mock_chat_service.answer_chat_query.return_value = ChatAnswer(content="It was paid.", sources=[source])
+    
+    response = client.post("/chat/", json={
+        "pk": "file123",
+        "search": "Was invoice 4411 paid?"
+    })
+    
+    assert response.status_code == 200
+    assert response.json()["sources"] == [source.model_dump()]
+
+def parse_sse(body):
+    """Split a Server-Sent Events body into (event, data) pairs"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_stream_chat_with_file(client, mock_chat_service):
+    """Test that the streaming endpoint sends the parts, then the whole answer with its sources"""
+    source = Source(ordinal=0, text="Invoice 4411 was paid.", start_offset=0, end_offset=22, score=0.8)
+    async def events():
+        yield ChatStreamEvent(event="delta", content="It was ")
+        yield ChatStreamEvent(event="delta", content="paid.")
+        yield ChatStreamEvent(event="done", content="It was paid.", sources=[source])
+    mock_chat_service.open_chat_stream.return_value = events()
+    
+    response = client.post("/chat/stream", json={"pk": "file123", "search": "Was invoice 4411 paid?"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_sse(response.text) == [
+        ("delta", {"content": "It was ", "sources": []}),
+        ("delta", {"content": "paid.", "sources": []}),
+        ("done", {"content": "It was paid.", "sources": [source.model_dump()]})
+    ]
+    mock_chat_service.open_chat_stream.assert_called_once_with("file123", "Was invoice 4411 paid?")
+
+def test_stream_chat_with_file_error_mid_stream(client, mock_chat_service):
+    """Test that a failure after the stream started is sent as an error event"""
+    async def events():
+        yield ChatStreamEvent(event="delta", content="It was ")
+        raise RuntimeError("connection lost")
+    mock_chat_service.open_chat_stream.return_value = events()
+    
+    response = client.post("/chat/stream", json={"pk": "file123", "search": "Was invoice 4411 paid?"})
+    
+    event, data = parse_sse(response.text)[-1]
+    assert event == "error"
+    assert "connection lost" in data["content"]
+
+def test_stream_chat_with_file_timeout_mid_stream(client, mock_chat_service):
+    """Test that the model stalling after the stream started is sent as an error event"""
+    async def events():
+        yield ChatStreamEvent(event="delta", content="It was ")
+        raise TimeoutError()
+    mock_chat_service.open_chat_stream.return_value = events()
+    
+    response = client.post("/chat/stream", json={"pk": "file123", "search": "Was invoice 4411 paid?"})
+    
+    assert parse_sse(response.text)[-1] == ("error", {"content": "The model did not answer in time", "sources": []})
+
+def test_stream_chat_with_file_not_found(client, mock_chat_service):
+    """Test that a missing file is reported before the stream starts"""
+    mock_chat_service.open_chat_stream.side_effect = ValueError("File with ID file123 not found")
+    
+    response = client.post("/chat/stream", json={"pk": "file123", "search": "Tell me about this document"})
+    
+    assert response.status_code == 404
+
+def test_chat_with_files(client, mock_chat_service):
+    """Test that the multi-file endpoint returns sources attributed to their files"""
+    source = FileSource(pk="amendment", filename="amendment.pdf", ordinal=0, text="The fee is 120 dollars.",
+                        start_offset=13, end_offset=36)
+    mock_chat_service.answer_multi_file_query.return_value = MultiFileChatAnswer(
+        content="The fee was raised to 120 dollars [S2].", sources=[source]
+    )
+    
+    response = client.post("/chat/multi", json={"pks": ["contract", "amendment"], "search": "What is the fee?"})
+    
+    assert response.status_code == 200
+    assert response.json()["sources"] == [source.model_dump()]
+    mock_chat_service.answer_multi_file_query.assert_called_once_with(["contract", "amendment"], "What is the fee?")
+    
+    mock_chat_service.answer_multi_file_query.side_effect = ValueError("Files not found: amendment")
+    assert client.post("/chat/multi", json={"pks": ["amendment"], "search": "?"}).status_code == 404
+
+def test_chat_with_file_batch(client, mock_chat_service):
+    """Test that the batch endpoint returns the answer and timing of each question"""
+    mock_chat_service.answer_chat_batch.return_value = [
+        BatchChatAnswer(question="When?", content="In May.", duration_ms=120.0),
+        BatchChatAnswer(question="Who?", content="", duration_ms=60000.0, error="TimeoutError")
+    ]
+    
+    response = client.post("/chat/batch", json={"pk": "file123", "questions": ["When?", "Who?"]})
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["pk"] == "file123"
+    assert [answer["content"] for answer in body["answers"]] == ["In May.", ""]
+    assert body["answers"][1]["error"] == "TimeoutError"
+    assert body["duration_ms"] >= 0
+    mock_chat_service.answer_chat_batch.assert_called_once_with("file123", ["When?", "Who?"])
+
+def test_chat_with_file_batch_errors(client, mock_chat_service):
+    """Test that a missing file and an invalid batch are reported"""
+    mock_chat_service.answer_chat_batch.side_effect = ValueError("File with ID file123 not found")
+    assert client.post("/chat/batch", json={"pk": "file123", "questions": ["When?"]}).status_code == 404
+    
+    mock_chat_service.answer_chat_batch.side_effect = ValueError("At least one question is required")
+    assert client.post("/chat/batch", json={"pk": "file123", "questions": []}).status_code == 400
+
+def test_get_coalescing_stats(client, mock_chat_service):
+    """Test that the coalescing counters are exposed, with grouping on or off"""
+    mock_chat_service.in_flight = MagicMock(shared=5)
+    mock_chat_service.in_flight.__len__.return_value = 1
+    mock_chat_service.question_grouper = None
+    
+    response = client.get("/chat/coalescing/stats")
+    assert response.status_code == 200
+    assert response.json() == {
+        "shared_requests": 5, "in_flight": 1, "grouping_enabled": False, "groups": 0, "grouped_questions": 0
+    }
+    
+    mock_chat_service.question_grouper = MagicMock()
+    mock_chat_service.question_grouper.stats.return_value = {"groups": 3, "grouped_questions": 7}
+    body = client.get("/chat/coalescing/stats").json()
+    assert body["grouping_enabled"] is True
+    assert body["grouped_questions"] == 7
+
+def test_get_answer_cache_stats(client, mock_chat_service):
+    """Test that the answer cache counters are exposed"""
+    stats = {"memory_hits": 3, "persisted_hits": 1, "misses": 4, "hit_rate": 0.5, "size": 2}
+    mock_chat_service.answer_cache = MagicMock()
+    mock_chat_service.answer_cache.stats.return_value = stats
+    
+    response = client.get("/chat/cache/stats")
+    
+    assert response.status_code == 200
+    assert response.json() == stats
+
+def test_get_semantic_cache_stats(client, mock_chat_service):
+    """Test that the semantic cache counters are exposed, or reported as disabled"""
+    stats = {"hits": 2, "misses": 6, "hit_rate": 0.25, "llm_calls_avoided": 2,
+             "mean_hit_similarity": 0.97, "evictions": 0, "files": 1}
+    mock_chat_service.file_exploration_service = MagicMock()
+    mock_chat_service.file_exploration_service.semantic_cache.stats.return_value = stats
+    
+    response = client.get("/chat/cache/semantic/stats")
+    assert response.status_code == 200
+    assert response.json() == {"enabled": True, **stats}
+    
+    mock_chat_service.file_exploration_service.semantic_cache = None
+    assert client.get("/chat/cache/semantic/stats").json()["enabled"] is False
+
 @pytest.mark.asyncio
 async def test_chat_with_file_not_found(client, mock_chat_service):
     """Test the chat_with_file endpoint when file is not found"""
     # Configure the mock service to raise an error
-    mock_chat_service.process_chat_query.side_effect = ValueError("File with ID file123 not found")
+    mock_chat_service.answer_chat_query.side_effect = ValueError("File with ID file123 not found")
     
     # Make the request
     response = client.post("/chat/", json={
@@ -80,7 +241,7 @@ async def test_chat_with_file_not_found(client, mock_chat_service):
 async def test_chat_with_file_validation_error(client, mock_chat_service):
     """Test the chat_with_file endpoint with validation error"""
     # Configure the mock service to raise an error
-    mock_chat_service.process_chat_query.side_effect = ValueError("File is not ready")
+    mock_chat_service.answer_chat_query.side_effect = ValueError("File is not ready")
     
     # Make the request
     response = client.post("/chat/", json={
@@ -96,7 +257,7 @@ async def test_chat_with_file_validation_error(client, mock_chat_service):
 async def test_chat_with_file_server_error(client, mock_chat_service):
     """Test the chat_with_file endpoint with server error"""
     # Configure the mock service to raise an unexpected error
-    mock_chat_service.process_chat_query.side_effect = Exception("Internal server error")
+    mock_chat_service.answer_chat_query.side_effect = Exception("Internal server error")
     
     # Make the request
     response = client.post("/chat/", json={
@@ -108,6 +269,14 @@ async def test_chat_with_file_server_error(client, mock_chat_service):
     assert response.status_code == 500
     assert "Error processing chat request" in response.json()["detail"]
 
+def test_chat_with_file_timeout(client, mock_chat_service):
+    """Test that a model that does not answer in time is reported as a gateway timeout"""
+    mock_chat_service.answer_chat_query.side_effect = TimeoutError()
+    
+    response = client.post("/chat/", json={"pk": "file123", "search": "Tell me about this document"})
+    
+    assert response.status_code == 504
+
 @pytest.mark.asyncio
 async def test_get_chat_history(client, mock_chat_service):
     """Test the get_chat_history endpoint"""
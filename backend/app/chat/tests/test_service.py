@@ -1,11 +1,23 @@
+import asyncio
+import gc
+import time
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, timedelta
 import json
 from app.chat.service import ChatService
+from app.chat.answer_cache import AnswerCache
+from app.chat.question_grouper import QuestionGrouper
 from app.chat.models import ChatHistory
+from app.file_exploration.file_explorer import FileExplorer
+from app.file_exploration.service import FileExplorationService
+from app.infrastructure.config import settings
 from app.file_processing.models import FileProcessingRecord
-from app.common.schemas import FileDTO
+from app.common.schemas import FileDTO, Passage
+
+async def stream(*parts):
+    for part in parts:
+        yield part
 
 @pytest.fixture
 def mock_file_record():
@@ -53,6 +65,15 @@ def chat_service():
     service.file_repository = AsyncMock()
     service.dynamodb_repository = AsyncMock()
     service.file_exploration_service = MagicMock()
+    service.file_exploration_service.model_name = "gemini-2.0-flash"
+    service.file_exploration_service.prompt_version = "excerpts-1"
+    service.file_exploration_service.is_error_response.return_value = False
+    service.file_exploration_service.explore_async = AsyncMock()
+    service.retrieval_service = AsyncMock()
+    service.retrieval_service.retrieve.return_value = []
+    cache_repository = AsyncMock()
+    cache_repository.get_item.return_value = None
+    service.answer_cache = AnswerCache(repository=cache_repository, max_size=8, ttl_seconds=60, persist=True)
     return service
 
 @pytest.mark.asyncio
@@ -162,7 +183,7 @@ async def test_process_chat_query(chat_service, mock_file_record):
     """Test processing a chat query"""
     # Configure mocks
     chat_service.file_repository.get_item.return_value = mock_file_record
-    chat_service.file_exploration_service.explore.return_value = "AI generated response"
+    chat_service.file_exploration_service.explore_async.return_value = "AI generated response"
     chat_service.dynamodb_repository.put_item.return_value = None
     
     # Call method
@@ -171,9 +192,315 @@ async def test_process_chat_query(chat_service, mock_file_record):
     # Verify
     assert result == "AI generated response"
     chat_service.file_repository.get_item.assert_called_once()
-    chat_service.file_exploration_service.explore.assert_called_once()
+    chat_service.file_exploration_service.explore_async.assert_called_once()
     chat_service.dynamodb_repository.put_item.assert_called_once()
 
+@pytest.mark.asyncio
+async def test_process_chat_query_attaches_passages(chat_service, mock_file_record):
+    """Test that retrieved passages are passed to the explorer"""
+    passages = [Passage(ordinal=0, text="# Test Document", start_offset=0, end_offset=15, token_estimate=4, score=0.9)]
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.retrieval_service.retrieve.return_value = passages
+    chat_service.file_exploration_service.explore_async.return_value = "AI generated response"
+    
+    await chat_service.process_chat_query("file123", "What is this document about?")
+    
+    search, file_dto = chat_service.file_exploration_service.explore_async.call_args.args
+    assert search == "What is this document about?"
+    assert file_dto.passages == passages
+
+@pytest.mark.asyncio
+async def test_answer_chat_query_locates_sources(chat_service, mock_file_record):
+    """Test that the answer comes with the exact spans of the passages it was built from"""
+    passages = [Passage(ordinal=0, text=mock_file_record.markdown_content, start_offset=0, end_offset=41, token_estimate=10, score=0.9)]
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.retrieval_service.retrieve.return_value = passages
+    chat_service.file_exploration_service.explore_async.return_value = "It is a test document."
+    
+    answer = await chat_service.answer_chat_query("file123", "What kind of document is this?")
+    
+    assert answer.content == "It is a test document."
+    assert len(answer.sources) == 1
+    source = answer.sources[0]
+    assert source.text == "This is a test document."
+    assert mock_file_record.markdown_content[source.start_offset:source.end_offset] == source.text
+    assert source.page is None
+
+@pytest.mark.asyncio
+async def test_answer_chat_query_repeat_is_cached(chat_service, mock_file_record):
+    """Test that a repeated question is answered from the cache without loading the file or calling the explorer"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.file_exploration_service.explore_async.return_value = "It is a test document."
+    
+    first = await chat_service.answer_chat_query("file123", "What kind of document is this?")
+    second = await chat_service.answer_chat_query("file123", "  what kind of document is this  ")
+    
+    assert second == first
+    chat_service.file_repository.get_item.assert_called_once()
+    chat_service.file_exploration_service.explore_async.assert_called_once()
+    chat_service.answer_cache.repository.put_item.assert_called_once()
+    assert chat_service.dynamodb_repository.put_item.call_count == 2
+    assert chat_service.answer_cache.stats()["memory_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_answer_chat_query_does_not_cache_errors(chat_service, mock_file_record):
+    """Test that explorer failures are not cached"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.file_exploration_service.explore_async.return_value = "Error exploring content with Gemini: quota"
+    chat_service.file_exploration_service.is_error_response.return_value = True
+    
+    await chat_service.answer_chat_query("file123", "What is this?")
+    await chat_service.answer_chat_query("file123", "What is this?")
+    
+    assert chat_service.file_exploration_service.explore_async.call_count == 2
+    chat_service.answer_cache.repository.put_item.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_open_chat_stream(chat_service, mock_file_record):
+    """Test that the stream forwards the explorer's parts, then caches and saves the whole answer"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.file_exploration_service.explore_stream_async.return_value = stream("It is a ", "test document.")
+    
+    events = [event async for event in await chat_service.open_chat_stream("file123", "What is this?")]
+    
+    assert [(event.event, event.content) for event in events] == [
+        ("delta", "It is a "), ("delta", "test document."), ("done", "It is a test document.")
+    ]
+    chat_service.dynamodb_repository.put_item.assert_called_once()
+    assert chat_service.dynamodb_repository.put_item.call_args.args[0].response == "It is a test document."
+    
+    cached = await chat_service.answer_chat_query("file123", "What is this?")
+    assert cached.content == "It is a test document."
+    chat_service.file_exploration_service.explore_async.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_open_chat_stream_replays_cached_answer(chat_service, mock_file_record):
+    """Test that a cached answer is streamed in one part without loading the file"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.file_exploration_service.explore_async.return_value = "It is a test document."
+    await chat_service.answer_chat_query("file123", "What is this?")
+    
+    events = [event async for event in await chat_service.open_chat_stream("file123", "what is this")]
+    
+    assert [(event.event, event.content) for event in events] == [
+        ("delta", "It is a test document."), ("done", "It is a test document.")
+    ]
+    chat_service.file_repository.get_item.assert_called_once()
+    chat_service.file_exploration_service.explore_stream_async.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_open_chat_stream_file_not_found(chat_service):
+    """Test that a missing file fails before the stream starts"""
+    chat_service.file_repository.get_item.return_value = None
+    
+    with pytest.raises(ValueError, match="File with ID file123 not found"):
+        await chat_service.open_chat_stream("file123", "What is this?")
+
+class SlowModelExplorer(FileExplorer):
+    """Explorer standing in for a model whose latency depends on the question"""
+    async def explore_async(self, search, file_dto):
+        await asyncio.sleep(float(search.split()[-1]))
+        return f"Answer to {search}"
+    
+    def explore(self, search, file_dto):
+        raise AssertionError("the blocking call must not be used")
+
+@pytest.mark.asyncio
+async def test_concurrent_chats_take_the_longest_latency(chat_service, mock_file_record):
+    """Load test: N concurrent chats finish in about the slowest latency, not the sum of them"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.file_exploration_service = FileExplorationService(explorer=SlowModelExplorer(), timeout_seconds=5)
+    latencies = [0.05 + 0.01 * i for i in range(16)]
+    # A full collection of the objects left by earlier tests would otherwise pause the timed section
+    gc.collect()
+    
+    start = time.perf_counter()
+    answers = await asyncio.gather(*(
+        chat_service.answer_chat_query("file123", f"question {latency}") for latency in latencies
+    ))
+    elapsed = time.perf_counter() - start
+    
+    assert [answer.content for answer in answers] == [f"Answer to question {latency}" for latency in latencies]
+    assert elapsed < max(latencies) + 0.1
+    assert elapsed < sum(latencies) / 4
+
+@pytest.mark.asyncio
+async def test_answer_chat_batch(chat_service, mock_file_record, monkeypatch):
+    """Test that a batch loads the file once and answers its questions concurrently, in order"""
+    monkeypatch.setattr(settings, "CHAT_BATCH_CONCURRENCY", 2)
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    running = 0
+    most_running = 0
+    async def explore(search, file_dto):
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"Answer to {search}"
+    chat_service.file_exploration_service.explore_async.side_effect = explore
+    questions = [f"Question {i}?" for i in range(6)]
+    
+    answers = await chat_service.answer_chat_batch("file123", questions)
+    
+    assert [answer.question for answer in answers] == questions
+    assert [answer.content for answer in answers] == [f"Answer to {question}" for question in questions]
+    assert all(not answer.cached and answer.error is None and answer.duration_ms > 0 for answer in answers)
+    chat_service.file_repository.get_item.assert_called_once()
+    assert most_running == 2
+
+@pytest.mark.asyncio
+async def test_answer_chat_batch_reuses_cached_and_repeated_answers(chat_service, mock_file_record):
+    """Test that cached questions and repeats within the batch do not call the explorer again"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.file_exploration_service.explore_async.side_effect = lambda search, file_dto: f"Answer to {search}"
+    await chat_service.answer_chat_query("file123", "What is the total?")
+    
+    answers = await chat_service.answer_chat_batch(
+        "file123", ["what is the total", "Who signed it?", "who signed it"]
+    )
+    
+    assert [answer.content for answer in answers] == [
+        "Answer to What is the total?", "Answer to Who signed it?", "Answer to Who signed it?"
+    ]
+    assert [answer.cached for answer in answers] == [True, False, False]
+    assert answers[2].question == "who signed it"
+    assert chat_service.file_exploration_service.explore_async.call_count == 2
+
+@pytest.mark.asyncio
+async def test_answer_chat_batch_reports_failed_questions(chat_service, mock_file_record):
+    """Test that a question that times out gets an error without failing the others"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    async def explore(search, file_dto):
+        if search == "Slow question?":
+            raise TimeoutError()
+        return "Fine"
+    chat_service.file_exploration_service.explore_async.side_effect = explore
+    
+    answers = await chat_service.answer_chat_batch("file123", ["Slow question?", "Quick question?"])
+    
+    assert answers[0].error == "TimeoutError"
+    assert answers[0].content == ""
+    assert answers[1].content == "Fine"
+
+@pytest.mark.asyncio
+async def test_answer_chat_batch_validation(chat_service, monkeypatch):
+    """Test that empty and oversized batches are rejected"""
+    monkeypatch.setattr(settings, "CHAT_BATCH_MAX_QUESTIONS", 2)
+    
+    with pytest.raises(ValueError, match="At least one question"):
+        await chat_service.answer_chat_batch("file123", [])
+    with pytest.raises(ValueError, match="At most 2 questions"):
+        await chat_service.answer_chat_batch("file123", ["a?", "b?", "c?"])
+    chat_service.file_repository.get_item.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_queries_share_one_answer(chat_service, mock_file_record):
+    """Test that identical in-flight queries share one record read and one explorer call"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    async def explore(search, file_dto):
+        await asyncio.sleep(0.01)
+        return "It is a test document."
+    chat_service.file_exploration_service.explore_async.side_effect = explore
+    
+    answers = await asyncio.gather(*(
+        chat_service.answer_chat_query("file123", query) for query in ["What is this?", "what is this", "What is this?"]
+    ))
+    
+    assert [answer.content for answer in answers] == ["It is a test document."] * 3
+    chat_service.file_exploration_service.explore_async.assert_called_once()
+    chat_service.file_repository.get_item.assert_called_once()
+    assert chat_service.dynamodb_repository.put_item.call_count == 3
+    assert chat_service.in_flight.shared == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_questions_are_grouped(chat_service, mock_file_record):
+    """Test that different questions within the grouping window are answered by one call"""
+    chat_service.file_repository.get_item.return_value = mock_file_record
+    chat_service.file_exploration_service.explore_many_async = AsyncMock(return_value=["In May.", "ACME Corp."])
+    chat_service.question_grouper = QuestionGrouper(
+        lambda searches, file_dtos: chat_service.file_exploration_service.explore_many_async(searches, file_dtos),
+        window_seconds=0.02,
+        max_questions=8
+    )
+    
+    answers = await asyncio.gather(
+        chat_service.answer_chat_query("file123", "When was it signed?"),
+        chat_service.answer_chat_query("file123", "Who signed it?")
+    )
+    
+    assert [answer.content for answer in answers] == ["In May.", "ACME Corp."]
+    chat_service.file_exploration_service.explore_many_async.assert_awaited_once()
+    chat_service.file_exploration_service.explore_async.assert_not_called()
+
+@pytest.fixture
+def contract_records(mock_file_record):
+    """A contract and its amendment"""
+    contract = mock_file_record.model_copy(update={
+        "pk": "contract", "file_name": "contract.pdf",
+        "markdown_content": "# Contract\n\nThe monthly fee is 100 dollars. The term is one year."
+    })
+    amendment = mock_file_record.model_copy(update={
+        "pk": "amendment", "file_name": "amendment.pdf",
+        "markdown_content": "# Amendment\n\nThe monthly fee is raised to 120 dollars."
+    })
+    return [contract, amendment]
+
+def whole_passage(record, score):
+    """A passage covering the text after the title"""
+    start = record.markdown_content.index("The")
+    text = record.markdown_content[start:]
+    return Passage(ordinal=0, text=text, start_offset=start, end_offset=len(record.markdown_content),
+                   token_estimate=len(text) // 4, score=score)
+
+@pytest.mark.asyncio
+async def test_answer_multi_file_query(chat_service, contract_records):
+    """Test that several files are loaded with one batch read and answered with one grounded prompt"""
+    contract, amendment = contract_records
+    chat_service.file_repository.batch_get.return_value = [amendment, contract]
+    chat_service.retrieval_service.retrieve.side_effect = lambda search, file_dto, retriever=None: [
+        whole_passage(contract if file_dto.pk == "contract" else amendment, 0.9)
+    ]
+    chat_service.file_exploration_service.explore_files_async = AsyncMock(
+        return_value="The amendment raises the monthly fee from 100 to 120 dollars [S2]."
+    )
+    
+    answer = await chat_service.answer_multi_file_query(["contract", "amendment", "contract"], "What is the monthly fee?")
+    
+    chat_service.file_repository.batch_get.assert_called_once()
+    assert chat_service.file_repository.batch_get.call_args.args[0] == [{"pk": "contract"}, {"pk": "amendment"}]
+    search, file_dtos = chat_service.file_exploration_service.explore_files_async.call_args.args
+    assert [file_dto.pk for file_dto in file_dtos] == ["contract", "amendment"]
+    assert all(len(file_dto.passages) == 1 for file_dto in file_dtos)
+    assert answer.content.endswith("[S2].")
+    assert {source.pk for source in answer.sources} == {"amendment"}
+    assert answer.sources[0].filename == "amendment.pdf"
+    assert "120 dollars" in answer.sources[0].text
+    assert chat_service.dynamodb_repository.put_item.call_count == 2
+
+@pytest.mark.asyncio
+async def test_answer_multi_file_query_missing_file(chat_service, contract_records):
+    """Test that files missing from the batch read are reported"""
+    chat_service.file_repository.batch_get.return_value = contract_records[:1]
+    
+    with pytest.raises(ValueError, match="Files not found: amendment"):
+        await chat_service.answer_multi_file_query(["contract", "amendment"], "What is the monthly fee?")
+
+def test_share_token_budget(chat_service, contract_records):
+    """Test that files take turns within the budget and files without passages get their start"""
+    def passage(start, tokens):
+        return Passage(ordinal=start, text="x" * tokens * 4, start_offset=start, end_offset=start + tokens * 4,
+                       token_estimate=tokens)
+    file_dtos = [chat_service.create_file_dto(record) for record in contract_records]
+    file_dtos.append(file_dtos[0].model_copy(update={"pk": "empty", "markdown_content": "y" * 1000}))
+    ranked = [[passage(100, 10), passage(0, 10), passage(50, 10)], [passage(0, 25), passage(40, 5)], []]
+    
+    selected = chat_service._share_token_budget(file_dtos, ranked, token_budget=60)
+    
+    assert [[p.start_offset for p in passages] for passages in selected] == [[100], [0, 40], [0]]
+    assert selected[2][0].token_estimate == 20
+    assert sum(p.token_estimate for passages in selected for p in passages) <= 60
+
 @pytest.mark.asyncio
 async def test_process_chat_query_file_not_found(chat_service):
     """Test processing a chat query when file is not found"""
@@ -200,7 +527,7 @@ async def test_process_chat_query_history_error(chat_service, mock_file_record):
     """Test processing a chat query with history error"""
     # Configure mocks
     chat_service.file_repository.get_item.return_value = mock_file_record
-    chat_service.file_exploration_service.explore.return_value = "AI generated response"
+    chat_service.file_exploration_service.explore_async.return_value = "AI generated response"
     chat_service.dynamodb_repository.put_item.side_effect = Exception("Database error")
     
     # Call method - should not raise the exception
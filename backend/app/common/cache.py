@@ -0,0 +1,81 @@
+"""
+In-process caching helpers.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A least-recently-used cache with an optional time-to-live per entry.
+    """
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of entries kept in the cache
+            ttl_seconds: Optional number of seconds after which an entry expires
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get an entry and mark it as recently used.
+        
+        Args:
+            key: The entry key
+            default: Value returned when the key is missing or expired
+            
+        Returns:
+            The cached value, or default
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Add or replace an entry, evicting the least recently used one if full.
+        
+        Args:
+            key: The entry key
+            value: The value to cache
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove an entry.
+        
+        Args:
+            key: The entry key
+            default: Value returned when the key is missing
+            
+        Returns:
+            The removed value, or default
+        """
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+    
+    def clear(self) -> None:
+        """
+        Remove every entry.
+        """
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
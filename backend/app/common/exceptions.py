@@ -12,4 +12,16 @@ class TextExtractionError(FileProcessingError):
 
 class FileUploadError(FileProcessingError):
     """Raised when file upload fails."""
-    pass 
\ No newline at end of file
+    pass 
+
+class TextChunkingError(FileProcessingError):
+    """Raised when text chunking fails."""
+    pass
+
+class TextIndexingError(FileProcessingError):
+    """Raised when building the search indexes of a file fails."""
+    pass
+
+class IndexNotReadyError(Exception):
+    """Raised when a search index of a file is still being built; the request can be retried."""
+    pass
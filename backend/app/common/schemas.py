@@ -1,7 +1,23 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime
 
+class Passage(BaseModel):
+    ordinal: int
+    text: str
+    start_offset: int
+    end_offset: int
+    token_estimate: int
+    score: float = 0.0
+
+class Source(BaseModel):
+    ordinal: int
+    text: str
+    start_offset: int
+    end_offset: int
+    page: Optional[int] = None
+    score: float = 0.0
+
 class FileDTO(BaseModel):
     pk: str
     filename: str
@@ -16,4 +32,5 @@ class FileDTO(BaseModel):
     updated_at: datetime
     error_message: Optional[str] = None
     metadata: Dict
-    history: Dict[str, str] 
\ No newline at end of file
+    history: Dict[str, str]
+    passages: List[Passage] = []
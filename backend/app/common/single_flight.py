@@ -0,0 +1,44 @@
+"""
+Deduplication of concurrent async calls.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    Callers arriving while a call with the same key is in flight wait for that
+    call and share its result or exception instead of starting their own. The
+    call runs in its own task, so a caller that gives up does not cancel it for
+    the others.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run call, or join the call already in flight for the key.
+
+        Args:
+            key: Identifies calls that produce the same result
+            call: Starts the call when none is in flight
+
+        Returns:
+            The result of the call
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1 @@
+# Tests for the common module 
\ No newline at end of file
@@ -0,0 +1,27 @@
+from unittest.mock import patch
+from app.common.cache import LRUCache
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted when full"""
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+def test_lru_cache_expires_entries():
+    """Test that entries expire after their time-to-live"""
+    cache = LRUCache(max_size=2, ttl_seconds=10)
+    with patch("app.common.cache.time.monotonic", return_value=100.0):
+        cache.put("a", 1)
+    
+    with patch("app.common.cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") == 1
+    with patch("app.common.cache.time.monotonic", return_value=111.0):
+        assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from app.common.single_flight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_concurrent_calls():
+    """Test that concurrent calls with the same key run once and share the result"""
+    flight = SingleFlight()
+    calls = []
+    async def call(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"result {key}"
+    
+    results = await asyncio.gather(*(flight.do(key, lambda key=key: call(key)) for key in ["a", "a", "b", "a"]))
+    
+    assert results == ["result a", "result a", "result b", "result a"]
+    assert sorted(calls) == ["a", "b"]
+    assert flight.shared == 2
+    assert len(flight) == 0
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_exceptions_and_forgets_finished_calls():
+    """Test that waiters get the exception of the call and that later calls run again"""
+    flight = SingleFlight()
+    calls = 0
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+    
+    results = await asyncio.gather(flight.do("a", failing), flight.do("a", failing), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert calls == 1
+    
+    with pytest.raises(ValueError):
+        await flight.do("a", failing)
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_single_flight_call_survives_cancelled_caller():
+    """Test that a caller giving up does not cancel the call for the others"""
+    flight = SingleFlight()
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+    
+    first = asyncio.ensure_future(flight.do("a", slow))
+    second = asyncio.ensure_future(flight.do("a", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+    
+    assert await second == "done"
@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from typing import List
+import numpy as np
+
+# Vectors are stored as little-endian float32 bytes
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+class Embedder(ABC):
+    model_name: str
+    dimension: int
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of document texts.
+
+        Returns:
+            A float32 matrix of shape (len(texts), dimension) with L2-normalized rows
+        """
+        pass
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
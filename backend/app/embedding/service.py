@@ -0,0 +1,53 @@
+from typing import List
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from app.embedding.embedder import Embedder, EMBEDDING_DTYPE
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
+from app.text_chunking.models import DocumentChunk
+from app.infrastructure.config import settings
+
+class EmbeddingService:
+    def __init__(self, embedder: Embedder = None, batch_size: int = None):
+        self.embedder = embedder or create_embedder(settings.EMBEDDING_PROVIDER)
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+
+    def embed_chunks(self, chunks: List[DocumentChunk]) -> np.ndarray:
+        """
+        Embed the chunks in batches and attach each vector to its chunk.
+
+        Args:
+            chunks: The chunks to embed
+
+        Returns:
+            A float32 matrix with one row per chunk
+        """
+        matrix = np.empty((len(chunks), self.embedder.dimension), dtype=EMBEDDING_DTYPE)
+        for start in range(0, len(chunks), self.batch_size):
+            batch = chunks[start:start + self.batch_size]
+            matrix[start:start + len(batch)] = self.embedder.embed([chunk.text for chunk in batch])
+
+        for chunk, vector in zip(chunks, matrix):
+            chunk.embedding = vector.tobytes()
+        return matrix
+
+    async def embed_chunks_async(self, chunks: List[DocumentChunk]) -> np.ndarray:
+        """
+        Embed the chunks in a worker thread, since embedding a large file takes seconds
+        and remote embedders block on the network.
+        """
+        return await run_in_threadpool(self.embed_chunks, chunks)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embedder.embed_query(text).astype(EMBEDDING_DTYPE, copy=False)
+
+    async def embed_query_async(self, text: str) -> np.ndarray:
+        """
+        Embed a query in a worker thread, since remote embedders block on the network.
+        """
+        return await run_in_threadpool(self.embed_query, text)
+
+def create_embedder(provider: str) -> Embedder:
+    if provider == "gemini":
+        from app.embedding.strategies.gemini_embedder import GeminiEmbedder
+        return GeminiEmbedder()
+    return HashingEmbedder()
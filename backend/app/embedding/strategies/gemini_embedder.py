@@ -0,0 +1,46 @@
+from typing import List, Optional
+import numpy as np
+import google.generativeai as genai
+from app.embedding.embedder import Embedder
+from app.infrastructure.config import settings
+
+class GeminiEmbedder(Embedder):
+    """
+    An embedder that uses Google's Gemini embedding API.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, model_name: str = "models/text-embedding-004", dimension: int = 768):
+        """
+        Initializes the Gemini embedder.
+        
+        Args:
+            api_key: Google API key for Gemini (defaults to settings.GOOGLE_API_KEY)
+            model_name: The Gemini embedding model to use (default: models/text-embedding-004)
+            dimension: The dimension of the vectors returned by the model
+        """
+        self.api_key = api_key or settings.GOOGLE_API_KEY
+        if not self.api_key:
+            raise ValueError("Google API key is required for GeminiEmbedder")
+        
+        self.model_name = model_name
+        self.dimension = dimension
+        genai.configure(api_key=self.api_key)
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self._embed(texts, "retrieval_document")
+    
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed([text], "retrieval_query")[0]
+    
+    def _embed(self, texts: List[str], task_type: str) -> np.ndarray:
+        """
+        Calls the embedding API and normalizes the returned vectors.
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        response = genai.embed_content(model=self.model_name, content=texts, task_type=task_type)
+        vectors = np.asarray(response["embedding"], dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
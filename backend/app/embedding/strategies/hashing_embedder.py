@@ -0,0 +1,64 @@
+import re
+import zlib
+from typing import List
+import numpy as np
+from app.embedding.embedder import Embedder
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+class HashingEmbedder(Embedder):
+    """
+    A deterministic local embedder based on the hashing trick.
+    Words and character n-grams are hashed into a fixed number of signed buckets,
+    so similar wording produces similar vectors without any model or network call.
+    """
+    
+    def __init__(self, dimension: int = 384, ngram_range: tuple = (3, 4)):
+        """
+        Initializes the hashing embedder.
+        
+        Args:
+            dimension: Number of hash buckets (vector dimension)
+            ngram_range: Inclusive range of character n-gram lengths to hash
+        """
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self.model_name = f"hashing-{dimension}"
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds the texts into L2-normalized float32 vectors.
+        
+        Args:
+            texts: The texts to embed
+            
+        Returns:
+            A float32 matrix of shape (len(texts), dimension)
+        """
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode("utf-8")) for feature in self._features(text)),
+                dtype=np.uint32
+            )
+            if not hashes.size:
+                continue
+            buckets = (hashes % self.dimension).astype(np.intp)
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], buckets, signs)
+        
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+    
+    def _features(self, text: str):
+        """
+        Yields the word and character n-gram features of the text.
+        """
+        min_n, max_n = self.ngram_range
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            yield token
+            padded = f"<{token}>"
+            for n in range(min_n, max_n + 1):
+                for i in range(len(padded) - n + 1):
+                    yield padded[i:i + n]
@@ -0,0 +1 @@
+# Tests for the embedding module 
\ No newline at end of file
@@ -0,0 +1,33 @@
+import numpy as np
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
+
+def test_hashing_embedder_shape_and_norm():
+    """Test that vectors have the configured dimension and unit length"""
+    embedder = HashingEmbedder(dimension=64)
+    
+    vectors = embedder.embed(["invoice total", "payment terms"])
+    
+    assert vectors.shape == (2, 64)
+    assert vectors.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+
+def test_hashing_embedder_is_deterministic():
+    """Test that the same text always produces the same vector"""
+    first = HashingEmbedder().embed(["The total amount is 42"])
+    second = HashingEmbedder().embed(["The total amount is 42"])
+    
+    np.testing.assert_array_equal(first, second)
+
+def test_hashing_embedder_similarity():
+    """Test that overlapping wording is closer than unrelated wording"""
+    embedder = HashingEmbedder()
+    query = embedder.embed_query("total amount due")
+    related, unrelated = embedder.embed(["The total amount due is 42 USD", "Weather forecast for Lisbon"])
+    
+    assert query @ related > query @ unrelated
+
+def test_hashing_embedder_empty_text():
+    """Test that text without tokens produces a zero vector"""
+    vectors = HashingEmbedder(dimension=16).embed([""])
+    
+    assert not vectors.any()
@@ -0,0 +1,49 @@
+import numpy as np
+from unittest.mock import MagicMock
+from app.embedding.service import EmbeddingService, EMBEDDING_DTYPE
+from app.embedding.embedder import Embedder
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
+from app.text_chunking.models import DocumentChunk
+
+def make_chunks(count):
+    return [
+        DocumentChunk(
+            pk=DocumentChunk.build_pk("file123", ordinal),
+            file_id="file123",
+            ordinal=ordinal,
+            start_offset=ordinal * 10,
+            end_offset=ordinal * 10 + 10,
+            token_estimate=3,
+            text=f"chunk number {ordinal}"
+        )
+        for ordinal in range(count)
+    ]
+
+def test_service_initialization_default():
+    """Test service initialization with the default local embedder"""
+    service = EmbeddingService()
+    assert isinstance(service.embedder, HashingEmbedder)
+
+def test_embed_chunks_in_batches():
+    """Test that chunks are embedded in batches and vectors attached as float32 bytes"""
+    embedder = MagicMock(spec=Embedder)
+    embedder.dimension = 4
+    embedder.embed.side_effect = lambda texts: np.ones((len(texts), 4), dtype=np.float32)
+    service = EmbeddingService(embedder=embedder, batch_size=2)
+    chunks = make_chunks(5)
+    
+    matrix = service.embed_chunks(chunks)
+    
+    assert embedder.embed.call_count == 3
+    assert matrix.shape == (5, 4)
+    for chunk in chunks:
+        np.testing.assert_array_equal(np.frombuffer(chunk.embedding, dtype=EMBEDDING_DTYPE), np.ones(4))
+
+def test_embed_query():
+    """Test that query vectors use the storage dtype"""
+    service = EmbeddingService(embedder=HashingEmbedder(dimension=32))
+    
+    vector = service.embed_query("total amount")
+    
+    assert vector.shape == (32,)
+    assert vector.dtype == EMBEDDING_DTYPE
@@ -1,8 +1,81 @@
+import asyncio
 from abc import ABC, abstractmethod
-from app.common.schemas import FileDTO
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+from app.common.schemas import FileDTO, Passage
+from app.retrieval.retriever import Retriever
+from app.infrastructure.config import settings
+
+# Threads running the synchronous explorers; bounded so a burst of chats cannot start unlimited threads
+EXPLORER_EXECUTOR = ThreadPoolExecutor(max_workers=settings.EXPLORER_MAX_WORKERS, thread_name_prefix="explorer")
+
+
+def number_sources(file_dtos: List[FileDTO]) -> List[Tuple[FileDTO, Passage]]:
+    """
+    Lists the passages of several files in the order they are numbered in a multi-file prompt.
+
+    Source n (from 1) is the n-th pair: files in order, then each file's passages in order.
+    """
+    return [(file_dto, passage) for file_dto in file_dtos for passage in file_dto.passages]
 
 
 class FileExplorer(ABC):
+    # Retrieval strategy the explorer ranks its passages with (None uses the default)
+    retriever: Optional[Retriever] = None
+    # Model and prompt template the answers depend on; cached answers are keyed by them,
+    # so bump the version whenever the prompt changes
+    model_name: str = "none"
+    prompt_version: str = "1"
+    # Whether explore calls a language model (only those answers are worth caching semantically)
+    uses_llm: bool = False
+
     @abstractmethod
     def explore(self, search: str, file_dto: FileDTO) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    async def explore_async(self, search: str, file_dto: FileDTO) -> str:
+        """
+        Explores the content without blocking the event loop.
+
+        Runs explore in the explorer executor; strategies with an async client
+        override this to await it directly.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(EXPLORER_EXECUTOR, self.explore, search, file_dto)
+
+    async def explore_many_async(self, searches: List[str], file_dtos: List[FileDTO]) -> List[str]:
+        """
+        Answers several questions about the same file.
+
+        Each question comes with its own FileDTO (the passages retrieved for it).
+        By default the questions are answered separately and concurrently;
+        strategies that can answer them in one call override this.
+        """
+        return list(await asyncio.gather(*(
+            self.explore_async(search, file_dto) for search, file_dto in zip(searches, file_dtos)
+        )))
+
+    async def explore_files_async(self, search: str, file_dtos: List[FileDTO]) -> str:
+        """
+        Answers a question about several files, each with the passages selected for it.
+
+        By default each file is explored separately and the answers are listed
+        under the file names; strategies that can answer from all the passages
+        at once override this.
+        """
+        answers = await asyncio.gather(*(self.explore_async(search, file_dto) for file_dto in file_dtos))
+        return "\n\n".join(f"**{file_dto.filename}**\n{answer}" for file_dto, answer in zip(file_dtos, answers))
+
+    def explore_stream(self, search: str, file_dto: FileDTO) -> Iterator[str]:
+        """
+        Yields the response in parts as it is produced.
+
+        Strategies that cannot stream yield their whole response at once.
+        """
+        yield self.explore(search, file_dto)
+
+    def is_error_response(self, response: str) -> bool:
+        """
+        Returns True if the response reports a failure instead of answering.
+        """
+        return False
@@ -0,0 +1,216 @@
+"""
+Semantic cache of explorer answers for paraphrased questions.
+"""
+import re
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.common.cache import LRUCache
+from app.embedding.service import EmbeddingService
+from app.retrieval.lexical_index import tokenize
+from app.infrastructure.config import settings
+
+NEGATION_PATTERN = re.compile(r"\b(?:not|no|never|none|nothing|nobody|nor|neither|without|cannot)\b|n't\b", re.IGNORECASE)
+
+
+class SemanticCacheHit(NamedTuple):
+    answer: str
+    query: str
+    similarity: float
+
+
+def same_question(query: str, cached_query: str) -> bool:
+    """
+    Whether a query can reuse the answer of a similar cached query.
+
+    Embeddings that ignore or blur word order score "Did Alice pay Bob?" and
+    "Did Bob pay Alice?" as the same question, and a negation barely moves them.
+    The answer is only reused when both queries have as many negations and the
+    words they share appear in the same order.
+
+    Args:
+        query: The new query
+        cached_query: The query of the cached answer
+
+    Returns:
+        False if the queries differ in word order or negation
+    """
+    if len(NEGATION_PATTERN.findall(query)) != len(NEGATION_PATTERN.findall(cached_query)):
+        return False
+    tokens, cached_tokens = tokenize(query), tokenize(cached_query)
+    shared = set(tokens) & set(cached_tokens)
+    order = list(dict.fromkeys(token for token in tokens if token in shared))
+    return order == list(dict.fromkeys(token for token in cached_tokens if token in shared))
+
+
+class _FileAnswers:
+    """
+    The cached answers of one file, as parallel arrays of a fixed capacity.
+    """
+    def __init__(self, capacity: int, dimension: int):
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.created_at = np.zeros(capacity, dtype=np.float64)
+        self.used_at = np.zeros(capacity, dtype=np.float64)
+        self.answers: List[Optional[str]] = [None] * capacity
+        self.queries: List[Optional[str]] = [None] * capacity
+
+    def expire(self, oldest: float) -> None:
+        """
+        Frees the slots of the answers created before oldest.
+        """
+        for slot in np.flatnonzero((self.created_at < oldest) & (self.created_at > 0)).tolist():
+            self.free(slot)
+
+    def free(self, slot: int) -> None:
+        self.vectors[slot] = 0.0
+        self.created_at[slot] = 0.0
+        self.used_at[slot] = 0.0
+        self.answers[slot] = None
+        self.queries[slot] = None
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.created_at))
+
+
+class SemanticAnswerCache:
+    """
+    Cache of explorer answers looked up by query similarity.
+
+    The query is embedded and compared, by cosine similarity, with the queries
+    previously answered for the same file, model and prompt version. The answer
+    of the closest one is reused when the similarity reaches the threshold, so a
+    paraphrase ("total amount?" after "what is the total?") avoids an LLM call,
+    unless the two queries differ in word order or negation (see same_question).
+    Answers expire after a maximum age, each file keeps a bounded number of
+    answers (the least recently used one is replaced), and only the most recently
+    used files are kept.
+    """
+
+    def __init__(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        threshold: Optional[float] = None,
+        max_age_seconds: Optional[float] = None,
+        per_file_capacity: Optional[int] = None,
+        max_files: Optional[int] = None
+    ):
+        """
+        Initializes the semantic cache.
+
+        Args:
+            embedding_service: Service used to embed the queries
+            threshold: Minimum cosine similarity to serve a cached answer
+                (defaults to settings.SEMANTIC_CACHE_THRESHOLD)
+            max_age_seconds: Age after which an answer is no longer served
+                (defaults to settings.SEMANTIC_CACHE_MAX_AGE_SECONDS)
+            per_file_capacity: Maximum number of answers per file
+                (defaults to settings.SEMANTIC_CACHE_PER_FILE)
+            max_files: Maximum number of files with cached answers (defaults to settings.RETRIEVAL_CACHE_SIZE)
+        """
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self.max_age_seconds = settings.SEMANTIC_CACHE_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        self.per_file_capacity = per_file_capacity or settings.SEMANTIC_CACHE_PER_FILE
+        self.files = LRUCache(max_files or settings.RETRIEVAL_CACHE_SIZE)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hit_similarity_total = 0.0
+
+    def embed(self, query: str) -> np.ndarray:
+        """
+        Embeds a query once, for both the lookup and the store.
+        """
+        return self.embedding_service.embed_query(query)
+
+    async def embed_async(self, query: str) -> np.ndarray:
+        """
+        Embeds a query without blocking the event loop.
+        """
+        return await self.embedding_service.embed_query_async(query)
+
+    def lookup(
+        self,
+        namespace: Tuple[str, str, str],
+        vector: np.ndarray,
+        query: Optional[str] = None
+    ) -> Optional[SemanticCacheHit]:
+        """
+        Finds the cached answer to the most similar query.
+
+        Args:
+            namespace: (file pk, model name, prompt version)
+            vector: The embedded query
+            query: The query, checked against the cached ones with same_question
+
+        Returns:
+            The cached answer if its query is similar enough, None otherwise
+        """
+        entries: Optional[_FileAnswers] = self.files.get(namespace)
+        best = None
+        if entries is not None:
+            now = time.time()
+            entries.expire(now - self.max_age_seconds)
+            occupied = entries.created_at > 0
+            if occupied.any():
+                similarities = np.where(occupied, entries.vectors @ vector, -np.inf)
+                for slot in np.argsort(-similarities).tolist():
+                    if similarities[slot] < self.threshold:
+                        break
+                    if query is None or same_question(query, entries.queries[slot]):
+                        entries.used_at[slot] = now
+                        best = SemanticCacheHit(entries.answers[slot], entries.queries[slot], float(similarities[slot]))
+                        break
+
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._hit_similarity_total += best.similarity
+        return best
+
+    def store(self, namespace: Tuple[str, str, str], vector: np.ndarray, query: str, answer: str) -> None:
+        """
+        Caches an answer, replacing the least recently used one if the file is full.
+
+        Args:
+            namespace: (file pk, model name, prompt version)
+            vector: The embedded query
+            query: The query
+            answer: The explorer's answer
+        """
+        entries: Optional[_FileAnswers] = self.files.get(namespace)
+        if entries is None:
+            entries = _FileAnswers(self.per_file_capacity, len(vector))
+            self.files.put(namespace, entries)
+
+        now = time.time()
+        entries.expire(now - self.max_age_seconds)
+        free = np.flatnonzero(entries.created_at == 0)
+        if len(free):
+            slot = int(free[0])
+        else:
+            slot = int(np.argmin(entries.used_at))
+            self.evictions += 1
+        entries.vectors[slot] = vector
+        entries.created_at[slot] = now
+        entries.used_at[slot] = now
+        entries.answers[slot] = answer
+        entries.queries[slot] = query
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the counters since the process started.
+
+        Every hit is an LLM call avoided.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "llm_calls_avoided": self.hits,
+            "mean_hit_similarity": self._hit_similarity_total / self.hits if self.hits else 0.0,
+            "evictions": self.evictions,
+            "files": len(self.files)
+        }
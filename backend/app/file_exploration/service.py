@@ -1,14 +1,226 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Iterator, List, Optional
 from app.common.schemas import FileDTO
-from app.file_exploration.file_explorer import FileExplorer
+from app.file_exploration.file_explorer import EXPLORER_EXECUTOR, FileExplorer
+from app.file_exploration.semantic_cache import SemanticAnswerCache
 from app.file_exploration.strategies.gemini_explorer import GeminiExplorer
+from app.file_exploration.strategies.lexical_explorer import LexicalExplorer
+from app.file_exploration.strategies.map_reduce_explorer import MapReduceExplorer
+from app.file_exploration.strategies.retrieval_augmented_explorer import RetrievalAugmentedExplorer
+from app.retrieval.retriever import Retriever
+from app.retrieval.strategies.hybrid_retriever import HybridRetriever
+from app.infrastructure.config import settings
+
+logger = logging.getLogger(__name__)
 
 class FileExplorationService:
     """
     Service responsible for exploring file content.
+    
+    When the explorer calls a language model, a semantic cache sits in front of
+    it: answers to earlier questions about the same file are reused for
+    paraphrases of those questions.
+    
+    explore_async and explore_stream_async are the entry points for async code:
+    they never block the event loop, so concurrent chats wait on the model
+    together, and each call (or each part of a stream) is bounded by a timeout.
     """
     
-    def __init__(self, explorer: FileExplorer = None):
-        self.explorer = explorer or GeminiExplorer()
+    def __init__(
+        self,
+        explorer: FileExplorer = None,
+        semantic_cache: Optional[SemanticAnswerCache] = None,
+        timeout_seconds: Optional[float] = None
+    ):
+        self.explorer = explorer or create_explorer(settings.FILE_EXPLORER_STRATEGY)
+        if semantic_cache is None and settings.SEMANTIC_CACHE_ENABLED and self.explorer.uses_llm:
+            semantic_cache = SemanticAnswerCache()
+        self.semantic_cache = semantic_cache
+        self.timeout_seconds = settings.EXPLORER_TIMEOUT_SECONDS if timeout_seconds is None else timeout_seconds
+    
+    @property
+    def retriever(self) -> Optional[Retriever]:
+        return self.explorer.retriever
+    
+    @property
+    def model_name(self) -> str:
+        return self.explorer.model_name
+    
+    @property
+    def prompt_version(self) -> str:
+        return self.explorer.prompt_version
+    
+    def is_error_response(self, response: str) -> bool:
+        return self.explorer.is_error_response(response)
     
     def explore(self, search: str, file_dto: FileDTO) -> str:
-        return self.explorer.explore(search, file_dto)
\ No newline at end of file
+        if self.semantic_cache is None:
+            return self.explorer.explore(search, file_dto)
+        
+        namespace, vector, hit = self._lookup_semantic_cache(search, file_dto)
+        if hit is not None:
+            return hit.answer
+        
+        response = self.explorer.explore(search, file_dto)
+        if not self.is_error_response(response):
+            self.semantic_cache.store(namespace, vector, search, response)
+        return response
+    
+    async def explore_async(self, search: str, file_dto: FileDTO) -> str:
+        """
+        Explores the content without blocking the event loop.
+        
+        The timeout ends the wait, not the work: an explorer running in the
+        explorer executor keeps its thread until its call returns. The executor
+        has EXPLORER_MAX_WORKERS threads, so at most that many abandoned calls
+        run at once and later calls queue behind them.
+        
+        Raises:
+            TimeoutError: If the explorer does not answer within timeout_seconds
+        """
+        if self.semantic_cache is None:
+            return await asyncio.wait_for(self.explorer.explore_async(search, file_dto), self.timeout_seconds)
+        
+        namespace, vector, hit = await self._lookup_semantic_cache_async(search, file_dto)
+        if hit is not None:
+            return hit.answer
+        
+        response = await asyncio.wait_for(self.explorer.explore_async(search, file_dto), self.timeout_seconds)
+        if not self.is_error_response(response):
+            self.semantic_cache.store(namespace, vector, search, response)
+        return response
+    
+    async def explore_many_async(self, searches: List[str], file_dtos: List[FileDTO]) -> List[str]:
+        """
+        Answers several questions about the same file, in one explorer call when it supports it.
+        
+        Questions answered by the semantic cache are left out of the call.
+        
+        Raises:
+            TimeoutError: If the explorer does not answer within timeout_seconds
+        """
+        if self.semantic_cache is None:
+            return await asyncio.wait_for(self.explorer.explore_many_async(searches, file_dtos), self.timeout_seconds)
+        
+        answers: List[Optional[str]] = [None] * len(searches)
+        misses = []
+        lookups = await asyncio.gather(*(
+            self._lookup_semantic_cache_async(search, file_dto) for search, file_dto in zip(searches, file_dtos)
+        ))
+        for i, (namespace, vector, hit) in enumerate(lookups):
+            if hit is not None:
+                answers[i] = hit.answer
+            else:
+                misses.append((i, namespace, vector))
+        if misses:
+            responses = await asyncio.wait_for(
+                self.explorer.explore_many_async([searches[i] for i, _, _ in misses], [file_dtos[i] for i, _, _ in misses]),
+                self.timeout_seconds
+            )
+            for (i, namespace, vector), response in zip(misses, responses):
+                answers[i] = response
+                if not self.is_error_response(response):
+                    self.semantic_cache.store(namespace, vector, searches[i], response)
+        return answers
+    
+    async def explore_files_async(self, search: str, file_dtos: List[FileDTO]) -> str:
+        """
+        Answers a question about several files, each with the passages selected for it.
+        
+        Raises:
+            TimeoutError: If the explorer does not answer within timeout_seconds
+        """
+        return await asyncio.wait_for(self.explorer.explore_files_async(search, file_dtos), self.timeout_seconds)
+    
+    def explore_stream(self, search: str, file_dto: FileDTO) -> Iterator[str]:
+        """
+        Yields the explorer's response in parts as it is produced.
+        
+        A semantic cache hit is yielded at once; a streamed response is cached
+        once it is complete.
+        """
+        if self.semantic_cache is None:
+            yield from self.explorer.explore_stream(search, file_dto)
+            return
+        
+        namespace, vector, hit = self._lookup_semantic_cache(search, file_dto)
+        if hit is not None:
+            yield hit.answer
+            return
+        
+        parts = []
+        failed = False
+        for part in self.explorer.explore_stream(search, file_dto):
+            failed = failed or self.is_error_response(part)
+            parts.append(part)
+            yield part
+        if not failed:
+            self.semantic_cache.store(namespace, vector, search, "".join(parts))
+    
+    async def explore_stream_async(self, search: str, file_dto: FileDTO) -> AsyncIterator[str]:
+        """
+        Yields the parts of explore_stream without blocking the event loop.
+        
+        Each part is read in the explorer executor and must come within
+        timeout_seconds of the previous one, so a model that stops answering
+        mid-stream ends the stream; as with explore_async, the abandoned read
+        keeps its thread until the model returns.
+        
+        Raises:
+            TimeoutError: If the explorer produces no part within timeout_seconds
+        """
+        loop = asyncio.get_running_loop()
+        parts = self.explore_stream(search, file_dto)
+        while True:
+            part = await asyncio.wait_for(loop.run_in_executor(EXPLORER_EXECUTOR, next, parts, None), self.timeout_seconds)
+            if part is None:
+                return
+            yield part
+    
+    def _lookup_semantic_cache(self, search: str, file_dto: FileDTO):
+        """
+        Embeds the search and looks up the answer to a similar earlier search.
+        
+        Returns:
+            Tuple of (cache namespace, embedded search, hit or None)
+        """
+        return self._find_in_semantic_cache(search, file_dto, self.semantic_cache.embed(search))
+    
+    async def _lookup_semantic_cache_async(self, search: str, file_dto: FileDTO):
+        """
+        Same as _lookup_semantic_cache, embedding the search in a worker thread.
+        """
+        return self._find_in_semantic_cache(search, file_dto, await self.semantic_cache.embed_async(search))
+    
+    def _find_in_semantic_cache(self, search: str, file_dto: FileDTO, vector):
+        namespace = (file_dto.pk, self.model_name, self.prompt_version)
+        hit = self.semantic_cache.lookup(namespace, vector, search)
+        if hit is not None:
+            logger.info(
+                f"Reusing the answer to \"{hit.query}\" for file {file_dto.pk} (similarity {hit.similarity:.3f})"
+            )
+        return namespace, vector, hit
+
+def create_explorer(strategy: str) -> FileExplorer:
+    """
+    Create the explorer for a strategy name.
+    
+    Strategies:
+        gemini: the full document is sent to Gemini
+        retrieval: the passages retrieved by embedding search are sent to Gemini
+        hybrid: the passages retrieved by BM25 and embedding search fused with RRF are sent to Gemini
+        lexical: the passages ranked by BM25 are returned without calling Gemini
+        map_reduce: every window of the document is sent to Gemini and the partial answers are combined
+    """
+    if strategy == "gemini":
+        return GeminiExplorer()
+    if strategy == "hybrid":
+        return RetrievalAugmentedExplorer(retriever=HybridRetriever())
+    if strategy == "lexical":
+        return LexicalExplorer()
+    if strategy == "map_reduce":
+        return MapReduceExplorer()
+    if strategy == "retrieval":
+        return RetrievalAugmentedExplorer()
+    raise ValueError(f"Unknown file explorer strategy: {strategy}")
@@ -1,18 +1,34 @@
 import os
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, Iterator, List, Optional
 import google.generativeai as genai
 import logging
-from app.file_exploration.file_explorer import FileExplorer
+from app.file_exploration.file_explorer import FileExplorer, number_sources
 from app.common.schemas import FileDTO
 from app.infrastructure.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Responses returned instead of an answer when Gemini fails
+ERROR_RESPONSE_PREFIXES = ("Error exploring content with Gemini", "Unable to process response from Gemini API")
+
+# Heading that starts the answer to each question of a grouped prompt
+GROUP_ANSWER_HEADING = re.compile(r"^#+\s*Answer\s+(\d+)\s*:?\s*$", re.MULTILINE | re.IGNORECASE)
+
+# Parameters for better control of the generation
+GENERATION_CONFIG = {
+    "temperature": 0.3,
+    "top_p": 0.8,
+    "max_output_tokens": 2048
+}
+
 class GeminiExplorer(FileExplorer):
     """
     A strategy that uses Google's Gemini model to explore file content.
     This strategy analyzes the content based on the search query.
     """
+    prompt_version = "full-document-1"
+    uses_llm = True
     
     def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.0-flash"):
         """
@@ -45,30 +61,196 @@ class GeminiExplorer(FileExplorer):
             # Prepare the prompt combining the search query and file content
             prompt = self._create_prompt(search, file_dto)
             
-            # Set parameters for better control
-            generation_config = {
-                "temperature": 0.3,
-                "top_p": 0.8,
-                "max_output_tokens": 2048
-            }
-            
             # Call Gemini API with generation config
             response = self.model.generate_content(
                 prompt,
-                generation_config=generation_config
+                generation_config=GENERATION_CONFIG
             )
-            
-            # Return the response text
-            if hasattr(response, "text"):
-                return response.text
-            elif hasattr(response, "parts"):
-                return "".join(part.text for part in response.parts)
-            else:
-                return "Unable to process response from Gemini API"
+            return self._response_text(response)
                 
         except Exception as e:
             logger.error(f"Error using Gemini to explore content: {str(e)}")
-            return f"Error exploring content with Gemini: {str(e)}"
+            return f"{ERROR_RESPONSE_PREFIXES[0]}: {str(e)}"
+    
+    async def explore_async(self, search: str, file_dto: FileDTO) -> str:
+        """
+        Explores the file content using Gemini's async API.
+        
+        Args:
+            search: The search query or instructions for exploring the content
+            file_dto: The file DTO containing the content to be explored
+            
+        Returns:
+            A string containing the AI's response based on the content and search query
+        """
+        try:
+            prompt = self._create_prompt(search, file_dto)
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=GENERATION_CONFIG
+            )
+            return self._response_text(response)
+        except Exception as e:
+            logger.error(f"Error using Gemini to explore content: {str(e)}")
+            return f"{ERROR_RESPONSE_PREFIXES[0]}: {str(e)}"
+    
+    async def explore_many_async(self, searches: List[str], file_dtos: List[FileDTO]) -> List[str]:
+        """
+        Answers several questions about the same file with one Gemini call.
+        
+        The prompt numbers the questions and asks for one headed section per
+        answer; it carries the passages of every question, best ranked first. If
+        the response cannot be split into one answer per question, the questions
+        are answered separately instead.
+        
+        Args:
+            searches: The questions
+            file_dtos: The file DTO of each question, with the passages retrieved for it
+            
+        Returns:
+            The answer to each question, in order
+        """
+        if len(searches) == 1:
+            return [await self.explore_async(searches[0], file_dtos[0])]
+        
+        response = await self.explore_async(self._group_instructions(searches), self._merge_passages(file_dtos))
+        if self.is_error_response(response):
+            return [response] * len(searches)
+        answers = self._split_group_response(response, len(searches))
+        if answers is None:
+            logger.warning(f"Could not split the grouped answer into {len(searches)} answers; asking separately")
+            return await super().explore_many_async(searches, file_dtos)
+        return answers
+    
+    async def explore_files_async(self, search: str, file_dtos: List[FileDTO]) -> str:
+        """
+        Answers a question about several files with one prompt grounded in their passages.
+        
+        Every passage is labelled [S1], [S2], ... (see number_sources) and the
+        answer is asked to cite the labels it relies on.
+        
+        Args:
+            search: The search query or instructions
+            file_dtos: The files, each with the passages selected for the prompt
+            
+        Returns:
+            The AI's response, citing its sources
+        """
+        try:
+            response = await self.model.generate_content_async(
+                self._create_files_prompt(search, file_dtos),
+                generation_config=GENERATION_CONFIG
+            )
+            return self._response_text(response)
+        except Exception as e:
+            logger.error(f"Error using Gemini to explore {len(file_dtos)} files: {str(e)}")
+            return f"{ERROR_RESPONSE_PREFIXES[0]}: {str(e)}"
+    
+    def explore_stream(self, search: str, file_dto: FileDTO) -> Iterator[str]:
+        """
+        Explores the file content using Gemini AI, yielding the response as it is generated.
+        
+        Args:
+            search: The search query or instructions for exploring the content
+            file_dto: The file DTO containing the content to be explored
+            
+        Yields:
+            Consecutive parts of the AI's response; on failure, an error response
+        """
+        try:
+            prompt = self._create_prompt(search, file_dto)
+            response = self.model.generate_content(
+                prompt,
+                generation_config=GENERATION_CONFIG,
+                stream=True
+            )
+            for chunk in response:
+                # Chunks without text (safety ratings, finish reason) are skipped
+                text = getattr(chunk, "text", "")
+                if text:
+                    yield text
+        except Exception as e:
+            logger.error(f"Error using Gemini to stream content: {str(e)}")
+            yield f"{ERROR_RESPONSE_PREFIXES[0]}: {str(e)}"
+    
+    def is_error_response(self, response: str) -> bool:
+        """
+        Returns True if the response reports a Gemini failure instead of answering.
+        """
+        return response.startswith(ERROR_RESPONSE_PREFIXES)
+    
+    def _group_instructions(self, searches: List[str]) -> str:
+        """
+        Combines several questions into the instructions of one prompt.
+        """
+        questions = "\n".join(f"{i}. {search}" for i, search in enumerate(searches, start=1))
+        return (
+            f"Answer each of the following {len(searches)} questions separately.\n"
+            f"{questions}\n\n"
+            f"Start the answer to question n with a line containing only \"### Answer n\", "
+            f"for every question from 1 to {len(searches)}, in order."
+        )
+    
+    def _merge_passages(self, file_dtos: List[FileDTO]) -> FileDTO:
+        """
+        Returns a FileDTO with the passages of every question, interleaved by rank.
+        """
+        passages, seen = [], set()
+        for rank in range(max(len(file_dto.passages) for file_dto in file_dtos)):
+            for file_dto in file_dtos:
+                if rank < len(file_dto.passages):
+                    passage = file_dto.passages[rank]
+                    if (passage.start_offset, passage.end_offset) not in seen:
+                        seen.add((passage.start_offset, passage.end_offset))
+                        passages.append(passage)
+        return file_dtos[0].model_copy(update={"passages": passages})
+    
+    def _split_group_response(self, response: str, count: int) -> Optional[List[str]]:
+        """
+        Splits a grouped response into its answers.
+        
+        Returns:
+            The answers in question order, or None unless there is exactly one per question
+        """
+        headings = list(GROUP_ANSWER_HEADING.finditer(response))
+        if [int(heading.group(1)) for heading in headings] != list(range(1, count + 1)):
+            return None
+        ends = [heading.start() for heading in headings[1:]] + [len(response)]
+        return [response[heading.end():end].strip() for heading, end in zip(headings, ends)]
+    
+    def _create_files_prompt(self, search: str, file_dtos: List[FileDTO]) -> str:
+        """
+        Creates a prompt with the labelled passages of several files.
+        """
+        excerpts = "\n\n".join(
+            f'[S{i}] "{file_dto.filename}", characters {passage.start_offset}-{passage.end_offset}\n{passage.text}'
+            for i, (file_dto, passage) in enumerate(number_sources(file_dtos), start=1)
+        )
+        filenames = ", ".join(f'"{file_dto.filename}"' for file_dto in file_dtos)
+        return f"""
+You are an AI assistant specialized in analyzing and comparing documents.
+
+INSTRUCTIONS:
+{search}
+
+EXCERPTS (the most relevant parts of {filenames}, labelled [S1], [S2], ...):
+{excerpts}
+
+Please respond directly to the instructions above based solely on the excerpts provided.
+Cite the label of every excerpt you rely on, e.g. [S2], and name the document when comparing documents.
+Be concise and accurate. If the answer is not in the excerpts, say so clearly.
+"""
+    
+    def _response_text(self, response) -> str:
+        """
+        Extracts the text of a Gemini response.
+        """
+        if hasattr(response, "text"):
+            return response.text
+        elif hasattr(response, "parts"):
+            return "".join(part.text for part in response.parts)
+        else:
+            return ERROR_RESPONSE_PREFIXES[1]
     
     def _create_prompt(self, search: str, file_dto: FileDTO) -> str:
         """
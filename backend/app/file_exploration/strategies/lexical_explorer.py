@@ -0,0 +1,47 @@
+from typing import Optional
+from app.file_exploration.file_explorer import FileExplorer
+from app.common.schemas import FileDTO
+from app.retrieval.retriever import Retriever
+from app.retrieval.lexical_index import make_snippet, tokenize
+from app.retrieval.strategies.lexical_retriever import LexicalRetriever
+
+class LexicalExplorer(FileExplorer):
+    """
+    A strategy that answers keyword-style questions locally.
+    Passages are ranked with the file's BM25 index and returned as snippets,
+    without calling any language model.
+    """
+    model_name = "bm25"
+    prompt_version = "lexical-1"
+    
+    def __init__(self, retriever: Optional[Retriever] = None, snippet_chars: int = 300):
+        """
+        Initializes the lexical explorer.
+        
+        Args:
+            retriever: Retrieval strategy used to rank passages (default: LexicalRetriever)
+            snippet_chars: Maximum number of characters shown per passage
+        """
+        self.retriever = retriever or LexicalRetriever()
+        self.snippet_chars = snippet_chars
+    
+    def explore(self, search: str, file_dto: FileDTO) -> str:
+        """
+        Lists the passages that best match the search.
+        
+        Args:
+            search: The search query
+            file_dto: The file DTO containing the ranked passages
+            
+        Returns:
+            A markdown list of matching snippets with their character offsets
+        """
+        if not file_dto.passages:
+            return f'No passages in "{file_dto.filename}" match "{search}".'
+        
+        terms = set(tokenize(search))
+        lines = [f'Passages in "{file_dto.filename}" matching "{search}":', ""]
+        for i, passage in enumerate(file_dto.passages, start=1):
+            snippet = make_snippet(passage.text, terms, self.snippet_chars)
+            lines.append(f"{i}. (characters {passage.start_offset}-{passage.end_offset}) {snippet}")
+        return "\n".join(lines)
@@ -0,0 +1,356 @@
+import asyncio
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from app.common.cache import LRUCache
+from app.common.schemas import FileDTO
+from app.file_exploration.file_explorer import FileExplorer
+from app.file_exploration.strategies.gemini_explorer import GeminiExplorer, ERROR_RESPONSE_PREFIXES, GENERATION_CONFIG
+from app.infrastructure.config import settings
+from app.text_chunking.service import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Reply of the map prompt when a window does not answer the question
+NOT_FOUND = "NOT FOUND"
+
+# Last line of a map reply, rating how completely the window answers the question
+CONFIDENCE_LINE = re.compile(r"^\s*CONFIDENCE:\s*(high|medium|low)\s*$", re.MULTILINE | re.IGNORECASE)
+
+
+class WindowAnswer(NamedTuple):
+    start_offset: int
+    end_offset: int
+    answer: Optional[str]
+    confident: bool
+
+
+def split_windows(text: str, max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Splits a text into consecutive windows of at most max_chars characters.
+
+    Windows end at the last paragraph break, or else line break, in their second
+    half, so rows and paragraphs are not cut unless a single one is too long.
+
+    Args:
+        text: The text to split
+        max_chars: Maximum number of characters per window
+
+    Returns:
+        The (start, end) character offsets of the windows
+    """
+    windows = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            for separator in ("\n\n", "\n"):
+                cut = text.rfind(separator, start + max_chars // 2, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+        windows.append((start, end))
+        start = end
+    return windows
+
+
+class MapReduceExplorer(GeminiExplorer):
+    """
+    A strategy for documents larger than a single prompt.
+
+    Documents that fit in one window are sent whole, like GeminiExplorer. Larger
+    ones are split into windows that are asked the question in parallel, at most
+    max_parallel at a time (map); the windows that hold part of the answer are
+    then combined by a final call (reduce). As soon as one window reports a
+    complete answer with high confidence, the remaining windows are cancelled and
+    that answer is returned without a reduce call. Window answers are cached per
+    file, window and question, so asking a question again (after a timeout, or
+    with a different reduce) only maps the windows not answered yet.
+    """
+    prompt_version = "map-reduce-1"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model_name: str = "gemini-2.0-flash",
+        window_tokens: Optional[int] = None,
+        max_parallel: Optional[int] = None,
+        cache_size: Optional[int] = None
+    ):
+        """
+        Initializes the map-reduce explorer.
+
+        Args:
+            api_key: Google API key for Gemini (defaults to settings.GOOGLE_API_KEY)
+            model_name: The Gemini model to use (default: gemini-2.0-flash)
+            window_tokens: Maximum number of document tokens per window (defaults to settings.MAP_REDUCE_WINDOW_TOKENS)
+            max_parallel: Maximum number of windows queried at once (defaults to settings.MAP_REDUCE_MAX_PARALLEL)
+            cache_size: Number of window answers kept (defaults to settings.MAP_REDUCE_CACHE_SIZE)
+        """
+        super().__init__(api_key=api_key, model_name=model_name)
+        self.window_tokens = window_tokens or settings.MAP_REDUCE_WINDOW_TOKENS
+        self.max_parallel = max_parallel or settings.MAP_REDUCE_MAX_PARALLEL
+        self.window_answers = LRUCache(cache_size or settings.MAP_REDUCE_CACHE_SIZE)
+
+    def explore(self, search: str, file_dto: FileDTO) -> str:
+        """
+        Explores the file content with the blocking Gemini client, mapping windows in threads.
+
+        Used from worker threads. The async client is not used here: it is bound to
+        the event loop it was first used on, and a worker thread has none of its own.
+        """
+        windows = split_windows(file_dto.markdown_content, self.window_tokens * CHARS_PER_TOKEN)
+        if len(windows) <= 1:
+            return super().explore(search, file_dto)
+
+        logger.info(f"Mapping {len(windows)} windows of file {file_dto.pk}")
+        try:
+            answers = self._map_sync(search, file_dto, windows)
+        except Exception as e:
+            logger.error(f"Error mapping the windows of file {file_dto.pk}: {str(e)}")
+            return f"{ERROR_RESPONSE_PREFIXES[0]}: {str(e)}"
+
+        answer, found = self._select(search, file_dto, answers)
+        if answer is not None:
+            return answer
+        try:
+            response = self.model.generate_content(
+                self._create_reduce_prompt(search, file_dto, found),
+                generation_config=GENERATION_CONFIG
+            )
+            return self._response_text(response)
+        except Exception as e:
+            logger.error(f"Error reducing the answers of file {file_dto.pk}: {str(e)}")
+            return f"{ERROR_RESPONSE_PREFIXES[0]}: {str(e)}"
+
+    async def explore_async(self, search: str, file_dto: FileDTO) -> str:
+        """
+        Explores the file content window by window, then combines the partial answers.
+
+        Args:
+            search: The search query or instructions for exploring the content
+            file_dto: The file DTO containing the content to be explored
+
+        Returns:
+            A string containing the AI's response based on the content and search query
+        """
+        text = file_dto.markdown_content
+        windows = split_windows(text, self.window_tokens * CHARS_PER_TOKEN)
+        if len(windows) <= 1:
+            return await super().explore_async(search, file_dto)
+
+        logger.info(f"Mapping {len(windows)} windows of file {file_dto.pk}")
+        try:
+            answers = await self._map(search, file_dto, windows)
+        except Exception as e:
+            logger.error(f"Error mapping the windows of file {file_dto.pk}: {str(e)}")
+            return f"{ERROR_RESPONSE_PREFIXES[0]}: {str(e)}"
+
+        answer, found = self._select(search, file_dto, answers)
+        if answer is not None:
+            return answer
+        return await self._reduce(search, file_dto, found)
+
+    async def explore_many_async(self, searches: List[str], file_dtos: List[FileDTO]) -> List[str]:
+        """
+        Answers the questions separately; each one runs its own map phase.
+        """
+        return await FileExplorer.explore_many_async(self, searches, file_dtos)
+
+    def explore_stream(self, search: str, file_dto: FileDTO) -> Iterator[str]:
+        """
+        Yields the reduced answer at once, since it only exists after every window is mapped.
+        """
+        yield self.explore(search, file_dto)
+
+    def _select(self, search: str, file_dto: FileDTO, answers: List[WindowAnswer]) -> Tuple[Optional[str], List[WindowAnswer]]:
+        """
+        Picks the answer when no reduce call is needed.
+
+        Returns:
+            Tuple of (the answer, or None if the found answers must be reduced; the window answers found)
+        """
+        confident = [answer for answer in answers if answer.confident]
+        if confident:
+            return confident[0].answer, []
+        found = [answer for answer in answers if answer.answer is not None]
+        if not found:
+            return f'The answer to "{search}" is not in "{file_dto.filename}".', []
+        if len(found) == 1:
+            return found[0].answer, found
+        return None, found
+
+    def _window_key(self, search: str, file_dto: FileDTO, start: int, end: int) -> tuple:
+        return (file_dto.pk, len(file_dto.markdown_content), start, end, " ".join(search.casefold().split()))
+
+    def _map_sync(self, search: str, file_dto: FileDTO, windows: List[Tuple[int, int]]) -> List[WindowAnswer]:
+        """
+        Same as _map, calling the blocking client from max_parallel threads.
+
+        Returns:
+            The answers of the windows mapped, in document order
+        """
+        answered = threading.Event()
+
+        def map_window(start: int, end: int) -> Optional[WindowAnswer]:
+            # Windows still waiting for a thread are skipped once one answered confidently
+            if answered.is_set():
+                return None
+            response = self.model.generate_content(
+                self._create_map_prompt(search, file_dto, start, end),
+                generation_config=GENERATION_CONFIG
+            )
+            answer = self._parse_map_response(start, end, self._response_text(response))
+            if answer.confident:
+                answered.set()
+            return answer
+
+        # The window cache is only touched from this thread
+        answers = []
+        pending = []
+        for start, end in windows:
+            answer = self.window_answers.get(self._window_key(search, file_dto, start, end))
+            if answer is None:
+                pending.append((start, end))
+            elif answer.confident:
+                return [answer]
+            else:
+                answers.append(answer)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="map-window")
+        try:
+            futures = [executor.submit(map_window, start, end) for start, end in pending]
+            for future in as_completed(futures):
+                answer = future.result()
+                if answer is None:
+                    continue
+                self.window_answers.put(self._window_key(search, file_dto, answer.start_offset, answer.end_offset), answer)
+                answers.append(answer)
+                if answer.confident:
+                    logger.info(
+                        f"Window {answer.start_offset}-{answer.end_offset} of file {file_dto.pk} answered confidently; "
+                        f"stopping after {len(answers)} of {len(windows)} windows"
+                    )
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return sorted(answers, key=lambda answer: answer.start_offset)
+
+    async def _map(self, search: str, file_dto: FileDTO, windows: List[Tuple[int, int]]) -> List[WindowAnswer]:
+        """
+        Asks every window the question, stopping early on a confident answer.
+
+        Returns:
+            The answers of the windows mapped, in document order
+        """
+        slots = asyncio.Semaphore(self.max_parallel)
+        answered = asyncio.Event()
+
+        async def map_window(start: int, end: int) -> Optional[WindowAnswer]:
+            key = self._window_key(search, file_dto, start, end)
+            answer = self.window_answers.get(key)
+            if answer is None:
+                async with slots:
+                    # Windows still waiting for a slot are skipped once one answered confidently
+                    if answered.is_set():
+                        return None
+                    response = await self.model.generate_content_async(
+                        self._create_map_prompt(search, file_dto, start, end),
+                        generation_config=GENERATION_CONFIG
+                    )
+                    answer = self._parse_map_response(start, end, self._response_text(response))
+                    self.window_answers.put(key, answer)
+            if answer.confident:
+                answered.set()
+            return answer
+
+        tasks = [asyncio.ensure_future(map_window(start, end)) for start, end in windows]
+        answers = []
+        try:
+            for next_answer in asyncio.as_completed(tasks):
+                answer = await next_answer
+                if answer is None:
+                    continue
+                answers.append(answer)
+                if answer.confident:
+                    logger.info(
+                        f"Window {answer.start_offset}-{answer.end_offset} of file {file_dto.pk} answered confidently; "
+                        f"stopping after {len(answers)} of {len(windows)} windows"
+                    )
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+        return sorted(answers, key=lambda answer: answer.start_offset)
+
+    def _parse_map_response(self, start: int, end: int, response: str) -> WindowAnswer:
+        """
+        Reads the answer and confidence of a map reply.
+        """
+        if response.startswith(ERROR_RESPONSE_PREFIXES):
+            raise RuntimeError(response)
+        confidence = CONFIDENCE_LINE.search(response)
+        answer = CONFIDENCE_LINE.sub("", response).strip()
+        if not answer or answer.upper().startswith(NOT_FOUND):
+            return WindowAnswer(start, end, None, False)
+        confident = confidence is not None and confidence.group(1).lower() == "high"
+        return WindowAnswer(start, end, answer, confident)
+
+    def _create_map_prompt(self, search: str, file_dto: FileDTO, start: int, end: int) -> str:
+        """
+        Creates the prompt asking one window the question.
+        """
+        return f"""
+You are an AI assistant specialized in analyzing and exploring document content.
+You are given one part of a longer document; other parts are read separately.
+
+INSTRUCTIONS:
+{search}
+
+DOCUMENT PART (characters {start}-{end} of {len(file_dto.markdown_content)} of "{file_dto.filename}"):
+{file_dto.markdown_content[start:end]}
+
+Respond to the instructions above based solely on this part of the document. Be concise and accurate.
+If this part contains nothing relevant, reply with exactly "{NOT_FOUND}".
+End your reply with a line "CONFIDENCE: high" if this part alone fully answers the instructions and the
+rest of the document could not change the answer, "CONFIDENCE: medium" if it answers them only in part,
+or "CONFIDENCE: low" otherwise.
+"""
+
+    async def _reduce(self, search: str, file_dto: FileDTO, answers: List[WindowAnswer]) -> str:
+        """
+        Combines the partial answers of several windows with one final call.
+        """
+        try:
+            response = await self.model.generate_content_async(
+                self._create_reduce_prompt(search, file_dto, answers),
+                generation_config=GENERATION_CONFIG
+            )
+            return self._response_text(response)
+        except Exception as e:
+            logger.error(f"Error reducing the answers of file {file_dto.pk}: {str(e)}")
+            return f"{ERROR_RESPONSE_PREFIXES[0]}: {str(e)}"
+
+    def _create_reduce_prompt(self, search: str, file_dto: FileDTO, answers: List[WindowAnswer]) -> str:
+        """
+        Creates the prompt combining the partial answers of several windows.
+        """
+        partials = "\n\n".join(
+            f"[Answer from characters {answer.start_offset}-{answer.end_offset}]\n{answer.answer}"
+            for answer in answers
+        )
+        return f"""
+You are an AI assistant specialized in analyzing and exploring document content.
+The document "{file_dto.filename}" was read in parts, and each part that was relevant answered the instructions below.
+
+INSTRUCTIONS:
+{search}
+
+PARTIAL ANSWERS (in document order):
+{partials}
+
+Please combine the partial answers into one response to the instructions, based solely on them.
+Be concise and accurate; merge lists and totals, and say so clearly if the partial answers conflict.
+"""
@@ -0,0 +1,105 @@
+from typing import List, Optional
+import logging
+from app.file_exploration.strategies.gemini_explorer import GeminiExplorer
+from app.common.schemas import FileDTO, Passage
+from app.retrieval.retriever import Retriever
+from app.infrastructure.config import settings
+from app.text_chunking.service import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+class RetrievalAugmentedExplorer(GeminiExplorer):
+    """
+    A strategy that sends Gemini only the passages retrieved for the query.
+    The best passages are packed into a token budget, so the prompt size stays
+    bounded no matter how large the document is. Files without retrieved
+    passages fall back to the full-document prompt.
+    """
+    prompt_version = "excerpts-1"
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model_name: str = "gemini-2.0-flash",
+        token_budget: Optional[int] = None,
+        retriever: Optional[Retriever] = None
+    ):
+        """
+        Initializes the retrieval-augmented explorer.
+        
+        Args:
+            api_key: Google API key for Gemini (defaults to settings.GOOGLE_API_KEY)
+            model_name: The Gemini model to use (default: gemini-2.0-flash)
+            token_budget: Maximum number of passage tokens per prompt (defaults to settings.PROMPT_TOKEN_BUDGET)
+            retriever: Retrieval strategy used to rank passages (None uses the default vector retrieval)
+        """
+        super().__init__(api_key=api_key, model_name=model_name)
+        self.token_budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+        self.retriever = retriever
+        # Answers depend on the passages, so those of another retriever are cached apart
+        if retriever is not None:
+            self.prompt_version = f"{self.prompt_version}:{retriever.name}"
+    
+    def _create_prompt(self, search: str, file_dto: FileDTO) -> str:
+        """
+        Creates a prompt containing only the passages that fit in the token budget.
+        
+        Args:
+            search: The search query or instructions
+            file_dto: The file DTO containing the retrieved passages
+            
+        Returns:
+            A formatted prompt string
+        """
+        passages = self._pack_passages(file_dto.passages)
+        if not passages:
+            logger.info(f"No passages retrieved for file {file_dto.pk}; sending the full document")
+            return super()._create_prompt(search, file_dto)
+        
+        excerpts = "\n\n".join(
+            f"[Excerpt {i}, characters {passage.start_offset}-{passage.end_offset}]\n{passage.text}"
+            for i, passage in enumerate(passages, start=1)
+        )
+        return f"""
+You are an AI assistant specialized in analyzing and exploring document content.
+
+INSTRUCTIONS:
+{search}
+
+DOCUMENT EXCERPTS (the most relevant parts of "{file_dto.filename}", in document order):
+{excerpts}
+
+Please respond directly to the instructions above based solely on the document excerpts provided.
+Be concise and accurate. If the answer is not in the excerpts, say so clearly.
+"""
+    
+    def _pack_passages(self, passages: List[Passage]) -> List[Passage]:
+        """
+        Selects the best passages that fit in the token budget.
+        
+        Passages are taken best first; the first passage is truncated if it alone
+        exceeds the budget. The selection is returned in document order.
+        
+        Args:
+            passages: The retrieved passages, best first
+            
+        Returns:
+            The passages to send, ordered by position in the document
+        """
+        selected = []
+        remaining = self.token_budget
+        for passage in passages:
+            if passage.token_estimate <= remaining:
+                selected.append(passage)
+                remaining -= passage.token_estimate
+            elif not selected:
+                text = passage.text[:remaining * CHARS_PER_TOKEN]
+                selected.append(passage.model_copy(update={
+                    "text": text,
+                    "end_offset": passage.start_offset + len(text),
+                    "token_estimate": remaining
+                }))
+                remaining = 0
+            if remaining <= 0:
+                break
+        return sorted(selected, key=lambda passage: passage.start_offset)
@@ -35,4 +35,11 @@ def test_basic_explorer_explore(mock_file_dto):
     result = explorer.explore("Any search query", mock_file_dto)
     
     # Verify that it returns the content from the DTO
-    assert result == mock_file_dto.content 
\ No newline at end of file
+    assert result == mock_file_dto.content
+
+
+def test_basic_explorer_explore_stream_falls_back_to_explore(mock_file_dto):
+    """Test that a strategy without streaming yields its whole response at once"""
+    explorer = BasicExplorer()
+    
+    assert list(explorer.explore_stream("Any search query", mock_file_dto)) == [mock_file_dto.content]
@@ -1,8 +1,8 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, UTC
 from app.file_exploration.strategies.gemini_explorer import GeminiExplorer
-from app.common.schemas import FileDTO
+from app.common.schemas import FileDTO, Passage
 
 @pytest.fixture
 def mock_file_dto():
@@ -156,4 +156,152 @@ def test_gemini_explorer_error_handling(mock_generative_model, mock_configure, m
     
     # Verify that an error message is returned
     assert "Error exploring content with Gemini" in result
-    assert "API error" in result 
\ No newline at end of file
+    assert "API error" in result
+    assert explorer.is_error_response(result)
+    assert not explorer.is_error_response("The document is about testing.")
+
+
+@patch("google.generativeai.configure")
+@patch("google.generativeai.GenerativeModel")
+def test_gemini_explorer_explore_stream(mock_generative_model, mock_configure, mock_file_dto):
+    """Test that streamed chunks are yielded as they arrive, skipping empty ones"""
+    chunks = [MagicMock(text="The document "), MagicMock(text=""), MagicMock(text="is a test.")]
+    model_instance = MagicMock()
+    model_instance.generate_content.return_value = iter(chunks)
+    mock_generative_model.return_value = model_instance
+    explorer = GeminiExplorer(api_key="custom_api_key")
+    
+    parts = list(explorer.explore_stream("What is this document about?", mock_file_dto))
+    
+    assert parts == ["The document ", "is a test."]
+    assert model_instance.generate_content.call_args.kwargs["stream"] is True
+
+@patch("google.generativeai.configure")
+@patch("google.generativeai.GenerativeModel")
+def test_gemini_explorer_explore_stream_error(mock_generative_model, mock_configure, mock_file_dto):
+    """Test that a failure while streaming ends the stream with an error response"""
+    def failing_stream():
+        yield MagicMock(text="The document ")
+        raise Exception("API error")
+    model_instance = MagicMock()
+    model_instance.generate_content.return_value = failing_stream()
+    mock_generative_model.return_value = model_instance
+    explorer = GeminiExplorer(api_key="custom_api_key")
+    
+    parts = list(explorer.explore_stream("What is this document about?", mock_file_dto))
+    
+    assert parts[0] == "The document "
+    assert explorer.is_error_response(parts[1])
+    assert "API error" in parts[1]
+
+@pytest.mark.asyncio
+@patch("google.generativeai.configure")
+@patch("google.generativeai.GenerativeModel")
+async def test_gemini_explorer_explore_async(mock_generative_model, mock_configure, mock_file_dto, mock_gemini_response):
+    """Test that explore_async awaits the async API instead of the blocking one"""
+    model_instance = MagicMock()
+    model_instance.generate_content_async = AsyncMock(return_value=mock_gemini_response)
+    mock_generative_model.return_value = model_instance
+    explorer = GeminiExplorer(api_key="custom_api_key")
+    
+    result = await explorer.explore_async("What is this document about?", mock_file_dto)
+    
+    assert result == "This is a response from Gemini AI"
+    model_instance.generate_content_async.assert_awaited_once()
+    model_instance.generate_content.assert_not_called()
+
+@pytest.mark.asyncio
+@patch("google.generativeai.configure")
+@patch("google.generativeai.GenerativeModel")
+async def test_gemini_explorer_explore_async_error(mock_generative_model, mock_configure, mock_file_dto):
+    """Test that async API failures are returned as error responses"""
+    model_instance = MagicMock()
+    model_instance.generate_content_async = AsyncMock(side_effect=Exception("API error"))
+    mock_generative_model.return_value = model_instance
+    explorer = GeminiExplorer(api_key="custom_api_key")
+    
+    result = await explorer.explore_async("What is this document about?", mock_file_dto)
+    
+    assert explorer.is_error_response(result)
+
+@pytest.mark.asyncio
+@patch("google.generativeai.configure")
+@patch("google.generativeai.GenerativeModel")
+async def test_gemini_explorer_explore_many_async(mock_generative_model, mock_configure, mock_file_dto):
+    """Test that several questions are answered with one call and split back into answers"""
+    model_instance = MagicMock()
+    model_instance.generate_content_async = AsyncMock(return_value=MagicMock(
+        text="### Answer 1\nIn May.\n\n### Answer 2\nACME Corp."
+    ))
+    mock_generative_model.return_value = model_instance
+    explorer = GeminiExplorer(api_key="custom_api_key")
+    first = mock_file_dto.model_copy(update={"passages": [
+        Passage(ordinal=0, text="Signed in May.", start_offset=0, end_offset=14, token_estimate=4)
+    ]})
+    second = mock_file_dto.model_copy(update={"passages": [
+        Passage(ordinal=3, text="Between ACME Corp.", start_offset=50, end_offset=68, token_estimate=5)
+    ]})
+    
+    answers = await explorer.explore_many_async(["When was it signed?", "Who signed it?"], [first, second])
+    
+    assert answers == ["In May.", "ACME Corp."]
+    model_instance.generate_content_async.assert_awaited_once()
+    prompt = model_instance.generate_content_async.call_args.args[0]
+    assert "1. When was it signed?" in prompt
+    assert "2. Who signed it?" in prompt
+
+@pytest.mark.asyncio
+@patch("google.generativeai.configure")
+@patch("google.generativeai.GenerativeModel")
+async def test_gemini_explorer_explore_many_async_falls_back(mock_generative_model, mock_configure, mock_file_dto):
+    """Test that a grouped response that cannot be split is replaced by separate calls"""
+    model_instance = MagicMock()
+    model_instance.generate_content_async = AsyncMock(side_effect=[
+        MagicMock(text="In May, by ACME Corp."),
+        MagicMock(text="In May."),
+        MagicMock(text="ACME Corp.")
+    ])
+    mock_generative_model.return_value = model_instance
+    explorer = GeminiExplorer(api_key="custom_api_key")
+    
+    answers = await explorer.explore_many_async(["When?", "Who?"], [mock_file_dto, mock_file_dto])
+    
+    assert answers == ["In May.", "ACME Corp."]
+    assert model_instance.generate_content_async.await_count == 3
+
+@patch("google.generativeai.configure")
+@patch("google.generativeai.GenerativeModel")
+def test_gemini_explorer_merges_passages_by_rank(mock_generative_model, mock_configure, mock_file_dto):
+    """Test that the grouped prompt carries each question's passages, best ranked first and without repeats"""
+    def passage(start):
+        return Passage(ordinal=start, text=f"p{start}", start_offset=start, end_offset=start + 2, token_estimate=1)
+    first = mock_file_dto.model_copy(update={"passages": [passage(0), passage(10)]})
+    second = mock_file_dto.model_copy(update={"passages": [passage(20), passage(0), passage(30)]})
+    
+    merged = GeminiExplorer(api_key="custom_api_key")._merge_passages([first, second])
+    
+    assert [p.start_offset for p in merged.passages] == [0, 20, 10, 30]
+
+@pytest.mark.asyncio
+@patch("google.generativeai.configure")
+@patch("google.generativeai.GenerativeModel")
+async def test_gemini_explorer_explore_files_async(mock_generative_model, mock_configure, mock_file_dto):
+    """Test that the passages of several files are labelled in one prompt"""
+    model_instance = MagicMock()
+    model_instance.generate_content_async = AsyncMock(return_value=MagicMock(text="It changed [S2]."))
+    mock_generative_model.return_value = model_instance
+    explorer = GeminiExplorer(api_key="custom_api_key")
+    contract = mock_file_dto.model_copy(update={"filename": "contract.pdf", "passages": [
+        Passage(ordinal=0, text="The fee is 100.", start_offset=0, end_offset=15, token_estimate=4)
+    ]})
+    amendment = mock_file_dto.model_copy(update={"filename": "amendment.pdf", "passages": [
+        Passage(ordinal=0, text="The fee is 120.", start_offset=10, end_offset=25, token_estimate=4)
+    ]})
+    
+    result = await explorer.explore_files_async("Did the fee change?", [contract, amendment])
+    
+    assert result == "It changed [S2]."
+    prompt = model_instance.generate_content_async.call_args.args[0]
+    assert '[S1] "contract.pdf", characters 0-15\nThe fee is 100.' in prompt
+    assert '[S2] "amendment.pdf", characters 10-25\nThe fee is 120.' in prompt
+    assert mock_file_dto.markdown_content not in prompt
@@ -0,0 +1,58 @@
+import pytest
+from datetime import datetime, UTC
+from app.file_exploration.strategies.lexical_explorer import LexicalExplorer
+from app.retrieval.strategies.lexical_retriever import LexicalRetriever
+from app.common.schemas import FileDTO, Passage
+
+@pytest.fixture
+def mock_file_dto():
+    """Create a mock FileDTO with BM25-ranked passages"""
+    return FileDTO(
+        pk="file123",
+        filename="invoices.pdf",
+        url="https://example.com/invoices.pdf",
+        content="Test content",
+        markdown_content="# Invoices\n\nInvoice 4411 was paid in full.",
+        file_size=1024,
+        file_type="application/pdf",
+        processing_status="completed",
+        embedding_status="completed",
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+        metadata={},
+        history={},
+        passages=[
+            Passage(ordinal=0, text="# Invoices\n\nInvoice 4411 was paid in full.",
+                    start_offset=0, end_offset=41, token_estimate=11, score=2.5)
+        ]
+    )
+
+def test_lexical_explorer_uses_lexical_retriever():
+    """Test that the explorer ranks its passages with BM25 by default"""
+    explorer = LexicalExplorer()
+    assert isinstance(explorer.retriever, LexicalRetriever)
+
+def test_lexical_explorer_lists_passages(mock_file_dto):
+    """Test that matching passages are returned with their offsets"""
+    result = LexicalExplorer().explore("invoice 4411", mock_file_dto)
+    
+    assert "characters 0-41" in result
+    assert "Invoice 4411 was paid in full." in result
+
+def test_lexical_explorer_no_match(mock_file_dto):
+    """Test the answer when no passage matches"""
+    mock_file_dto.passages = []
+    
+    result = LexicalExplorer().explore("invoice 9999", mock_file_dto)
+    
+    assert "No passages" in result
+
+def test_lexical_explorer_snippet_centers_on_match(mock_file_dto):
+    """Test that long passages are cut around the first matching term"""
+    text = "filler " * 100 + "Invoice 4411 appears here." + " tail" * 100
+    mock_file_dto.passages = [Passage(ordinal=0, text=text, start_offset=0, end_offset=len(text), token_estimate=300)]
+    
+    result = LexicalExplorer(snippet_chars=60).explore("4411", mock_file_dto)
+    
+    assert "4411" in result
+    assert result.count("filler") < 10
@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import datetime, UTC
+from app.file_exploration.strategies.map_reduce_explorer import MapReduceExplorer, split_windows
+from app.common.schemas import FileDTO
+
+SECTIONS = ["Invoice 1: total 10.", "Invoice 2: total 20.", "Invoice 3: total 30.", "Signed by ACME."]
+
+@pytest.fixture
+def mock_file_dto():
+    """Create a FileDTO whose content spans several windows"""
+    return FileDTO(
+        pk="file123",
+        filename="invoices.xlsx",
+        url="https://example.com/invoices.xlsx",
+        content="Test content",
+        markdown_content="\n\n".join(SECTIONS),
+        file_size=1024,
+        file_type="application/vnd.ms-excel",
+        processing_status="completed",
+        embedding_status="completed",
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+        metadata={},
+        history={}
+    )
+
+def make_explorer(reply, max_parallel=4):
+    """Create a MapReduceExplorer with 6-token windows whose model replies with reply(prompt)"""
+    with patch("google.generativeai.GenerativeModel"), patch("google.generativeai.configure"):
+        explorer = MapReduceExplorer(api_key="fake_api_key", window_tokens=6, max_parallel=max_parallel)
+    prompts = []
+    async def generate_content_async(prompt, generation_config=None):
+        prompts.append(prompt)
+        await asyncio.sleep(0)
+        return MagicMock(text=reply(prompt))
+    def generate_content(prompt, generation_config=None):
+        prompts.append(prompt)
+        return MagicMock(text=reply(prompt))
+    explorer.model.generate_content_async = generate_content_async
+    explorer.model.generate_content = generate_content
+    return explorer, prompts
+
+def map_reply(prompt):
+    """Answer with the totals found in a window, or NOT FOUND"""
+    if "PARTIAL ANSWERS" in prompt:
+        return "The totals are 10, 20 and 30."
+    part = prompt.split("DOCUMENT PART", 1)[1]
+    for section in SECTIONS[:3]:
+        if section in part:
+            return f"{section}\nCONFIDENCE: medium"
+    return "NOT FOUND\nCONFIDENCE: low"
+
+def test_split_windows_prefers_paragraph_breaks():
+    """Test that windows cover the text and end after a paragraph break when there is one"""
+    text = "\n\n".join(SECTIONS)
+    
+    windows = split_windows(text, 24)
+    
+    assert "".join(text[start:end] for start, end in windows) == text
+    assert all(end - start <= 24 for start, end in windows)
+    assert [text[start:end].strip() for start, end in windows] == SECTIONS
+
+@pytest.mark.asyncio
+async def test_map_then_reduce(mock_file_dto):
+    """Test that every window is asked and the partial answers are combined in one call"""
+    explorer, prompts = make_explorer(map_reply)
+    
+    answer = await explorer.explore_async("List the invoice totals", mock_file_dto)
+    
+    assert answer == "The totals are 10, 20 and 30."
+    assert len(prompts) == 5
+    reduce_prompt = prompts[-1]
+    assert reduce_prompt.index("Invoice 1: total 10.") < reduce_prompt.index("Invoice 3: total 30.")
+    assert "Signed by ACME." not in reduce_prompt
+
+@pytest.mark.asyncio
+async def test_confident_answer_stops_early(mock_file_dto):
+    """Test that a confident window answer is returned without mapping the rest or reducing"""
+    def reply(prompt):
+        if "Invoice 1" in prompt.split("DOCUMENT PART", 1)[1]:
+            return "Invoice 1 totals 10.\nCONFIDENCE: high"
+        return "NOT FOUND"
+    explorer, prompts = make_explorer(reply, max_parallel=1)
+    
+    answer = await explorer.explore_async("What is the total of invoice 1?", mock_file_dto)
+    
+    assert answer == "Invoice 1 totals 10."
+    assert len(prompts) == 1
+
+@pytest.mark.asyncio
+async def test_window_answers_are_cached(mock_file_dto):
+    """Test that asking again reuses the window answers and only repeats the reduce call"""
+    explorer, prompts = make_explorer(map_reply)
+    
+    await explorer.explore_async("List the invoice totals", mock_file_dto)
+    await explorer.explore_async("list the invoice totals", mock_file_dto)
+    
+    assert len(prompts) == 6
+    assert "PARTIAL ANSWERS" in prompts[-1]
+
+@pytest.mark.asyncio
+async def test_small_document_is_sent_whole(mock_file_dto):
+    """Test that a document fitting in one window gets the single full-document prompt"""
+    explorer, prompts = make_explorer(lambda prompt: "Four sections.")
+    explorer.window_tokens = 1000
+    
+    answer = await explorer.explore_async("How many sections?", mock_file_dto)
+    
+    assert answer == "Four sections."
+    assert len(prompts) == 1
+    assert "DOCUMENT CONTENT" in prompts[0]
+
+@pytest.mark.asyncio
+async def test_failed_window_is_an_error_response(mock_file_dto):
+    """Test that a window failure makes the whole answer an error response"""
+    explorer, prompts = make_explorer(map_reply)
+    async def failing(prompt, generation_config=None):
+        raise Exception("quota")
+    explorer.model.generate_content_async = failing
+    
+    answer = await explorer.explore_async("List the invoice totals", mock_file_dto)
+    
+    assert explorer.is_error_response(answer)
+
+def test_explore_uses_the_blocking_client(mock_file_dto):
+    """Test that explore maps and reduces without the async client, which is bound to another event loop"""
+    explorer, prompts = make_explorer(map_reply)
+    async def bound_elsewhere(prompt, generation_config=None):
+        raise RuntimeError("Event loop is closed")
+    explorer.model.generate_content_async = bound_elsewhere
+    
+    assert explorer.explore("List the invoice totals", mock_file_dto) == "The totals are 10, 20 and 30."
+    assert list(explorer.explore_stream("List the invoice totals", mock_file_dto)) == ["The totals are 10, 20 and 30."]
+    assert len(prompts) == 6
+
+def test_explore_stops_early_on_a_confident_window(mock_file_dto):
+    """Test that the blocking map phase also stops at the first confident answer"""
+    def reply(prompt):
+        if "Invoice 1" in prompt.split("DOCUMENT PART", 1)[1]:
+            return "Invoice 1 totals 10.\nCONFIDENCE: high"
+        return "NOT FOUND"
+    explorer, prompts = make_explorer(reply, max_parallel=1)
+    
+    assert explorer.explore("What is the total of invoice 1?", mock_file_dto) == "Invoice 1 totals 10."
+    assert explorer.explore("What is the total of invoice 1?", mock_file_dto) == "Invoice 1 totals 10."
+    assert len(prompts) == 1
@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import datetime, UTC
+from app.file_exploration.strategies.retrieval_augmented_explorer import RetrievalAugmentedExplorer
+from app.common.schemas import FileDTO, Passage
+
+@pytest.fixture
+def mock_file_dto():
+    """Create a mock FileDTO with retrieved passages, best first"""
+    return FileDTO(
+        pk="file123",
+        filename="test.pdf",
+        url="https://example.com/test.pdf",
+        content="Test content",
+        markdown_content="# Test Document\n\nThis is a test document." + " filler" * 1000,
+        file_size=1024,
+        file_type="application/pdf",
+        processing_status="completed",
+        embedding_status="completed",
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+        metadata={},
+        history={},
+        passages=[
+            Passage(ordinal=3, text="The total is 42.", start_offset=300, end_offset=316, token_estimate=4, score=0.9),
+            Passage(ordinal=1, text="Issued to ACME.", start_offset=100, end_offset=115, token_estimate=4, score=0.7),
+            Passage(ordinal=5, text="Unrelated text.", start_offset=500, end_offset=515, token_estimate=4, score=0.1),
+        ]
+    )
+
+@pytest.fixture
+def explorer():
+    """Create a RetrievalAugmentedExplorer with a mocked Gemini model"""
+    with patch("google.generativeai.GenerativeModel"), patch("google.generativeai.configure"):
+        return RetrievalAugmentedExplorer(api_key="fake_api_key", token_budget=8)
+
+def test_prompt_contains_only_passages_within_budget(explorer, mock_file_dto):
+    """Test that only the best passages fitting the budget are sent, in document order"""
+    prompt = explorer._create_prompt("What is the total?", mock_file_dto)
+    
+    assert "What is the total?" in prompt
+    assert "The total is 42." in prompt
+    assert "Issued to ACME." in prompt
+    assert "Unrelated text." not in prompt
+    assert "filler" not in prompt
+    assert prompt.index("Issued to ACME.") < prompt.index("The total is 42.")
+
+def test_prompt_truncates_oversized_first_passage(explorer, mock_file_dto):
+    """Test that a single passage larger than the budget is truncated"""
+    mock_file_dto.passages = [
+        Passage(ordinal=0, text="x" * 100, start_offset=0, end_offset=100, token_estimate=25, score=1.0)
+    ]
+    
+    packed = explorer._pack_passages(mock_file_dto.passages)
+    
+    assert len(packed) == 1
+    assert packed[0].text == "x" * 32
+    assert packed[0].end_offset == 32
+
+def test_prompt_falls_back_to_full_document(explorer, mock_file_dto):
+    """Test that the full document is sent when no passages were retrieved"""
+    mock_file_dto.passages = []
+    
+    prompt = explorer._create_prompt("What is the total?", mock_file_dto)
+    
+    assert mock_file_dto.markdown_content in prompt
+
+def test_explore_sends_bounded_prompt(explorer, mock_file_dto):
+    """Test that explore calls Gemini with the retrieval-augmented prompt"""
+    response = MagicMock()
+    response.text = "The total is 42."
+    explorer.model = MagicMock()
+    explorer.model.generate_content.return_value = response
+    
+    result = explorer.explore("What is the total?", mock_file_dto)
+    
+    assert result == "The total is 42."
+    prompt = explorer.model.generate_content.call_args.args[0]
+    assert "filler" not in prompt
@@ -0,0 +1,115 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock, patch
+from app.embedding.service import EmbeddingService
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
+from app.file_exploration.semantic_cache import SemanticAnswerCache, same_question
+
+NAMESPACE = ("file123", "gemini-2.0-flash", "excerpts-1")
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+@pytest.fixture
+def cache():
+    return SemanticAnswerCache(
+        embedding_service=MagicMock(), threshold=0.9, max_age_seconds=100, per_file_capacity=2, max_files=2
+    )
+
+def test_paraphrase_above_threshold_hits(cache):
+    """Test that a query close enough to a cached one reuses its answer"""
+    cache.store(NAMESPACE, unit(1, 0, 0), "What is the total?", "120 USD")
+    
+    hit = cache.lookup(NAMESPACE, unit(1, 0.2, 0))
+    
+    assert hit.answer == "120 USD"
+    assert hit.query == "What is the total?"
+    assert hit.similarity == pytest.approx(0.98, abs=0.01)
+    assert cache.stats()["llm_calls_avoided"] == 1
+
+def test_dissimilar_query_misses(cache):
+    """Test that queries below the threshold are not answered from the cache"""
+    cache.store(NAMESPACE, unit(1, 0, 0), "What is the total?", "120 USD")
+    
+    assert cache.lookup(NAMESPACE, unit(1, 1, 0)) is None
+    assert cache.lookup(("file456", "gemini-2.0-flash", "excerpts-1"), unit(1, 0, 0)) is None
+    assert cache.lookup(("file123", "gemini-2.0-flash", "excerpts-2"), unit(1, 0, 0)) is None
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["hit_rate"] == 0.0
+
+def test_closest_answer_wins(cache):
+    """Test that the most similar cached query is used"""
+    cache.store(NAMESPACE, unit(1, 0, 0), "What is the total?", "120 USD")
+    cache.store(NAMESPACE, unit(0, 1, 0), "Who signed?", "Jane Doe")
+    
+    assert cache.lookup(NAMESPACE, unit(0.1, 1, 0)).answer == "Jane Doe"
+
+def test_answers_expire_by_age(cache):
+    """Test that answers older than the maximum age are not served"""
+    with patch("app.file_exploration.semantic_cache.time.time", return_value=1000.0):
+        cache.store(NAMESPACE, unit(1, 0, 0), "What is the total?", "120 USD")
+    with patch("app.file_exploration.semantic_cache.time.time", return_value=1050.0):
+        assert cache.lookup(NAMESPACE, unit(1, 0, 0)) is not None
+    with patch("app.file_exploration.semantic_cache.time.time", return_value=1101.0):
+        assert cache.lookup(NAMESPACE, unit(1, 0, 0)) is None
+
+def test_per_file_capacity_evicts_least_recently_used(cache):
+    """Test that a full file replaces its least recently used answer"""
+    cache.max_age_seconds = float("inf")
+    with patch("app.file_exploration.semantic_cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+        cache.store(NAMESPACE, unit(1, 0, 0), "What is the total?", "120 USD")
+        cache.store(NAMESPACE, unit(0, 1, 0), "Who signed?", "Jane Doe")
+        cache.lookup(NAMESPACE, unit(1, 0, 0))
+        cache.store(NAMESPACE, unit(0, 0, 1), "When?", "In May")
+    
+    assert cache.lookup(NAMESPACE, unit(0, 1, 0)) is None
+    assert cache.lookup(NAMESPACE, unit(1, 0, 0)).answer == "120 USD"
+    assert cache.lookup(NAMESPACE, unit(0, 0, 1)).answer == "In May"
+    assert cache.stats()["evictions"] == 1
+
+def test_file_count_is_bounded(cache):
+    """Test that only the most recently used files keep their answers"""
+    for file_id in ["file1", "file2", "file3"]:
+        cache.store((file_id, "m", "1"), unit(1, 0, 0), "q", file_id)
+    
+    assert cache.lookup(("file1", "m", "1"), unit(1, 0, 0)) is None
+    assert cache.lookup(("file3", "m", "1"), unit(1, 0, 0)).answer == "file3"
+    assert cache.stats()["files"] == 2
+
+@pytest.fixture
+def hashing_cache():
+    """Create a cache embedding queries with word and character n-grams, which ignore word order"""
+    return SemanticAnswerCache(EmbeddingService(HashingEmbedder(dimension=256)), threshold=0.9, max_age_seconds=100)
+
+def ask(cache, query, answer=None):
+    vector = cache.embed(query)
+    hit = cache.lookup(NAMESPACE, vector, query)
+    if answer is not None:
+        cache.store(NAMESPACE, vector, query, answer)
+    return hit
+
+@pytest.mark.parametrize("cached_query,query", [
+    ("Did Alice pay Bob?", "Did Bob pay Alice?"),
+    ("What is owed by the tenant to the landlord?", "What is owed by the landlord to the tenant?"),
+])
+def test_reordered_question_misses(hashing_cache, cached_query, query):
+    """Test that swapping the roles of a question does not reuse its answer, however similar the embeddings"""
+    ask(hashing_cache, cached_query, "Yes")
+    
+    assert float(hashing_cache.embed(cached_query) @ hashing_cache.embed(query)) >= 0.9
+    assert ask(hashing_cache, query) is None
+
+def test_negated_question_misses(hashing_cache):
+    """Test that a negated question does not reuse the answer of the affirmative one"""
+    ask(hashing_cache, "Which invoices were paid in March?", "4411 and 4412")
+    
+    assert ask(hashing_cache, "Which invoices were not paid in March?") is None
+    assert ask(hashing_cache, "Which invoices weren't paid in March?") is None
+    assert ask(hashing_cache, "which invoices were paid in march") is not None
+
+def test_same_question():
+    """Test the word order and negation checks"""
+    assert same_question("What is the total?", "total amount?")
+    assert not same_question("Did Alice pay Bob?", "Did Bob pay Alice?")
+    assert not same_question("Is the lease renewable?", "Is the lease not renewable?")
@@ -1,9 +1,20 @@
+import asyncio
+import time
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime, UTC
-from app.file_exploration.service import FileExplorationService
+from app.file_exploration.service import FileExplorationService, create_explorer
 from app.file_exploration.file_explorer import FileExplorer
+from app.infrastructure.config import settings
+from app.file_exploration.semantic_cache import SemanticAnswerCache
+from app.embedding.service import EmbeddingService
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
 from app.file_exploration.strategies.gemini_explorer import GeminiExplorer
+from app.file_exploration.strategies.retrieval_augmented_explorer import RetrievalAugmentedExplorer
+from app.file_exploration.strategies.lexical_explorer import LexicalExplorer
+from app.retrieval.strategies.lexical_retriever import LexicalRetriever
+from app.file_exploration.strategies.map_reduce_explorer import MapReduceExplorer
+from app.retrieval.strategies.hybrid_retriever import HybridRetriever
 from app.common.schemas import FileDTO
 
 @pytest.fixture
@@ -40,6 +51,7 @@ def test_service_initialization_with_custom_explorer(mock_explorer):
 def test_service_initialization_default():
     """Test service initialization with default explorer"""
     service = FileExplorationService()
+    assert isinstance(service.explorer, RetrievalAugmentedExplorer)
     assert isinstance(service.explorer, GeminiExplorer)
 
 def test_explore_method(mock_explorer, mock_file_dto):
@@ -53,4 +65,186 @@ def test_explore_method(mock_explorer, mock_file_dto):
     assert result == "Mock exploration result"
     
     # Verify the mock was called correctly
-    mock_explorer.explore.assert_called_once_with("What is this document about?", mock_file_dto) 
\ No newline at end of file
+    mock_explorer.explore.assert_called_once_with("What is this document about?", mock_file_dto)
+
+
+def test_service_exposes_explorer_retriever(mock_explorer):
+    """Test that the service exposes the retrieval strategy of its explorer"""
+    mock_explorer.retriever = MagicMock()
+    service = FileExplorationService(explorer=mock_explorer)
+    
+    assert service.retriever is mock_explorer.retriever
+
+
+def test_explore_reuses_answers_to_paraphrases(mock_explorer, mock_file_dto):
+    """Test that the semantic cache answers a repeated question without calling the explorer"""
+    mock_explorer.model_name = "gemini-2.0-flash"
+    mock_explorer.prompt_version = "excerpts-1"
+    mock_explorer.is_error_response.return_value = False
+    semantic_cache = SemanticAnswerCache(EmbeddingService(HashingEmbedder(dimension=256)), threshold=0.9)
+    service = FileExplorationService(explorer=mock_explorer, semantic_cache=semantic_cache)
+    
+    first = service.explore("What is the total amount?", mock_file_dto)
+    second = service.explore("what is the total amount", mock_file_dto)
+    
+    assert first == second == "Mock exploration result"
+    mock_explorer.explore.assert_called_once()
+    assert semantic_cache.stats()["llm_calls_avoided"] == 1
+
+@pytest.mark.asyncio
+async def test_explore_async_embeds_off_the_event_loop(mock_explorer, mock_file_dto):
+    """Test that the semantic cache embeds the question in a worker thread"""
+    class BlockingEmbedder(HashingEmbedder):
+        def embed_query(self, text):
+            time.sleep(0.2)
+            return super().embed_query(text)
+    mock_explorer.model_name = "gemini-2.0-flash"
+    mock_explorer.prompt_version = "excerpts-1"
+    mock_explorer.is_error_response.return_value = False
+    mock_explorer.explore_many_async = AsyncMock(return_value=["Mock exploration result"] * 2)
+    semantic_cache = SemanticAnswerCache(EmbeddingService(BlockingEmbedder(dimension=256)), threshold=0.9)
+    service = FileExplorationService(explorer=mock_explorer, semantic_cache=semantic_cache)
+    ticks = 0
+    
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+    
+    ticker = asyncio.create_task(tick())
+    answers = await service.explore_many_async(["What is the total?", "Who signed?"], [mock_file_dto, mock_file_dto])
+    ticker.cancel()
+    
+    assert answers == ["Mock exploration result", "Mock exploration result"]
+    assert ticks >= 5
+
+def test_explore_does_not_cache_errors(mock_explorer, mock_file_dto):
+    """Test that failed answers are not reused"""
+    mock_explorer.model_name = "gemini-2.0-flash"
+    mock_explorer.prompt_version = "excerpts-1"
+    mock_explorer.is_error_response.return_value = True
+    semantic_cache = SemanticAnswerCache(EmbeddingService(HashingEmbedder(dimension=256)), threshold=0.9)
+    service = FileExplorationService(explorer=mock_explorer, semantic_cache=semantic_cache)
+    
+    service.explore("What is the total amount?", mock_file_dto)
+    service.explore("What is the total amount?", mock_file_dto)
+    
+    assert mock_explorer.explore.call_count == 2
+
+def test_explore_stream_caches_assembled_response(mock_explorer, mock_file_dto):
+    """Test that a streamed response is cached whole and replayed in one part"""
+    mock_explorer.model_name = "gemini-2.0-flash"
+    mock_explorer.prompt_version = "excerpts-1"
+    mock_explorer.is_error_response.return_value = False
+    mock_explorer.explore_stream.return_value = iter(["The total ", "is 42."])
+    semantic_cache = SemanticAnswerCache(EmbeddingService(HashingEmbedder(dimension=256)), threshold=0.9)
+    service = FileExplorationService(explorer=mock_explorer, semantic_cache=semantic_cache)
+    
+    first = list(service.explore_stream("What is the total amount?", mock_file_dto))
+    second = list(service.explore_stream("what is the total amount", mock_file_dto))
+    
+    assert first == ["The total ", "is 42."]
+    assert second == ["The total is 42."]
+    mock_explorer.explore_stream.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_explore_stream_async_times_out_between_parts(mock_explorer, mock_file_dto):
+    """Test that a stream stalling between parts ends with a timeout instead of waiting on the model"""
+    def explore_stream(search, file_dto):
+        yield "The total "
+        time.sleep(0.5)
+        yield "is 42."
+    mock_explorer.explore_stream.side_effect = explore_stream
+    service = FileExplorationService(explorer=mock_explorer, timeout_seconds=0.1)
+    parts = []
+    
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        async for part in service.explore_stream_async("What is the total amount?", mock_file_dto):
+            parts.append(part)
+    
+    assert parts == ["The total "]
+    assert time.perf_counter() - start < 0.4
+
+@pytest.mark.asyncio
+async def test_explore_many_async_skips_cached_questions(mock_explorer, mock_file_dto):
+    """Test that only the questions missing from the semantic cache are sent to the explorer"""
+    mock_explorer.model_name = "gemini-2.0-flash"
+    mock_explorer.prompt_version = "excerpts-1"
+    mock_explorer.is_error_response.return_value = False
+    mock_explorer.explore_many_async = AsyncMock(side_effect=lambda searches, file_dtos: [f"A: {s}" for s in searches])
+    semantic_cache = SemanticAnswerCache(EmbeddingService(HashingEmbedder(dimension=256)), threshold=0.9)
+    service = FileExplorationService(explorer=mock_explorer, semantic_cache=semantic_cache)
+    
+    await service.explore_many_async(["What is the total amount?"], [mock_file_dto])
+    answers = await service.explore_many_async(
+        ["what is the total amount", "Who signed the contract?"], [mock_file_dto, mock_file_dto]
+    )
+    
+    assert answers == ["A: What is the total amount?", "A: Who signed the contract?"]
+    assert mock_explorer.explore_many_async.call_args.args[0] == ["Who signed the contract?"]
+
+class SleepingExplorer(FileExplorer):
+    """Synchronous explorer that takes a fixed time to answer"""
+    def __init__(self, latency):
+        self.latency = latency
+    
+    def explore(self, search, file_dto):
+        time.sleep(self.latency)
+        return f"Answer to {search}"
+
+@pytest.mark.asyncio
+async def test_explore_async_runs_sync_explorers_concurrently(mock_file_dto):
+    """Test that synchronous explorers run in the executor instead of blocking the event loop"""
+    service = FileExplorationService(explorer=SleepingExplorer(0.2))
+    calls = min(4, settings.EXPLORER_MAX_WORKERS)
+    
+    start = time.perf_counter()
+    answers = await asyncio.gather(*(service.explore_async(f"q{i}", mock_file_dto) for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    
+    assert answers == [f"Answer to q{i}" for i in range(calls)]
+    assert elapsed < 0.2 * calls / 2
+
+@pytest.mark.asyncio
+async def test_explore_async_times_out(mock_file_dto):
+    """Test that a call slower than the timeout raises instead of holding the request"""
+    service = FileExplorationService(explorer=SleepingExplorer(0.5), timeout_seconds=0.05)
+    
+    with pytest.raises(TimeoutError):
+        await service.explore_async("What is this?", mock_file_dto)
+
+def test_semantic_cache_only_for_language_models(monkeypatch):
+    """Test that explorers that do not call a language model get no semantic cache"""
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_ENABLED", True)
+    assert FileExplorationService(explorer=LexicalExplorer()).semantic_cache is None
+    assert FileExplorationService(explorer=GeminiExplorer(api_key="key")).semantic_cache is not None
+
+def test_semantic_cache_off_by_default_with_hashing_embeddings():
+    """Test that the layer is only on by default with a semantic embedder"""
+    assert settings.SEMANTIC_CACHE_ENABLED == (settings.EMBEDDING_PROVIDER == "gemini")
+
+@pytest.mark.parametrize("strategy,explorer_class,retriever_class", [
+    ("gemini", GeminiExplorer, type(None)),
+    ("retrieval", RetrievalAugmentedExplorer, type(None)),
+    ("hybrid", RetrievalAugmentedExplorer, HybridRetriever),
+    ("lexical", LexicalExplorer, LexicalRetriever),
+    ("map_reduce", MapReduceExplorer, type(None)),
+])
+def test_create_explorer(strategy, explorer_class, retriever_class):
+    """Test that every strategy name creates the matching explorer"""
+    explorer = create_explorer(strategy)
+    
+    assert type(explorer) is explorer_class
+    assert isinstance(explorer.retriever, retriever_class)
+
+def test_retrieval_strategies_cache_apart():
+    """Test that answers built from the passages of different retrievers get different cache keys"""
+    assert create_explorer("retrieval").prompt_version != create_explorer("hybrid").prompt_version
+    assert create_explorer("hybrid").prompt_version == "excerpts-1:hybrid"
+
+def test_create_explorer_unknown_strategy():
+    """Test that an unknown strategy name is rejected"""
+    with pytest.raises(ValueError, match="Unknown file explorer strategy"):
+        create_explorer("unknown")
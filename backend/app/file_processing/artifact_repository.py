@@ -0,0 +1,89 @@
+"""
+Repository for binary artifacts stored next to a FileProcessingRecord.
+"""
+from typing import Any, Dict, Optional
+from app.infrastructure.dynamodb.repository import DynamoDBRepository
+from app.file_processing.models import FileArtifactPart
+from app.uploads.s3_client import S3Client
+
+# Stay well below the 400KB DynamoDB item size limit
+ARTIFACT_PART_SIZE_BYTES = 350 * 1024
+
+# Prefix of the keys of the artifacts stored in the S3 bucket
+ARTIFACT_S3_PREFIX = "artifacts"
+
+
+class FileArtifactRepository(DynamoDBRepository):
+    """
+    Repository for binary artifacts derived from a file, such as search indexes.
+
+    An artifact that fits in one item is stored inline. A larger one (a suffix
+    array takes several times the size of its text) is stored as an object of
+    the S3 bucket, read in one request, and its item only holds the object key.
+    Artifacts split into several items by earlier versions are still read.
+    """
+
+    def __init__(self, s3_client: Optional[S3Client] = None):
+        """
+        Initializes the repository.
+
+        Args:
+            s3_client: Client of the bucket holding the large artifacts
+        """
+        self.s3_client = s3_client or S3Client()
+
+    async def save_artifact(self, file_id: str, kind: str, data: bytes) -> Dict[str, Any]:
+        """
+        Save an artifact, inline or in S3 depending on its size.
+        
+        Args:
+            file_id: The ID of the file
+            kind: The kind of artifact
+            data: The serialized artifact
+            
+        Returns:
+            The response from DynamoDB
+        """
+        s3_key = None
+        if len(data) > ARTIFACT_PART_SIZE_BYTES:
+            s3_key = f"{ARTIFACT_S3_PREFIX}/{file_id}/{kind}"
+            # The object is written first, so the item never points to a missing object
+            await self.s3_client.put_object(s3_key, data)
+            data = b""
+        return await DynamoDBRepository.put_item(FileArtifactPart(
+            pk=FileArtifactPart.build_pk(file_id, kind, 0),
+            file_id=file_id,
+            kind=kind,
+            part=0,
+            part_count=1,
+            data=data,
+            s3_key=s3_key
+        ))
+
+    async def get_artifact(self, file_id: str, kind: str) -> Optional[bytes]:
+        """
+        Get an artifact, from its item, its S3 object or its parts.
+        
+        Args:
+            file_id: The ID of the file
+            kind: The kind of artifact
+            
+        Returns:
+            The serialized artifact if found, None otherwise
+        """
+        first = await DynamoDBRepository.get_item(
+            {"pk": FileArtifactPart.build_pk(file_id, kind, 0)}, FileArtifactPart
+        )
+        if not first:
+            return None
+        if first.s3_key:
+            return await self.s3_client.get_object(first.s3_key)
+        if first.part_count == 1:
+            return first.data
+        
+        keys = [{"pk": FileArtifactPart.build_pk(file_id, kind, part)} for part in range(1, first.part_count)]
+        rest = await DynamoDBRepository.batch_get(keys, FileArtifactPart)
+        if len(rest) != first.part_count - 1:
+            return None
+        rest.sort(key=lambda item: item.part)
+        return first.data + b"".join(item.data for item in rest)
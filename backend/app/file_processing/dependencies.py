@@ -1,6 +1,8 @@
 from typing import Annotated
 from fastapi import Depends
 from app.text_extraction.service import TextExtractionService
+from app.text_chunking.service import TextChunkingService
+from app.embedding.service import EmbeddingService
 from app.uploads.service import FileUploadService
 from app.uploads.dependencies import get_upload_service
 from .service import FileProcessorService
@@ -8,8 +10,16 @@ from .service import FileProcessorService
 def get_text_extraction_service() -> TextExtractionService:
     return TextExtractionService()
 
+def get_text_chunking_service() -> TextChunkingService:
+    return TextChunkingService()
+
+def get_embedding_service() -> EmbeddingService:
+    return EmbeddingService()
+
 def get_file_processor_service(
     text_extraction_service: Annotated[TextExtractionService, Depends(get_text_extraction_service)],
-    upload_service: Annotated[FileUploadService, Depends(get_upload_service)]
+    upload_service: Annotated[FileUploadService, Depends(get_upload_service)],
+    text_chunking_service: Annotated[TextChunkingService, Depends(get_text_chunking_service)],
+    embedding_service: Annotated[EmbeddingService, Depends(get_embedding_service)]
 ) -> FileProcessorService:
-    return FileProcessorService(text_extraction_service, upload_service) 
\ No newline at end of file
+    return FileProcessorService(text_extraction_service, upload_service, text_chunking_service, embedding_service) 
\ No newline at end of file
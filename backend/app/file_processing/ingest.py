@@ -0,0 +1,55 @@
+"""
+Single-pass reading of an uploaded file.
+"""
+import logging
+from typing import Optional
+from fastapi import UploadFile
+from app.common.exceptions import FileUploadError
+from app.infrastructure.config import settings
+from app.uploads.s3_client import S3MultipartUpload
+from .file_identity import FileDigest
+
+logger = logging.getLogger(__name__)
+
+
+async def tee_upload(
+    file: UploadFile,
+    upload: Optional[S3MultipartUpload] = None,
+    block_size: Optional[int] = None
+) -> FileDigest:
+    """
+    Reads the spooled upload once, feeding every block to the digest and the S3 upload.
+
+    The file is read in fixed-size blocks and each block goes to the digest that
+    identifies the file and, when given, to the multipart upload storing it; the
+    spool itself is left for the extractor, which converts it in place. Memory is
+    bounded by one block plus one upload part, whatever the file size. The file
+    position is reset to the start afterwards.
+
+    Args:
+        file: The uploaded file
+        upload: The started multipart upload, if the file is stored
+        block_size: Bytes read at a time (defaults to settings.INGEST_BLOCK_BYTES)
+
+    Returns:
+        The digest of the full content
+
+    Raises:
+        FileUploadError: If uploading a part fails
+    """
+    digest = FileDigest()
+    block_size = block_size or settings.INGEST_BLOCK_BYTES
+    await file.seek(0)
+    try:
+        # UploadFile.read moves to a worker thread once the spool has rolled over to disk
+        while block := await file.read(block_size):
+            digest.update(block)
+            if upload is not None:
+                try:
+                    await upload.write(block)
+                except Exception as e:
+                    raise FileUploadError(f"Failed to upload file: {str(e)}")
+    finally:
+        await file.seek(0)
+    logger.info(f"Read {digest.size} bytes of file {file.filename}")
+    return digest
@@ -3,7 +3,8 @@ File processing models.
 """
 from datetime import datetime
 from typing import Optional, Union
-from pydantic import BaseModel, Field, field_serializer
+from pydantic import BaseModel, Field, field_serializer, field_validator
+from app.infrastructure.dynamodb.types import unwrap_binary
 
 class FileProcessingRecord(BaseModel):
     """
@@ -77,4 +78,49 @@ class FileProcessingRecord(BaseModel):
                     "processing_to_completed": "2024-04-06T12:01:00Z",
                 }
             }
-        } 
\ No newline at end of file
+        }
+
+
+class FileArtifactPart(BaseModel):
+    """
+    Model representing one part of a binary artifact derived from a file (e.g. a search index).
+    
+    Artifacts are split into parts so that each item stays below the DynamoDB item size limit;
+    larger ones are stored in S3 and the single part points to the object.
+    """
+    pk: str = Field(..., description="Primary key - composite of 'file_id#kind#part'")
+    file_id: str = Field(..., description="ID of the file the artifact belongs to")
+    kind: str = Field(..., description="Kind of artifact, e.g. 'bm25'")
+    part: int = Field(..., description="Position of the part inside the artifact, starting at 0")
+    part_count: int = Field(..., description="Total number of parts of the artifact")
+    data: bytes = Field(..., description="Binary content of the part")
+    s3_key: Optional[str] = Field(None, description="Key of the S3 object holding the artifact, instead of the parts")
+
+    @field_validator('data', mode='before')
+    @classmethod
+    def unwrap_data(cls, value):
+        """
+        Unwrap the Binary type returned by DynamoDB for binary attributes.
+        
+        Args:
+            value: The raw attribute value
+            
+        Returns:
+            The attribute value as bytes
+        """
+        return unwrap_binary(value)
+
+    @staticmethod
+    def build_pk(file_id: str, kind: str, part: int) -> str:
+        """
+        Build the primary key of an artifact part.
+        
+        Args:
+            file_id: The ID of the file
+            kind: The kind of artifact
+            part: The position of the part
+            
+        Returns:
+            The artifact part primary key
+        """
+        return f"{file_id}#{kind}#{part:03d}"
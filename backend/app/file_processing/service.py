@@ -1,21 +1,28 @@
 from fastapi import UploadFile
-import hashlib
+from starlette.concurrency import run_in_threadpool
 import logging
 import os
 import asyncio
 from app.text_extraction.service import TextExtractionService
+from app.text_chunking.service import TextChunkingService
+from app.text_chunking.repository import ChunkRepository
+from app.embedding.service import EmbeddingService
 from app.uploads.service import FileUploadService
 from app.file_processing.repository import FileProcessingRepository
-from app.common.exceptions import FileProcessingError, TextExtractionError, FileUploadError
+from app.file_processing.artifact_repository import FileArtifactRepository
+from app.retrieval.lexical_index import LexicalIndex, LEXICAL_INDEX_ARTIFACT
+from app.retrieval.sentence_index import SentenceIndex, SENTENCE_INDEX_ARTIFACT
+from app.retrieval.suffix_array import SuffixArray, SUFFIX_ARRAY_ARTIFACT
+from app.retrieval.trigram_index import TrigramIndex, TRIGRAM_INDEX_ARTIFACT
+from app.common.exceptions import FileProcessingError, TextExtractionError, TextChunkingError, TextIndexingError, FileUploadError
+from .ingest import tee_upload
 from .schemas import FileProcessResponse
 from .models import FileProcessingRecord
+from app.text_chunking.models import DocumentChunk
+from app.uploads.s3_client import S3MultipartUpload
 from datetime import datetime
 from io import BytesIO
-from typing import Optional
-
-# Constants
-SAMPLE_SIZE_BYTES = 32768  # 32KB
-HASH_ALGORITHM = 'md5'
+from typing import List, Optional
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -24,14 +31,16 @@ class FileProcessorService:
     """
     Service responsible for processing and uploading files.
     
-    This service coordinates the text extraction, file upload, and storage operations.
+    This service coordinates the text extraction, chunking, file upload, and storage operations.
     It ensures files are processed efficiently and maintains a record of processed files.
     """
     
     def __init__(
         self, 
         text_extraction_service: TextExtractionService, 
-        upload_service: FileUploadService
+        upload_service: FileUploadService,
+        text_chunking_service: Optional[TextChunkingService] = None,
+        embedding_service: Optional[EmbeddingService] = None
     ):
         """
         Initialize the FileProcessorService.
@@ -39,23 +48,36 @@ class FileProcessorService:
         Args:
             text_extraction_service: Service for extracting text from files
             upload_service: Service for handling file uploads
+            text_chunking_service: Service for splitting extracted text into chunks
+            embedding_service: Service for embedding the chunks
         """
         self.text_extraction_service = text_extraction_service
         self.upload_service = upload_service
+        self.text_chunking_service = text_chunking_service or TextChunkingService()
+        self.embedding_service = embedding_service or EmbeddingService()
         self.repository = FileProcessingRepository()
+        self.chunk_repository = ChunkRepository()
+        self.artifact_repository = FileArtifactRepository()
 
     async def process_and_upload(self, file: UploadFile) -> FileProcessResponse:
         """
         Process a file by extracting its text and uploading it.
         
         This method:
-        1. Generates a unique identifier for the file
+        1. Reads the file once, generating its identifier while uploading it (see tee_upload)
         2. Checks if the file was already processed
         3. Creates an initial record with status "received"
         4. Extracts text from the file and updates status to "extracted"
-        5. Uploads the file and updates status to "stored"
-        6. Completes the record with status "completed"
-        7. Returns the processing response
+        5. Splits the text into embedded chunks and updates status to "chunked"
+        6. Builds the search indexes and updates status to "indexed"
+        7. Completes the upload and updates status to "stored"
+        8. Completes the record with status "completed"
+        9. Returns the processing response
+        
+        The upload (I/O bound) runs concurrently with steps 4 to 6 (CPU bound), so
+        the file is processed in about the time of the longer of the two; "stored"
+        is reported once both are done. If either fails, the other is cancelled and
+        the record ends in "error" with the message of the failing stage.
         
         Args:
             file: The file to be processed and uploaded
@@ -65,13 +87,18 @@ class FileProcessorService:
             
         Raises:
             TextExtractionError: If text extraction fails
+            TextChunkingError: If text chunking fails
+            TextIndexingError: If building the search indexes fails
             FileUploadError: If file upload fails
             FileProcessingError: If an unexpected error occurs
         """
         file_record = None
+        upload = None
         try:
             logger.info(f"Starting file processing for: {file.filename}")
-            file_id = self._calculate_file_identifier(file)
+            upload = await self._start_upload(file)
+            file_id = (await tee_upload(file, upload)).identifier
+            logger.info(f"Generated file ID: {file_id} for file: {file.filename}")
             
             # Check if the file was already processed
             file_record = await self._get_file_record(file_id)
@@ -84,12 +111,13 @@ class FileProcessorService:
                 file_record = await self._create_initial_record(file_id, file)
             
             try:
-                # Extract text and update status to "extracted"
-                extracted_text = await self._extract_text(file, file_record)
-                file_record = await self._update_processing_status(file_record, "extracted")
+                # Extract, chunk and index the text while the upload completes
+                extracted_text, upload_response = await self._run_concurrently(
+                    self._process_text(file, file_record),
+                    self._upload_file(file, file_record, upload)
+                )
                 
-                # Upload file and update status to "stored"
-                upload_response = await self._upload_file(file, file_record)
+                # Update status to "stored" once the upload is complete
                 file_record = await self._update_processing_status(file_record, "stored")
                 
                 # Complete the record with status "completed"
@@ -101,7 +129,7 @@ class FileProcessorService:
                 
                 return self._create_response_from_record(file_record)
                 
-            except (TextExtractionError, FileUploadError) as e:
+            except (TextExtractionError, TextChunkingError, TextIndexingError, FileUploadError) as e:
                 # Update status to "error" if an error occurs
                 await self._update_processing_status(file_record, "error", str(e))
                 raise
@@ -111,6 +139,56 @@ class FileProcessorService:
             if file_record:
                 await self._update_processing_status(file_record, "error", str(e))
             raise FileProcessingError(f"Unexpected error processing file: {str(e)}")
+        finally:
+            # Duplicates and failures leave no object behind; a completed upload is kept
+            if upload is not None:
+                await upload.abort()
+
+    async def _process_text(self, file: UploadFile, file_record: FileProcessingRecord) -> str:
+        """
+        Extract, chunk and index the text of the file, reporting each stage.
+        
+        Args:
+            file: The file being processed
+            file_record: The file processing record
+            
+        Returns:
+            The extracted text
+        """
+        # Extract text and update status to "extracted"
+        extracted_text = await self._extract_text(file, file_record)
+        await self._update_processing_status(file_record, "extracted")
+        
+        # Split the text into embedded chunks and update status to "chunked"
+        chunks = await self._chunk_text(extracted_text, file_record)
+        await self._update_processing_status(file_record, "chunked")
+        
+        # Build the search indexes and update status to "indexed"
+        await self._index_chunks(chunks, file_record, extracted_text)
+        await self._update_processing_status(file_record, "indexed")
+        return extracted_text
+
+    async def _run_concurrently(self, *stages) -> list:
+        """
+        Run independent stages concurrently.
+        
+        Args:
+            stages: The coroutines of the stages
+            
+        Returns:
+            The result of each stage, in order
+            
+        Raises:
+            Exception: The error of the first stage to fail, after the others are cancelled
+        """
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
     def _is_file_with_error(self, file_record: FileProcessingRecord) -> bool:
         return file_record and file_record.processing_status == "error"
@@ -282,21 +360,180 @@ class FileProcessorService:
                 logger.debug("Using async text extraction method")
                 result = await extract_method(file)
             else:
+                # Run in a worker thread so the upload keeps going while the text is extracted
                 logger.debug("Using sync text extraction method")
-                result = extract_method(file)
+                result = await run_in_threadpool(extract_method, file)
             logger.info(f"Text extraction completed for file: {file.filename} (content length: {len(result)} characters)")
             return result
         except Exception as e:
             logger.error(f"Error extracting text from file {file.filename}: {str(e)}", exc_info=True)
             raise TextExtractionError(f"Failed to extract text from file: {str(e)}")
 
-    async def _upload_file(self, file: UploadFile, file_record: FileProcessingRecord):
+    async def _chunk_text(self, extracted_text: str, file_record: FileProcessingRecord) -> List[DocumentChunk]:
+        """
+        Split the extracted text into chunks, embed them and store each chunk as its own item.
+        
+        The number of chunks is kept in the record metadata so the chunks can be
+        loaded later without reading the whole markdown content.
+        Embedding failures do not fail the processing; they are reported through
+        the embedding status and the chunks are stored without vectors.
+        
+        Args:
+            extracted_text: The extracted markdown text
+            file_record: The file processing record
+            
+        Returns:
+            The stored chunks
+            
+        Raises:
+            TextChunkingError: If text chunking fails
+        """
+        try:
+            logger.info(f"Starting text chunking for file: {file_record.file_name}")
+            chunks = self.text_chunking_service.chunk(file_record.pk, extracted_text)
+            await self._embed_chunks(chunks, file_record)
+            await self.chunk_repository.save_chunks(chunks)
+            file_record.metadata["chunk_count"] = len(chunks)
+            logger.info(f"Text chunking completed for file: {file_record.file_name} ({len(chunks)} chunks)")
+            return chunks
+        except Exception as e:
+            logger.error(f"Error chunking text from file {file_record.file_name}: {str(e)}", exc_info=True)
+            raise TextChunkingError(f"Failed to chunk text from file: {str(e)}")
+
+    async def _index_chunks(
+        self,
+        chunks: List[DocumentChunk],
+        file_record: FileProcessingRecord,
+        extracted_text: str
+    ) -> None:
+        """
+        Build the search indexes over the chunks and store them next to the record.
+        
+        Besides the BM25 index, the sentence and page boundaries of the text are
+        stored so answers can be mapped back to exact offsets, with a suffix array
+        and a trigram index of the text for exact phrase and typo-tolerant lookups.
+        The kinds of stored artifacts are listed in the record metadata. Indexes
+        are built and serialized in worker threads, which takes seconds for large
+        files, so the upload running concurrently keeps going.
+        
+        Args:
+            chunks: The chunks of the file, ordered by ordinal
+            file_record: The file processing record
+            extracted_text: The extracted markdown text
+            
+        Raises:
+            TextIndexingError: If building or storing an index fails
+        """
+        try:
+            logger.info(f"Building lexical index for file: {file_record.file_name}")
+            lexical_index, data = await run_in_threadpool(_build_index, LexicalIndex, [chunk.text for chunk in chunks])
+            await self.artifact_repository.save_artifact(file_record.pk, LEXICAL_INDEX_ARTIFACT, data)
+            self._add_artifact(file_record, LEXICAL_INDEX_ARTIFACT)
+            logger.info(
+                f"Lexical index stored for file: {file_record.file_name} "
+                f"({len(lexical_index.terms)} terms, {len(data)} bytes)"
+            )
+            
+            sentence_index, data = await run_in_threadpool(_build_index, SentenceIndex, extracted_text)
+            await self.artifact_repository.save_artifact(file_record.pk, SENTENCE_INDEX_ARTIFACT, data)
+            self._add_artifact(file_record, SENTENCE_INDEX_ARTIFACT)
+            logger.info(f"Sentence index stored for file: {file_record.file_name} ({len(sentence_index)} sentences)")
+            
+            suffix_array, data = await run_in_threadpool(_build_index, SuffixArray, extracted_text)
+            await self.artifact_repository.save_artifact(file_record.pk, SUFFIX_ARRAY_ARTIFACT, data)
+            self._add_artifact(file_record, SUFFIX_ARRAY_ARTIFACT)
+            logger.info(f"Suffix array stored for file: {file_record.file_name} ({len(data)} bytes)")
+            
+            trigram_index, data = await run_in_threadpool(_build_index, TrigramIndex, extracted_text)
+            await self.artifact_repository.save_artifact(file_record.pk, TRIGRAM_INDEX_ARTIFACT, data)
+            self._add_artifact(file_record, TRIGRAM_INDEX_ARTIFACT)
+            logger.info(
+                f"Trigram index stored for file: {file_record.file_name} "
+                f"({len(trigram_index.terms)} terms, {len(data)} bytes)"
+            )
+        except Exception as e:
+            logger.error(f"Error indexing file {file_record.file_name}: {str(e)}", exc_info=True)
+            raise TextIndexingError(f"Failed to index file: {str(e)}")
+
+    def _add_artifact(self, file_record: FileProcessingRecord, kind: str) -> None:
+        artifacts = file_record.metadata.setdefault("artifacts", [])
+        if kind not in artifacts:
+            artifacts.append(kind)
+
+    async def _embed_chunks(self, chunks: List[DocumentChunk], file_record: FileProcessingRecord) -> FileProcessingRecord:
+        """
+        Embed the chunks in batches and track the progress in the embedding status.
+        
+        The embedding status moves from "pending" to "embedding" and then to
+        "completed", or to "error" if the embedder fails.
+        
+        Args:
+            chunks: The chunks to embed
+            file_record: The file processing record
+            
+        Returns:
+            The updated FileProcessingRecord
+        """
+        file_record = await self._update_embedding_status(file_record, "embedding")
+        try:
+            logger.info(f"Starting embedding of {len(chunks)} chunks for file: {file_record.file_name}")
+            await self.embedding_service.embed_chunks_async(chunks)
+            file_record.metadata["embedding_model"] = self.embedding_service.embedder.model_name
+            file_record.metadata["embedding_dimension"] = self.embedding_service.embedder.dimension
+            logger.info(f"Embedding completed for file: {file_record.file_name}")
+            return await self._update_embedding_status(file_record, "completed")
+        except Exception as e:
+            logger.error(f"Error embedding chunks of file {file_record.file_name}: {str(e)}", exc_info=True)
+            for chunk in chunks:
+                chunk.embedding = None
+            return await self._update_embedding_status(file_record, "error")
+
+    async def _update_embedding_status(self, record: FileProcessingRecord, new_status: str) -> FileProcessingRecord:
+        """
+        Update the embedding status of a file record.
+        
+        Args:
+            record: The FileProcessingRecord to update
+            new_status: The new embedding status
+            
+        Returns:
+            The updated FileProcessingRecord
+        """
+        logger.info(f"Updating embedding status to '{new_status}' for file: {record.file_name}")
+        record.embedding_status = new_status
+        await self.repository.put_item(record)
+        return record
+
+    async def _start_upload(self, file: UploadFile) -> S3MultipartUpload:
         """
-        Upload the file.
+        Start the multipart upload fed while the file is read.
+        
+        Args:
+            file: The file to upload
+            
+        Returns:
+            The started upload
+            
+        Raises:
+            FileUploadError: If the upload cannot be started
+        """
+        try:
+            return await self.upload_service.start_upload(file)
+        except Exception as error:
+            logger.error(f"Error starting upload of file {file.filename}: {str(error)}", exc_info=True)
+            raise FileUploadError(f"Failed to upload file: {str(error)}")
+
+    async def _upload_file(self, file: UploadFile, file_record: FileProcessingRecord, upload: S3MultipartUpload):
+        """
+        Complete the upload of the file.
+        
+        The parts were sent while the file was read; a file uploaded by an
+        earlier attempt keeps its object and the new upload is discarded.
         
         Args:
             file: The file to upload
             file_record: The file processing record
+            upload: The multipart upload fed while reading the file
             
         Returns:
             The upload response
@@ -330,35 +567,20 @@ class FileProcessorService:
                     history={}
                 )
             
-            file.file.seek(0)  # Reset file pointer for upload
-            response = await self.upload_service.upload(file, file_record.pk)
+            response = await self.upload_service.complete_upload(file, file_record.pk, upload)
             logger.info(f"File uploaded successfully: {file.filename} (URL: {response.url})")
             return response
         except Exception as error:
             logger.error(f"Error uploading file {file.filename}: {str(error)}", exc_info=True)
             raise FileUploadError(f"Failed to upload file: {str(error)}")
 
-    def _calculate_file_identifier(self, file: UploadFile) -> str:
-        """
-        Calculate a unique identifier for the file using a sample of its content.
-        
-        This method reads a sample from the beginning of the file and creates a hash.
-        The sample size is defined by SAMPLE_SIZE_BYTES.
-        
-        Args:
-            file: The file to generate an identifier for
-            
-        Returns:
-            A string identifier based on the file's content sample
-        """
-        logger.info(f"Calculating file identifier for: {file.filename} (size: {file.size} bytes, type: {file.content_type})")
-        current_position = file.file.tell()
-        file.file.seek(0)
-        
-        try:
-            sample = file.file.read(SAMPLE_SIZE_BYTES)
-            file_id = hashlib.new(HASH_ALGORITHM, sample).hexdigest()
-            logger.info(f"Generated file ID: {file_id} for file: {file.filename}")
-            return file_id
-        finally:
-            file.file.seek(current_position) 
\ No newline at end of file
+
+def _build_index(index_class, source):
+    """
+    Build an index and serialize it, in one call to run in a worker thread.
+    
+    Returns:
+        Tuple of (index, serialized index)
+    """
+    index = index_class.build(source)
+    return index, index.to_bytes()
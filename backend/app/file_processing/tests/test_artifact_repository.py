@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.file_processing.artifact_repository import FileArtifactRepository, ARTIFACT_PART_SIZE_BYTES
+from app.file_processing.models import FileArtifactPart
+
+@pytest.fixture
+def repository():
+    """Create a FileArtifactRepository with a mocked S3 client"""
+    return FileArtifactRepository(s3_client=AsyncMock())
+
+@pytest.mark.asyncio
+@patch("app.infrastructure.dynamodb.repository.DynamoDBRepository.put_item")
+async def test_save_small_artifact_inline(mock_put_item, repository):
+    """Test that an artifact fitting in one item is stored in it"""
+    await repository.save_artifact("file123", "bm25", b"index")
+    
+    part = mock_put_item.call_args.args[0]
+    assert (part.pk, part.part_count, part.data, part.s3_key) == ("file123#bm25#000", 1, b"index", None)
+    repository.s3_client.put_object.assert_not_called()
+
+@pytest.mark.asyncio
+@patch("app.infrastructure.dynamodb.repository.DynamoDBRepository.put_item")
+async def test_save_large_artifact_in_s3(mock_put_item, repository):
+    """Test that an artifact larger than an item is stored in S3 with a pointer item"""
+    data = b"x" * (ARTIFACT_PART_SIZE_BYTES * 2 + 10)
+    
+    await repository.save_artifact("file123", "suffixes", data)
+    
+    repository.s3_client.put_object.assert_called_once_with("artifacts/file123/suffixes", data)
+    part = mock_put_item.call_args.args[0]
+    assert (part.pk, part.part_count, part.data, part.s3_key) == ("file123#suffixes#000", 1, b"", "artifacts/file123/suffixes")
+
+@pytest.mark.asyncio
+@patch("app.infrastructure.dynamodb.repository.DynamoDBRepository.get_item")
+async def test_get_artifact_from_s3(mock_get_item, repository):
+    """Test that an artifact stored in S3 is read from its object"""
+    mock_get_item.return_value = FileArtifactPart(
+        pk="file123#suffixes#000", file_id="file123", kind="suffixes", part=0, part_count=1, data=b"",
+        s3_key="artifacts/file123/suffixes"
+    )
+    repository.s3_client.get_object.return_value = b"suffix array"
+    
+    assert await repository.get_artifact("file123", "suffixes") == b"suffix array"
+    repository.s3_client.get_object.assert_called_once_with("artifacts/file123/suffixes")
+
+@pytest.mark.asyncio
+@patch("app.infrastructure.dynamodb.repository.DynamoDBRepository.batch_get")
+@patch("app.infrastructure.dynamodb.repository.DynamoDBRepository.get_item")
+async def test_get_artifact_joins_parts(mock_get_item, mock_batch_get, repository):
+    """Test that parts stored by earlier versions are joined in order"""
+    mock_get_item.return_value = FileArtifactPart(
+        pk="file123#bm25#000", file_id="file123", kind="bm25", part=0, part_count=3, data=b"ab"
+    )
+    mock_batch_get.return_value = [
+        FileArtifactPart(pk="file123#bm25#002", file_id="file123", kind="bm25", part=2, part_count=3, data=b"ef"),
+        FileArtifactPart(pk="file123#bm25#001", file_id="file123", kind="bm25", part=1, part_count=3, data=b"cd"),
+    ]
+    
+    data = await repository.get_artifact("file123", "bm25")
+    
+    assert data == b"abcdef"
+    mock_batch_get.assert_called_once_with(
+        [{"pk": "file123#bm25#001"}, {"pk": "file123#bm25#002"}], FileArtifactPart
+    )
+
+@pytest.mark.asyncio
+@patch("app.infrastructure.dynamodb.repository.DynamoDBRepository.get_item")
+async def test_get_missing_artifact(mock_get_item, repository):
+    """Test that a missing artifact returns None"""
+    mock_get_item.return_value = None
+    
+    assert await repository.get_artifact("file123", "bm25") is None
@@ -0,0 +1,23 @@
+import io
+from app.file_processing.file_identity import FileDigest, digest_file
+
+
+def test_digest_file_covers_the_full_content():
+    """Test that files sharing a long prefix get different identifiers"""
+    header = b"id,name,amount\n" * 4096
+    first = digest_file(io.BytesIO(header + b"1,a,10\n"), block_size=1000)
+    second = digest_file(io.BytesIO(header + b"1,a,11\n"), block_size=1000)
+
+    assert first.identifier != second.identifier
+    assert first.size == len(header) + 7
+
+
+def test_digest_file_does_not_depend_on_block_size():
+    """Test that the identifier is the same however the content is split into blocks"""
+    content = bytes(range(256)) * 100
+    digest = FileDigest()
+    for start in range(0, len(content), 7):
+        digest.update(content[start:start + 7])
+
+    assert digest.identifier == digest_file(io.BytesIO(content), block_size=4096).identifier
+    assert digest.identifier.endswith(f"-{len(content)}")
@@ -0,0 +1,35 @@
+import io
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import UploadFile
+from app.common.exceptions import FileUploadError
+from app.file_processing.file_identity import digest_file
+from app.file_processing.ingest import tee_upload
+
+
+@pytest.mark.asyncio
+async def test_tee_upload_feeds_every_block_to_the_digest_and_the_upload():
+    """Test that one read in blocks produces the identifier and the uploaded bytes"""
+    content = bytes(range(256)) * 40
+    file = UploadFile(io.BytesIO(content), filename="data.bin")
+    upload = AsyncMock()
+
+    digest = await tee_upload(file, upload, block_size=1000)
+
+    assert digest.identifier == digest_file(io.BytesIO(content)).identifier
+    blocks = [call.args[0] for call in upload.write.call_args_list]
+    assert max(len(block) for block in blocks) == 1000
+    assert b"".join(blocks) == content
+    assert file.file.tell() == 0
+
+
+@pytest.mark.asyncio
+async def test_tee_upload_reports_a_failed_part():
+    """Test that a failing part is reported as an upload error and the file is rewound"""
+    file = UploadFile(io.BytesIO(b"some content"), filename="data.txt")
+    upload = AsyncMock()
+    upload.write.side_effect = RuntimeError("S3 down")
+
+    with pytest.raises(FileUploadError):
+        await tee_upload(file, upload)
+    assert file.file.tell() == 0
@@ -0,0 +1,247 @@
+import asyncio
+import io
+import threading
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime
+from app.file_processing.service import FileProcessorService
+from app.file_processing.file_identity import digest_file
+from app.file_processing.models import FileProcessingRecord
+from app.common.exceptions import FileProcessingError
+from app.text_chunking.service import TextChunkingService
+from app.text_chunking.strategies.markdown import MarkdownChunker
+from app.embedding.service import EmbeddingService
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
+from app.retrieval.lexical_index import LexicalIndex
+from app.retrieval.sentence_index import SentenceIndex
+from app.retrieval.suffix_array import SuffixArray
+from app.retrieval.trigram_index import TrigramIndex
+
+@pytest.fixture
+def mock_file_record():
+    """Create a record that has just been received"""
+    return FileProcessingRecord(
+        pk="file123",
+        file_name="test.pdf",
+        file_url="",
+        file_size=1024,
+        file_type="application/pdf",
+        markdown_content="",
+        processing_status="extracted",
+        embedding_status="pending",
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+        metadata={}
+    )
+
+@pytest.fixture
+def processor_service():
+    """Create a FileProcessorService with mocked storage"""
+    service = FileProcessorService(
+        text_extraction_service=MagicMock(),
+        upload_service=AsyncMock(),
+        text_chunking_service=TextChunkingService(MarkdownChunker(chunk_size=50, chunk_overlap=0)),
+        embedding_service=EmbeddingService(HashingEmbedder(dimension=16))
+    )
+    service.repository = AsyncMock()
+    service.chunk_repository = AsyncMock()
+    service.artifact_repository = AsyncMock()
+    return service
+
+@pytest.mark.asyncio
+async def test_chunk_text_embeds_and_stores_chunks(processor_service, mock_file_record):
+    """Test that chunks are embedded, stored and counted in the record metadata"""
+    embedding_statuses = []
+    processor_service.repository.put_item.side_effect = lambda record: embedding_statuses.append(record.embedding_status)
+    
+    chunks = await processor_service._chunk_text("# One\n\nFirst part.\n\n# Two\n\nSecond part.", mock_file_record)
+    
+    assert len(chunks) == 2
+    assert all(chunk.embedding is not None for chunk in chunks)
+    processor_service.chunk_repository.save_chunks.assert_called_once_with(chunks)
+    assert embedding_statuses == ["embedding", "completed"]
+    assert mock_file_record.metadata["chunk_count"] == 2
+    assert mock_file_record.metadata["embedding_model"] == "hashing-16"
+    assert mock_file_record.metadata["embedding_dimension"] == 16
+
+@pytest.mark.asyncio
+async def test_chunk_text_embeds_off_the_event_loop(processor_service, mock_file_record):
+    """Test that the chunks are embedded in a worker thread, not on the event loop"""
+    embedder = processor_service.embedding_service.embedder
+    threads = []
+    embed = embedder.embed
+    processor_service.embedding_service.embedder = MagicMock(wraps=embedder, model_name="hashing-16", dimension=16)
+    processor_service.embedding_service.embedder.embed.side_effect = (
+        lambda texts: threads.append(threading.current_thread()) or embed(texts)
+    )
+    
+    await processor_service._chunk_text("Some text", mock_file_record)
+    
+    assert threads and threading.main_thread() not in threads
+
+@pytest.mark.asyncio
+async def test_chunk_text_embedding_error(processor_service, mock_file_record):
+    """Test that an embedding failure is reported without failing the chunking"""
+    processor_service.embedding_service.embedder = MagicMock()
+    processor_service.embedding_service.embedder.embed.side_effect = Exception("Embedding API down")
+    
+    chunks = await processor_service._chunk_text("Some text", mock_file_record)
+    
+    assert mock_file_record.embedding_status == "error"
+    assert all(chunk.embedding is None for chunk in chunks)
+    processor_service.chunk_repository.save_chunks.assert_called_once_with(chunks)
+
+@pytest.mark.asyncio
+async def test_index_chunks_stores_lexical_index(processor_service, mock_file_record):
+    """Test that the BM25 index is stored next to the record and listed in its metadata"""
+    text = "# One\n\nInvoice 4411.\n\n# Two\n\nOther text."
+    chunks = processor_service.text_chunking_service.chunk("file123", text)
+    
+    await processor_service._index_chunks(chunks, mock_file_record, text)
+    
+    file_id, kind, data = processor_service.artifact_repository.save_artifact.call_args_list[0].args
+    assert (file_id, kind) == ("file123", "bm25")
+    assert list(LexicalIndex.from_bytes(data).search("4411", 1)[0]) == [0]
+    assert mock_file_record.metadata["artifacts"] == ["bm25", "sentences", "suffixes", "trigrams"]
+
+@pytest.mark.asyncio
+async def test_index_chunks_stores_sentence_index(processor_service, mock_file_record):
+    """Test that the sentence boundaries of the text are stored next to the record"""
+    text = "# One\n\nFirst sentence. Second sentence.\n\n# Two\n\nThird sentence."
+    chunks = processor_service.text_chunking_service.chunk("file123", text)
+    
+    await processor_service._index_chunks(chunks, mock_file_record, text)
+    
+    file_id, kind, data = processor_service.artifact_repository.save_artifact.call_args_list[1].args
+    assert (file_id, kind) == ("file123", "sentences")
+    index = SentenceIndex.from_bytes(data)
+    assert [text[slice(*index.sentence_span(i))].strip() for i in range(len(index))] == [
+        "# One", "First sentence.", "Second sentence.", "# Two", "Third sentence."
+    ]
+
+@pytest.mark.asyncio
+async def test_index_chunks_stores_suffix_array(processor_service, mock_file_record):
+    """Test that a suffix array of the text is stored next to the record"""
+    text = "# Parts\n\nPart AX-200 ships with part AX-201."
+    chunks = processor_service.text_chunking_service.chunk("file123", text)
+    
+    await processor_service._index_chunks(chunks, mock_file_record, text)
+    
+    file_id, kind, data = processor_service.artifact_repository.save_artifact.call_args_list[2].args
+    assert (file_id, kind) == ("file123", "suffixes")
+    assert list(SuffixArray.from_bytes(data, text).find("AX-20")) == [14, 37]
+
+@pytest.mark.asyncio
+async def test_index_chunks_stores_trigram_index(processor_service, mock_file_record):
+    """Test that a trigram index of the text is stored next to the record"""
+    text = "# Contacts\n\nJonathan Smith handles billing."
+    chunks = processor_service.text_chunking_service.chunk("file123", text)
+    
+    await processor_service._index_chunks(chunks, mock_file_record, text)
+    
+    file_id, kind, data = processor_service.artifact_repository.save_artifact.call_args_list[3].args
+    assert (file_id, kind) == ("file123", "trigrams")
+    match = TrigramIndex.from_bytes(data).search("Jonathon Smith")[0]
+    assert text[match.start_offset:match.end_offset] == "Jonathan Smith"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_class", [LexicalIndex, SentenceIndex, SuffixArray, TrigramIndex])
+async def test_index_chunks_builds_off_the_event_loop(processor_service, mock_file_record, monkeypatch, index_class):
+    """Test that the indexes are built in a worker thread, not on the event loop"""
+    threads = []
+    build = index_class.build
+    monkeypatch.setattr(
+        index_class, "build", classmethod(lambda cls, source: threads.append(threading.current_thread()) or build(source))
+    )
+    text = "# One\n\nFirst sentence.\n\n# Two\n\nSecond sentence."
+    
+    await processor_service._index_chunks(processor_service.text_chunking_service.chunk("file123", text), mock_file_record, text)
+    
+    assert threads and threading.main_thread() not in threads
+
+@pytest.fixture
+def upload_file():
+    """Create an upload of a small CSV"""
+    return UploadFile(io.BytesIO(b"id,name\n1,Alice\n"), size=17, filename="people.csv", headers=Headers({"content-type": "text/csv"}))
+
+@pytest.mark.asyncio
+async def test_process_and_upload_reads_the_file_once(processor_service, upload_file):
+    """Test that the upload is fed while the file is read and completed under the file ID"""
+    upload = AsyncMock()
+    processor_service.upload_service.start_upload.return_value = upload
+    processor_service.upload_service.complete_upload.side_effect = lambda file, pk, upload: MagicMock(url=f"https://bucket/{pk}")
+    processor_service.repository.get_item.return_value = None
+    processor_service.text_extraction_service.extract.return_value = "| id | name |\n| --- | --- |\n| 1 | Alice |"
+    
+    response = await processor_service.process_and_upload(upload_file)
+    
+    upload.write.assert_called_once_with(b"id,name\n1,Alice\n")
+    processor_service.upload_service.complete_upload.assert_called_once_with(upload_file, response.pk, upload)
+    assert response.pk == digest_file(io.BytesIO(b"id,name\n1,Alice\n")).identifier
+    assert response.url == f"https://bucket/{response.pk}"
+    assert response.processing_status == "completed"
+
+@pytest.mark.asyncio
+async def test_process_and_upload_discards_the_upload_of_a_duplicate(processor_service, upload_file, mock_file_record):
+    """Test that a file already processed is answered from its record and its new upload aborted"""
+    upload = AsyncMock()
+    processor_service.upload_service.start_upload.return_value = upload
+    mock_file_record.processing_status = "completed"
+    processor_service.repository.get_item.return_value = mock_file_record
+    
+    response = await processor_service.process_and_upload(upload_file)
+    
+    assert response.pk == "file123"
+    upload.abort.assert_called_once()
+    processor_service.upload_service.complete_upload.assert_not_called()
+    processor_service.text_extraction_service.extract.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_process_and_upload_overlaps_extraction_and_upload(processor_service, upload_file):
+    """Test that the upload completes while the text is extracted, and "stored" follows "indexed\""""
+    extraction_started, upload_completed = asyncio.Event(), threading.Event()
+    loop = asyncio.get_running_loop()
+    
+    def extract(file):
+        loop.call_soon_threadsafe(extraction_started.set)
+        # Only returns if the upload completes while the extraction is running
+        assert upload_completed.wait(timeout=5)
+        return "| id | name |"
+    
+    async def complete_upload(file, pk, upload):
+        await extraction_started.wait()
+        upload_completed.set()
+        return MagicMock(url=f"https://bucket/{pk}")
+    
+    statuses = []
+    processor_service.repository.put_item.side_effect = lambda record: statuses.append(record.processing_status)
+    processor_service.repository.get_item.return_value = None
+    processor_service.text_extraction_service.extract.side_effect = extract
+    processor_service.upload_service.complete_upload.side_effect = complete_upload
+    
+    response = await processor_service.process_and_upload(upload_file)
+    
+    assert response.processing_status == "completed"
+    assert [status for status in statuses if status != "received"][-5:] == ["extracted", "chunked", "indexed", "stored", "completed"]
+
+@pytest.mark.asyncio
+async def test_process_and_upload_cancels_extraction_when_the_upload_fails(processor_service, upload_file):
+    """Test that a failed upload cancels the text stages and leaves the record in error"""
+    async def extract(file):
+        await asyncio.sleep(5)
+    
+    upload = AsyncMock()
+    processor_service.upload_service.start_upload.return_value = upload
+    processor_service.upload_service.complete_upload.side_effect = RuntimeError("S3 down")
+    processor_service.repository.get_item.return_value = None
+    processor_service.text_extraction_service.extract = extract
+    
+    with pytest.raises(FileProcessingError):
+        await asyncio.wait_for(processor_service.process_and_upload(upload_file), timeout=2)
+    
+    record = processor_service.repository.put_item.call_args.args[0]
+    assert record.processing_status == "error"
+    assert "Failed to upload file" in record.error_message
+    upload.abort.assert_called_once()
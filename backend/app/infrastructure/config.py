@@ -4,5 +4,57 @@ class Settings:
     AWS_REGION = os.getenv("AWS_REGION")
     S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+    INGEST_BLOCK_BYTES = int(os.getenv("INGEST_BLOCK_BYTES", str(1024 * 1024)))
+    S3_PART_BYTES = int(os.getenv("S3_PART_BYTES", str(8 * 1024 * 1024)))
+    S3_MAX_CONCURRENT_PARTS = int(os.getenv("S3_MAX_CONCURRENT_PARTS", "4"))
+    # Limits of the Lambda function, which the extraction limits must stay under to ever fire
+    LAMBDA_TIMEOUT_SECONDS = float(os.getenv("LAMBDA_TIMEOUT_SECONDS", "60"))
+    LAMBDA_MEMORY_MB = int(os.getenv("LAMBDA_MEMORY_MB", os.getenv("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "512")))
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(max(1, min(os.cpu_count() or 1, LAMBDA_MEMORY_MB // 1024)))))
+    EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", str(LAMBDA_TIMEOUT_SECONDS / 2)))
+    EXTRACTION_MEMORY_LIMIT_MB = int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", str(LAMBDA_MEMORY_MB * 3 // 4 // EXTRACTION_WORKERS)))
+    CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "2000"))
+    CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+    EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "hashing")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "8"))
+    RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "32"))
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "4000"))
+    HYBRID_VECTOR_WEIGHT = float(os.getenv("HYBRID_VECTOR_WEIGHT", "1.0"))
+    HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "1.0"))
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+    FILE_EXPLORER_STRATEGY = os.getenv("FILE_EXPLORER_STRATEGY", "retrieval")
+    MAP_REDUCE_WINDOW_TOKENS = int(os.getenv("MAP_REDUCE_WINDOW_TOKENS", "24000"))
+    MAP_REDUCE_MAX_PARALLEL = int(os.getenv("MAP_REDUCE_MAX_PARALLEL", "4"))
+    MAP_REDUCE_CACHE_SIZE = int(os.getenv("MAP_REDUCE_CACHE_SIZE", "4096"))
+    EXPLORER_TIMEOUT_SECONDS = float(os.getenv("EXPLORER_TIMEOUT_SECONDS", "60"))
+    EXPLORER_MAX_WORKERS = int(os.getenv("EXPLORER_MAX_WORKERS", "8"))
+    CHAT_SOURCES_LIMIT = int(os.getenv("CHAT_SOURCES_LIMIT", "3"))
+    CHAT_BATCH_MAX_QUESTIONS = int(os.getenv("CHAT_BATCH_MAX_QUESTIONS", "50"))
+    CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+    CHAT_MULTI_MAX_FILES = int(os.getenv("CHAT_MULTI_MAX_FILES", "20"))
+    CHAT_GROUP_WINDOW_MS = float(os.getenv("CHAT_GROUP_WINDOW_MS", "0"))
+    CHAT_GROUP_MAX_QUESTIONS = int(os.getenv("CHAT_GROUP_MAX_QUESTIONS", "8"))
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+    ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+    ANSWER_CACHE_PERSIST = os.getenv("ANSWER_CACHE_PERSIST", "true").lower() == "true"
+    # Only a semantic embedder tells paraphrases apart from questions sharing their words
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", str(EMBEDDING_PROVIDER == "gemini")).lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_MAX_AGE_SECONDS = float(os.getenv("SEMANTIC_CACHE_MAX_AGE_SECONDS", "3600"))
+    SEMANTIC_CACHE_PER_FILE = int(os.getenv("SEMANTIC_CACHE_PER_FILE", "64"))
+    SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", "30"))
+    SEARCH_REFRESH_OVERLAP_SECONDS = float(os.getenv("SEARCH_REFRESH_OVERLAP_SECONDS", "60"))
+    SEARCH_REFRESH_MAX_FILES = int(os.getenv("SEARCH_REFRESH_MAX_FILES", "64"))
+    SEARCH_REFRESH_CONCURRENCY = int(os.getenv("SEARCH_REFRESH_CONCURRENCY", "8"))
+    FILE_STATUS_INDEX = os.getenv("FILE_STATUS_INDEX", "status-updated-index")
+    SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "200"))
+    SEARCH_IVF_NPROBE = int(os.getenv("SEARCH_IVF_NPROBE", "8"))
+    FUZZY_MAX_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", "2"))
+    VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "")
+    VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float32")
+    VECTOR_STORE_MAX_SEGMENTS = int(os.getenv("VECTOR_STORE_MAX_SEGMENTS", "8"))
+    VECTOR_STORE_RESCORE = os.getenv("VECTOR_STORE_RESCORE", "true").lower() == "true"
+    VECTOR_STORE_RESCORE_FACTOR = int(os.getenv("VECTOR_STORE_RESCORE_FACTOR", "8"))
 
 settings = Settings()
@@ -1,6 +1,7 @@
 """
 DynamoDB repository with generic CRUD operations.
 """
+import asyncio
 from typing import Any, Dict, List, Optional, Union, Type, TypeVar
 from pydantic import BaseModel
 from .client import table, dynamodb_client
@@ -8,6 +9,10 @@ from datetime import datetime
 
 T = TypeVar('T', bound=BaseModel)
 
+# Retries of the keys and items a batch call leaves unprocessed (when throttled), with exponential backoff
+BATCH_MAX_RETRIES = 8
+BATCH_BACKOFF_SECONDS = 0.05
+
 class DynamoDBRepository:
     @staticmethod
     def _convert_datetime_to_iso(item_dict: Dict[str, Any]) -> Dict[str, Any]:
@@ -129,10 +134,14 @@ class DynamoDBRepository:
         expression_attribute_names: Optional[Dict[str, str]] = None,
         filter_expression: Optional[str] = None,
         limit: Optional[int] = None,
-        model_class: Optional[Type[T]] = None
+        model_class: Optional[Type[T]] = None,
+        index_name: Optional[str] = None,
+        projection_expression: Optional[str] = None
     ) -> List[Union[Dict[str, Any], T]]:
         """
-        Query items from the DynamoDB table.
+        Query items from the DynamoDB table or one of its secondary indexes.
+        
+        Without a limit, every page of the result is read.
         
         Args:
             key_condition_expression: The key condition expression
@@ -141,6 +150,8 @@ class DynamoDBRepository:
             filter_expression: Optional filter expression
             limit: Optional limit for the number of items
             model_class: Optional Pydantic model class to convert items to
+            index_name: Optional name of the secondary index to query
+            projection_expression: Optional attributes to return
             
         Returns:
             List of items matching the query, as Pydantic models if model_class is provided
@@ -159,9 +170,19 @@ class DynamoDBRepository:
         if limit:
             params['Limit'] = limit
             
+        if index_name:
+            params['IndexName'] = index_name
+            
+        if projection_expression:
+            params['ProjectionExpression'] = projection_expression
+            
         response = table.query(**params)
         items = response.get('Items', [])
         
+        while not limit and 'LastEvaluatedKey' in response:
+            response = table.query(ExclusiveStartKey=response['LastEvaluatedKey'], **params)
+            items.extend(response.get('Items', []))
+        
         if model_class:
             return [model_class.model_validate(item) for item in items]
         return items
@@ -172,17 +193,21 @@ class DynamoDBRepository:
         expression_attribute_values: Optional[Dict[str, Any]] = None,
         expression_attribute_names: Optional[Dict[str, str]] = None,
         limit: Optional[int] = None,
-        model_class: Optional[Type[T]] = None
+        model_class: Optional[Type[T]] = None,
+        projection_expression: Optional[str] = None
     ) -> List[Union[Dict[str, Any], T]]:
         """
         Scan items from the DynamoDB table.
         
+        Without a limit, every page of the table is read.
+        
         Args:
             filter_expression: Optional filter expression
             expression_attribute_values: Values for the scan expression
             expression_attribute_names: Names for the scan expression
             limit: Optional limit for the number of items
             model_class: Optional Pydantic model class to convert items to
+            projection_expression: Optional attributes to return
             
         Returns:
             List of items matching the scan, as Pydantic models if model_class is provided
@@ -201,9 +226,16 @@ class DynamoDBRepository:
         if limit:
             params['Limit'] = limit
             
+        if projection_expression:
+            params['ProjectionExpression'] = projection_expression
+            
         response = table.scan(**params)
         items = response.get('Items', [])
         
+        while not limit and 'LastEvaluatedKey' in response:
+            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **params)
+            items.extend(response.get('Items', []))
+        
         if model_class:
             return [model_class.model_validate(item) for item in items]
         return items
@@ -213,11 +245,17 @@ class DynamoDBRepository:
         """
         Write multiple items to the DynamoDB table in a batch operation.
         
+        Items DynamoDB leaves unprocessed are written again with exponential backoff,
+        so every item is stored when the call returns.
+        
         Args:
             items: List of Pydantic model instances to write
             
         Returns:
-            The response from DynamoDB
+            The responses from DynamoDB
+            
+        Raises:
+            RuntimeError: If some items are still unprocessed after BATCH_MAX_RETRIES retries
         """
         # DynamoDB batch_write_item has a limit of 25 items per batch
         batch_size = 25
@@ -225,14 +263,19 @@ class DynamoDBRepository:
         
         for i in range(0, len(items), batch_size):
             batch = items[i:i+batch_size]
-            request_items = [{'PutRequest': {'Item': item.model_dump()}} for item in batch]
+            request = {table.name: [{'PutRequest': {'Item': item.model_dump()}} for item in batch]}
             
-            response = dynamodb_client.dynamodb.meta.client.batch_write_item(
-                RequestItems={
-                    table.name: request_items
-                }
-            )
-            results.append(response)
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                if attempt:
+                    await asyncio.sleep(BATCH_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                response = dynamodb_client.dynamodb.meta.client.batch_write_item(RequestItems=request)
+                results.append(response)
+                request = response.get('UnprocessedItems') or {}
+                if not request:
+                    break
+            if request:
+                unprocessed = len(request[table.name])
+                raise RuntimeError(f"{unprocessed} items still unprocessed after {BATCH_MAX_RETRIES} retries")
             
         return results
         
@@ -244,30 +287,37 @@ class DynamoDBRepository:
         """
         Get multiple items from the DynamoDB table in a batch operation.
         
+        Keys DynamoDB leaves unprocessed are requested again with exponential backoff,
+        so a missing item means it does not exist.
+        
         Args:
             keys: List of primary keys to retrieve
             model_class: Optional Pydantic model class to convert items to
             
         Returns:
             List of items retrieved, as Pydantic models if model_class is provided
+            
+        Raises:
+            RuntimeError: If some keys are still unprocessed after BATCH_MAX_RETRIES retries
         """
         # DynamoDB batch_get_item has a limit of 100 items per batch
         batch_size = 100
         all_items = []
         
         for i in range(0, len(keys), batch_size):
-            batch = keys[i:i+batch_size]
-            
-            response = dynamodb_client.dynamodb.meta.client.batch_get_item(
-                RequestItems={
-                    table.name: {
-                        'Keys': batch
-                    }
-                }
-            )
+            request = {table.name: {'Keys': keys[i:i+batch_size]}}
             
-            items = response.get('Responses', {}).get(table.name, [])
-            all_items.extend(items)
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                if attempt:
+                    await asyncio.sleep(BATCH_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                response = dynamodb_client.dynamodb.meta.client.batch_get_item(RequestItems=request)
+                all_items.extend(response.get('Responses', {}).get(table.name, []))
+                request = response.get('UnprocessedKeys') or {}
+                if not request:
+                    break
+            if request:
+                unprocessed = len(request[table.name]['Keys'])
+                raise RuntimeError(f"{unprocessed} keys still unprocessed after {BATCH_MAX_RETRIES} retries")
             
         if model_class:
             return [model_class.model_validate(item) for item in all_items]
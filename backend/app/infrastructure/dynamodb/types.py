@@ -0,0 +1,18 @@
+"""
+Helpers for DynamoDB attribute types.
+"""
+from typing import Any
+from boto3.dynamodb.types import Binary
+
+
+def unwrap_binary(value: Any) -> Any:
+    """
+    Unwrap the Binary type returned by DynamoDB for binary attributes.
+    
+    Args:
+        value: The raw attribute value
+        
+    Returns:
+        The attribute value as bytes if it was a Binary, otherwise unchanged
+    """
+    return value.value if isinstance(value, Binary) else value
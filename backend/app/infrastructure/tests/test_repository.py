@@ -0,0 +1,68 @@
+import pytest
+from pydantic import BaseModel
+from unittest.mock import MagicMock, patch
+from app.infrastructure.dynamodb.repository import DynamoDBRepository, BATCH_MAX_RETRIES, table
+
+class Item(BaseModel):
+    pk: str
+
+@pytest.fixture
+def client():
+    """Patch the DynamoDB client"""
+    client = MagicMock()
+    with patch("app.infrastructure.dynamodb.repository.dynamodb_client") as dynamodb_client, \
+         patch("app.infrastructure.dynamodb.repository.BATCH_BACKOFF_SECONDS", 0):
+        dynamodb_client.dynamodb.meta.client = client
+        yield client
+
+@pytest.fixture
+def batch_get_item(client):
+    return client.batch_get_item
+
+@pytest.fixture
+def batch_write_item(client):
+    return client.batch_write_item
+
+@pytest.mark.asyncio
+async def test_batch_get_retries_unprocessed_keys(batch_get_item):
+    """Test that keys left unprocessed by a throttled call are requested again"""
+    batch_get_item.side_effect = [
+        {"Responses": {table.name: [{"pk": "a"}]}, "UnprocessedKeys": {table.name: {"Keys": [{"pk": "b"}]}}},
+        {"Responses": {table.name: [{"pk": "b"}]}, "UnprocessedKeys": {}},
+    ]
+    
+    items = await DynamoDBRepository.batch_get([{"pk": "a"}, {"pk": "b"}])
+    
+    assert items == [{"pk": "a"}, {"pk": "b"}]
+    assert batch_get_item.call_args.kwargs["RequestItems"] == {table.name: {"Keys": [{"pk": "b"}]}}
+
+@pytest.mark.asyncio
+async def test_batch_get_fails_when_keys_stay_unprocessed(batch_get_item):
+    """Test that keys still unprocessed after the retries raise instead of being reported missing"""
+    batch_get_item.return_value = {"Responses": {}, "UnprocessedKeys": {table.name: {"Keys": [{"pk": "a"}]}}}
+    
+    with pytest.raises(RuntimeError, match="1 keys still unprocessed"):
+        await DynamoDBRepository.batch_get([{"pk": "a"}])
+    
+    assert batch_get_item.call_count == BATCH_MAX_RETRIES + 1
+
+@pytest.mark.asyncio
+async def test_batch_write_retries_unprocessed_items(batch_write_item):
+    """Test that items left unprocessed by a throttled call are written again"""
+    unprocessed = {table.name: [{"PutRequest": {"Item": {"pk": "b"}}}]}
+    batch_write_item.side_effect = [{"UnprocessedItems": unprocessed}, {"UnprocessedItems": {}}]
+    
+    await DynamoDBRepository.batch_write([Item(pk="a"), Item(pk="b")])
+    
+    assert batch_write_item.call_count == 2
+    assert batch_write_item.call_args.kwargs["RequestItems"] == unprocessed
+
+@pytest.mark.asyncio
+async def test_batch_write_fails_when_items_stay_unprocessed(batch_write_item):
+    """Test that items still unprocessed after the retries raise instead of being dropped"""
+    batch_write_item.return_value = {"UnprocessedItems": {table.name: [{"PutRequest": {"Item": {"pk": "a"}}}]}}
+    
+    with pytest.raises(RuntimeError, match="1 items still unprocessed"):
+        await DynamoDBRepository.batch_write([Item(pk="a")])
+    
+    assert batch_write_item.call_count == BATCH_MAX_RETRIES + 1
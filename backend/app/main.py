@@ -8,6 +8,7 @@ from app.uploads.router import router as uploads_router
 from app.health.router import router as health_router
 from app.file_processing.router import router as file_processing_router
 from app.chat.router import ChatRouter
+from app.search.router import SearchRouter
 
 # Configure logging
 logging.basicConfig(
@@ -40,5 +41,9 @@ app.include_router(file_processing_router, prefix="/api")
 chat_router = ChatRouter()
 app.include_router(chat_router.router, prefix="/api")
 
+# Register search router
+search_router = SearchRouter()
+app.include_router(search_router.router, prefix="/api")
+
 # AWS Lambda handler
 handler = Mangum(app, lifespan="off") 
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+BM25 inverted index over a file's chunks.
+"""
+import io
+import math
+import re
+from typing import Dict, List, Set, Tuple
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Kind under which the serialized index is stored next to the file record
+LEXICAL_INDEX_ARTIFACT = "bm25"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text: The text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def make_snippet(text: str, terms: Set[str], max_chars: int) -> str:
+    """
+    Cut a single-line snippet of the text around the first matching term.
+
+    Args:
+        text: The text to cut the snippet from
+        terms: Lowercase query terms
+        max_chars: Maximum number of characters taken from the text
+
+    Returns:
+        The snippet, with an ellipsis on each side that was cut
+    """
+    first_match = next(
+        (match.start() for match in TOKEN_PATTERN.finditer(text) if match.group().lower() in terms),
+        0
+    )
+    start = max(0, first_match - max_chars // 3)
+    snippet = " ".join(text[start:start + max_chars].split())
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if start + max_chars < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index stored as flat arrays.
+
+    Postings are kept in compressed sparse row form: the postings of term t are
+    postings_docs[term_offsets[t]:term_offsets[t + 1]] with the matching term
+    frequencies in postings_tf. Documents are identified by their position in the
+    list the index was built from (for chunks, the chunk ordinal).
+    """
+    def __init__(
+        self,
+        terms: List[str],
+        term_offsets: np.ndarray,
+        postings_docs: np.ndarray,
+        postings_tf: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        """
+        Initialize the index from its arrays.
+
+        Args:
+            terms: Vocabulary, indexed by term id
+            term_offsets: Start of each term's postings, with a final end offset
+            postings_docs: Document id of each posting
+            postings_tf: Term frequency of each posting
+            doc_lengths: Number of tokens of each document
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.terms = terms
+        self.term_ids: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+        self.term_offsets = term_offsets
+        self.postings_docs = postings_docs
+        self.postings_tf = postings_tf
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.average_length = float(doc_lengths.mean()) if len(doc_lengths) and doc_lengths.any() else 1.0
+
+    @classmethod
+    def build(cls, documents: List[str], k1: float = 1.2, b: float = 0.75) -> "LexicalIndex":
+        """
+        Build an index over the documents.
+
+        Args:
+            documents: The document texts
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+
+        Returns:
+            A LexicalIndex
+        """
+        vocabulary: Dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        doc_lengths = np.zeros(len(documents), dtype=np.int32)
+
+        for doc_id, text in enumerate(documents):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            term_ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+            doc_ids.extend([doc_id] * len(tokens))
+
+        # Count each (term, document) pair; np.unique sorts by term, then document
+        doc_count = max(len(documents), 1)
+        pairs = np.asarray(term_ids, dtype=np.int64) * doc_count + np.asarray(doc_ids, dtype=np.int64)
+        unique_pairs, frequencies = np.unique(pairs, return_counts=True)
+        posting_terms = unique_pairs // doc_count
+
+        term_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(posting_terms, minlength=len(vocabulary)), out=term_offsets[1:])
+
+        return cls(
+            terms=list(vocabulary),
+            term_offsets=term_offsets,
+            postings_docs=(unique_pairs % doc_count).astype(np.int32),
+            postings_tf=np.minimum(frequencies, np.iinfo(np.uint16).max).astype(np.uint16),
+            doc_lengths=doc_lengths,
+            k1=k1,
+            b=b
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def search(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rank the documents against the query with BM25.
+
+        Args:
+            query: The query text
+            top_k: Maximum number of results
+
+        Returns:
+            Tuple of (document ids, scores), best first; documents sharing no
+            term with the query are not returned
+        """
+        doc_count = len(self.doc_lengths)
+        scores = np.zeros(doc_count, dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / self.average_length)
+
+        for term in set(tokenize(query)):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            docs = self.postings_docs[start:end]
+            tf = self.postings_tf[start:end].astype(np.float32)
+            document_frequency = end - start
+            idf = math.log(1 + (doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + length_norm[docs])
+
+        matched = np.flatnonzero(scores)
+        k = min(top_k, len(matched))
+        if k <= 0:
+            return matched[:0], scores[:0]
+        if k < len(matched):
+            matched = matched[np.argpartition(scores[matched], -k)[-k:]]
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        return order, scores[order]
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the index into a compact compressed form.
+
+        Returns:
+            The serialized index
+        """
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            terms=np.frombuffer("\n".join(self.terms).encode("utf-8"), dtype=np.uint8),
+            term_offsets=self.term_offsets,
+            postings_docs=self.postings_docs,
+            postings_tf=self.postings_tf,
+            doc_lengths=self.doc_lengths,
+            parameters=np.array([self.k1, self.b], dtype=np.float64)
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LexicalIndex":
+        """
+        Deserialize an index produced by to_bytes.
+
+        Args:
+            data: The serialized index
+
+        Returns:
+            A LexicalIndex
+        """
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            terms = arrays["terms"].tobytes().decode("utf-8")
+            k1, b = arrays["parameters"]
+            return cls(
+                terms=terms.split("\n") if terms else [],
+                term_offsets=arrays["term_offsets"],
+                postings_docs=arrays["postings_docs"],
+                postings_tf=arrays["postings_tf"],
+                doc_lengths=arrays["doc_lengths"],
+                k1=float(k1),
+                b=float(b)
+            )
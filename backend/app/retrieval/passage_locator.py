@@ -0,0 +1,178 @@
+import logging
+from typing import Dict, List, Optional
+from app.common.cache import LRUCache
+from app.common.schemas import FileDTO, Passage, Source
+from app.file_processing.artifact_repository import FileArtifactRepository
+from app.retrieval.lexical_index import tokenize
+from app.retrieval.sentence_index import SentenceIndex, SENTENCE_INDEX_ARTIFACT
+from app.infrastructure.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Weight of a query term and of an answer term found in a sentence
+QUERY_TERM_WEIGHT = 2.0
+ANSWER_TERM_WEIGHT = 1.0
+
+# Shorter tokens ("a", "of", "is") match almost every sentence
+MIN_TERM_LENGTH = 3
+
+
+class PassageLocator:
+    """
+    Maps retrieved passages (and the answer built from them) back to exact spans
+    of the file's markdown content.
+
+    Inside each passage, the window of consecutive sentences sharing the most
+    terms with the query and the answer is picked. Sentence and page boundaries
+    come from the offset arrays built at ingest time, so locating a passage is a
+    couple of binary searches plus a scan of the passage's own sentences.
+    """
+
+    def __init__(
+        self,
+        artifact_repository: Optional[FileArtifactRepository] = None,
+        cache_size: Optional[int] = None,
+        max_sentences: int = 2
+    ):
+        """
+        Initializes the passage locator.
+
+        Args:
+            artifact_repository: Repository used to load the sentence index
+            cache_size: Number of sentence indexes kept in memory (defaults to settings.RETRIEVAL_CACHE_SIZE)
+            max_sentences: Maximum number of consecutive sentences in a source
+        """
+        self.artifact_repository = artifact_repository or FileArtifactRepository()
+        self.cache = LRUCache(cache_size or settings.RETRIEVAL_CACHE_SIZE)
+        self.max_sentences = max_sentences
+
+    async def locate(
+        self,
+        file_dto: FileDTO,
+        passages: List[Passage],
+        query: str,
+        answer: str = "",
+        limit: Optional[int] = None
+    ) -> List[Source]:
+        """
+        Locates the sources of an answer.
+
+        Locating is best effort: failures are logged and produce no sources.
+
+        Args:
+            file_dto: The file the passages come from
+            passages: The retrieved passages, best first
+            query: The search query
+            answer: The answer built from the passages
+            limit: Maximum number of sources (defaults to settings.CHAT_SOURCES_LIMIT)
+
+        Returns:
+            The sources, in the order of the passages they come from
+        """
+        if not passages:
+            return []
+        try:
+            index = await self.load_index(file_dto)
+            return self.locate_in(index, file_dto.markdown_content, passages, query, answer, limit)
+        except Exception as e:
+            logger.error(f"Error locating sources for file {file_dto.pk}: {str(e)}", exc_info=True)
+            return []
+
+    async def load_index(self, file_dto: FileDTO) -> SentenceIndex:
+        """
+        Loads the sentence index of a file, using the cache when possible.
+
+        Files processed before the index existed get one built from their content.
+
+        Args:
+            file_dto: The file
+
+        Returns:
+            The file's SentenceIndex
+        """
+        key = (file_dto.pk, len(file_dto.markdown_content))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        data = None
+        if SENTENCE_INDEX_ARTIFACT in file_dto.metadata.get("artifacts", []):
+            data = await self.artifact_repository.get_artifact(file_dto.pk, SENTENCE_INDEX_ARTIFACT)
+        index = SentenceIndex.from_bytes(data) if data is not None else SentenceIndex.build(file_dto.markdown_content)
+        self.cache.put(key, index)
+        return index
+
+    def locate_in(
+        self,
+        index: SentenceIndex,
+        text: str,
+        passages: List[Passage],
+        query: str,
+        answer: str = "",
+        limit: Optional[int] = None
+    ) -> List[Source]:
+        """
+        Locates the sources of an answer with an already loaded sentence index.
+
+        Args:
+            index: The sentence index of the text
+            text: The markdown content
+            passages: The retrieved passages, best first
+            query: The search query
+            answer: The answer built from the passages
+            limit: Maximum number of sources (defaults to settings.CHAT_SOURCES_LIMIT)
+
+        Returns:
+            The sources, in the order of the passages they come from
+        """
+        weights: Dict[str, float] = {}
+        for term in tokenize(answer):
+            if len(term) >= MIN_TERM_LENGTH:
+                weights[term] = ANSWER_TERM_WEIGHT
+        for term in tokenize(query):
+            if len(term) >= MIN_TERM_LENGTH:
+                weights[term] = QUERY_TERM_WEIGHT
+
+        sources = []
+        seen = set()
+        for passage in passages[:limit or settings.CHAT_SOURCES_LIMIT]:
+            start, end = self._best_window(index, text, passage, weights)
+            # Trim the surrounding whitespace so the offsets point at the text itself
+            span = text[start:end]
+            start += len(span) - len(span.lstrip())
+            end -= len(span) - len(span.rstrip())
+            if (start, end) in seen or start >= end:
+                continue
+            seen.add((start, end))
+            sources.append(Source(
+                ordinal=passage.ordinal,
+                text=text[start:end],
+                start_offset=start,
+                end_offset=end,
+                page=index.page_at(start),
+                score=passage.score
+            ))
+        return sources
+
+    def _best_window(self, index: SentenceIndex, text: str, passage: Passage, weights: Dict[str, float]):
+        """
+        Finds the window of up to max_sentences consecutive sentences with the
+        highest weight of distinct matching terms, clipped to the passage.
+        """
+        first, last = index.sentences_between(passage.start_offset, passage.end_offset)
+        spans = []
+        for sentence in range(first, last):
+            start, end = index.sentence_span(sentence)
+            spans.append((max(start, passage.start_offset), min(end, passage.end_offset)))
+        terms = [set(tokenize(text[start:end])) for start, end in spans]
+
+        best, best_score = None, 0.0
+        for size in range(1, self.max_sentences + 1):
+            for i in range(len(spans) - size + 1):
+                covered = set().union(*terms[i:i + size])
+                score = sum(weights.get(term, 0.0) for term in covered)
+                # A longer window must add a term to win
+                if score > best_score:
+                    best, best_score = (spans[i][0], spans[i + size - 1][1]), score
+
+        return best or (passage.start_offset, passage.end_offset)
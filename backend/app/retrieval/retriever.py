@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import List
+from app.common.schemas import FileDTO, Passage
+
+class Retriever(ABC):
+    # Identifies the strategy in the cache keys of answers built from its passages
+    name: str = "retriever"
+    
+    @abstractmethod
+    async def retrieve(self, search: str, file_dto: FileDTO, top_k: int) -> List[Passage]:
+        """
+        Retrieve the passages of the file that best match the search, best first.
+        """
+        pass
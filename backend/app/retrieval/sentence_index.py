@@ -0,0 +1,150 @@
+"""
+Sentence and page boundary offsets of a file's markdown content.
+"""
+import io
+import re
+from typing import Optional, Tuple
+import numpy as np
+
+# Kind under which the serialized index is stored next to the file record
+SENTENCE_INDEX_ARTIFACT = "sentences"
+
+# A sentence ends after terminal punctuation (and closing quotes or brackets)
+# followed by whitespace, at a blank line, at a page break, or before a line that
+# starts a markdown block (heading, table row, list item, quote)
+SENTENCE_BOUNDARY = re.compile(
+    r"(?<=[.!?])[\"')\]]*\s+"
+    r"|\n[ \t]*\n\s*"
+    r"|\f"
+    r"|\n(?=[ \t]*(?:#|\||>|[-*+][ \t]|\d+[.)][ \t]))"
+)
+
+# pdfminer separates pages with form feeds; MarkItDown marks slides with a comment
+PAGE_BREAK = re.compile(r"\f")
+SLIDE_MARKER = re.compile(r"<!--\s*Slide number:\s*(\d+)\s*-->")
+
+
+class SentenceIndex:
+    """
+    Sorted start offsets of the sentences and pages of a document.
+
+    Both are plain integer arrays, so mapping a character offset to its sentence
+    or page is a binary search, and the index costs a few bytes per sentence.
+    """
+    def __init__(self, sentence_starts: np.ndarray, page_starts: np.ndarray, page_numbers: np.ndarray, length: int):
+        """
+        Initialize the index from its arrays.
+
+        Args:
+            sentence_starts: Start offset of each sentence, ascending
+            page_starts: Start offset of each page, ascending (empty if pages are unknown)
+            page_numbers: Number of each page
+            length: Length of the document in characters
+        """
+        self.sentence_starts = sentence_starts
+        self.page_starts = page_starts
+        self.page_numbers = page_numbers
+        self.length = length
+
+    @classmethod
+    def build(cls, text: str) -> "SentenceIndex":
+        """
+        Find the sentence and page boundaries of a document.
+
+        Args:
+            text: The markdown content
+
+        Returns:
+            A SentenceIndex
+        """
+        starts = [0] + [match.end() for match in SENTENCE_BOUNDARY.finditer(text)]
+        sentence_starts = np.unique(np.asarray([start for start in starts if start < len(text)] or [0], dtype=np.int64))
+
+        slides = list(SLIDE_MARKER.finditer(text))
+        if slides:
+            page_starts = [match.start() for match in slides]
+            page_numbers = [int(match.group(1)) for match in slides]
+        elif "\f" in text:
+            page_starts = [0] + [match.end() for match in PAGE_BREAK.finditer(text)]
+            page_numbers = list(range(1, len(page_starts) + 1))
+        else:
+            page_starts, page_numbers = [], []
+
+        return cls(
+            sentence_starts=sentence_starts,
+            page_starts=np.asarray(page_starts, dtype=np.int64),
+            page_numbers=np.asarray(page_numbers, dtype=np.int32),
+            length=len(text)
+        )
+
+    def __len__(self) -> int:
+        return len(self.sentence_starts)
+
+    def sentences_between(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Find the sentences that start inside a span.
+
+        Args:
+            start: Start offset of the span
+            end: End offset of the span
+
+        Returns:
+            Tuple of (first sentence, last sentence + 1), including the sentence
+            already open at start
+        """
+        first = max(int(np.searchsorted(self.sentence_starts, start, side="right")) - 1, 0)
+        last = int(np.searchsorted(self.sentence_starts, end, side="left"))
+        return first, max(last, first + 1)
+
+    def sentence_span(self, sentence: int) -> Tuple[int, int]:
+        """
+        Returns the (start, end) offsets of a sentence.
+        """
+        end = self.sentence_starts[sentence + 1] if sentence + 1 < len(self.sentence_starts) else self.length
+        return int(self.sentence_starts[sentence]), int(end)
+
+    def page_at(self, offset: int) -> Optional[int]:
+        """
+        Returns the page number containing the offset, or None if pages are unknown.
+        """
+        if not len(self.page_starts):
+            return None
+        page = int(np.searchsorted(self.page_starts, offset, side="right")) - 1
+        return int(self.page_numbers[max(page, 0)])
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the index into a compact compressed form.
+
+        Returns:
+            The serialized index
+        """
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            # Gaps between sentence starts are small and compress much better than offsets
+            sentence_gaps=np.diff(self.sentence_starts, prepend=0).astype(np.int32),
+            page_starts=self.page_starts,
+            page_numbers=self.page_numbers,
+            length=np.array([self.length], dtype=np.int64)
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SentenceIndex":
+        """
+        Deserialize an index produced by to_bytes.
+
+        Args:
+            data: The serialized index
+
+        Returns:
+            A SentenceIndex
+        """
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            return cls(
+                sentence_starts=np.cumsum(arrays["sentence_gaps"], dtype=np.int64),
+                page_starts=arrays["page_starts"],
+                page_numbers=arrays["page_numbers"],
+                length=int(arrays["length"][0])
+            )
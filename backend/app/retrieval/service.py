@@ -0,0 +1,42 @@
+import logging
+from typing import List, Optional
+from app.common.schemas import FileDTO, Passage
+from app.retrieval.retriever import Retriever
+from app.retrieval.strategies.vector_retriever import VectorRetriever
+from app.infrastructure.config import settings
+
+logger = logging.getLogger(__name__)
+
+class RetrievalService:
+    """
+    Service responsible for picking the passages of a file relevant to a query.
+    """
+    
+    def __init__(self, retriever: Retriever = None, top_k: Optional[int] = None):
+        self.retriever = retriever or VectorRetriever()
+        self.top_k = top_k or settings.RETRIEVAL_TOP_K
+    
+    async def retrieve(
+        self,
+        search: str,
+        file_dto: FileDTO,
+        top_k: Optional[int] = None,
+        retriever: Optional[Retriever] = None
+    ) -> List[Passage]:
+        """
+        Retrieve the best passages for the search.
+        
+        Retrieval is best effort: failures are logged and produce no passages,
+        so callers can fall back to the full document.
+        
+        Args:
+            search: The search query
+            file_dto: The file to search
+            top_k: Maximum number of passages (defaults to the service top_k)
+            retriever: Retrieval strategy to use instead of the service default
+        """
+        try:
+            return await (retriever or self.retriever).retrieve(search, file_dto, top_k or self.top_k)
+        except Exception as e:
+            logger.error(f"Error retrieving passages for file {file_dto.pk}: {str(e)}", exc_info=True)
+            return []
@@ -0,0 +1,113 @@
+import asyncio
+from typing import Dict, List, Optional
+from app.common.schemas import FileDTO, Passage
+from app.common.single_flight import SingleFlight
+from app.retrieval.retriever import Retriever
+from app.retrieval.strategies.lexical_retriever import LexicalRetriever
+from app.retrieval.strategies.vector_retriever import VectorRetriever
+from app.text_chunking.models import DocumentChunk
+from app.text_chunking.repository import ChunkRepository
+from app.infrastructure.config import settings
+
+class SharedChunkLoader:
+    """
+    Loads the chunks of a file once for concurrent callers.
+    
+    Given to both signals of the hybrid retriever as their chunk repository, so
+    the two index loads of a query share a single chunk read.
+    """
+    
+    def __init__(self, chunk_repository: Optional[ChunkRepository] = None):
+        self.chunk_repository = chunk_repository or ChunkRepository()
+        self.single_flight = SingleFlight()
+    
+    async def get_chunks(self, file_id: str, chunk_count: int) -> List[DocumentChunk]:
+        return await self.single_flight.do(
+            (file_id, chunk_count),
+            lambda: self.chunk_repository.get_chunks(file_id, chunk_count)
+        )
+
+class HybridRetriever(Retriever):
+    """
+    A strategy that runs BM25 and embedding search over the same chunks and
+    merges the two rankings with weighted reciprocal-rank fusion.
+    
+    Each signal contributes weight / (rrf_k + rank) for every chunk it ranks, so
+    chunks found by both signals rise to the top without comparing raw scores.
+    """
+    name = "hybrid"
+    
+    def __init__(
+        self,
+        vector_retriever: Optional[Retriever] = None,
+        lexical_retriever: Optional[Retriever] = None,
+        vector_weight: Optional[float] = None,
+        lexical_weight: Optional[float] = None,
+        rrf_k: Optional[int] = None,
+        candidate_multiplier: int = 4,
+        chunk_repository: Optional[ChunkRepository] = None
+    ):
+        """
+        Initializes the hybrid retriever.
+        
+        Args:
+            vector_retriever: Embedding-based retrieval strategy (default: VectorRetriever)
+            lexical_retriever: BM25-based retrieval strategy (default: LexicalRetriever)
+            vector_weight: Weight of the vector ranking (defaults to settings.HYBRID_VECTOR_WEIGHT)
+            lexical_weight: Weight of the lexical ranking (defaults to settings.HYBRID_LEXICAL_WEIGHT)
+            rrf_k: Rank offset damping the top ranks (defaults to settings.HYBRID_RRF_K)
+            candidate_multiplier: Each signal returns top_k * candidate_multiplier candidates
+            chunk_repository: Repository the default signals load the chunks from, once per query
+        """
+        chunk_loader = SharedChunkLoader(chunk_repository)
+        self.vector_retriever = vector_retriever or VectorRetriever(chunk_repository=chunk_loader)
+        self.lexical_retriever = lexical_retriever or LexicalRetriever(chunk_repository=chunk_loader)
+        self.vector_weight = settings.HYBRID_VECTOR_WEIGHT if vector_weight is None else vector_weight
+        self.lexical_weight = settings.HYBRID_LEXICAL_WEIGHT if lexical_weight is None else lexical_weight
+        self.rrf_k = rrf_k or settings.HYBRID_RRF_K
+        self.candidate_multiplier = candidate_multiplier
+    
+    async def retrieve(self, search: str, file_dto: FileDTO, top_k: int) -> List[Passage]:
+        """
+        Retrieves the chunks with the best fused rank.
+        
+        Args:
+            search: The search query
+            file_dto: The file to search
+            top_k: Maximum number of passages to return
+            
+        Returns:
+            The best passages, best first, scored with their fused rank score
+        """
+        candidates = top_k * self.candidate_multiplier
+        vector_passages, lexical_passages = await asyncio.gather(
+            self.vector_retriever.retrieve(search, file_dto, candidates),
+            self.lexical_retriever.retrieve(search, file_dto, candidates)
+        )
+        return self.fuse(
+            [(vector_passages, self.vector_weight), (lexical_passages, self.lexical_weight)],
+            top_k
+        )
+    
+    def fuse(self, rankings: List[tuple], top_k: int) -> List[Passage]:
+        """
+        Merges rankings with weighted reciprocal-rank fusion.
+        
+        Args:
+            rankings: List of (passages best first, weight)
+            top_k: Maximum number of passages to return
+            
+        Returns:
+            The fused passages, best first
+        """
+        scores: Dict[int, float] = {}
+        passages: Dict[int, Passage] = {}
+        for ranked, weight in rankings:
+            if not weight:
+                continue
+            for rank, passage in enumerate(ranked, start=1):
+                scores[passage.ordinal] = scores.get(passage.ordinal, 0.0) + weight / (self.rrf_k + rank)
+                passages.setdefault(passage.ordinal, passage)
+        
+        best = sorted(scores, key=lambda ordinal: (-scores[ordinal], ordinal))[:top_k]
+        return [passages[ordinal].model_copy(update={"score": scores[ordinal]}) for ordinal in best]
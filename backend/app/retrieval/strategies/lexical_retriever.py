@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from app.common.cache import LRUCache
+from app.common.schemas import FileDTO, Passage
+from app.file_processing.artifact_repository import FileArtifactRepository
+from app.retrieval.retriever import Retriever
+from app.retrieval.lexical_index import LexicalIndex, LEXICAL_INDEX_ARTIFACT
+from app.retrieval.strategies.vector_retriever import to_passage
+from app.text_chunking.models import DocumentChunk
+from app.text_chunking.repository import ChunkRepository
+from app.infrastructure.config import settings
+
+logger = logging.getLogger(__name__)
+
+class LexicalRetriever(Retriever):
+    """
+    A strategy that ranks a file's chunks with the BM25 index built at ingest time.
+    The chunks and the deserialized index are kept in an in-process LRU cache.
+    """
+    name = "lexical"
+    
+    def __init__(
+        self,
+        chunk_repository: Optional[ChunkRepository] = None,
+        artifact_repository: Optional[FileArtifactRepository] = None,
+        cache_size: Optional[int] = None
+    ):
+        """
+        Initializes the lexical retriever.
+        
+        Args:
+            chunk_repository: Repository used to load the chunks
+            artifact_repository: Repository used to load the serialized index
+            cache_size: Number of file indexes kept in memory (defaults to settings.RETRIEVAL_CACHE_SIZE)
+        """
+        self.chunk_repository = chunk_repository or ChunkRepository()
+        self.artifact_repository = artifact_repository or FileArtifactRepository()
+        self.cache = LRUCache(cache_size or settings.RETRIEVAL_CACHE_SIZE)
+    
+    async def retrieve(self, search: str, file_dto: FileDTO, top_k: int) -> List[Passage]:
+        """
+        Retrieves the chunks with the best BM25 score for the search.
+        
+        Args:
+            search: The search query
+            file_dto: The file to search
+            top_k: Maximum number of passages to return
+            
+        Returns:
+            The best matching passages, best first
+        """
+        if LEXICAL_INDEX_ARTIFACT not in file_dto.metadata.get("artifacts", []):
+            return []
+        
+        chunks, index = await self.load_index(file_dto.pk, int(file_dto.metadata.get("chunk_count", 0)))
+        if index is None:
+            return []
+        
+        ordinals, scores = index.search(search, top_k)
+        return [
+            to_passage(chunks[ordinal], float(score))
+            for ordinal, score in zip(ordinals.tolist(), scores) if ordinal in chunks
+        ]
+    
+    async def load_index(self, file_id: str, chunk_count: int) -> Tuple[Dict[int, DocumentChunk], Optional[LexicalIndex]]:
+        """
+        Loads the chunks of a file and its BM25 index, using the cache when possible.
+        
+        Args:
+            file_id: The ID of the file
+            chunk_count: Number of chunks stored for the file
+            
+        Returns:
+            Tuple of (chunks by ordinal, lexical index or None if missing)
+        """
+        key = (file_id, chunk_count)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        data, chunks = await asyncio.gather(
+            self.artifact_repository.get_artifact(file_id, LEXICAL_INDEX_ARTIFACT),
+            self.chunk_repository.get_chunks(file_id, chunk_count)
+        )
+        if data is None:
+            logger.warning(f"Lexical index not found for file {file_id}")
+            return {}, None
+        
+        # Keyed by ordinal: a chunk missing from the list must not shift the others
+        entry = ({chunk.ordinal: chunk for chunk in chunks}, LexicalIndex.from_bytes(data))
+        self.cache.put(key, entry)
+        logger.info(f"Loaded lexical index for file {file_id} ({len(entry[1].terms)} terms)")
+        return entry
@@ -0,0 +1,104 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+from app.common.cache import LRUCache
+from app.common.schemas import FileDTO, Passage
+from app.embedding.service import EmbeddingService
+from app.retrieval.retriever import Retriever
+from app.retrieval.vector_index import VectorIndex
+from app.text_chunking.models import DocumentChunk
+from app.text_chunking.repository import ChunkRepository
+from app.infrastructure.config import settings
+
+logger = logging.getLogger(__name__)
+
+class VectorRetriever(Retriever):
+    """
+    A strategy that ranks a file's chunks by cosine similarity to the embedded query.
+    The chunks and their embedding matrix are loaded once per file and kept in an
+    in-process LRU cache, so repeated queries only pay for the matrix-vector product.
+    """
+    name = "vector"
+    
+    def __init__(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        chunk_repository: Optional[ChunkRepository] = None,
+        cache_size: Optional[int] = None
+    ):
+        """
+        Initializes the vector retriever.
+        
+        Args:
+            embedding_service: Service used to embed queries (must match the ingest embedder)
+            chunk_repository: Repository used to load the chunks
+            cache_size: Number of file indexes kept in memory (defaults to settings.RETRIEVAL_CACHE_SIZE)
+        """
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.chunk_repository = chunk_repository or ChunkRepository()
+        self.cache = LRUCache(cache_size or settings.RETRIEVAL_CACHE_SIZE)
+    
+    async def retrieve(self, search: str, file_dto: FileDTO, top_k: int) -> List[Passage]:
+        """
+        Retrieves the chunks most similar to the search.
+        
+        Args:
+            search: The search query
+            file_dto: The file to search
+            top_k: Maximum number of passages to return
+            
+        Returns:
+            The best matching passages, best first
+        """
+        if file_dto.embedding_status != "completed":
+            return []
+        
+        model_name = file_dto.metadata.get("embedding_model")
+        if model_name and model_name != self.embedding_service.embedder.model_name:
+            logger.warning(
+                f"File {file_dto.pk} was embedded with {model_name}, "
+                f"not {self.embedding_service.embedder.model_name}; skipping vector retrieval"
+            )
+            return []
+        
+        chunks, index = await self.load_index(file_dto.pk, int(file_dto.metadata.get("chunk_count", 0)))
+        if not len(index):
+            return []
+        
+        ordinals, scores = index.search(await self.embedding_service.embed_query_async(search), top_k)
+        return [
+            to_passage(chunks[ordinal], float(score))
+            for ordinal, score in zip(ordinals.tolist(), scores) if ordinal in chunks
+        ]
+    
+    async def load_index(self, file_id: str, chunk_count: int) -> Tuple[Dict[int, DocumentChunk], VectorIndex]:
+        """
+        Loads the chunks of a file and their embedding matrix, using the cache when possible.
+        
+        Args:
+            file_id: The ID of the file
+            chunk_count: Number of chunks stored for the file
+            
+        Returns:
+            Tuple of (chunks by ordinal, vector index over their embeddings)
+        """
+        key = (file_id, chunk_count)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        chunks = await self.chunk_repository.get_chunks(file_id, chunk_count)
+        # Keyed by ordinal: a chunk missing from the list must not shift the others
+        entry = ({chunk.ordinal: chunk for chunk in chunks}, VectorIndex.from_chunks(chunks))
+        self.cache.put(key, entry)
+        logger.info(f"Loaded vector index for file {file_id} ({len(entry[1])} vectors)")
+        return entry
+
+def to_passage(chunk: DocumentChunk, score: float) -> Passage:
+    return Passage(
+        ordinal=chunk.ordinal,
+        text=chunk.text,
+        start_offset=chunk.start_offset,
+        end_offset=chunk.end_offset,
+        token_estimate=chunk.token_estimate,
+        score=score
+    )
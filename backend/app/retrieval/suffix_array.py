@@ -0,0 +1,188 @@
+"""
+Suffix array over a file's markdown content for exact phrase lookups.
+"""
+import io
+from typing import Tuple
+import numpy as np
+
+# Kind under which the serialized suffix array is stored next to the file record
+SUFFIX_ARRAY_ARTIFACT = "suffixes"
+
+
+class SuffixArray:
+    """
+    Suffix array with its LCP array over the characters of a document.
+
+    suffixes[i] is the offset of the i-th smallest suffix and lcp[i] the length of
+    the common prefix of suffixes i - 1 and i (lcp[0] is 0). A phrase of m
+    characters is found with one binary search over the suffixes (O(m log n)
+    character comparisons); its occurrences are the run of following suffixes
+    whose LCP is at least m, so they come out without further comparisons.
+    Offsets are character offsets, like the chunk and passage offsets.
+    """
+    def __init__(self, text: str, suffixes: np.ndarray, lcp: np.ndarray):
+        """
+        Initialize the suffix array from its arrays.
+
+        Args:
+            text: The indexed text
+            suffixes: Suffix offsets in lexicographic order
+            lcp: Longest common prefix of each suffix with the previous one
+        """
+        self.text = text
+        self.suffixes = suffixes
+        self.lcp = lcp
+
+    @classmethod
+    def build(cls, text: str) -> "SuffixArray":
+        """
+        Build the suffix array and LCP array of a text by prefix doubling.
+
+        Every round sorts the suffixes by their first 2^k characters using the
+        ranks of the previous round, so the work is O(n log n) per round with
+        O(log L) rounds, L being the longest repeated substring. The ranks of every
+        round are kept to derive the LCP of neighbouring suffixes by binary lifting.
+
+        Args:
+            text: The text to index
+
+        Returns:
+            A SuffixArray
+        """
+        n = len(text)
+        if n == 0:
+            return cls(text, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        _, rank = np.unique(codes, return_inverse=True)
+        rank = rank.astype(np.int64)
+        levels = [rank.astype(np.int32)]
+        suffixes = np.argsort(rank, kind="stable")
+
+        step = 1
+        while int(rank.max()) < n - 1:
+            # Rank of the next 2^k characters, 0 past the end of the text
+            following = np.zeros(n, dtype=np.int64)
+            following[:n - step] = rank[step:] + 1
+            keys = rank * (n + 1) + following
+            suffixes = np.argsort(keys, kind="stable")
+            sorted_keys = keys[suffixes]
+            rank = np.empty(n, dtype=np.int64)
+            rank[suffixes] = np.concatenate(([0], np.cumsum(sorted_keys[1:] != sorted_keys[:-1])))
+            levels.append(rank.astype(np.int32))
+            step *= 2
+
+        # Equal ranks at level k mean equal first 2^k characters; walking the
+        # levels from the top adds the LCP one power of two at a time
+        left = suffixes[:-1].astype(np.int64)
+        right = suffixes[1:].astype(np.int64)
+        lcp = np.zeros(n, dtype=np.int64)
+        for level in range(len(levels) - 1, -1, -1):
+            length = 1 << level
+            inside = (left < n) & (right < n)
+            candidates = np.flatnonzero(inside)
+            equal = candidates[levels[level][left[candidates]] == levels[level][right[candidates]]]
+            lcp[equal + 1] += length
+            left[equal] += length
+            right[equal] += length
+
+        return cls(text, suffixes.astype(np.int32), lcp.astype(np.int32))
+
+    def __len__(self) -> int:
+        return len(self.suffixes)
+
+    def find(self, phrase: str) -> np.ndarray:
+        """
+        Find every occurrence of a phrase.
+
+        Args:
+            phrase: The exact phrase to look up
+
+        Returns:
+            The start offsets of the occurrences, ascending
+        """
+        first, last = self.find_range(phrase)
+        return np.sort(self.suffixes[first:last]).astype(np.int64)
+
+    def count(self, phrase: str) -> int:
+        """
+        Returns the number of occurrences of a phrase.
+        """
+        first, last = self.find_range(phrase)
+        return last - first
+
+    def find_range(self, phrase: str) -> Tuple[int, int]:
+        """
+        Find the range of suffixes starting with a phrase.
+
+        Args:
+            phrase: The exact phrase to look up
+
+        Returns:
+            Tuple of (first suffix, last suffix + 1), empty if the phrase does not occur
+        """
+        m = len(phrase)
+        if m == 0 or m > len(self.text):
+            return 0, 0
+
+        low, high = 0, len(self.suffixes)
+        while low < high:
+            middle = (low + high) // 2
+            start = int(self.suffixes[middle])
+            if self.text[start:start + m] < phrase:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(self.suffixes):
+            return low, low
+        start = int(self.suffixes[low])
+        if self.text[start:start + m] != phrase:
+            return low, low
+
+        # The matching suffixes follow while they share at least m characters;
+        # the run is scanned in growing blocks so the cost follows the match count
+        end = low + 1
+        block = 64
+        while end < len(self.lcp):
+            window = self.lcp[end:end + block]
+            shorter = np.flatnonzero(window < m)
+            if len(shorter):
+                return low, end + int(shorter[0])
+            end += len(window)
+            block *= 2
+        return low, end
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the suffix and LCP arrays.
+
+        The text is not included; it is passed back to from_bytes.
+
+        Returns:
+            The serialized arrays
+        """
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, suffixes=self.suffixes, lcp=self.lcp)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, text: str) -> "SuffixArray":
+        """
+        Deserialize arrays produced by to_bytes.
+
+        Args:
+            data: The serialized arrays
+            text: The indexed text
+
+        Returns:
+            A SuffixArray
+
+        Raises:
+            ValueError: If the arrays were not built over a text of this length
+        """
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            suffixes = arrays["suffixes"]
+            lcp = arrays["lcp"]
+        if len(suffixes) != len(text):
+            raise ValueError("Suffix array does not match the text")
+        return cls(text, suffixes, lcp)
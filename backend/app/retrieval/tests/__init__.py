@@ -0,0 +1 @@
+# Tests for the retrieval module 
\ No newline at end of file
@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.common.schemas import Passage
+from app.retrieval.lexical_index import LexicalIndex
+from app.retrieval.strategies.hybrid_retriever import HybridRetriever
+from app.text_chunking.service import TextChunkingService
+from app.text_chunking.strategies.markdown import MarkdownChunker
+
+MARKDOWN = (
+    "# Invoices\n\nInvoice 4411 is due within 30 days.\n\n"
+    "# Contacts\n\nReach billing at the main office."
+)
+
+def passage(ordinal, score=1.0):
+    return Passage(ordinal=ordinal, text=f"chunk {ordinal}", start_offset=ordinal * 10,
+                   end_offset=ordinal * 10 + 7, token_estimate=2, score=score)
+
+@pytest.fixture
+def retriever():
+    """Create a HybridRetriever over mocked signals"""
+    vector_retriever = AsyncMock()
+    vector_retriever.retrieve.return_value = [passage(1), passage(2), passage(3)]
+    lexical_retriever = AsyncMock()
+    lexical_retriever.retrieve.return_value = [passage(3), passage(4)]
+    return HybridRetriever(vector_retriever, lexical_retriever, vector_weight=1.0, lexical_weight=1.0, rrf_k=60)
+
+@pytest.mark.asyncio
+async def test_retrieve_fuses_both_signals(retriever):
+    """Test that a chunk found by both signals ranks first"""
+    file_dto = MagicMock()
+    
+    passages = await retriever.retrieve("query", file_dto, 3)
+    
+    assert [p.ordinal for p in passages] == [3, 1, 2]
+    assert passages[0].score == pytest.approx(1 / 63 + 1 / 61)
+    retriever.vector_retriever.retrieve.assert_called_once_with("query", file_dto, 12)
+    retriever.lexical_retriever.retrieve.assert_called_once_with("query", file_dto, 12)
+
+def test_fuse_respects_weights(retriever):
+    """Test that a heavier signal decides the order"""
+    rankings = [([passage(1), passage(2)], 1.0), ([passage(2), passage(1)], 3.0)]
+    
+    fused = retriever.fuse(rankings, 2)
+    
+    assert [p.ordinal for p in fused] == [2, 1]
+
+def test_fuse_ignores_zero_weight(retriever):
+    """Test that a signal with zero weight does not contribute"""
+    rankings = [([passage(1)], 1.0), ([passage(9)], 0.0)]
+    
+    assert [p.ordinal for p in retriever.fuse(rankings, 5)] == [1]
+
+@pytest.mark.asyncio
+async def test_retrieve_loads_chunks_once():
+    """Test that the default signals share one chunk load per query"""
+    chunks = TextChunkingService(MarkdownChunker(chunk_size=200, chunk_overlap=0)).chunk("file123", MARKDOWN)
+    chunk_repository = AsyncMock()
+    chunk_repository.get_chunks.return_value = chunks
+    retriever = HybridRetriever(chunk_repository=chunk_repository)
+    retriever.vector_retriever.embedding_service.embed_chunks(chunks)
+    retriever.lexical_retriever.artifact_repository = AsyncMock()
+    retriever.lexical_retriever.artifact_repository.get_artifact.return_value = (
+        LexicalIndex.build([chunk.text for chunk in chunks]).to_bytes()
+    )
+    file_dto = MagicMock(pk="file123", embedding_status="completed", metadata={
+        "chunk_count": len(chunks),
+        "embedding_model": retriever.vector_retriever.embedding_service.embedder.model_name,
+        "artifacts": ["bm25"]
+    })
+    
+    passages = await retriever.retrieve("when is invoice 4411 due?", file_dto, 2)
+    
+    assert "4411" in passages[0].text
+    chunk_repository.get_chunks.assert_called_once_with("file123", len(chunks))
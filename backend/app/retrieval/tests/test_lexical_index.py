@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from app.retrieval.lexical_index import LexicalIndex, tokenize
+
+DOCUMENTS = [
+    "The agreement is between ACME Corp and Globex.",
+    "Invoice 4411 lists the total amount due.",
+    "Invoice 4412 was cancelled. Invoice 4412 is void.",
+    "Either party may terminate the agreement with notice.",
+]
+
+@pytest.fixture
+def index():
+    return LexicalIndex.build(DOCUMENTS)
+
+def test_tokenize():
+    """Test that tokens are lowercase words"""
+    assert tokenize("Invoice #4411, ACME-Corp") == ["invoice", "4411", "acme", "corp"]
+
+def test_build_postings(index):
+    """Test that postings store term frequencies and document lengths"""
+    term_id = index.term_ids["4412"]
+    start, end = index.term_offsets[term_id], index.term_offsets[term_id + 1]
+    
+    assert list(index.postings_docs[start:end]) == [2]
+    assert list(index.postings_tf[start:end]) == [2]
+    assert list(index.doc_lengths) == [len(tokenize(document)) for document in DOCUMENTS]
+
+def test_search_ranks_rare_terms_first(index):
+    """Test that a rare exact term outranks common terms"""
+    ids, scores = index.search("where does it mention invoice 4411?", 3)
+    
+    assert ids[0] == 1
+    assert 2 in ids
+    assert list(scores) == sorted(scores, reverse=True)
+
+def test_search_without_matches(index):
+    """Test that a query sharing no terms returns nothing"""
+    ids, scores = index.search("weather in Lisbon", 5)
+    
+    assert len(ids) == 0 and len(scores) == 0
+
+def test_serialization_round_trip(index):
+    """Test that the serialized index answers queries identically"""
+    restored = LexicalIndex.from_bytes(index.to_bytes())
+    
+    assert restored.terms == index.terms
+    np.testing.assert_array_equal(restored.postings_docs, index.postings_docs)
+    for query in ["agreement", "invoice 4412", "total amount"]:
+        np.testing.assert_array_equal(restored.search(query, 4)[0], index.search(query, 4)[0])
+
+def test_empty_index():
+    """Test that an index without documents can be built, serialized and searched"""
+    index = LexicalIndex.from_bytes(LexicalIndex.build([]).to_bytes())
+    
+    assert len(index) == 0
+    assert len(index.search("anything", 3)[0]) == 0
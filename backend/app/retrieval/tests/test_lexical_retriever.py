@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import AsyncMock
+from datetime import datetime, UTC
+from app.common.schemas import FileDTO
+from app.retrieval.lexical_index import LexicalIndex
+from app.retrieval.strategies.lexical_retriever import LexicalRetriever
+from app.text_chunking.service import TextChunkingService
+from app.text_chunking.strategies.markdown import MarkdownChunker
+
+MARKDOWN = (
+    "# Invoices\n\nInvoice 4411 was paid in full.\n\n"
+    "# Disputes\n\nInvoice 4412 is under dispute.\n\n"
+    "# Contacts\n\nReach billing at the main office."
+)
+
+@pytest.fixture
+def chunks():
+    return TextChunkingService(MarkdownChunker(chunk_size=200, chunk_overlap=0)).chunk("file123", MARKDOWN)
+
+@pytest.fixture
+def file_dto(chunks):
+    """Create a FileDTO whose lexical index was built at ingest"""
+    return FileDTO(
+        pk="file123",
+        filename="invoices.pdf",
+        url="https://example.com/invoices.pdf",
+        content=MARKDOWN,
+        markdown_content=MARKDOWN,
+        file_size=1024,
+        file_type="application/pdf",
+        processing_status="completed",
+        embedding_status="pending",
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+        metadata={"chunk_count": len(chunks), "artifacts": ["bm25"]},
+        history={}
+    )
+
+@pytest.fixture
+def retriever(chunks):
+    """Create a LexicalRetriever backed by mocked repositories"""
+    chunk_repository = AsyncMock()
+    chunk_repository.get_chunks.return_value = chunks
+    artifact_repository = AsyncMock()
+    artifact_repository.get_artifact.return_value = LexicalIndex.build([chunk.text for chunk in chunks]).to_bytes()
+    return LexicalRetriever(chunk_repository=chunk_repository, artifact_repository=artifact_repository)
+
+@pytest.mark.asyncio
+async def test_retrieve_ranks_with_bm25(retriever, file_dto):
+    """Test that the chunk mentioning the exact term is ranked first"""
+    passages = await retriever.retrieve("where does it mention invoice 4411?", file_dto, 3)
+    
+    assert "4411" in passages[0].text
+    assert all("Contacts" not in passage.text for passage in passages)
+    retriever.artifact_repository.get_artifact.assert_called_once_with("file123", "bm25")
+
+@pytest.mark.asyncio
+async def test_retrieve_maps_passages_by_ordinal(retriever, file_dto, chunks):
+    """Test that a chunk missing from the loaded ones does not shift the text of the others"""
+    retriever.chunk_repository.get_chunks.return_value = [chunk for chunk in chunks if chunk.ordinal != 0]
+    
+    passages = await retriever.retrieve("invoice 4412 dispute", file_dto, 3)
+    
+    assert "4412" in passages[0].text
+    assert 0 not in [passage.ordinal for passage in passages]
+
+@pytest.mark.asyncio
+async def test_retrieve_without_index(retriever, file_dto):
+    """Test that files indexed before BM25 existed produce no passages"""
+    file_dto.metadata["artifacts"] = []
+    
+    assert await retriever.retrieve("invoice", file_dto, 3) == []
+    retriever.artifact_repository.get_artifact.assert_not_called()
@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import AsyncMock
+from datetime import datetime, UTC
+from app.common.schemas import FileDTO, Passage
+from app.retrieval.passage_locator import PassageLocator
+from app.retrieval.sentence_index import SentenceIndex
+
+TEXT = (
+    "# Invoices\n\nInvoice 4410 was issued in May. Invoice 4411 was paid in full on June 3. "
+    "Late fees were waived.\f# Contacts\n\nReach billing at the main office. The office opens at 9."
+)
+
+def make_passage(ordinal, start, end, score=1.0):
+    return Passage(ordinal=ordinal, text=TEXT[start:end], start_offset=start, end_offset=end, token_estimate=1, score=score)
+
+@pytest.fixture
+def file_dto():
+    return FileDTO(
+        pk="file123",
+        filename="invoices.pdf",
+        url="https://example.com/invoices.pdf",
+        content=TEXT,
+        markdown_content=TEXT,
+        file_size=1024,
+        file_type="application/pdf",
+        processing_status="completed",
+        embedding_status="completed",
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+        metadata={"artifacts": ["bm25", "sentences"]},
+        history={}
+    )
+
+@pytest.fixture
+def locator():
+    artifact_repository = AsyncMock()
+    artifact_repository.get_artifact.return_value = SentenceIndex.build(TEXT).to_bytes()
+    return PassageLocator(artifact_repository=artifact_repository)
+
+@pytest.mark.asyncio
+async def test_locate_picks_matching_sentence(locator, file_dto):
+    """Test that the source is the sentence of the passage matching the query, with exact offsets"""
+    passage = make_passage(0, 0, TEXT.index("\f"))
+    
+    sources = await locator.locate(file_dto, [passage], "When was invoice 4411 paid?", "It was paid on June 3.")
+    
+    assert len(sources) == 1
+    assert sources[0].text == "Invoice 4411 was paid in full on June 3."
+    assert TEXT[sources[0].start_offset:sources[0].end_offset] == sources[0].text
+    assert sources[0].page == 1
+    locator.artifact_repository.get_artifact.assert_called_once_with("file123", "sentences")
+
+@pytest.mark.asyncio
+async def test_locate_reports_pages_and_caches_index(locator, file_dto):
+    """Test that sources on later pages get their page number and the index is loaded once"""
+    passage = make_passage(1, TEXT.index("# Contacts"), len(TEXT))
+    
+    await locator.locate(file_dto, [passage], "billing office")
+    sources = await locator.locate(file_dto, [passage], "what time the office opens")
+    
+    assert sources[0].text == "The office opens at 9."
+    assert sources[0].page == 2
+    assert locator.artifact_repository.get_artifact.call_count == 1
+
+@pytest.mark.asyncio
+async def test_locate_without_match_returns_passage(locator, file_dto):
+    """Test that a passage sharing no term with the query is returned whole"""
+    passage = make_passage(1, TEXT.index("# Contacts"), len(TEXT))
+    
+    sources = await locator.locate(file_dto, [passage], "xyz")
+    
+    assert sources[0].start_offset == passage.start_offset
+    assert sources[0].end_offset == len(TEXT)
+
+@pytest.mark.asyncio
+async def test_locate_builds_index_for_older_files(locator, file_dto):
+    """Test that files without a stored sentence index are located from their content"""
+    file_dto.metadata["artifacts"] = ["bm25"]
+    passage = make_passage(0, 0, TEXT.index("\f"))
+    
+    sources = await locator.locate(file_dto, [passage], "late fees")
+    
+    assert sources[0].text == "Late fees were waived."
+    locator.artifact_repository.get_artifact.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_locate_limits_and_deduplicates(locator, file_dto):
+    """Test that overlapping passages give one source and the limit is applied"""
+    first = make_passage(0, 0, TEXT.index("\f"), 0.9)
+    overlapping = make_passage(1, TEXT.index("Invoice 4411"), TEXT.index("\f"), 0.8)
+    other = make_passage(2, TEXT.index("# Contacts"), len(TEXT), 0.7)
+    
+    sources = await locator.locate(file_dto, [first, overlapping, other], "invoice 4411", limit=2)
+    
+    assert [source.ordinal for source in sources] == [0]
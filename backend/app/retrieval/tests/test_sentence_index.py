@@ -0,0 +1,70 @@
+from app.retrieval.sentence_index import SentenceIndex
+
+def sentences(text, index):
+    return [text[slice(*index.sentence_span(i))].strip() for i in range(len(index))]
+
+def test_build_splits_sentences_and_blocks():
+    """Test that sentences end at punctuation, blank lines and markdown blocks"""
+    text = (
+        "# Terms\n\nThe fee is 10 USD. It is due (monthly) on Mondays!\n"
+        "- First item\n- Second item\n\n| a | b |\n| 1 | 2 |"
+    )
+    index = SentenceIndex.build(text)
+    
+    assert sentences(text, index) == [
+        "# Terms",
+        "The fee is 10 USD.",
+        "It is due (monthly) on Mondays!",
+        "- First item",
+        "- Second item",
+        "| a | b |",
+        "| 1 | 2 |"
+    ]
+
+def test_hard_wrapped_lines_stay_in_one_sentence():
+    """Test that a line break inside a sentence is not a boundary"""
+    text = "The agreement is between ACME\nand Globex. Payment follows."
+    
+    assert sentences(text, SentenceIndex.build(text)) == [
+        "The agreement is between ACME\nand Globex.",
+        "Payment follows."
+    ]
+
+def test_sentences_between():
+    """Test that the sentence open at the start of a span is included"""
+    text = "One two. Three four. Five six."
+    index = SentenceIndex.build(text)
+    
+    assert index.sentences_between(3, 15) == (0, 2)
+    assert index.sentences_between(9, 9) == (1, 2)
+
+def test_pages_from_form_feeds():
+    """Test that pdf page breaks give page numbers"""
+    text = "Page one text.\fPage two text.\fPage three."
+    index = SentenceIndex.build(text)
+    
+    assert index.page_at(0) == 1
+    assert index.page_at(text.index("two")) == 2
+    assert index.page_at(len(text) - 1) == 3
+
+def test_pages_from_slide_markers():
+    """Test that slide comments give slide numbers"""
+    text = "<!-- Slide number: 1 -->\n# Intro\n\n<!-- Slide number: 2 -->\n# Plan"
+    index = SentenceIndex.build(text)
+    
+    assert index.page_at(text.index("Plan")) == 2
+
+def test_unknown_pages():
+    """Test that documents without page markers have no page numbers"""
+    assert SentenceIndex.build("Just text.").page_at(0) is None
+
+def test_serialization_round_trip():
+    """Test that the index survives serialization"""
+    text = "First. Second.\fThird."
+    index = SentenceIndex.build(text)
+    
+    restored = SentenceIndex.from_bytes(index.to_bytes())
+    
+    assert list(restored.sentence_starts) == list(index.sentence_starts)
+    assert list(restored.page_starts) == list(index.page_starts)
+    assert restored.length == len(text)
@@ -0,0 +1,65 @@
+import os
+import random
+import pytest
+import numpy as np
+from app.retrieval.suffix_array import SuffixArray
+
+def naive_occurrences(text, phrase):
+    return [i for i in range(len(text)) if text.startswith(phrase, i)]
+
+def test_build_matches_naive_sort():
+    """Test the suffix and LCP arrays against a naive construction"""
+    rng = random.Random(7)
+    for _ in range(50):
+        text = "".join(rng.choice("ab€ ") for _ in range(rng.randint(1, 80)))
+        suffix_array = SuffixArray.build(text)
+        
+        expected = sorted(range(len(text)), key=lambda i: text[i:])
+        lcp = [0] + [
+            len(os.path.commonprefix([text[expected[i - 1]:], text[expected[i]:]])) for i in range(1, len(text))
+        ]
+        assert suffix_array.suffixes.tolist() == expected
+        assert suffix_array.lcp.tolist() == lcp
+
+def test_find_every_occurrence():
+    """Test that every occurrence of a phrase is found, in document order"""
+    text = "Clause 4.2: the tenant pays. Clause 4.2 applies. See clause 4.2 (b)."
+    suffix_array = SuffixArray.build(text)
+    
+    assert suffix_array.find("Clause 4.2").tolist() == naive_occurrences(text, "Clause 4.2")
+    assert suffix_array.count("lause 4.2") == 3
+    assert suffix_array.find(".").tolist() == naive_occurrences(text, ".")
+
+def test_find_missing_phrase():
+    """Test that phrases absent from the text have no occurrences"""
+    suffix_array = SuffixArray.build("part AX-200")
+    
+    assert suffix_array.find("AX-300").tolist() == []
+    assert suffix_array.find("part AX-200 and more").tolist() == []
+    assert suffix_array.find("zzz").tolist() == []
+    assert suffix_array.find("").tolist() == []
+
+def test_long_runs():
+    """Test lookups in highly repetitive text, where runs span many LCP blocks"""
+    text = "ab" * 500 + "c"
+    suffix_array = SuffixArray.build(text)
+    
+    assert suffix_array.count("ab") == 500
+    assert suffix_array.find("abc").tolist() == [998]
+
+def test_empty_text():
+    """Test that an empty text has an empty suffix array"""
+    suffix_array = SuffixArray.build("")
+    
+    assert len(suffix_array) == 0
+    assert suffix_array.find("a").tolist() == []
+
+def test_serialization_round_trip():
+    """Test that the arrays survive serialization and are checked against the text"""
+    text = "the cat sat on the mat"
+    suffix_array = SuffixArray.from_bytes(SuffixArray.build(text).to_bytes(), text)
+    
+    assert suffix_array.find("the").tolist() == [0, 15]
+    assert suffix_array.suffixes.dtype == np.int32
+    with pytest.raises(ValueError):
+        SuffixArray.from_bytes(suffix_array.to_bytes(), text + "!")
@@ -0,0 +1,80 @@
+import random
+import numpy as np
+from app.retrieval.trigram_index import TrigramIndex, edit_distances, trigrams
+
+TEXT = (
+    "Contact Jonathan Smith about part AX-200. Jonathan Smyth signed the order.\n"
+    "Part AX-2O0 failed the inspection; Smith replaced it."
+)
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+        previous = current
+    return previous[-1]
+
+def matched(index, query, **kwargs):
+    return [(TEXT[match.start_offset:match.end_offset], match.distance) for match in index.search(query, **kwargs)]
+
+def test_trigrams_are_padded():
+    """Test that the first and last characters get their own trigrams"""
+    assert trigrams("ab") == ["  a", " ab", "ab "]
+
+def test_edit_distances_match_naive():
+    """Test the vectorized edit distance against a naive implementation"""
+    rng = random.Random(3)
+    for _ in range(50):
+        word = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+        candidates = ["".join(rng.choice("abc") for _ in range(rng.randint(0, 7))) for _ in range(20)]
+        
+        assert edit_distances(word, candidates).tolist() == [levenshtein(word, c) for c in candidates]
+
+def test_search_tolerates_typos():
+    """Test that misspelled words match, closest first"""
+    index = TrigramIndex.build(TEXT)
+    
+    assert matched(index, "Jonathon Smith") == [("Jonathan Smith", 1), ("Jonathan Smyth", 2)]
+    assert matched(index, "smith") == [("Smith", 0), ("Smith", 0), ("Smyth", 1)]
+    assert matched(index, "inspektion") == [("inspection", 1)]
+
+def test_search_part_numbers():
+    """Test that codes split into several words match as a sequence"""
+    index = TrigramIndex.build(TEXT)
+    
+    assert matched(index, "AX-200") == [("AX-200", 0), ("AX-2O0", 1)]
+    assert matched(index, "AX-200", max_distance=0) == [("AX-200", 0)]
+
+def test_search_offsets_in_document_order():
+    """Test that matches at the same distance come in document order with exact offsets"""
+    index = TrigramIndex.build(TEXT)
+    
+    matches = index.search("Jonatan")
+    assert [match.start_offset for match in matches] == [TEXT.index("Jonathan"), TEXT.rindex("Jonathan")]
+    assert all(match.distance == 1 for match in matches)
+
+def test_search_without_match():
+    """Test that unrelated and empty queries have no matches"""
+    index = TrigramIndex.build(TEXT)
+    
+    assert index.search("warranty") == []
+    assert index.search("...") == []
+    assert TrigramIndex.build("").search("smith") == []
+
+def test_short_words_match_exactly():
+    """Test that words under three characters are not matched fuzzily"""
+    index = TrigramIndex.build("go to the ox farm")
+    
+    assert [match.distance for match in index.search("to")] == [0]
+    assert index.search("ax") == []
+
+def test_serialization_round_trip():
+    """Test that the index survives serialization"""
+    index = TrigramIndex.build(TEXT)
+    restored = TrigramIndex.from_bytes(index.to_bytes())
+    
+    assert restored.terms == index.terms
+    assert np.array_equal(restored.token_ends, index.token_ends)
+    assert restored.search("Jonathon Smith") == index.search("Jonathon Smith")
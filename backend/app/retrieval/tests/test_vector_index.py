@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from app.retrieval.vector_index import VectorIndex
+from app.text_chunking.models import DocumentChunk
+
+def make_chunk(ordinal, vector):
+    return DocumentChunk(
+        pk=DocumentChunk.build_pk("file123", ordinal),
+        file_id="file123",
+        ordinal=ordinal,
+        start_offset=0,
+        end_offset=1,
+        token_estimate=1,
+        text="x",
+        embedding=np.asarray(vector, dtype="<f4").tobytes() if vector is not None else None
+    )
+
+def test_search_returns_top_k_best_first():
+    """Test that search returns the k most similar rows in score order"""
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((100, 16)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    index = VectorIndex(matrix, np.arange(100))
+    query = matrix[42] + 0.01
+    
+    ids, scores = index.search(query, 5)
+    
+    expected = np.argsort(-(matrix @ (query / np.linalg.norm(query))))[:5]
+    assert list(ids) == list(expected)
+    assert ids[0] == 42
+    assert list(scores) == sorted(scores, reverse=True)
+
+def test_search_with_k_larger_than_index():
+    """Test that asking for more results than rows returns every row"""
+    index = VectorIndex(np.eye(3, dtype=np.float32), np.array([7, 8, 9]))
+    
+    ids, scores = index.search(np.array([0, 1, 0], dtype=np.float32), 10)
+    
+    assert ids[0] == 8
+    assert set(ids) == {7, 8, 9}
+    assert scores[0] == pytest.approx(1.0)
+
+def test_from_chunks_skips_chunks_without_embedding():
+    """Test that the index maps rows back to chunk ordinals"""
+    chunks = [make_chunk(0, [1, 0]), make_chunk(1, None), make_chunk(2, [0, 1])]
+    
+    index = VectorIndex.from_chunks(chunks)
+    
+    assert len(index) == 2
+    assert index.dimension == 2
+    assert index.matrix.flags["C_CONTIGUOUS"]
+    ids, _ = index.search(np.array([0, 1], dtype=np.float32), 1)
+    assert list(ids) == [2]
+
+def test_empty_index():
+    """Test that an index without vectors returns no results"""
+    index = VectorIndex.from_chunks([make_chunk(0, None)])
+    
+    ids, scores = index.search(np.zeros(4, dtype=np.float32), 3)
+    
+    assert len(ids) == 0 and len(scores) == 0
@@ -0,0 +1,108 @@
+import pytest
+from unittest.mock import AsyncMock
+from datetime import datetime, UTC
+from app.common.schemas import FileDTO
+from app.embedding.service import EmbeddingService
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
+from app.retrieval.service import RetrievalService
+from app.retrieval.strategies.vector_retriever import VectorRetriever
+from app.text_chunking.service import TextChunkingService
+from app.text_chunking.strategies.markdown import MarkdownChunker
+
+MARKDOWN = (
+    "# Parties\n\nThe agreement is between ACME Corp and Globex.\n\n"
+    "# Payment\n\nThe total amount due is 4,411 USD within 30 days.\n\n"
+    "# Termination\n\nEither party may terminate with notice."
+)
+
+@pytest.fixture
+def embedding_service():
+    return EmbeddingService(HashingEmbedder(dimension=256))
+
+@pytest.fixture
+def chunks(embedding_service):
+    """Create embedded chunks for the test document"""
+    chunks = TextChunkingService(MarkdownChunker(chunk_size=200, chunk_overlap=0)).chunk("file123", MARKDOWN)
+    embedding_service.embed_chunks(chunks)
+    return chunks
+
+@pytest.fixture
+def file_dto(chunks):
+    """Create a FileDTO for the test document"""
+    return FileDTO(
+        pk="file123",
+        filename="contract.pdf",
+        url="https://example.com/contract.pdf",
+        content=MARKDOWN,
+        markdown_content=MARKDOWN,
+        file_size=1024,
+        file_type="application/pdf",
+        processing_status="completed",
+        embedding_status="completed",
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+        metadata={"chunk_count": len(chunks), "embedding_model": "hashing-256"},
+        history={}
+    )
+
+@pytest.fixture
+def retriever(embedding_service, chunks):
+    """Create a VectorRetriever backed by a mocked chunk repository"""
+    chunk_repository = AsyncMock()
+    chunk_repository.get_chunks.return_value = chunks
+    return VectorRetriever(embedding_service=embedding_service, chunk_repository=chunk_repository)
+
+@pytest.mark.asyncio
+async def test_retrieve_ranks_relevant_chunk_first(retriever, file_dto):
+    """Test that the chunk answering the query is ranked first"""
+    passages = await retriever.retrieve("what is the total amount due?", file_dto, 2)
+    
+    assert len(passages) == 2
+    assert "total amount due" in passages[0].text
+    assert passages[0].score >= passages[1].score
+    assert MARKDOWN[passages[0].start_offset:passages[0].end_offset] == passages[0].text
+
+@pytest.mark.asyncio
+async def test_retrieve_maps_passages_by_ordinal(retriever, file_dto, chunks):
+    """Test that a chunk missing from the loaded ones does not shift the text of the others"""
+    retriever.chunk_repository.get_chunks.return_value = [chunk for chunk in chunks if chunk.ordinal != 0]
+    
+    passages = await retriever.retrieve("what is the total amount due?", file_dto, len(chunks))
+    
+    assert 0 not in [passage.ordinal for passage in passages]
+    for passage in passages:
+        assert MARKDOWN[passage.start_offset:passage.end_offset] == passage.text
+    assert "total amount due" in passages[0].text
+
+@pytest.mark.asyncio
+async def test_retrieve_caches_loaded_index(retriever, file_dto):
+    """Test that the chunks are loaded once per file"""
+    await retriever.retrieve("total", file_dto, 1)
+    await retriever.retrieve("parties", file_dto, 1)
+    
+    retriever.chunk_repository.get_chunks.assert_called_once_with("file123", file_dto.metadata["chunk_count"])
+
+@pytest.mark.asyncio
+async def test_retrieve_skips_files_without_embeddings(retriever, file_dto):
+    """Test that files whose embedding did not complete produce no passages"""
+    file_dto.embedding_status = "error"
+    
+    assert await retriever.retrieve("total", file_dto, 3) == []
+    retriever.chunk_repository.get_chunks.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_retrieve_skips_other_embedding_model(retriever, file_dto):
+    """Test that vectors from a different embedding model are not compared"""
+    file_dto.metadata["embedding_model"] = "models/text-embedding-004"
+    
+    assert await retriever.retrieve("total", file_dto, 3) == []
+
+@pytest.mark.asyncio
+async def test_retrieval_service_swallows_errors(file_dto):
+    """Test that retrieval failures produce no passages instead of an error"""
+    retriever = AsyncMock()
+    retriever.retrieve.side_effect = Exception("DynamoDB unavailable")
+    service = RetrievalService(retriever=retriever, top_k=3)
+    
+    assert await service.retrieve("total", file_dto) == []
+    retriever.retrieve.assert_called_once_with("total", file_dto, 3)
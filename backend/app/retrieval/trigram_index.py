@@ -0,0 +1,296 @@
+"""
+Trigram index over the words of a file's markdown content for typo-tolerant search.
+"""
+import io
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+from app.retrieval.lexical_index import TOKEN_PATTERN
+
+# Kind under which the serialized index is stored next to the file record
+TRIGRAM_INDEX_ARTIFACT = "trigrams"
+
+
+class TrigramMatch(NamedTuple):
+    start_offset: int
+    end_offset: int
+    distance: int
+
+
+def trigrams(term: str) -> List[str]:
+    """
+    Returns the distinct trigrams of a term, padded so its start and end count twice.
+    """
+    padded = f"  {term} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def edit_distances(word: str, candidates: List[str]) -> np.ndarray:
+    """
+    Computes the Levenshtein distance between a word and many candidates at once.
+
+    The dynamic programming table is filled one cell at a time for all candidates
+    together, so the cost in Python operations depends on the word and candidate
+    lengths but not on the number of candidates.
+
+    Args:
+        word: The word
+        candidates: The candidate strings (must not contain NUL characters)
+
+    Returns:
+        The distance to each candidate
+    """
+    if not candidates:
+        return np.zeros(0, dtype=np.int32)
+    width = max(len(candidate) for candidate in candidates)
+    # One column per candidate, NUL padded past its end
+    codes = np.frombuffer(
+        "".join(candidate.ljust(width, "\0") for candidate in candidates).encode("utf-32-le"), dtype=np.uint32
+    ).reshape(len(candidates), width).T
+    lengths = np.fromiter((len(candidate) for candidate in candidates), dtype=np.int64, count=len(candidates))
+
+    previous = np.repeat(np.arange(width + 1, dtype=np.int32)[:, None], len(candidates), axis=1)
+    for i, char in enumerate(word, start=1):
+        current = np.empty_like(previous)
+        current[0] = i
+        for j in range(1, width + 1):
+            substitution = previous[j - 1] + (codes[j - 1] != ord(char))
+            current[j] = np.minimum(np.minimum(previous[j], current[j - 1]) + 1, substitution)
+        previous = current
+    return previous[lengths, np.arange(len(candidates))]
+
+
+class TrigramIndex:
+    """
+    Trigram posting lists over the distinct words of a document.
+
+    Every word of the text is a token; tokens are lowercased and mapped to terms.
+    Postings are kept in compressed sparse row form, like the BM25 index: the
+    terms containing trigram g are gram_terms[gram_offsets[g]:gram_offsets[g + 1]]
+    and the token positions of term t are term_tokens[term_offsets[t]:term_offsets[t + 1]].
+    A misspelled query word is matched by counting the trigrams each term shares
+    with it, then verifying the best candidates with a bounded edit distance.
+    """
+    def __init__(
+        self,
+        terms: List[str],
+        grams: List[str],
+        gram_offsets: np.ndarray,
+        gram_terms: np.ndarray,
+        term_offsets: np.ndarray,
+        term_tokens: np.ndarray,
+        token_starts: np.ndarray,
+        token_ends: np.ndarray
+    ):
+        """
+        Initialize the index from its arrays.
+
+        Args:
+            terms: Distinct lowercase words
+            grams: Distinct trigrams of the terms
+            gram_offsets: Start of each trigram's postings in gram_terms (len(grams) + 1 entries)
+            gram_terms: Term IDs, grouped by trigram
+            term_offsets: Start of each term's tokens in term_tokens (len(terms) + 1 entries)
+            term_tokens: Token positions, grouped by term and ascending
+            token_starts: Start offset of each token in the text
+            token_ends: End offset of each token in the text
+        """
+        self.terms = terms
+        self.grams = grams
+        self.gram_ids: Dict[str, int] = {gram: i for i, gram in enumerate(grams)}
+        self.gram_offsets = gram_offsets
+        self.gram_terms = gram_terms
+        self.term_offsets = term_offsets
+        self.term_tokens = term_tokens
+        self.token_starts = token_starts
+        self.token_ends = token_ends
+        self.term_lengths = np.fromiter((len(term) for term in terms), dtype=np.int32, count=len(terms))
+
+    @classmethod
+    def build(cls, text: str) -> "TrigramIndex":
+        """
+        Build the index over the words of a text.
+
+        Args:
+            text: The markdown content
+
+        Returns:
+            A TrigramIndex
+        """
+        term_ids: Dict[str, int] = {}
+        token_terms, token_starts, token_ends = [], [], []
+        for match in TOKEN_PATTERN.finditer(text):
+            token_terms.append(term_ids.setdefault(match.group().lower(), len(term_ids)))
+            token_starts.append(match.start())
+            token_ends.append(match.end())
+        terms = list(term_ids)
+
+        token_terms = np.asarray(token_terms, dtype=np.int32)
+        term_tokens = np.argsort(token_terms, kind="stable").astype(np.int32)
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        term_offsets[1:] = np.cumsum(np.bincount(token_terms, minlength=len(terms)))
+
+        gram_ids: Dict[str, int] = {}
+        pair_grams, pair_terms = [], []
+        for term_id, term in enumerate(terms):
+            for gram in trigrams(term):
+                pair_grams.append(gram_ids.setdefault(gram, len(gram_ids)))
+                pair_terms.append(term_id)
+        pair_grams = np.asarray(pair_grams, dtype=np.int32)
+        order = np.argsort(pair_grams, kind="stable")
+        gram_offsets = np.zeros(len(gram_ids) + 1, dtype=np.int64)
+        gram_offsets[1:] = np.cumsum(np.bincount(pair_grams, minlength=len(gram_ids)))
+
+        return cls(
+            terms=terms,
+            grams=list(gram_ids),
+            gram_offsets=gram_offsets,
+            gram_terms=np.asarray(pair_terms, dtype=np.int32)[order],
+            term_offsets=term_offsets,
+            term_tokens=term_tokens,
+            token_starts=np.asarray(token_starts, dtype=np.int64),
+            token_ends=np.asarray(token_ends, dtype=np.int64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.token_starts)
+
+    def similar_terms(self, word: str, max_distance: int, max_candidates: int = 256) -> Dict[int, int]:
+        """
+        Find the terms within an edit distance of a word.
+
+        A term within distance k shares at least len(trigrams(word)) - 3k trigrams
+        with the word, since one edit changes at most three padded trigrams; terms
+        below that count, or whose length differs by more than k, are skipped
+        without computing their distance. The remaining candidates are verified
+        together with a vectorized edit distance.
+
+        Args:
+            word: The lowercase word
+            max_distance: Maximum edit distance
+            max_candidates: Maximum number of terms verified, most shared trigrams first
+
+        Returns:
+            Mapping of term ID to edit distance
+        """
+        grams = [self.gram_ids[gram] for gram in trigrams(word) if gram in self.gram_ids]
+        if not grams:
+            return {}
+        postings = np.concatenate([self.gram_terms[self.gram_offsets[g]:self.gram_offsets[g + 1]] for g in grams])
+        shared = np.bincount(postings, minlength=len(self.terms))
+
+        required = max(len(trigrams(word)) - 3 * max_distance, 1)
+        candidates = np.flatnonzero(
+            (shared >= required) & (np.abs(self.term_lengths - len(word)) <= max_distance)
+        )
+        if len(candidates) > max_candidates:
+            best = np.argpartition(-shared[candidates], max_candidates - 1)[:max_candidates]
+            candidates = candidates[best]
+
+        candidates = candidates.tolist()
+        distances = edit_distances(word, [self.terms[term_id] for term_id in candidates])
+        return {
+            term_id: int(distance) for term_id, distance in zip(candidates, distances.tolist())
+            if distance <= max_distance
+        }
+
+    def search(self, query: str, max_distance: int = 2) -> List[TrigramMatch]:
+        """
+        Find the spans of consecutive words matching the words of the query.
+
+        The distance of a span is the sum of the edit distances of its words. The
+        distance allowed grows with the number of characters in the query words
+        (none up to 3, 1 up to 6, 2 beyond), capped by max_distance; words shorter
+        than 3 characters must match exactly.
+
+        Args:
+            query: The query text
+            max_distance: Maximum edit distance of a match
+
+        Returns:
+            The matches, closest first and then in document order
+        """
+        words = [match.group().lower() for match in TOKEN_PATTERN.finditer(query)]
+        if not words or not len(self.token_starts):
+            return []
+
+        budget = min(max_distance, max(0, (sum(len(word) for word in words) - 1) // 3))
+        starts: Optional[np.ndarray] = None
+        distances: Optional[np.ndarray] = None
+        for i, word in enumerate(words):
+            similar = self.similar_terms(word, budget if len(word) >= 3 else 0)
+            if not similar:
+                return []
+            # Token positions where a match starting i words earlier would be
+            positions = np.concatenate([
+                self.term_tokens[self.term_offsets[t]:self.term_offsets[t + 1]] for t in similar
+            ]).astype(np.int64) - i
+            word_distances = np.concatenate([
+                np.full(self.term_offsets[t + 1] - self.term_offsets[t], d, dtype=np.int64) for t, d in similar.items()
+            ])
+            order = np.argsort(positions)
+            positions, word_distances = positions[order], word_distances[order]
+            if starts is None:
+                starts, distances = positions, word_distances
+            else:
+                starts, left, right = np.intersect1d(starts, positions, assume_unique=True, return_indices=True)
+                distances = distances[left] + word_distances[right]
+                within = distances <= budget
+                starts, distances = starts[within], distances[within]
+            if not len(starts):
+                return []
+
+        ends = starts + len(words) - 1
+        order = np.lexsort((starts, distances))
+        return [
+            TrigramMatch(int(self.token_starts[start]), int(self.token_ends[end]), int(distance))
+            for start, end, distance in zip(starts[order].tolist(), ends[order].tolist(), distances[order].tolist())
+        ]
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the index into a compact compressed form.
+
+        Returns:
+            The serialized index
+        """
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            terms=np.frombuffer("\n".join(self.terms).encode("utf-8"), dtype=np.uint8),
+            grams=np.frombuffer("\n".join(self.grams).encode("utf-8"), dtype=np.uint8),
+            gram_offsets=self.gram_offsets,
+            gram_terms=self.gram_terms,
+            term_offsets=self.term_offsets,
+            term_tokens=self.term_tokens,
+            # Gaps between token starts are small and compress much better than offsets
+            token_gaps=np.diff(self.token_starts, prepend=0).astype(np.int32),
+            token_lengths=(self.token_ends - self.token_starts).astype(np.int32)
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TrigramIndex":
+        """
+        Deserialize an index produced by to_bytes.
+
+        Args:
+            data: The serialized index
+
+        Returns:
+            A TrigramIndex
+        """
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            terms = arrays["terms"].tobytes().decode("utf-8")
+            # Trigrams are padded with spaces but never contain a newline
+            grams = arrays["grams"].tobytes().decode("utf-8")
+            token_starts = np.cumsum(arrays["token_gaps"], dtype=np.int64)
+            return cls(
+                terms=terms.split("\n") if terms else [],
+                grams=grams.split("\n") if grams else [],
+                gram_offsets=arrays["gram_offsets"],
+                gram_terms=arrays["gram_terms"],
+                term_offsets=arrays["term_offsets"],
+                term_tokens=arrays["term_tokens"],
+                token_starts=token_starts,
+                token_ends=token_starts + arrays["token_lengths"]
+            )
@@ -0,0 +1,85 @@
+"""
+In-memory vector index over a file's chunk embeddings.
+"""
+from typing import List, Tuple
+import numpy as np
+from app.embedding.embedder import EMBEDDING_DTYPE
+from app.text_chunking.models import DocumentChunk
+
+
+class VectorIndex:
+    """
+    Contiguous matrix of unit-length embeddings answering top-k cosine queries.
+    
+    A query is scored against every row with a single matrix-vector product and
+    the best rows are selected with argpartition, so only the k winners are sorted.
+    """
+    def __init__(self, matrix: np.ndarray, ids: np.ndarray):
+        """
+        Initialize the index.
+        
+        Args:
+            matrix: Matrix of shape (rows, dimension) with L2-normalized rows
+            ids: Identifier of each row (for chunks, the chunk ordinal)
+        """
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.ids = np.asarray(ids)
+        if self.matrix.ndim != 2 or len(self.matrix) != len(self.ids):
+            raise ValueError("matrix must be two-dimensional with one id per row")
+    
+    @classmethod
+    def from_chunks(cls, chunks: List[DocumentChunk]) -> "VectorIndex":
+        """
+        Build an index from the embeddings stored on the chunks.
+        
+        Chunks without an embedding are skipped.
+        
+        Args:
+            chunks: The chunks of a file
+            
+        Returns:
+            A VectorIndex whose ids are the chunk ordinals
+        """
+        embedded = [chunk for chunk in chunks if chunk.embedding]
+        if not embedded:
+            return cls(np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.int64))
+        
+        # One join and one copy into a contiguous matrix instead of a row-by-row stack
+        matrix = np.frombuffer(b"".join(chunk.embedding for chunk in embedded), dtype=EMBEDDING_DTYPE)
+        ids = np.fromiter((chunk.ordinal for chunk in embedded), dtype=np.int64, count=len(embedded))
+        return cls(matrix.reshape(len(embedded), -1), ids)
+    
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def search(self, query: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows most similar to the query.
+        
+        Args:
+            query: The query vector
+            top_k: Maximum number of results
+            
+        Returns:
+            Tuple of (ids, cosine scores), best first
+        """
+        k = min(top_k, len(self.ids))
+        if k <= 0:
+            return self.ids[:0], np.zeros(0, dtype=np.float32)
+        
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        
+        scores = self.matrix @ query
+        if k < len(scores):
+            candidates = np.argpartition(scores, -k)[-k:]
+        else:
+            candidates = np.arange(len(scores))
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return self.ids[order], scores[order]
@@ -0,0 +1,241 @@
+"""
+Corpus-level index over the chunks of every completed file.
+"""
+import math
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.retrieval.lexical_index import LexicalIndex, tokenize
+from app.search.ivf_index import IVFIndex
+from app.search.vector_store import VectorStore
+from app.infrastructure.config import settings
+
+
+class CorpusHit(NamedTuple):
+    file_id: str
+    ordinal: int
+    score: float
+
+
+class CorpusLexicalIndex:
+    """
+    BM25 over the whole corpus, merged from the per-file indexes built at ingest.
+
+    Each file's index is kept as a segment whose documents are numbered from the
+    segment's first row. Term statistics (document frequency, average length) are
+    summed across segments at query time, so adding a file never rewrites the
+    postings of the files already indexed.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.segments: List[Tuple[LexicalIndex, int]] = []
+        self.term_segments: Dict[str, List[int]] = {}
+        self.document_count = 0
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return self.document_count
+
+    def add(self, index: LexicalIndex, first_row: int) -> None:
+        """
+        Add a file's index as a new segment.
+
+        Args:
+            index: The file's lexical index
+            first_row: Corpus row of the file's first chunk
+        """
+        segment = len(self.segments)
+        self.segments.append((index, first_row))
+        for term in index.terms:
+            self.term_segments.setdefault(term, []).append(segment)
+        self.document_count += len(index)
+        self.total_length += int(index.doc_lengths.sum())
+
+    def search(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rank the corpus rows against the query with BM25.
+
+        Args:
+            query: The query text
+            top_k: Maximum number of results
+
+        Returns:
+            Tuple of (corpus rows, scores), best first
+        """
+        if top_k <= 0 or not self.document_count:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        average_length = max(self.total_length / self.document_count, 1.0)
+        rows: List[np.ndarray] = []
+        contributions: List[np.ndarray] = []
+
+        for term in set(tokenize(query)):
+            segments = self.term_segments.get(term)
+            if not segments:
+                continue
+            postings = []
+            for segment in segments:
+                index, first_row = self.segments[segment]
+                term_id = index.term_ids[term]
+                postings.append((index, first_row, index.term_offsets[term_id], index.term_offsets[term_id + 1]))
+
+            document_frequency = sum(end - start for _, _, start, end in postings)
+            idf = math.log(1 + (self.document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            for index, first_row, start, end in postings:
+                docs = index.postings_docs[start:end]
+                tf = index.postings_tf[start:end].astype(np.float32)
+                length_norm = self.k1 * (1 - self.b + self.b * index.doc_lengths[docs] / average_length)
+                rows.append(docs.astype(np.int64) + first_row)
+                contributions.append(idf * tf * (self.k1 + 1) / (tf + length_norm))
+
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        matched, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+        k = min(top_k, len(matched))
+        best = np.argpartition(scores, -k)[-k:] if k < len(matched) else np.arange(len(matched))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return matched[best], scores[best]
+
+
+class CorpusIndex:
+    """
+    Hybrid index over the chunks of every indexed file.
+
+    Every chunk gets a corpus row when its file is added. Vectors go into an
+    in-memory IVF index, or into a memory-mapped VectorStore when one is given,
+    and lexical postings into a merged BM25 index; the two rankings are combined
+    with weighted reciprocal-rank fusion. Files are added one at a time, so the
+    index grows incrementally as files complete.
+    """
+    def __init__(
+        self,
+        vector_index: Optional[IVFIndex] = None,
+        lexical_index: Optional[CorpusLexicalIndex] = None,
+        vector_store: Optional[VectorStore] = None,
+        vector_weight: Optional[float] = None,
+        lexical_weight: Optional[float] = None,
+        rrf_k: Optional[int] = None
+    ):
+        """
+        Initialize an empty corpus index.
+
+        Args:
+            vector_index: ANN index for the chunk embeddings
+            lexical_index: BM25 index for the chunk texts
+            vector_store: On-disk store used for the embeddings instead of vector_index
+            vector_weight: Weight of the vector ranking (defaults to settings.HYBRID_VECTOR_WEIGHT)
+            lexical_weight: Weight of the lexical ranking (defaults to settings.HYBRID_LEXICAL_WEIGHT)
+            rrf_k: Rank damping constant (defaults to settings.HYBRID_RRF_K)
+        """
+        self.vector_index = IVFIndex() if vector_index is None else vector_index
+        self.lexical_index = CorpusLexicalIndex() if lexical_index is None else lexical_index
+        self.vector_store = vector_store
+        self.vector_weight = settings.HYBRID_VECTOR_WEIGHT if vector_weight is None else vector_weight
+        self.lexical_weight = settings.HYBRID_LEXICAL_WEIGHT if lexical_weight is None else lexical_weight
+        self.rrf_k = rrf_k or settings.HYBRID_RRF_K
+        self.file_names: Dict[str, str] = {}
+        self._row_files: List[str] = []
+        self._row_ordinals: List[int] = []
+
+    def __contains__(self, file_id: str) -> bool:
+        return file_id in self.file_names
+
+    def __len__(self) -> int:
+        return len(self._row_files)
+
+    @property
+    def vector_count(self) -> int:
+        return len(self.vector_store) if self.vector_store is not None else len(self.vector_index)
+
+    def has_vectors(self, file_id: str) -> bool:
+        """
+        Checks whether the file's embeddings are already persisted in the vector store.
+
+        Args:
+            file_id: The ID of the file
+
+        Returns:
+            True if the file can be added without its embeddings
+        """
+        return self.vector_store is not None and file_id in self.vector_store
+
+    def add_file(
+        self,
+        file_id: str,
+        file_name: str,
+        chunk_count: int,
+        embeddings: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        lexical_index: Optional[LexicalIndex] = None
+    ) -> None:
+        """
+        Add the chunks of a file to the index.
+
+        Args:
+            file_id: The ID of the file
+            file_name: The original file name
+            chunk_count: Number of chunks of the file
+            embeddings: Optional (chunk ordinals, embedding matrix)
+            lexical_index: Optional BM25 index over the file's chunks
+        """
+        if file_id in self.file_names:
+            return
+        first_row = len(self._row_files)
+        self.file_names[file_id] = file_name
+        self._row_files.extend([file_id] * chunk_count)
+        self._row_ordinals.extend(range(chunk_count))
+
+        if embeddings is not None:
+            ordinals, matrix = embeddings
+            if self.vector_store is not None:
+                self.vector_store.append([(file_id, np.asarray(ordinals, dtype=np.int32), matrix)])
+            else:
+                self.vector_index.add(matrix, np.asarray(ordinals, dtype=np.int64) + first_row)
+        if lexical_index is not None:
+            self.lexical_index.add(lexical_index, first_row)
+
+    def search(self, query: str, query_vector: Optional[np.ndarray], top_k: int) -> List[CorpusHit]:
+        """
+        Rank the corpus chunks against the query.
+
+        Args:
+            query: The query text
+            query_vector: The embedded query, or None to rank lexically only
+            top_k: Maximum number of hits
+
+        Returns:
+            The best hits, best first
+        """
+        rankings = []
+        if query_vector is not None and self.vector_weight and self.vector_count:
+            if self.vector_store is not None:
+                refs = [(file_id, ordinal) for file_id, ordinal, _ in self.vector_store.search(query_vector, top_k)]
+                # Files persisted by another worker are not searchable here until they are added
+                refs = [ref for ref in refs if ref[0] in self.file_names]
+            else:
+                refs = self._refs(self.vector_index.search(query_vector, top_k)[0])
+            rankings.append((refs, self.vector_weight))
+        if self.lexical_weight:
+            rankings.append((self._refs(self.lexical_index.search(query, top_k)[0]), self.lexical_weight))
+
+        scores: Dict[Tuple[str, int], float] = {}
+        for refs, weight in rankings:
+            for rank, ref in enumerate(refs, start=1):
+                scores[ref] = scores.get(ref, 0.0) + weight / (self.rrf_k + rank)
+
+        best = sorted(scores, key=lambda ref: (-scores[ref], ref))[:top_k]
+        return [CorpusHit(file_id, ordinal, scores[(file_id, ordinal)]) for file_id, ordinal in best]
+
+    def _refs(self, rows: np.ndarray) -> List[Tuple[str, int]]:
+        """
+        Maps corpus rows to (file ID, ordinal).
+        """
+        return [(self._row_files[row], self._row_ordinals[row]) for row in rows.tolist()]
@@ -0,0 +1,205 @@
+"""
+Inverted-file (IVF) approximate nearest neighbour index over unit-length vectors.
+"""
+import math
+from typing import Optional, Tuple
+import numpy as np
+
+# Rows scored at once when assigning vectors to cells, to bound the temporary matrix
+ASSIGN_BLOCK_ROWS = 8192
+
+
+class IVFIndex:
+    """
+    Cosine index that partitions vectors into cells around k-means centroids.
+
+    A query is scored against the centroids first and only the vectors of the
+    nprobe closest cells are scored exactly, so query cost grows with the size of
+    a few cells instead of the whole corpus. Until train_threshold vectors have
+    been added the index is searched exhaustively. Vectors added after training
+    are assigned to their closest cell; the centroids are retrained once the index
+    has grown by retrain_factor since the last training.
+    """
+    def __init__(
+        self,
+        nprobe: int = 8,
+        train_threshold: int = 2048,
+        retrain_factor: float = 4.0,
+        iterations: int = 10,
+        seed: int = 0
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            nprobe: Number of cells scored per query
+            train_threshold: Number of vectors before the first training
+            retrain_factor: Growth since the last training that triggers a new one
+            iterations: Number of k-means iterations per training
+            seed: Seed of the k-means initialization
+        """
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.retrain_factor = retrain_factor
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._size = 0
+        self._trained_size = 0
+        self._cell_offsets: Optional[np.ndarray] = None
+        self._cell_rows: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dimension(self) -> int:
+        return self._matrix.shape[1]
+
+    @property
+    def cell_count(self) -> int:
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """
+        Add vectors to the index.
+
+        Args:
+            vectors: Matrix of shape (rows, dimension) with L2-normalized rows
+            ids: Identifier of each row
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors must be two-dimensional with one id per row")
+        if not len(vectors):
+            return
+        if self._size and vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, got {vectors.shape[1]}")
+
+        start, end = self._size, self._size + len(vectors)
+        self._reserve(end, vectors.shape[1])
+        self._matrix[start:end] = vectors
+        self._ids[start:end] = ids
+        self._size = end
+
+        if self.centroids is None:
+            if self._size >= self.train_threshold:
+                self.train()
+        elif self._size >= self._trained_size * self.retrain_factor:
+            self.train()
+        else:
+            self._assignments[start:end] = self._assign(self._matrix[start:end])
+            self._cell_offsets = self._cell_rows = None
+
+    def train(self) -> None:
+        """
+        Cluster the vectors with spherical k-means and reassign every vector to its cell.
+        """
+        if not self._size:
+            return
+        vectors = self._matrix[:self._size]
+        cell_count = min(self._size, max(1, int(math.sqrt(self._size))))
+        rng = np.random.default_rng(self.seed)
+
+        # Train on a sample; 64 points per cell is plenty to place the centroids
+        sample_size = min(self._size, cell_count * 64)
+        sample = vectors[rng.choice(self._size, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=cell_count, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            # Reseed empty cells with random sample points
+            sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            norms[empty] = np.linalg.norm(sums[empty], axis=1)
+            centroids = sums / np.maximum(norms, 1e-12)[:, None]
+
+        self.centroids = centroids.astype(np.float32)
+        self._assignments[:self._size] = self._assign(vectors)
+        self._trained_size = self._size
+        self._cell_offsets = self._cell_rows = None
+
+    def search(self, query: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the vectors most similar to the query.
+
+        Args:
+            query: The query vector
+            top_k: Maximum number of results
+
+        Returns:
+            Tuple of (ids, cosine scores), best first
+        """
+        if top_k <= 0 or not self._size:
+            return self._ids[:0], np.zeros(0, dtype=np.float32)
+
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        if self.centroids is None:
+            rows = np.arange(self._size)
+        else:
+            rows = self._probe(query)
+
+        scores = self._matrix[rows] @ query
+        k = min(top_k, len(rows))
+        if k < len(rows):
+            best = np.argpartition(scores, -k)[-k:]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return self._ids[rows[best]], scores[best]
+
+    def _probe(self, query: np.ndarray) -> np.ndarray:
+        """
+        Returns the rows of the nprobe cells closest to the query.
+        """
+        if self._cell_offsets is None:
+            self._cell_rows = np.argsort(self._assignments[:self._size], kind="stable")
+            self._cell_offsets = np.zeros(self.cell_count + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(self._assignments[:self._size], minlength=self.cell_count),
+                out=self._cell_offsets[1:]
+            )
+
+        cell_scores = self.centroids @ query
+        nprobe = min(self.nprobe, self.cell_count)
+        cells = np.argpartition(cell_scores, -nprobe)[-nprobe:]
+        return np.concatenate([
+            self._cell_rows[self._cell_offsets[cell]:self._cell_offsets[cell + 1]] for cell in cells
+        ])
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Returns the closest cell of each vector.
+        """
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+            block = vectors[start:start + ASSIGN_BLOCK_ROWS]
+            labels[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return labels
+
+    def _reserve(self, rows: int, dimension: int) -> None:
+        """
+        Grows the buffers geometrically so appends are amortized constant time.
+        """
+        if rows <= len(self._matrix):
+            return
+        capacity = max(rows, 2 * len(self._matrix), 1024)
+        matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        assignments = np.zeros(capacity, dtype=np.int32)
+        if self._size:
+            matrix[:self._size] = self._matrix[:self._size]
+        ids[:self._size] = self._ids[:self._size]
+        assignments[:self._size] = self._assignments[:self._size]
+        self._matrix, self._ids, self._assignments = matrix, ids, assignments
@@ -0,0 +1,117 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.common.exceptions import IndexNotReadyError
+from .schemas import FuzzySearchResponse, PhraseSearchResponse, SearchResponse
+from .service import SearchService
+
+# Seconds a client waits before retrying a search whose index is being built
+INDEX_RETRY_AFTER_SECONDS = "5"
+
+class SearchRouter:
+    """
+    Router for searching across all processed files.
+    """
+    
+    def __init__(self):
+        """
+        Initialize the SearchRouter with a router and service.
+        """
+        self.router = APIRouter(prefix="/search")
+        self.service = SearchService()
+        self.register_routes()
+    
+    def register_routes(self):
+        """
+        Register all routes for the search router.
+        """
+        
+        @self.router.get("/", response_model=SearchResponse)
+        async def search_files(
+            q: str = Query(..., min_length=1, description="The search query"),
+            limit: int = Query(10, ge=1, le=50, description="Maximum number of hits to return"),
+            cursor: Optional[str] = Query(None, description="Cursor returned with the previous page")
+        ) -> SearchResponse:
+            """
+            Search the chunks of every completed file.
+            
+            Args:
+                q: The search query
+                limit: Maximum number of hits to return
+                cursor: Cursor returned with the previous page
+                
+            Returns:
+                A page of hits with the cursor of the next page
+                
+            Raises:
+                HTTPException: If the query or cursor is invalid or there is an error
+            """
+            try:
+                return await self.service.search(q, limit, cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error searching files: {str(e)}")
+        
+        @self.router.get("/phrase", response_model=PhraseSearchResponse)
+        async def find_phrase(
+            pk: str = Query(..., description="ID of the file to search"),
+            q: str = Query(..., min_length=1, description="The exact phrase to find"),
+            limit: int = Query(100, ge=1, le=1000, description="Maximum number of occurrences to return")
+        ) -> PhraseSearchResponse:
+            """
+            Find every occurrence of an exact phrase in a file.
+            
+            Args:
+                pk: ID of the file to search
+                q: The exact phrase to find
+                limit: Maximum number of occurrences to return
+                
+            Returns:
+                The number of occurrences and their offsets
+                
+            Raises:
+                HTTPException: If the file is not found or not ready, its index is being built, or there is an error
+            """
+            try:
+                return await self.service.find_phrase(pk, q, limit)
+            except IndexNotReadyError as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": INDEX_RETRY_AFTER_SECONDS})
+            except ValueError as e:
+                if "not found" in str(e):
+                    raise HTTPException(status_code=404, detail=str(e))
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error searching file: {str(e)}")
+        
+        @self.router.get("/fuzzy", response_model=FuzzySearchResponse)
+        async def fuzzy_search(
+            pk: str = Query(..., description="ID of the file to search"),
+            q: str = Query(..., min_length=1, description="The words to find, possibly misspelled"),
+            max_distance: Optional[int] = Query(None, ge=0, le=4, description="Maximum edit distance of a match"),
+            limit: int = Query(20, ge=1, le=1000, description="Maximum number of matches to return")
+        ) -> FuzzySearchResponse:
+            """
+            Find the spans of a file matching the query words with typos.
+            
+            Args:
+                pk: ID of the file to search
+                q: The words to find
+                max_distance: Maximum edit distance of a match
+                limit: Maximum number of matches to return
+                
+            Returns:
+                The number of matches and their offsets, closest first
+                
+            Raises:
+                HTTPException: If the file is not found or not ready, its index is being built, or there is an error
+            """
+            try:
+                return await self.service.fuzzy_search(pk, q, limit, max_distance)
+            except IndexNotReadyError as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": INDEX_RETRY_AFTER_SECONDS})
+            except ValueError as e:
+                if "not found" in str(e):
+                    raise HTTPException(status_code=404, detail=str(e))
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error searching file: {str(e)}")
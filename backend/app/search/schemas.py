@@ -0,0 +1,58 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class SearchHit(BaseModel):
+    """
+    A chunk of a file matching a corpus-wide search.
+    """
+    pk: str = Field(..., description="ID of the file the chunk belongs to")
+    file_name: str = Field(..., description="Original file name")
+    ordinal: int = Field(..., description="Position of the chunk in the file")
+    start_offset: int = Field(..., description="Start of the chunk in the file's markdown content")
+    end_offset: int = Field(..., description="End of the chunk in the file's markdown content")
+    snippet: str = Field(..., description="Single-line excerpt of the chunk around the first matching term")
+    score: float = Field(..., description="Fused relevance score")
+
+class SearchResponse(BaseModel):
+    """
+    A page of corpus-wide search results.
+    """
+    query: str = Field(..., description="The search query")
+    hits: List[SearchHit] = Field(default_factory=list, description="Matching chunks, best first")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, if there is one")
+
+class PhraseMatch(BaseModel):
+    """
+    An occurrence of an exact phrase in a file.
+    """
+    start_offset: int = Field(..., description="Start of the occurrence in the file's markdown content")
+    end_offset: int = Field(..., description="End of the occurrence in the file's markdown content")
+    snippet: str = Field(..., description="Single-line excerpt around the occurrence")
+
+class PhraseSearchResponse(BaseModel):
+    """
+    The occurrences of an exact phrase in a file.
+    """
+    pk: str = Field(..., description="ID of the searched file")
+    phrase: str = Field(..., description="The searched phrase")
+    total: int = Field(..., description="Number of occurrences in the file")
+    matches: List[PhraseMatch] = Field(default_factory=list, description="The first occurrences, in document order")
+
+class FuzzyMatch(BaseModel):
+    """
+    A span of a file matching the words of a query within an edit distance.
+    """
+    start_offset: int = Field(..., description="Start of the span in the file's markdown content")
+    end_offset: int = Field(..., description="End of the span in the file's markdown content")
+    text: str = Field(..., description="The matched text")
+    distance: int = Field(..., description="Edit distance between the query words and the matched words")
+    snippet: str = Field(..., description="Single-line excerpt around the span")
+
+class FuzzySearchResponse(BaseModel):
+    """
+    The spans of a file matching a query with typos.
+    """
+    pk: str = Field(..., description="ID of the searched file")
+    query: str = Field(..., description="The search query")
+    total: int = Field(..., description="Number of matching spans in the file")
+    matches: List[FuzzyMatch] = Field(default_factory=list, description="The closest matches, then in document order")
@@ -0,0 +1,431 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Union
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from app.common.exceptions import IndexNotReadyError
+from app.embedding.embedder import EMBEDDING_DTYPE
+from app.embedding.service import EmbeddingService
+from app.common.cache import LRUCache
+from app.file_processing.artifact_repository import FileArtifactRepository
+from app.file_processing.models import FileProcessingRecord
+from app.file_processing.repository import FileProcessingRepository
+from app.retrieval.lexical_index import LexicalIndex, LEXICAL_INDEX_ARTIFACT, make_snippet, tokenize
+from app.retrieval.suffix_array import SuffixArray, SUFFIX_ARRAY_ARTIFACT
+from app.retrieval.trigram_index import TrigramIndex, TRIGRAM_INDEX_ARTIFACT
+from app.search.corpus_index import CorpusIndex
+from app.search.ivf_index import IVFIndex
+from app.search.schemas import FuzzyMatch, FuzzySearchResponse, PhraseMatch, PhraseSearchResponse, SearchHit, SearchResponse
+from app.search.vector_store import VectorStore
+from app.text_chunking.repository import ChunkRepository
+from app.infrastructure.config import settings
+
+logger = logging.getLogger(__name__)
+
+class SearchService:
+    """
+    Service for searching the chunks of every completed file at once.
+
+    The corpus index lives in memory and is filled incrementally: before a search,
+    and at most once per refresh interval, the completed files updated since the
+    previous refresh are read from the status index of the table and the ones
+    that are not indexed yet are loaded concurrently and added, a bounded number
+    per refresh so a cold worker catches up over several searches. Exact phrases and
+    misspelled words are looked up per file, in the suffix array and trigram index
+    built at ingest time. Requests never build an index: one missing for a file
+    processed before it existed is built in the background, in a worker thread,
+    and the request is answered with IndexNotReadyError until it is ready.
+    """
+
+    def __init__(
+        self,
+        corpus_index: Optional[CorpusIndex] = None,
+        embedding_service: Optional[EmbeddingService] = None,
+        file_repository: Optional[FileProcessingRepository] = None,
+        chunk_repository: Optional[ChunkRepository] = None,
+        artifact_repository: Optional[FileArtifactRepository] = None,
+        refresh_interval: Optional[float] = None,
+        snippet_chars: int = 300
+    ):
+        """
+        Initializes the search service.
+
+        Args:
+            corpus_index: The corpus index to fill (default: an empty CorpusIndex, backed by
+                the on-disk vector store when settings.VECTOR_STORE_DIR is set)
+            embedding_service: Service used to embed queries (must match the ingest embedder)
+            file_repository: Repository used to find completed files
+            chunk_repository: Repository used to load chunks
+            artifact_repository: Repository used to load the per-file BM25, suffix array and trigram indexes
+            refresh_interval: Minimum seconds between queries for new files
+                (defaults to settings.SEARCH_REFRESH_SECONDS)
+            snippet_chars: Maximum number of characters per snippet
+        """
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.corpus_index = self._create_corpus_index() if corpus_index is None else corpus_index
+        self.file_repository = file_repository or FileProcessingRepository()
+        self.chunk_repository = chunk_repository or ChunkRepository()
+        self.artifact_repository = artifact_repository or FileArtifactRepository()
+        self.refresh_interval = settings.SEARCH_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        self.snippet_chars = snippet_chars
+        self._refreshed_at: Optional[float] = None
+        # Latest updated_at among the completed records read so far
+        self._updated_since: Optional[str] = None
+        self._refresh_lock = asyncio.Lock()
+        self._file_indexes = LRUCache(settings.RETRIEVAL_CACHE_SIZE)
+        # Background builds of the per-file indexes missing from storage, by cache key
+        self._index_builds: Dict[tuple, asyncio.Task] = {}
+
+    async def search(self, query: str, limit: int, cursor: Optional[str] = None) -> SearchResponse:
+        """
+        Searches the chunks of every completed file.
+
+        Args:
+            query: The search query
+            limit: Maximum number of hits in the page
+            cursor: Cursor returned with the previous page, if any
+
+        Returns:
+            A page of hits, best first
+
+        Raises:
+            ValueError: If the query is empty or the cursor is invalid
+        """
+        if not query.strip():
+            raise ValueError("Search query must not be empty")
+        offset = self._decode_cursor(cursor, query) if cursor else 0
+
+        await self.refresh()
+
+        # Ranks are recomputed per page; the depth is capped so deep pages stay cheap
+        depth = min(offset + limit, settings.SEARCH_MAX_RESULTS)
+        query_vector = await self.embedding_service.embed_query_async(query) if self.corpus_index.vector_count else None
+        ranked = self.corpus_index.search(query, query_vector, depth + 1)
+        page = ranked[offset:depth]
+
+        chunks = await self.chunk_repository.get_chunks_at([(hit.file_id, hit.ordinal) for hit in page])
+        chunks_by_ref = {(chunk.file_id, chunk.ordinal): chunk for chunk in chunks}
+        terms = set(tokenize(query))
+
+        hits = []
+        for hit in page:
+            chunk = chunks_by_ref.get((hit.file_id, hit.ordinal))
+            if chunk is None:
+                continue
+            hits.append(SearchHit(
+                pk=hit.file_id,
+                file_name=self.corpus_index.file_names[hit.file_id],
+                ordinal=hit.ordinal,
+                start_offset=chunk.start_offset,
+                end_offset=chunk.end_offset,
+                snippet=make_snippet(chunk.text, terms, self.snippet_chars),
+                score=hit.score
+            ))
+
+        has_more = len(ranked) > depth and depth < settings.SEARCH_MAX_RESULTS
+        return SearchResponse(
+            query=query,
+            hits=hits,
+            next_cursor=self._encode_cursor(depth, query) if has_more else None
+        )
+
+    async def find_phrase(self, file_id: str, phrase: str, limit: int) -> PhraseSearchResponse:
+        """
+        Finds every occurrence of an exact phrase in a file.
+
+        Args:
+            file_id: The ID of the file
+            phrase: The phrase, matched character for character (case-sensitive)
+            limit: Maximum number of occurrences in the response
+
+        Returns:
+            The number of occurrences and the first ones, in document order
+
+        Raises:
+            ValueError: If the phrase is empty or the file is not found or not ready
+            IndexNotReadyError: If the file's suffix array is still being built
+        """
+        if not phrase:
+            raise ValueError("Phrase must not be empty")
+        record = await self._get_completed_record(file_id)
+
+        suffix_array = await self._load_file_index(record, SUFFIX_ARRAY_ARTIFACT)
+        offsets = suffix_array.find(phrase)
+        text = record.markdown_content
+        matches = [
+            PhraseMatch(
+                start_offset=start,
+                end_offset=start + len(phrase),
+                snippet=self._line_snippet(text, start, start + len(phrase))
+            )
+            for start in offsets[:limit].tolist()
+        ]
+        return PhraseSearchResponse(pk=file_id, phrase=phrase, total=len(offsets), matches=matches)
+
+    async def fuzzy_search(self, file_id: str, query: str, limit: int, max_distance: Optional[int] = None) -> FuzzySearchResponse:
+        """
+        Finds the spans of a file matching the words of a query, allowing typos.
+
+        Args:
+            file_id: The ID of the file
+            query: The query words
+            limit: Maximum number of matches in the response
+            max_distance: Maximum edit distance of a match (defaults to settings.FUZZY_MAX_DISTANCE)
+
+        Returns:
+            The number of matches and the first ones, closest first
+
+        Raises:
+            ValueError: If the query has no words or the file is not found or not ready
+            IndexNotReadyError: If the file's trigram index is still being built
+        """
+        if not tokenize(query):
+            raise ValueError("Search query must contain at least one word")
+        record = await self._get_completed_record(file_id)
+
+        trigram_index = await self._load_file_index(record, TRIGRAM_INDEX_ARTIFACT)
+        found = trigram_index.search(query, settings.FUZZY_MAX_DISTANCE if max_distance is None else max_distance)
+        text = record.markdown_content
+        matches = [
+            FuzzyMatch(
+                start_offset=match.start_offset,
+                end_offset=match.end_offset,
+                text=text[match.start_offset:match.end_offset],
+                distance=match.distance,
+                snippet=self._line_snippet(text, match.start_offset, match.end_offset)
+            )
+            for match in found[:limit]
+        ]
+        return FuzzySearchResponse(pk=file_id, query=query, total=len(found), matches=matches)
+
+    async def _get_completed_record(self, file_id: str) -> FileProcessingRecord:
+        """
+        Loads a file record, checking that the file is ready to be searched.
+        """
+        record = await self.file_repository.get_item({"pk": file_id}, FileProcessingRecord)
+        if not record:
+            raise ValueError(f"File with ID {file_id} not found")
+        if record.processing_status != "completed":
+            raise ValueError(f"File processing is not complete. Current status: {record.processing_status}")
+        return record
+
+    async def _load_file_index(self, record: FileProcessingRecord, kind: str) -> Union[SuffixArray, TrigramIndex]:
+        """
+        Loads a per-file index of the markdown content, using the cache when possible.
+
+        Files processed before the index was stored get one built from their content
+        in the background (see _start_index_build).
+
+        Args:
+            record: The completed file record
+            kind: SUFFIX_ARRAY_ARTIFACT or TRIGRAM_INDEX_ARTIFACT
+
+        Returns:
+            The file's SuffixArray or TrigramIndex
+
+        Raises:
+            IndexNotReadyError: If the index is not stored and is being built
+        """
+        text = record.markdown_content
+        key = (record.pk, kind, len(text))
+        cached = self._file_indexes.get(key)
+        if cached is not None:
+            return cached
+
+        data = None
+        if kind in (record.metadata or {}).get("artifacts", []):
+            data = await self.artifact_repository.get_artifact(record.pk, kind)
+        if data is None:
+            self._start_index_build(key, SuffixArray.build if kind == SUFFIX_ARRAY_ARTIFACT else TrigramIndex.build, text)
+            raise IndexNotReadyError(f"The {kind} index of file {record.pk} is being built, retry shortly")
+        index = SuffixArray.from_bytes(data, text) if kind == SUFFIX_ARRAY_ARTIFACT else TrigramIndex.from_bytes(data)
+        self._file_indexes.put(key, index)
+        return index
+
+    def _start_index_build(self, key: tuple, build, text: str) -> None:
+        """
+        Builds a per-file index in a worker thread and caches it, unless it is already being built.
+
+        Args:
+            key: The cache key of the index
+            build: SuffixArray.build or TrigramIndex.build
+            text: The markdown content of the file
+        """
+        if key in self._index_builds:
+            return
+
+        async def run():
+            try:
+                self._file_indexes.put(key, await run_in_threadpool(build, text))
+                logger.info(f"Built the {key[1]} index of file {key[0]}")
+            except Exception as e:
+                logger.error(f"Error building the {key[1]} index of file {key[0]}: {str(e)}")
+            finally:
+                self._index_builds.pop(key, None)
+
+        self._index_builds[key] = asyncio.create_task(run())
+
+    async def refresh(self, force: bool = False) -> int:
+        """
+        Adds the completed files that are not indexed yet.
+
+        Args:
+            force: Query even if the refresh interval has not elapsed
+
+        Returns:
+            Number of files added to the index
+        """
+        async with self._refresh_lock:
+            now = time.monotonic()
+            if not force and self._refreshed_at is not None and now - self._refreshed_at < self.refresh_interval:
+                return 0
+
+            key_condition = "#status = :completed"
+            values = {":completed": "completed"}
+            if self._updated_since is not None:
+                # The index is eventually consistent and updated_at is stamped before the write
+                # lands, so records are read again from a margin before the latest one seen
+                since = datetime.fromisoformat(self._updated_since) - timedelta(seconds=settings.SEARCH_REFRESH_OVERLAP_SECONDS)
+                key_condition += " AND #updated >= :since"
+                values[":since"] = since.isoformat()
+            records = await self.file_repository.query(
+                key_condition_expression=key_condition,
+                expression_attribute_values=values,
+                expression_attribute_names={
+                    "#pk": "pk",
+                    "#name": "file_name",
+                    "#status": "processing_status",
+                    "#embedding": "embedding_status",
+                    "#metadata": "metadata",
+                    "#updated": "updated_at"
+                },
+                index_name=settings.FILE_STATUS_INDEX,
+                projection_expression="#pk, #name, #status, #embedding, #metadata, #updated"
+            )
+
+            # A cold worker may find every file of the table: files are loaded a few at a
+            # time and at most SEARCH_REFRESH_MAX_FILES per refresh, oldest first
+            pending = sorted(
+                (record for record in records if record["pk"] not in self.corpus_index),
+                key=lambda record: record.get("updated_at") or ""
+            )
+            deferred = pending[settings.SEARCH_REFRESH_MAX_FILES:]
+            semaphore = asyncio.Semaphore(settings.SEARCH_REFRESH_CONCURRENCY)
+
+            async def add(record: Dict[str, Any]) -> bool:
+                async with semaphore:
+                    try:
+                        await self.index_file(record)
+                        return True
+                    except Exception as e:
+                        logger.error(f"Error adding file {record['pk']} to the search index: {str(e)}")
+                        return False
+
+            loaded = await asyncio.gather(*(add(record) for record in pending[:settings.SEARCH_REFRESH_MAX_FILES]))
+            added = sum(loaded)
+            failed = [record.get("updated_at") for record, ok in zip(pending, loaded) if not ok]
+
+            updated = [record["updated_at"] for record in records if record.get("updated_at")]
+            remaining = failed + [record.get("updated_at") for record in deferred]
+            if remaining:
+                # Files that could not be added or were left for later are read again at the next refresh
+                self._updated_since = None if None in remaining else min(remaining)
+            elif updated:
+                self._updated_since = max(updated)
+            # The next search resumes right away while files are left for later
+            self._refreshed_at = None if deferred else time.monotonic()
+            if added:
+                logger.info(f"Added {added} files to the search index ({len(self.corpus_index)} chunks)")
+            return added
+
+    async def index_file(self, record: Dict[str, Any]) -> None:
+        """
+        Loads a completed file's chunks and BM25 index and adds them to the corpus index.
+
+        Args:
+            record: The file record (pk, file_name, embedding_status and metadata)
+        """
+        file_id = record["pk"]
+        metadata = record.get("metadata") or {}
+        chunk_count = int(metadata.get("chunk_count", 0))
+
+        embeddings = None
+        model_name = metadata.get("embedding_model")
+        compatible = record.get("embedding_status") == "completed" and model_name == self.embedding_service.embedder.model_name
+        # Embeddings persisted by an earlier run or another worker are not loaded again
+        if compatible and not self.corpus_index.has_vectors(file_id):
+            chunks = await self.chunk_repository.get_chunks(file_id, chunk_count)
+            embedded = [chunk for chunk in chunks if chunk.embedding]
+            if embedded:
+                matrix = np.frombuffer(b"".join(chunk.embedding for chunk in embedded), dtype=EMBEDDING_DTYPE)
+                embeddings = (
+                    np.fromiter((chunk.ordinal for chunk in embedded), dtype=np.int64, count=len(embedded)),
+                    matrix.reshape(len(embedded), -1)
+                )
+
+        lexical_index = None
+        if LEXICAL_INDEX_ARTIFACT in metadata.get("artifacts", []):
+            data = await self.artifact_repository.get_artifact(file_id, LEXICAL_INDEX_ARTIFACT)
+            if data is not None:
+                lexical_index = LexicalIndex.from_bytes(data)
+
+        self.corpus_index.add_file(file_id, record.get("file_name", ""), chunk_count, embeddings, lexical_index)
+
+    def _create_corpus_index(self) -> CorpusIndex:
+        """
+        Creates the default corpus index, with one vector store directory per embedding model.
+        """
+        vector_store = None
+        if settings.VECTOR_STORE_DIR:
+            vector_store = VectorStore(
+                os.path.join(settings.VECTOR_STORE_DIR, self.embedding_service.embedder.model_name),
+                dtype=settings.VECTOR_STORE_DTYPE,
+                max_segments=settings.VECTOR_STORE_MAX_SEGMENTS,
+                rescore=settings.VECTOR_STORE_RESCORE,
+                rescore_factor=settings.VECTOR_STORE_RESCORE_FACTOR
+            )
+        return CorpusIndex(IVFIndex(nprobe=settings.SEARCH_IVF_NPROBE), vector_store=vector_store)
+
+    def _line_snippet(self, text: str, start: int, end: int) -> str:
+        """
+        Cuts a single-line snippet of the line holding text[start:end], centered on it.
+        """
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", end)
+        line_end = len(text) if line_end == -1 else line_end
+        margin = max(self.snippet_chars - (end - start), 0) // 2
+        snippet_start = max(line_start, start - margin)
+        snippet_end = min(line_end, end + margin)
+        prefix = "..." if snippet_start > line_start else ""
+        suffix = "..." if snippet_end < line_end else ""
+        return f"{prefix}{' '.join(text[snippet_start:snippet_end].split())}{suffix}"
+
+    def _encode_cursor(self, offset: int, query: str) -> str:
+        """
+        Encodes the position of the next page as an opaque cursor bound to the query.
+        """
+        payload = json.dumps({"offset": offset, "query": self._query_digest(query)})
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def _decode_cursor(self, cursor: str, query: str) -> int:
+        """
+        Decodes a cursor produced by _encode_cursor for the same query.
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            offset = int(payload["offset"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Invalid search cursor")
+        if offset < 0 or payload.get("query") != self._query_digest(query):
+            raise ValueError("Invalid search cursor")
+        return offset
+
+    @staticmethod
+    def _query_digest(query: str) -> str:
+        return hashlib.sha256(" ".join(tokenize(query)).encode("utf-8")).hexdigest()[:16]
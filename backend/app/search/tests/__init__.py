@@ -0,0 +1 @@
+# Tests for the search module 
\ No newline at end of file
@@ -0,0 +1,75 @@
+import numpy as np
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
+from app.retrieval.lexical_index import LexicalIndex
+from app.search.corpus_index import CorpusIndex, CorpusLexicalIndex
+from app.search.vector_store import VectorStore
+
+FILES = {
+    "file1": ["Invoice 4411 was paid in full.", "Reach billing at the main office."],
+    "file2": ["The lease renews every March.", "Invoice 4412 is under dispute.", "Parking is included."],
+    "file3": ["Quarterly revenue grew by ten percent."]
+}
+
+def build_corpus(embedder=None, **kwargs):
+    corpus = CorpusIndex(**kwargs)
+    for file_id, texts in FILES.items():
+        embeddings = None
+        if embedder is not None:
+            embeddings = (np.arange(len(texts)), embedder.embed(texts))
+        corpus.add_file(file_id, f"{file_id}.pdf", len(texts), embeddings, LexicalIndex.build(texts))
+    return corpus
+
+def test_merged_lexical_index_matches_single_index():
+    """Test that BM25 over merged segments scores like one index over all documents"""
+    texts = [text for file_texts in FILES.values() for text in file_texts]
+    merged = CorpusLexicalIndex()
+    first_row = 0
+    for file_texts in FILES.values():
+        merged.add(LexicalIndex.build(file_texts), first_row)
+        first_row += len(file_texts)
+    
+    rows, scores = merged.search("invoice dispute", 10)
+    expected_rows, expected_scores = LexicalIndex.build(texts).search("invoice dispute", 10)
+    
+    assert list(rows) == list(expected_rows)
+    assert np.allclose(scores, expected_scores, rtol=1e-5)
+
+def test_search_returns_file_and_ordinal():
+    """Test that hits point back to the file and chunk they came from"""
+    corpus = build_corpus(vector_weight=0.0)
+    
+    hits = corpus.search("invoice 4412", None, 5)
+    
+    assert (hits[0].file_id, hits[0].ordinal) == ("file2", 1)
+    assert {hit.file_id for hit in hits} == {"file1", "file2"}
+
+def test_hybrid_search_uses_vectors():
+    """Test that vector hits are fused with lexical hits"""
+    embedder = HashingEmbedder(dimension=256)
+    corpus = build_corpus(embedder)
+    
+    hits = corpus.search("revenue growth", embedder.embed_query("revenue growth"), 3)
+    
+    assert (hits[0].file_id, hits[0].ordinal) == ("file3", 0)
+    assert len(corpus.vector_index) == 6
+
+def test_add_file_is_idempotent():
+    """Test that adding an indexed file again does not duplicate its chunks"""
+    corpus = build_corpus()
+    corpus.add_file("file1", "file1.pdf", 2, None, LexicalIndex.build(FILES["file1"]))
+    
+    assert len(corpus) == 6
+    assert "file1" in corpus
+    assert len(corpus.lexical_index.segments) == 3
+
+def test_hybrid_search_with_vector_store(tmp_path):
+    """Test that the on-disk vector store can replace the in-memory IVF index"""
+    embedder = HashingEmbedder(dimension=256)
+    corpus = build_corpus(embedder, vector_store=VectorStore(str(tmp_path)))
+    
+    hits = corpus.search("revenue growth", embedder.embed_query("revenue growth"), 3)
+    
+    assert (hits[0].file_id, hits[0].ordinal) == ("file3", 0)
+    assert len(corpus.vector_index) == 0
+    assert corpus.vector_count == 6
+    assert corpus.has_vectors("file2")
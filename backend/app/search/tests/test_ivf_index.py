@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from app.search.ivf_index import IVFIndex
+
+def unit_vectors(count, dimension, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((count, dimension)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+def test_untrained_index_is_exact():
+    """Test that below the training threshold every vector is scored"""
+    matrix = unit_vectors(100, 16)
+    index = IVFIndex(train_threshold=1000)
+    index.add(matrix, np.arange(100) + 1000)
+    
+    ids, scores = index.search(matrix[42], 5)
+    
+    assert index.centroids is None
+    assert list(ids) == list(np.argsort(-(matrix @ matrix[42]))[:5] + 1000)
+    assert list(scores) == sorted(scores, reverse=True)
+
+def test_trained_index_finds_near_duplicates():
+    """Test that probing the closest cells finds a perturbed copy of an indexed vector"""
+    matrix = unit_vectors(4000, 32)
+    index = IVFIndex(nprobe=4, train_threshold=1000)
+    index.add(matrix, np.arange(4000))
+    
+    assert index.cell_count > 1
+    found = 0
+    for row in range(0, 4000, 97):
+        ids, _ = index.search(matrix[row] + 0.05 * unit_vectors(1, 32, seed=row)[0], 1)
+        found += ids[0] == row
+    assert found / len(range(0, 4000, 97)) >= 0.9
+
+def test_incremental_adds_train_and_assign():
+    """Test that vectors added in batches are trained once and later batches are assigned"""
+    matrix = unit_vectors(3000, 16)
+    index = IVFIndex(nprobe=64, train_threshold=1000, retrain_factor=10)
+    for start in range(0, 3000, 500):
+        index.add(matrix[start:start + 500], np.arange(start, start + 500))
+    
+    assert len(index) == 3000
+    assert index._trained_size == 1000
+    ids, scores = index.search(matrix[2999], 1)
+    assert ids[0] == 2999
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+def test_add_rejects_dimension_mismatch():
+    """Test that vectors of a different dimension are rejected"""
+    index = IVFIndex()
+    index.add(unit_vectors(2, 8), np.arange(2))
+    
+    with pytest.raises(ValueError):
+        index.add(unit_vectors(2, 16), np.arange(2))
+
+def test_search_empty_index():
+    """Test that searching an empty index returns nothing"""
+    ids, scores = IVFIndex().search(np.ones(8, dtype=np.float32), 5)
+    
+    assert len(ids) == 0
+    assert len(scores) == 0
@@ -0,0 +1,332 @@
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+from app.common.exceptions import IndexNotReadyError
+from app.embedding.service import EmbeddingService
+from app.embedding.strategies.hashing_embedder import HashingEmbedder
+from app.file_processing.models import FileProcessingRecord
+from app.retrieval.lexical_index import LexicalIndex
+from app.retrieval.suffix_array import SuffixArray
+from app.retrieval.trigram_index import TrigramIndex
+from app.search.corpus_index import CorpusIndex
+from app.search.service import SearchService
+from app.search.vector_store import VectorStore
+from app.text_chunking.service import TextChunkingService
+from app.text_chunking.strategies.markdown import MarkdownChunker
+from app.infrastructure.config import settings
+
+DOCUMENTS = {
+    "file1": "# Invoices\n\nInvoice 4411 was paid in full.\n\n# Contacts\n\nReach billing at the main office.",
+    "file2": "# Lease\n\nThe lease renews every March.\n\n# Disputes\n\nInvoice 4412 is under dispute.",
+    "file3": "# Revenue\n\nQuarterly revenue grew by ten percent.\n\n# Outlook\n\nGrowth should continue."
+}
+
+@pytest.fixture
+def embedding_service():
+    return EmbeddingService(HashingEmbedder(dimension=256))
+
+@pytest.fixture
+def chunks(embedding_service):
+    """Chunk and embed every test document"""
+    chunking_service = TextChunkingService(MarkdownChunker(chunk_size=200, chunk_overlap=0))
+    chunks = {file_id: chunking_service.chunk(file_id, text) for file_id, text in DOCUMENTS.items()}
+    for file_chunks in chunks.values():
+        embedding_service.embed_chunks(file_chunks)
+    return chunks
+
+def make_record(file_id, chunks, model_name, updated_at="2024-04-06T12:00:00"):
+    return {
+        "pk": file_id,
+        "file_name": f"{file_id}.pdf",
+        "processing_status": "completed",
+        "embedding_status": "completed",
+        "updated_at": updated_at,
+        "metadata": {"chunk_count": len(chunks), "artifacts": ["bm25"], "embedding_model": model_name}
+    }
+
+@pytest.fixture
+def service(chunks, embedding_service):
+    """Create a SearchService backed by mocked repositories"""
+    model_name = embedding_service.embedder.model_name
+    file_repository = AsyncMock()
+    file_repository.query.return_value = [make_record(file_id, chunks[file_id], model_name) for file_id in ["file1", "file2"]]
+    
+    chunk_repository = AsyncMock()
+    chunk_repository.get_chunks.side_effect = lambda file_id, chunk_count: chunks[file_id]
+    chunk_repository.get_chunks_at.side_effect = lambda refs: [chunks[file_id][ordinal] for file_id, ordinal in refs]
+    
+    artifact_repository = AsyncMock()
+    artifact_repository.get_artifact.side_effect = lambda file_id, kind: LexicalIndex.build(
+        [chunk.text for chunk in chunks[file_id]]
+    ).to_bytes()
+    
+    return SearchService(
+        embedding_service=embedding_service,
+        file_repository=file_repository,
+        chunk_repository=chunk_repository,
+        artifact_repository=artifact_repository,
+        refresh_interval=60
+    )
+
+@pytest.mark.asyncio
+async def test_search_across_files(service):
+    """Test that hits come from every indexed file, with snippets"""
+    response = await service.search("invoice", 10)
+    
+    assert {hit.pk for hit in response.hits} == {"file1", "file2"}
+    assert all("Invoice" in hit.snippet for hit in response.hits[:2])
+    assert response.hits[0].file_name in {"file1.pdf", "file2.pdf"}
+    assert response.next_cursor is None
+
+@pytest.mark.asyncio
+async def test_cursor_pagination(service):
+    """Test that following the cursor returns the next hits without repeats"""
+    first = await service.search("invoice billing lease", 1)
+    second = await service.search("invoice billing lease", 1, first.next_cursor)
+    
+    assert first.next_cursor is not None
+    assert len(first.hits) == 1 and len(second.hits) == 1
+    assert (first.hits[0].pk, first.hits[0].ordinal) != (second.hits[0].pk, second.hits[0].ordinal)
+
+@pytest.mark.asyncio
+async def test_cursor_bound_to_query(service):
+    """Test that a cursor cannot be reused with another query"""
+    first = await service.search("invoice billing lease", 1)
+    
+    with pytest.raises(ValueError, match="Invalid search cursor"):
+        await service.search("revenue", 1, first.next_cursor)
+    with pytest.raises(ValueError, match="Invalid search cursor"):
+        await service.search("invoice billing lease", 1, "not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_refresh_adds_new_completed_files(service, chunks, embedding_service):
+    """Test that files completed after the first search are indexed incrementally"""
+    await service.search("revenue", 5)
+    service.file_repository.query.return_value.append(
+        make_record("file3", chunks["file3"], embedding_service.embedder.model_name)
+    )
+    
+    # Within the refresh interval the index is not rescanned
+    assert await service.refresh() == 0
+    assert await service.refresh(force=True) == 1
+    
+    response = await service.search("quarterly revenue", 5)
+    assert response.hits[0].pk == "file3"
+    assert service.artifact_repository.get_artifact.call_count == 3
+
+@pytest.mark.asyncio
+async def test_refresh_reads_only_recently_updated_files(service, chunks, embedding_service, monkeypatch):
+    """Test that after the first refresh only files updated since the latest one seen are queried"""
+    monkeypatch.setattr(settings, "SEARCH_REFRESH_OVERLAP_SECONDS", 60)
+    await service.refresh(force=True)
+    first = service.file_repository.query.call_args.kwargs
+    assert first["index_name"] == settings.FILE_STATUS_INDEX
+    assert first["key_condition_expression"] == "#status = :completed"
+    
+    service.file_repository.query.return_value = [
+        make_record("file3", chunks["file3"], embedding_service.embedder.model_name, "2024-04-06T12:05:00")
+    ]
+    assert await service.refresh(force=True) == 1
+    second = service.file_repository.query.call_args.kwargs
+    assert second["key_condition_expression"] == "#status = :completed AND #updated >= :since"
+    assert second["expression_attribute_values"][":since"] == "2024-04-06T11:59:00"
+    
+    await service.refresh(force=True)
+    assert service.file_repository.query.call_args.kwargs["expression_attribute_values"][":since"] == "2024-04-06T12:04:00"
+
+@pytest.mark.asyncio
+async def test_refresh_retries_failed_files(service, chunks, embedding_service):
+    """Test that a file that could not be indexed stays in the next refresh window"""
+    service.file_repository.query.return_value.append(
+        make_record("file3", chunks["file3"], embedding_service.embedder.model_name, "2024-04-06T11:00:00")
+    )
+    service.artifact_repository.get_artifact.side_effect = Exception("Throttled")
+    
+    assert await service.refresh(force=True) == 0
+    
+    assert service._updated_since == "2024-04-06T11:00:00"
+
+@pytest.mark.asyncio
+async def test_refresh_loads_a_bounded_number_of_files(service, chunks, embedding_service, monkeypatch):
+    """Test that a cold worker loads the oldest files first and the next search resumes with the rest"""
+    monkeypatch.setattr(settings, "SEARCH_REFRESH_MAX_FILES", 2)
+    model_name = embedding_service.embedder.model_name
+    service.file_repository.query.return_value = [
+        make_record("file1", chunks["file1"], model_name, "2024-04-06T12:02:00"),
+        make_record("file2", chunks["file2"], model_name, "2024-04-06T12:00:00"),
+        make_record("file3", chunks["file3"], model_name, "2024-04-06T12:01:00")
+    ]
+    
+    assert await service.refresh() == 2
+    assert {"file2", "file3"} == {file_id for file_id in chunks if file_id in service.corpus_index}
+    assert service._updated_since == "2024-04-06T12:02:00"
+    
+    # Not held back by the refresh interval while files are left
+    assert await service.refresh() == 1
+    assert "file1" in service.corpus_index
+    assert await service.refresh() == 0
+
+@pytest.mark.asyncio
+async def test_refresh_loads_files_concurrently(service, chunks, embedding_service, monkeypatch):
+    """Test that files are loaded concurrently, up to the configured limit"""
+    monkeypatch.setattr(settings, "SEARCH_REFRESH_CONCURRENCY", 2)
+    service.file_repository.query.return_value.append(make_record("file3", chunks["file3"], embedding_service.embedder.model_name))
+    active = []
+    peak = []
+    
+    async def get_chunks(file_id, chunk_count):
+        active.append(file_id)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(file_id)
+        return chunks[file_id]
+    service.chunk_repository.get_chunks.side_effect = get_chunks
+    
+    assert await service.refresh(force=True) == 3
+    assert max(peak) == 2
+
+@pytest.mark.asyncio
+async def test_refresh_skips_other_embedding_models(service, chunks):
+    """Test that files embedded with another model are only indexed lexically"""
+    service.file_repository.query.return_value = [make_record("file1", chunks["file1"], "other-model")]
+    
+    await service.refresh(force=True)
+    
+    assert len(service.corpus_index) == len(chunks["file1"])
+    assert len(service.corpus_index.vector_index) == 0
+    service.chunk_repository.get_chunks.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_search_rejects_empty_query(service):
+    """Test that an empty query is rejected"""
+    with pytest.raises(ValueError):
+        await service.search("   ", 10)
+
+@pytest.mark.asyncio
+async def test_persisted_vectors_are_not_reloaded(service, chunks, tmp_path):
+    """Test that a new worker reuses the embeddings persisted in the vector store"""
+    service.corpus_index = CorpusIndex(vector_store=VectorStore(str(tmp_path)))
+    await service.refresh(force=True)
+    
+    cold = SearchService(
+        corpus_index=CorpusIndex(vector_store=VectorStore(str(tmp_path))),
+        embedding_service=service.embedding_service,
+        file_repository=service.file_repository,
+        chunk_repository=AsyncMock(),
+        artifact_repository=service.artifact_repository
+    )
+    cold.chunk_repository.get_chunks_at.side_effect = service.chunk_repository.get_chunks_at.side_effect
+    response = await cold.search("invoice", 10)
+    
+    cold.chunk_repository.get_chunks.assert_not_called()
+    assert cold.corpus_index.vector_count == len(chunks["file1"]) + len(chunks["file2"])
+    assert {hit.pk for hit in response.hits} == {"file1", "file2"}
+
+def make_file_record(text, artifacts, processing_status="completed"):
+    return FileProcessingRecord(
+        pk="file1",
+        file_name="file1.pdf",
+        file_url="https://example.com/file1.pdf",
+        file_size=len(text),
+        file_type="application/pdf",
+        markdown_content=text,
+        processing_status=processing_status,
+        embedding_status="completed",
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+        metadata={"artifacts": artifacts}
+    )
+
+@pytest.mark.asyncio
+async def test_find_phrase_uses_stored_suffix_array(service):
+    """Test that every occurrence of a phrase is returned with offsets and line snippets"""
+    text = "# Parts\n\nPart AX-200 ships with AX-201.\nReplace AX-200 yearly."
+    service.file_repository.get_item.return_value = make_file_record(text, ["bm25", "suffixes"])
+    service.artifact_repository.get_artifact.side_effect = lambda file_id, kind: SuffixArray.build(text).to_bytes()
+    
+    response = await service.find_phrase("file1", "AX-200", 1)
+    
+    assert response.total == 2
+    assert len(response.matches) == 1
+    match = response.matches[0]
+    assert text[match.start_offset:match.end_offset] == "AX-200"
+    assert match.snippet == "Part AX-200 ships with AX-201."
+    service.artifact_repository.get_artifact.assert_called_once_with("file1", "suffixes")
+    
+    # The suffix array is cached
+    await service.find_phrase("file1", "AX-20", 10)
+    assert service.artifact_repository.get_artifact.call_count == 1
+
+@pytest.mark.asyncio
+async def test_find_phrase_builds_suffix_array_for_older_files(service):
+    """Test that a missing suffix array is built in the background, not by the request"""
+    service.file_repository.get_item.return_value = make_file_record("Net 30. Net 30 days.", ["bm25"])
+    
+    with pytest.raises(IndexNotReadyError):
+        await service.find_phrase("file1", "Net 30", 10)
+    with pytest.raises(IndexNotReadyError):
+        await service.find_phrase("file1", "Net 30", 10)
+    assert len(service._index_builds) == 1
+    await asyncio.gather(*service._index_builds.values())
+    
+    response = await service.find_phrase("file1", "Net 30", 10)
+    
+    assert [match.start_offset for match in response.matches] == [0, 8]
+    service.artifact_repository.get_artifact.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_find_phrase_rejects_missing_or_unfinished_files(service):
+    """Test that missing and unfinished files are rejected"""
+    service.file_repository.get_item.return_value = None
+    with pytest.raises(ValueError, match="not found"):
+        await service.find_phrase("file1", "Net 30", 10)
+    
+    service.file_repository.get_item.return_value = make_file_record("Net 30.", [], processing_status="extracted")
+    with pytest.raises(ValueError, match="not complete"):
+        await service.find_phrase("file1", "Net 30", 10)
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_finds_misspelled_names(service):
+    """Test that misspelled words are matched with their offsets, closest first"""
+    text = "# Contacts\n\nJonathan Smith handles billing.\nJonathan Smyth handles sales."
+    service.file_repository.get_item.return_value = make_file_record(text, ["bm25", "trigrams"])
+    service.artifact_repository.get_artifact.side_effect = lambda file_id, kind: TrigramIndex.build(text).to_bytes()
+    
+    response = await service.fuzzy_search("file1", "Jonathon Smith", 10)
+    
+    assert response.total == 2
+    assert [(match.text, match.distance) for match in response.matches] == [("Jonathan Smith", 1), ("Jonathan Smyth", 2)]
+    assert response.matches[0].snippet == "Jonathan Smith handles billing."
+    service.artifact_repository.get_artifact.assert_called_once_with("file1", "trigrams")
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_respects_max_distance(service):
+    """Test that the distance bound can be lowered per request"""
+    service.file_repository.get_item.return_value = make_file_record("Jonathan Smith", ["bm25", "trigrams"])
+    service.artifact_repository.get_artifact.side_effect = lambda file_id, kind: TrigramIndex.build("Jonathan Smith").to_bytes()
+    
+    response = await service.fuzzy_search("file1", "Jonathon Smith", 10, max_distance=0)
+    
+    assert response.total == 0
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_builds_trigram_index_for_older_files(service):
+    """Test that a missing trigram index is built in the background, not by the request"""
+    service.file_repository.get_item.return_value = make_file_record("Jonathan Smith", ["bm25"])
+    
+    with pytest.raises(IndexNotReadyError):
+        await service.fuzzy_search("file1", "Jonathon Smith", 10)
+    assert len(service._index_builds) == 1
+    await asyncio.gather(*service._index_builds.values())
+    
+    response = await service.fuzzy_search("file1", "Jonathon Smith", 10)
+    
+    assert [(match.text, match.distance) for match in response.matches] == [("Jonathan Smith", 1)]
+    service.artifact_repository.get_artifact.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_rejects_queries_without_words(service):
+    """Test that a query without words is rejected"""
+    with pytest.raises(ValueError):
+        await service.fuzzy_search("file1", "--", 10)
@@ -0,0 +1,148 @@
+import os
+import threading
+import numpy as np
+import pytest
+from app.search.vector_store import VectorSegment, VectorStore
+
+def unit_vectors(count, dimension, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((count, dimension)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+@pytest.fixture
+def matrix():
+    return unit_vectors(30, 16)
+
+def fill(store, matrix):
+    store.append([("file1", np.arange(10), matrix[:10])])
+    store.append([("file2", np.arange(10), matrix[10:20]), ("file3", np.arange(10), matrix[20:])])
+
+def test_segments_are_memory_mapped(tmp_path, matrix):
+    """Test that opened segments are read-only maps of the files"""
+    store = VectorStore(str(tmp_path))
+    fill(store, matrix)
+    
+    assert len(store.segments) == 2
+    assert all(isinstance(segment.codes, np.memmap) for segment in store.segments.values())
+    assert len(store) == 30
+    assert {"file1", "file2", "file3"} <= store.file_ids
+
+def test_search_across_segments(tmp_path, matrix):
+    """Test that search ranks the rows of every segment together"""
+    store = VectorStore(str(tmp_path))
+    fill(store, matrix)
+    
+    results = store.search(matrix[25], 3)
+    
+    assert results[0][:2] == ("file3", 5)
+    assert results[0][2] == pytest.approx(1.0, abs=1e-5)
+    expected = np.argsort(-(matrix @ matrix[25]))[:3]
+    assert [10 * ["file1", "file2", "file3"].index(file_id) + ordinal for file_id, ordinal, _ in results] == list(expected)
+
+def test_reopen_and_reload(tmp_path, matrix):
+    """Test that another worker sees the segments appended by the first one"""
+    writer = VectorStore(str(tmp_path))
+    reader = VectorStore(str(tmp_path))
+    fill(writer, matrix)
+    
+    assert reader.search(matrix[3], 1)[0][:2] == ("file1", 3)
+    assert "file2" in reader
+    assert reader.reload() is False
+
+def test_reload_waits_for_compaction(tmp_path, matrix):
+    """Test that a reader does not map the segments of a manifest while a writer holds the lock"""
+    writer = VectorStore(str(tmp_path))
+    reader = VectorStore(str(tmp_path))
+    fill(writer, matrix)
+    
+    with writer._lock():
+        reloading = threading.Thread(target=reader.reload)
+        reloading.start()
+        reloading.join(timeout=0.2)
+        assert reloading.is_alive()
+    reloading.join(timeout=5)
+    
+    assert not reloading.is_alive()
+    assert len(reader) == 30
+
+def test_append_skips_stored_files(tmp_path, matrix):
+    """Test that appending a file already in the store is a no-op"""
+    store = VectorStore(str(tmp_path))
+    fill(store, matrix)
+    
+    assert store.append([("file1", np.arange(10), matrix[:10])]) == 0
+    assert len(store) == 30
+
+def test_compaction_merges_segments(tmp_path, matrix):
+    """Test that exceeding max_segments compacts into one segment with the same results"""
+    store = VectorStore(str(tmp_path), max_segments=2)
+    before = None
+    for i in range(3):
+        store.append([(f"file{i}", np.arange(10), matrix[10 * i:10 * (i + 1)])])
+        if i == 1:
+            before = store.search(matrix[7], 5)
+    
+    assert len(store.segments) == 1
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith(".vec")) == list(store.segments)
+    assert store.search(matrix[7], 5)[:2] == before[:2]
+    assert store.file_ids == {"file0", "file1", "file2"}
+
+@pytest.mark.parametrize("dtype", ["int8", "binary"])
+def test_quantized_segments_rescore_exactly(tmp_path, matrix, dtype):
+    """Test that quantized segments re-score their shortlist with the float copy"""
+    store = VectorStore(str(tmp_path), dtype=dtype, rescore_factor=30)
+    fill(store, matrix)
+    
+    results = store.search(matrix[12], 5)
+    
+    expected = np.sort(matrix @ matrix[12])[::-1][:5]
+    assert results[0][:2] == ("file2", 2)
+    assert np.allclose([score for _, _, score in results], expected, atol=1e-6)
+
+def test_int8_without_rescoring(tmp_path, matrix):
+    """Test that int8 codes alone take a quarter of the float bytes and rank nearly like float32"""
+    store = VectorStore(str(tmp_path), dtype="int8", rescore=False)
+    fill(store, matrix)
+    
+    segment = next(iter(store.segments.values()))
+    assert segment.codes.dtype == np.int8
+    assert segment.floats is None
+    results = store.search(matrix[12], 3)
+    assert results[0][:2] == ("file2", 2)
+    assert results[0][2] == pytest.approx(1.0, abs=0.02)
+
+def test_binary_codes_are_sign_bits(tmp_path, matrix):
+    """Test that binary segments store one bit per dimension and score by sign agreement"""
+    store = VectorStore(str(tmp_path), dtype="binary", rescore=False)
+    store.append([("file1", np.arange(30), matrix)])
+    
+    segment = next(iter(store.segments.values()))
+    assert segment.codes.shape == (30, 2)
+    assert store.code_bytes == 30 * 2 + 30 * 8
+    file_id, ordinal, score = store.search(matrix[4], 1)[0]
+    assert (file_id, ordinal, score) == ("file1", 4, 1.0)
+
+def test_compaction_keeps_float_copy(tmp_path, matrix):
+    """Test that compacting quantized segments keeps the exact float vectors"""
+    store = VectorStore(str(tmp_path), dtype="int8", max_segments=1)
+    fill(store, matrix)
+    
+    segment = next(iter(store.segments.values()))
+    assert len(store.segments) == 1
+    assert np.allclose(np.sort(segment.vectors(0, 30), axis=0), np.sort(matrix, axis=0))
+
+def test_rejects_other_files(tmp_path):
+    """Test that a file that is not a segment is rejected"""
+    path = tmp_path / "segment-000001.vec"
+    path.write_bytes(b"not a segment" * 10)
+    
+    with pytest.raises(ValueError):
+        VectorSegment(str(path))
+
+def test_rejects_dimension_mismatch(tmp_path, matrix):
+    """Test that vectors of another dimension cannot be appended"""
+    store = VectorStore(str(tmp_path))
+    fill(store, matrix)
+    
+    with pytest.raises(ValueError):
+        store.append([("file4", np.arange(2), unit_vectors(2, 8))])
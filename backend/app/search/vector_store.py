@@ -0,0 +1,534 @@
+"""
+Memory-mapped on-disk store for chunk embeddings.
+
+A store is a directory holding a manifest and append-only segment files. Each
+segment is laid out as:
+
+    header   64 bytes: magic, version, dtype, dimension, rows, file table size, flags
+    codes    rows x dimension float32 values, int8 values, or packed sign bits
+    scales   rows float32 values (int8 segments only)
+    floats   rows x dimension float32 values (quantized segments kept for re-scoring)
+    ids      rows (file index, chunk ordinal) pairs
+    files    newline-separated file IDs referenced by the id table
+
+Every section starts on a 64-byte boundary so it can be mapped with numpy.memmap
+directly. Segments are opened read-only and paged in by the OS on demand, so
+opening a store costs a few small reads no matter how large the corpus is, and
+workers on the same host share the pages through the page cache.
+
+Quantized segments are searched in two passes: every row is scored on its int8
+or binary codes, and only a shortlist is re-scored exactly against the float
+copy. The full scan touches 4x (int8) or 32x (binary) fewer bytes, and the float
+section is only read a few rows at a time, so it rarely needs to stay resident.
+"""
+import fcntl
+import json
+import os
+import struct
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+
+MAGIC = b"SFSVEC01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIIQQI")
+ALIGNMENT = 64
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".lock"
+
+DTYPES = {"float32": 0, "int8": 1, "binary": 2}
+ID_DTYPE = np.dtype([("file", "<i4"), ("ordinal", "<i4")])
+
+# Header flag: the segment keeps a float32 copy of its quantized vectors
+FLAG_FLOATS = 1
+
+# Rows scored at once, to bound the temporary matrices of quantized segments
+SEARCH_BLOCK_ROWS = 65536
+# int8 rows are widened to float32 before the product; small blocks keep that copy in cache
+INT8_BLOCK_ROWS = 2048
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+    def _popcount(values: np.ndarray) -> np.ndarray:
+        return _POPCOUNT_TABLE[values]
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _code_shape(dtype: str, rows: int, dimension: int) -> Tuple[np.dtype, Tuple[int, int]]:
+    """
+    Returns the numpy type and shape of a segment's codes section.
+    """
+    if dtype == "float32":
+        return np.dtype(np.float32), (rows, dimension)
+    if dtype == "int8":
+        return np.dtype(np.int8), (rows, dimension)
+    return np.dtype(np.uint8), (rows, (dimension + 7) // 8)
+
+
+def _layout(dtype: str, rows: int, dimension: int, has_floats: bool) -> Dict[str, int]:
+    """
+    Returns the byte offset of each section of a segment.
+    """
+    code_dtype, code_shape = _code_shape(dtype, rows, dimension)
+    offsets = {"codes": ALIGNMENT}
+    offset = _align(ALIGNMENT + code_shape[0] * code_shape[1] * code_dtype.itemsize)
+    if dtype == "int8":
+        offsets["scales"] = offset
+        offset = _align(offset + rows * 4)
+    if has_floats:
+        offsets["floats"] = offset
+        offset = _align(offset + rows * dimension * 4)
+    offsets["ids"] = offset
+    offsets["files"] = _align(offset + rows * ID_DTYPE.itemsize)
+    return offsets
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Quantize L2-normalized vectors.
+
+    Args:
+        vectors: Matrix of shape (rows, dimension)
+        dtype: "float32", "int8" (symmetric, one scale per row) or "binary" (sign bits)
+
+    Returns:
+        Tuple of (codes, per-row scales or None)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "binary":
+        return np.packbits(vectors > 0, axis=1), None
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    return np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8), scales
+
+
+class VectorSegment:
+    """
+    A read-only, memory-mapped segment file.
+    """
+    def __init__(self, path: str):
+        """
+        Map a segment file.
+
+        Args:
+            path: Path of the segment file
+
+        Raises:
+            ValueError: If the file is not a segment of a supported version
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            magic, version, dtype_code, dimension, rows, files_size, flags = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION or dtype_code not in DTYPES.values():
+                raise ValueError(f"{path} is not a vector segment")
+            self.dtype = next(name for name, code in DTYPES.items() if code == dtype_code)
+            self.dimension = dimension
+            self.rows = rows
+
+            offsets = _layout(self.dtype, rows, dimension, bool(flags & FLAG_FLOATS))
+            self.codes = self._map(*_code_shape(self.dtype, rows, dimension), offsets["codes"])
+            self.scales = self._map(np.float32, (rows,), offsets["scales"]) if "scales" in offsets else None
+            self.floats = self._map(np.float32, (rows, dimension), offsets["floats"]) if "floats" in offsets else None
+            self.ids = self._map(ID_DTYPE, (rows,), offsets["ids"])
+
+            file.seek(offsets["files"])
+            files = file.read(files_size).decode("utf-8")
+            self.file_ids = files.split("\n") if files else []
+
+    @property
+    def code_bytes(self) -> int:
+        """
+        Bytes scanned by a query: the codes, scales and id table, without the float copy.
+        """
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0) + self.ids.nbytes
+
+    def _map(self, dtype, shape: Tuple[int, ...], offset: int) -> np.ndarray:
+        if not all(shape):
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+    def search(self, query: np.ndarray, top_k: int, rescore_factor: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score the rows of the segment against a unit-length query.
+
+        Float32 segments are scored exactly. Quantized segments are scored on their
+        codes; when the segment keeps a float copy, the best top_k * rescore_factor
+        rows are then re-scored exactly.
+
+        Args:
+            query: The normalized query vector
+            top_k: Maximum number of results
+            rescore_factor: Shortlist size, as a multiple of top_k, for re-scoring
+
+        Returns:
+            Tuple of (row numbers, cosine scores), best first
+        """
+        k = min(top_k, self.rows)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        scores = self._approximate_scores(query)
+        if self.floats is not None and self.dtype != "float32":
+            shortlist = _top(scores, min(self.rows, k * max(rescore_factor, 1)))
+            # Read the float rows in file order
+            shortlist.sort()
+            scores = np.asarray(self.floats[shortlist]) @ query
+            best = _top(scores, k)
+            return shortlist[best], scores[best]
+
+        best = _top(scores, k)
+        return best, scores[best]
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """
+        Scores every row on its codes, one block at a time.
+        """
+        scores = np.empty(self.rows, dtype=np.float32)
+        if self.dtype == "binary":
+            query_bits = np.packbits(query > 0)
+        block_rows = INT8_BLOCK_ROWS if self.dtype == "int8" else SEARCH_BLOCK_ROWS
+        for start in range(0, self.rows, block_rows):
+            block = self.codes[start:start + block_rows]
+            end = start + len(block)
+            if self.dtype == "float32":
+                scores[start:end] = block @ query
+            elif self.dtype == "int8":
+                scores[start:end] = (block.astype(np.float32) @ query) * self.scales[start:end]
+            else:
+                # Fraction of agreeing signs, rescaled to [-1, 1]
+                distances = _popcount(np.bitwise_xor(block, query_bits)).sum(axis=1, dtype=np.int32)
+                scores[start:end] = 1 - 2 * distances / self.dimension
+        return scores
+
+    def vectors(self, start: int, end: int) -> np.ndarray:
+        """
+        Returns rows [start, end) as float32 vectors (reconstructed from the codes if no float copy is kept).
+        """
+        if self.floats is not None:
+            return np.asarray(self.floats[start:end], dtype=np.float32)
+        block = np.asarray(self.codes[start:end])
+        if self.dtype == "float32":
+            return block.astype(np.float32)
+        if self.dtype == "int8":
+            return block.astype(np.float32) * self.scales[start:end, None]
+        signs = np.unpackbits(block, axis=1, count=self.dimension).astype(np.float32) * 2 - 1
+        return signs / np.sqrt(self.dimension)
+
+    @staticmethod
+    def write(
+        path: str,
+        blocks: Iterable[Tuple[np.ndarray, np.ndarray]],
+        file_ids: List[str],
+        rows: int,
+        dimension: int,
+        dtype: str = "float32",
+        keep_floats: bool = False
+    ) -> None:
+        """
+        Write a segment file atomically, one block of rows at a time.
+
+        The file is preallocated and its sections are filled through writable maps,
+        so writing (or compacting) a segment never holds more than one block in memory.
+
+        Args:
+            path: Path of the segment file
+            blocks: Iterable of (L2-normalized vectors, ids with ID_DTYPE), in row order
+            file_ids: File IDs referenced by the id tables
+            rows: Total number of rows in the blocks
+            dimension: Dimension of the vectors
+            dtype: Storage type of the codes, "float32", "int8" or "binary"
+            keep_floats: Keep a float32 copy of quantized vectors for re-scoring
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported vector store dtype: {dtype}")
+        has_floats = keep_floats and dtype != "float32"
+        files = "\n".join(file_ids).encode("utf-8")
+        offsets = _layout(dtype, rows, dimension, has_floats)
+        flags = FLAG_FLOATS if has_floats else 0
+
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, DTYPES[dtype], dimension, rows, len(files), flags))
+            file.seek(offsets["files"])
+            file.write(files)
+
+        if rows:
+            def writable(section_dtype, shape, offset):
+                return np.memmap(temporary_path, dtype=section_dtype, mode="r+", offset=offset, shape=shape)
+
+            sections = {
+                "codes": writable(*_code_shape(dtype, rows, dimension), offsets["codes"]),
+                "ids": writable(ID_DTYPE, (rows,), offsets["ids"])
+            }
+            if "scales" in offsets:
+                sections["scales"] = writable(np.float32, (rows,), offsets["scales"])
+            if has_floats:
+                sections["floats"] = writable(np.float32, (rows, dimension), offsets["floats"])
+
+            start = 0
+            for vectors, block_ids in blocks:
+                end = start + len(vectors)
+                codes, scales = quantize(vectors, dtype)
+                sections["codes"][start:end] = codes
+                sections["ids"][start:end] = block_ids
+                if scales is not None:
+                    sections["scales"][start:end] = scales
+                if has_floats:
+                    sections["floats"][start:end] = vectors
+                start = end
+            if start != rows:
+                raise ValueError(f"Expected {rows} rows, got {start}")
+            for section in sections.values():
+                section.flush()
+            del sections
+
+        with open(temporary_path, "rb+") as file:
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Returns the positions of the k best scores, best first.
+    """
+    best = np.argpartition(scores, -k)[-k:] if k < len(scores) else np.arange(len(scores))
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+class VectorStore:
+    """
+    Append-only, memory-mapped store of chunk embeddings keyed by (file ID, ordinal).
+
+    Each append writes a new immutable segment and publishes it by atomically
+    replacing the manifest. Readers remap only the segments they have not seen,
+    so several workers on the same host can share one store directory. Once
+    there are more than max_segments segments they are compacted into one.
+    """
+    def __init__(
+        self,
+        directory: str,
+        dtype: str = "float32",
+        max_segments: int = 8,
+        rescore: bool = True,
+        rescore_factor: int = 8
+    ):
+        """
+        Open (or create) a store.
+
+        Args:
+            directory: Directory of the store
+            dtype: Storage type of new segments, "float32", "int8" or "binary"
+            max_segments: Number of segments above which an append triggers compaction
+            rescore: Keep a float copy of quantized vectors and re-score shortlists with it
+            rescore_factor: Shortlist size, as a multiple of top_k, for re-scoring
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported vector store dtype: {dtype}")
+        self.directory = directory
+        self.dtype = dtype
+        self.max_segments = max_segments
+        self.rescore = rescore
+        self.rescore_factor = rescore_factor
+        self.segments: Dict[str, VectorSegment] = {}
+        self.file_ids: Set[str] = set()
+        self._generation = -1
+        os.makedirs(directory, exist_ok=True)
+        self.reload()
+
+    def __contains__(self, file_id: str) -> bool:
+        return file_id in self.file_ids
+
+    def __len__(self) -> int:
+        return sum(segment.rows for segment in self.segments.values())
+
+    @property
+    def code_bytes(self) -> int:
+        return sum(segment.code_bytes for segment in self.segments.values())
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return next((segment.dimension for segment in self.segments.values()), None)
+
+    def reload(self) -> bool:
+        """
+        Map the segments published since the last reload.
+
+        Returns:
+            True if the set of segments changed
+        """
+        if self._read_manifest()["generation"] == self._generation:
+            return False
+        # A compaction deletes the segments it merged; holding the lock keeps the
+        # segments of the manifest on disk until they are mapped
+        with self._lock(shared=True):
+            return self._reload()
+
+    def _reload(self) -> bool:
+        """
+        Map the segments of the current manifest. Must hold the lock.
+        """
+        manifest = self._read_manifest()
+        if manifest["generation"] == self._generation:
+            return False
+
+        names = manifest["segments"]
+        segments = {name: self.segments.get(name) or VectorSegment(self._path(name)) for name in names}
+        self.segments = segments
+        self.file_ids = {file_id for segment in segments.values() for file_id in segment.file_ids}
+        self._generation = manifest["generation"]
+        return True
+
+    def append(self, files: List[Tuple[str, np.ndarray, np.ndarray]]) -> int:
+        """
+        Append the embeddings of one or more files as a new segment.
+
+        Files already in the store (for example, added by another worker) are skipped.
+
+        Args:
+            files: List of (file ID, chunk ordinals, embedding matrix)
+
+        Returns:
+            Number of vectors written
+        """
+        with self._lock():
+            self._reload()
+            files = [entry for entry in files if entry[0] not in self.file_ids and len(entry[1])]
+            if not files:
+                return 0
+
+            file_ids = [file_id for file_id, _, _ in files]
+            matrix = np.concatenate([vectors for _, _, vectors in files])
+            ids = np.zeros(len(matrix), dtype=ID_DTYPE)
+            ids["file"] = np.repeat(np.arange(len(files)), [len(ordinals) for _, ordinals, _ in files])
+            ids["ordinal"] = np.concatenate([ordinals for _, ordinals, _ in files])
+            if self.dimension is not None and matrix.shape[1] != self.dimension:
+                raise ValueError(f"Expected vectors of dimension {self.dimension}, got {matrix.shape[1]}")
+
+            manifest = self._read_manifest()
+            name = f"segment-{manifest['next_segment']:06d}.vec"
+            VectorSegment.write(
+                self._path(name), [(matrix, ids)], file_ids, len(matrix), matrix.shape[1], self.dtype, self.rescore
+            )
+            manifest["segments"].append(name)
+            manifest["next_segment"] += 1
+            self._write_manifest(manifest)
+
+            if len(manifest["segments"]) > self.max_segments:
+                self._compact(manifest)
+            self._reload()
+            return len(matrix)
+
+    def compact(self) -> None:
+        """
+        Merge every segment into a single one.
+        """
+        with self._lock():
+            manifest = self._read_manifest()
+            if len(manifest["segments"]) > 1:
+                self._compact(manifest)
+            self._reload()
+
+    def search(self, query: np.ndarray, top_k: int) -> List[Tuple[str, int, float]]:
+        """
+        Find the chunks most similar to the query across all segments.
+
+        Args:
+            query: The query vector
+            top_k: Maximum number of results
+
+        Returns:
+            List of (file ID, ordinal, cosine score), best first
+        """
+        self.reload()
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        candidates = []
+        for segment in self.segments.values():
+            rows, scores = segment.search(query, top_k, self.rescore_factor)
+            ids = segment.ids[rows]
+            candidates.extend(
+                (segment.file_ids[file_index], int(ordinal), float(score))
+                for (file_index, ordinal), score in zip(ids.tolist(), scores.tolist())
+            )
+        candidates.sort(key=lambda candidate: -candidate[2])
+        return candidates[:top_k]
+
+    def _compact(self, manifest: dict) -> None:
+        """
+        Streams every segment into a new one and publishes it. Must hold the lock.
+        """
+        segments = [VectorSegment(self._path(name)) for name in manifest["segments"]]
+        file_indexes: Dict[str, int] = {}
+        remaps = [
+            np.array([file_indexes.setdefault(file_id, len(file_indexes)) for file_id in segment.file_ids], dtype=np.int32)
+            for segment in segments
+        ]
+
+        def blocks() -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+            for segment, remap in zip(segments, remaps):
+                for start in range(0, segment.rows, SEARCH_BLOCK_ROWS):
+                    end = min(start + SEARCH_BLOCK_ROWS, segment.rows)
+                    ids = np.array(segment.ids[start:end])
+                    ids["file"] = remap[ids["file"]]
+                    yield segment.vectors(start, end), ids
+
+        name = f"segment-{manifest['next_segment']:06d}.vec"
+        VectorSegment.write(
+            self._path(name),
+            blocks(),
+            list(file_indexes),
+            sum(segment.rows for segment in segments),
+            segments[0].dimension,
+            self.dtype,
+            self.rescore
+        )
+        old_names = manifest["segments"]
+        manifest["segments"] = [name]
+        manifest["next_segment"] += 1
+        self._write_manifest(manifest)
+
+        # Readers that still map the old files keep them alive until they remap
+        for old_name in old_names:
+            os.remove(self._path(old_name))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._path(MANIFEST_NAME), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"generation": 0, "segments": [], "next_segment": 1}
+
+    def _write_manifest(self, manifest: dict) -> None:
+        manifest["generation"] += 1
+        temporary_path = self._path(f"{MANIFEST_NAME}.tmp")
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self._path(MANIFEST_NAME))
+
+    @contextmanager
+    def _lock(self, shared: bool = False) -> Iterator[None]:
+        """
+        Serializes writers across processes sharing the directory; readers take it shared.
+        """
+        with open(self._path(LOCK_NAME), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
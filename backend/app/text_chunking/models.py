@@ -0,0 +1,50 @@
+"""
+Text chunking models.
+"""
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from app.infrastructure.dynamodb.types import unwrap_binary
+
+CHUNK_KEY_SEPARATOR = "#chunk#"
+
+
+class DocumentChunk(BaseModel):
+    """
+    Model representing a single chunk of a file's markdown content in DynamoDB.
+    """
+    pk: str = Field(..., description="Primary key - composite of 'file_id#chunk#ordinal'")
+    file_id: str = Field(..., description="ID of the file the chunk belongs to")
+    ordinal: int = Field(..., description="Position of the chunk inside the file, starting at 0")
+    start_offset: int = Field(..., description="Offset of the first character of the chunk in markdown_content")
+    end_offset: int = Field(..., description="Offset one past the last character of the chunk in markdown_content")
+    token_estimate: int = Field(..., description="Approximate number of tokens in the chunk")
+    text: str = Field(..., description="Markdown text of the chunk")
+    embedding: Optional[bytes] = Field(None, description="Embedding vector of the chunk as little-endian float32 bytes")
+
+    @field_validator('embedding', mode='before')
+    @classmethod
+    def unwrap_binary(cls, value):
+        """
+        Unwrap the Binary type returned by DynamoDB for binary attributes.
+        
+        Args:
+            value: The raw attribute value
+            
+        Returns:
+            The attribute value as bytes
+        """
+        return unwrap_binary(value)
+
+    @staticmethod
+    def build_pk(file_id: str, ordinal: int) -> str:
+        """
+        Build the primary key of a chunk.
+
+        Args:
+            file_id: The ID of the file
+            ordinal: The position of the chunk inside the file
+
+        Returns:
+            The chunk primary key
+        """
+        return f"{file_id}{CHUNK_KEY_SEPARATOR}{ordinal:05d}"
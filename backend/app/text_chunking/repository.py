@@ -0,0 +1,63 @@
+"""
+Repository for DocumentChunk operations.
+"""
+from typing import Any, Dict, List, Tuple
+from app.infrastructure.dynamodb.repository import DynamoDBRepository
+from app.text_chunking.models import DocumentChunk
+
+
+class ChunkRepository(DynamoDBRepository):
+    """
+    Repository for DocumentChunk operations.
+    Chunks are stored as individual items keyed by file ID and ordinal.
+    """
+
+    @staticmethod
+    async def save_chunks(chunks: List[DocumentChunk]) -> List[Dict[str, Any]]:
+        """
+        Save the chunks of a file in batches.
+
+        Args:
+            chunks: The chunks to save
+
+        Returns:
+            The responses from DynamoDB
+        """
+        if not chunks:
+            return []
+        return await DynamoDBRepository.batch_write(chunks)
+
+    @staticmethod
+    async def get_chunks(file_id: str, chunk_count: int) -> List[DocumentChunk]:
+        """
+        Get the chunks of a file, ordered by ordinal.
+
+        Args:
+            file_id: The ID of the file
+            chunk_count: Number of chunks stored for the file
+
+        Returns:
+            List of DocumentChunk ordered by ordinal
+        """
+        if chunk_count <= 0:
+            return []
+        keys = [{"pk": DocumentChunk.build_pk(file_id, ordinal)} for ordinal in range(chunk_count)]
+        chunks = await DynamoDBRepository.batch_get(keys, DocumentChunk)
+        chunks.sort(key=lambda chunk: chunk.ordinal)
+        return chunks
+
+    @staticmethod
+    async def get_chunks_at(refs: List[Tuple[str, int]]) -> List[DocumentChunk]:
+        """
+        Get specific chunks, possibly from different files.
+
+        Args:
+            refs: List of (file ID, ordinal)
+
+        Returns:
+            List of the DocumentChunk found, in no particular order
+        """
+        if not refs:
+            return []
+        keys = [{"pk": DocumentChunk.build_pk(file_id, ordinal)} for file_id, ordinal in dict.fromkeys(refs)]
+        return await DynamoDBRepository.batch_get(keys, DocumentChunk)
@@ -0,0 +1,28 @@
+from typing import List
+from app.text_chunking.text_chunker import TextChunker
+from app.text_chunking.strategies.markdown import MarkdownChunker
+from app.text_chunking.models import DocumentChunk
+
+# Rough characters-per-token ratio used for token estimates
+CHARS_PER_TOKEN = 4
+
+class TextChunkingService:
+    def __init__(self, chunker: TextChunker = None):
+        self.chunker = chunker or MarkdownChunker()
+
+    def chunk(self, file_id: str, text: str) -> List[DocumentChunk]:
+        return [
+            DocumentChunk(
+                pk=DocumentChunk.build_pk(file_id, ordinal),
+                file_id=file_id,
+                ordinal=ordinal,
+                start_offset=start,
+                end_offset=end,
+                token_estimate=estimate_tokens(text[start:end]),
+                text=text[start:end]
+            )
+            for ordinal, (start, end) in enumerate(self.chunker.split(text))
+        ]
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
@@ -0,0 +1,166 @@
+import re
+from typing import Iterator, List, Optional, Tuple
+from app.text_chunking.text_chunker import TextChunker
+from app.infrastructure.config import settings
+
+HEADING_PATTERN = re.compile(r"^ {0,3}#{1,6}(\s|$)")
+
+# Block kinds
+HEADING = "heading"
+TABLE = "table"
+PARAGRAPH = "paragraph"
+
+class MarkdownChunker(TextChunker):
+    """
+    Splits markdown into chunks on headings, table boundaries and paragraph windows.
+
+    A heading always starts a new chunk. Tables are kept whole when they fit in a
+    chunk and otherwise split on row boundaries. Paragraphs are packed together up
+    to the chunk size; a paragraph larger than the chunk size is split into
+    overlapping windows that end on whitespace.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None):
+        """
+        Initializes the markdown chunker.
+
+        Args:
+            chunk_size: Maximum number of characters per chunk (defaults to settings.CHUNK_SIZE)
+            chunk_overlap: Number of characters shared by consecutive windows of an
+                oversized paragraph (defaults to settings.CHUNK_OVERLAP)
+        """
+        self.chunk_size = chunk_size or settings.CHUNK_SIZE
+        self.chunk_overlap = settings.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        if self.chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= self.chunk_overlap < self.chunk_size:
+            raise ValueError("chunk_overlap must be between 0 and chunk_size")
+
+    def split(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Splits the markdown text into chunks.
+
+        Args:
+            text: The markdown text to split
+
+        Returns:
+            List of (start_offset, end_offset) spans, in document order
+        """
+        spans = []
+        chunk_start = chunk_end = None
+
+        for kind, start, end in self._blocks(text):
+            starts_section = kind == HEADING
+            overflows = chunk_start is not None and end - chunk_start > self.chunk_size
+
+            if chunk_start is not None and (starts_section or overflows):
+                spans.append((chunk_start, chunk_end))
+                chunk_start = chunk_end = None
+
+            if end - start > self.chunk_size:
+                if kind == TABLE:
+                    spans.extend(self._split_rows(text, start, end))
+                else:
+                    spans.extend(self._split_windows(text, start, end))
+                continue
+
+            if chunk_start is None:
+                chunk_start = start
+            chunk_end = end
+
+        if chunk_start is not None:
+            spans.append((chunk_start, chunk_end))
+        return spans
+
+    def _blocks(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """
+        Yields the headings, tables and paragraphs of the text as (kind, start, end).
+        """
+        block_kind = None
+        block_start = block_end = 0
+        offset = 0
+
+        for line in text.splitlines(keepends=True):
+            line_start = offset
+            offset += len(line)
+            content = line.rstrip("\r\n")
+            line_end = line_start + len(content)
+            stripped = content.strip()
+
+            if not stripped:
+                kind = None
+            elif HEADING_PATTERN.match(content):
+                kind = HEADING
+            elif stripped.startswith("|"):
+                kind = TABLE
+            else:
+                kind = PARAGRAPH
+
+            if block_kind is not None and (kind != block_kind or kind == HEADING):
+                yield block_kind, block_start, block_end
+                block_kind = None
+
+            if kind is None:
+                continue
+            if block_kind is None:
+                block_kind = kind
+                block_start = line_start
+            block_end = line_end
+
+        if block_kind is not None:
+            yield block_kind, block_start, block_end
+
+    def _split_rows(self, text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        Splits an oversized table on row boundaries.
+        """
+        spans = []
+        chunk_start = chunk_end = None
+        offset = start
+
+        for row in text[start:end].splitlines(keepends=True):
+            row_start = offset
+            offset += len(row)
+            row_end = row_start + len(row.rstrip("\r\n"))
+
+            if chunk_start is not None and row_end - chunk_start > self.chunk_size:
+                spans.append((chunk_start, chunk_end))
+                chunk_start = None
+
+            if row_end - row_start > self.chunk_size:
+                spans.extend(self._split_windows(text, row_start, row_end))
+                continue
+
+            if chunk_start is None:
+                chunk_start = row_start
+            chunk_end = row_end
+
+        if chunk_start is not None:
+            spans.append((chunk_start, chunk_end))
+        return spans
+
+    def _split_windows(self, text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        Splits an oversized block into overlapping windows that end on whitespace.
+        """
+        spans = []
+        window_start = start
+
+        while True:
+            if end - window_start <= self.chunk_size:
+                spans.append((window_start, end))
+                return spans
+
+            limit = window_start + self.chunk_size
+            window_end = text.rfind(" ", window_start + self.chunk_overlap + 1, limit)
+            if window_end == -1:
+                window_end = limit
+            spans.append((window_start, window_end))
+
+            next_start = window_end - self.chunk_overlap
+            if self.chunk_overlap:
+                # Start the overlap on a word boundary
+                boundary = text.find(" ", next_start, window_end)
+                if boundary != -1:
+                    next_start = boundary + 1
+            window_start = max(next_start, window_start + 1)
@@ -0,0 +1 @@
+# Tests for the text chunking module 
\ No newline at end of file
@@ -0,0 +1,70 @@
+import pytest
+from app.text_chunking.strategies.markdown import MarkdownChunker
+
+@pytest.fixture
+def markdown_text():
+    """Create a markdown document with headings, paragraphs and a table"""
+    return (
+        "# Invoice\n"
+        "\n"
+        "Issued to ACME Corp.\n"
+        "\n"
+        "## Items\n"
+        "\n"
+        "| Item | Price |\n"
+        "| --- | --- |\n"
+        "| Bolt | 10 |\n"
+        "\n"
+        "## Notes\n"
+        "\n"
+        "Payment due in 30 days.\n"
+    )
+
+def test_chunker_invalid_configuration():
+    """Test that an overlap larger than the chunk size is rejected"""
+    with pytest.raises(ValueError):
+        MarkdownChunker(chunk_size=10, chunk_overlap=10)
+
+def test_chunker_splits_on_headings(markdown_text):
+    """Test that every heading starts a new chunk"""
+    chunker = MarkdownChunker(chunk_size=500, chunk_overlap=0)
+    
+    spans = chunker.split(markdown_text)
+    chunks = [markdown_text[start:end] for start, end in spans]
+    
+    assert len(chunks) == 3
+    assert chunks[0] == "# Invoice\n\nIssued to ACME Corp."
+    assert chunks[1].startswith("## Items") and chunks[1].endswith("| Bolt | 10 |")
+    assert chunks[2] == "## Notes\n\nPayment due in 30 days."
+
+def test_chunker_splits_large_table_on_rows():
+    """Test that an oversized table is split on row boundaries"""
+    rows = "".join(f"| row {i} | value {i} |\n" for i in range(20))
+    chunker = MarkdownChunker(chunk_size=60, chunk_overlap=0)
+    
+    spans = chunker.split(rows)
+    
+    assert len(spans) > 1
+    for start, end in spans:
+        chunk = rows[start:end]
+        assert len(chunk) <= 60
+        assert chunk.startswith("| row") and chunk.endswith("|")
+
+def test_chunker_windows_large_paragraph_with_overlap():
+    """Test that an oversized paragraph is split into overlapping windows"""
+    text = " ".join(f"word{i}" for i in range(200))
+    chunker = MarkdownChunker(chunk_size=100, chunk_overlap=20)
+    
+    spans = chunker.split(text)
+    
+    assert len(spans) > 1
+    assert spans[0][0] == 0
+    assert spans[-1][1] == len(text)
+    for (_, previous_end), (start, end) in zip(spans, spans[1:]):
+        assert end - start <= 100
+        assert start < previous_end  # windows overlap
+        assert text[start - 1] == " "  # windows start on a word boundary
+
+def test_chunker_empty_text():
+    """Test that empty text produces no chunks"""
+    assert MarkdownChunker(chunk_size=100, chunk_overlap=0).split("") == []
@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import patch
+from app.text_chunking.service import TextChunkingService, estimate_tokens
+from app.text_chunking.strategies.markdown import MarkdownChunker
+from app.text_chunking.repository import ChunkRepository
+from app.text_chunking.models import DocumentChunk
+
+def test_service_initialization_default():
+    """Test service initialization with default chunker"""
+    service = TextChunkingService()
+    assert isinstance(service.chunker, MarkdownChunker)
+
+def test_chunk_builds_document_chunks():
+    """Test that chunks carry keys, offsets and token estimates"""
+    text = "# Title\n\nFirst paragraph.\n\n# Second\n\nMore text here."
+    service = TextChunkingService(MarkdownChunker(chunk_size=100, chunk_overlap=0))
+    
+    chunks = service.chunk("file123", text)
+    
+    assert [chunk.ordinal for chunk in chunks] == [0, 1]
+    assert chunks[0].pk == "file123#chunk#00000"
+    assert chunks[1].pk == "file123#chunk#00001"
+    for chunk in chunks:
+        assert chunk.file_id == "file123"
+        assert text[chunk.start_offset:chunk.end_offset] == chunk.text
+        assert chunk.token_estimate == estimate_tokens(chunk.text)
+
+def test_estimate_tokens():
+    """Test the token estimate rounds up"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+@pytest.mark.asyncio
+@patch("app.infrastructure.dynamodb.repository.DynamoDBRepository.batch_get")
+async def test_get_chunks_orders_by_ordinal(mock_batch_get):
+    """Test that get_chunks requests every chunk key and sorts the result"""
+    mock_batch_get.return_value = [
+        DocumentChunk(pk="file123#chunk#00001", file_id="file123", ordinal=1,
+                      start_offset=5, end_offset=10, token_estimate=2, text="world"),
+        DocumentChunk(pk="file123#chunk#00000", file_id="file123", ordinal=0,
+                      start_offset=0, end_offset=5, token_estimate=2, text="hello"),
+    ]
+    
+    chunks = await ChunkRepository.get_chunks("file123", 2)
+    
+    mock_batch_get.assert_called_once_with(
+        [{"pk": "file123#chunk#00000"}, {"pk": "file123#chunk#00001"}],
+        DocumentChunk
+    )
+    assert [chunk.ordinal for chunk in chunks] == [0, 1]
+
+@pytest.mark.asyncio
+@patch("app.infrastructure.dynamodb.repository.DynamoDBRepository.batch_write")
+async def test_save_chunks_skips_empty(mock_batch_write):
+    """Test that saving no chunks does not call DynamoDB"""
+    result = await ChunkRepository.save_chunks([])
+    
+    assert result == []
+    mock_batch_write.assert_not_called()
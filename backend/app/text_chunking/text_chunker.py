@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+class TextChunker(ABC):
+    @abstractmethod
+    def split(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Split the text into chunks.
+
+        Returns:
+            List of (start_offset, end_offset) character spans into the text
+        """
+        pass
@@ -0,0 +1,123 @@
+"""
+Dispatch of uploaded files to the text extractor of their format.
+"""
+import logging
+import os
+import zipfile
+from typing import Dict, Optional
+from fastapi import UploadFile
+from app.text_extraction.text_extractor import TextExtractor
+from app.text_extraction.strategies.markitdown import MarkItDownExtractor
+from app.text_extraction.strategies.plain_text import PlainTextExtractor, BYTE_ORDER_MARKS
+from app.text_extraction.strategies.xlsx import XlsxExtractor
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the start of a file to sniff its format
+SNIFF_BYTES = 8192
+
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Part present in every XLSX package (and absent from DOCX, PPTX and other ZIP files)
+XLSX_WORKBOOK_PART = "xl/workbook.xml"
+
+# Starts of binary formats that must not be taken for text whatever their content type
+BINARY_MAGIC = (
+    b"%PDF",
+    b"\xd0\xcf\x11\xe0",  # OLE2: XLS, DOC, PPT, MSG
+    b"\x89PNG",
+    b"\xff\xd8\xff",  # JPEG
+    b"GIF8",
+    b"RIFF",
+    b"ID3",
+)
+
+TEXT_CONTENT_TYPES = {"text/plain", "text/csv", "application/csv", "text/markdown", "text/tab-separated-values"}
+TEXT_EXTENSIONS = {".txt", ".csv", ".tsv", ".md", ".markdown"}
+
+
+def sniff_format(file: UploadFile) -> Optional[str]:
+    """
+    Identifies the format of an upload from its magic bytes, then its content type or extension.
+
+    Magic bytes win over the declared type: a ZIP file is only "xlsx" if it holds
+    a workbook, whatever its name, and a file is only "text" if it is declared
+    as text and its first bytes are not binary.
+
+    Args:
+        file: The uploaded file
+
+    Returns:
+        "xlsx", "text", or None for formats left to the fallback extractor
+    """
+    file.file.seek(0)
+    try:
+        head = file.file.read(SNIFF_BYTES)
+        if head.startswith(ZIP_MAGIC):
+            file.file.seek(0)
+            try:
+                # Only the central directory at the end of the file is read
+                with zipfile.ZipFile(file.file) as package:
+                    return "xlsx" if XLSX_WORKBOOK_PART in package.namelist() else None
+            except zipfile.BadZipFile:
+                return None
+        if head.startswith(BINARY_MAGIC):
+            return None
+
+        content_type = (file.content_type or "").split(";")[0].strip().lower()
+        extension = os.path.splitext(file.filename or "")[1].lower()
+        if content_type not in TEXT_CONTENT_TYPES and extension not in TEXT_EXTENSIONS:
+            return None
+        # UTF-16 and UTF-32 text has NUL bytes, but also a byte order mark
+        if b"\x00" in head and not head.startswith(tuple(bom for bom, _ in BYTE_ORDER_MARKS)):
+            return None
+        return "text"
+    finally:
+        file.file.seek(0)
+
+
+class TextExtractorRegistry(TextExtractor):
+    """
+    Sends each file to the extractor registered for its sniffed format.
+
+    Formats with a fast path skip the conversion of the fallback: text, markdown
+    and CSV are passed through decoded, and XLSX sheets are streamed into
+    markdown tables (in the extraction worker pool when called through
+    extract_async, like the fallback). Every other format, and any file the sniffer cannot place,
+    goes to the fallback extractor (MarkItDown by default).
+    """
+
+    def __init__(self, extractors: Optional[Dict[str, TextExtractor]] = None, fallback: Optional[TextExtractor] = None):
+        """
+        Initializes the registry.
+
+        Args:
+            extractors: Extractor of each format returned by sniff_format
+                (defaults to PlainTextExtractor for "text" and XlsxExtractor for "xlsx")
+            fallback: Extractor of the other formats (defaults to MarkItDownExtractor)
+        """
+        if extractors is None:
+            extractors = {"text": PlainTextExtractor(), "xlsx": XlsxExtractor()}
+        self.extractors = dict(extractors)
+        self.fallback = fallback or MarkItDownExtractor()
+
+    def register(self, file_format: str, extractor: TextExtractor) -> None:
+        """
+        Registers the extractor of a format, replacing the previous one.
+        """
+        self.extractors[file_format] = extractor
+
+    def select(self, file: UploadFile) -> TextExtractor:
+        """
+        Returns the extractor for a file.
+        """
+        file_format = sniff_format(file)
+        extractor = self.extractors.get(file_format, self.fallback)
+        logger.info(f"Extracting {file.filename} (format: {file_format or 'other'}) with {type(extractor).__name__}")
+        return extractor
+
+    def extract(self, file: UploadFile) -> str:
+        return self.select(file).extract(file)
+
+    async def extract_async(self, file: UploadFile) -> str:
+        return await self.select(file).extract_async(file)
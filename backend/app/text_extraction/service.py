@@ -1,10 +1,10 @@
 from fastapi import UploadFile
 from app.text_extraction.text_extractor import TextExtractor
-from app.text_extraction.strategies.markitdown import MarkItDownExtractor
+from app.text_extraction.registry import TextExtractorRegistry
 
 class TextExtractionService:
     def __init__(self, extractor: TextExtractor = None):
-        self.extractor = extractor or MarkItDownExtractor()
+        self.extractor = extractor or TextExtractorRegistry()
 
-    def extract(self, file: UploadFile) -> str:
-        return self.extractor.extract(file)
\ No newline at end of file
+    async def extract(self, file: UploadFile) -> str:
+        return await self.extractor.extract_async(file)
@@ -1,25 +1,81 @@
 from fastapi import UploadFile
 from markitdown import MarkItDown
 from app.text_extraction.text_extractor import TextExtractor
+from app.text_extraction.worker_pool import ExtractionWorkerPool, EXTRACTION_POOL
 import io
+import os
 
 """
 Reference: https://github.com/microsoft/markitdown
 """
 class MarkItDownExtractor(TextExtractor):
+    def __init__(self, worker_pool: ExtractionWorkerPool = None):
+        """
+        Initialize the extractor.
+        
+        Args:
+            worker_pool: Pool of worker processes used by extract_async (defaults to the shared EXTRACTION_POOL)
+        """
+        self.worker_pool = worker_pool or EXTRACTION_POOL
+
     def extract(self, file: UploadFile) -> str:
         try:
-            # Read the file content
-            content = file.file.read()
-            
-            # Create a new BytesIO object with the content
-            file_stream = io.BytesIO(content)
-            
-            # Reset the original file pointer
+            # The spooled upload is converted in place instead of being copied into memory
             file.file.seek(0)
+            stream = file.file if isinstance(file.file, io.BufferedIOBase) else _StreamReader(file.file)
             
             md = MarkItDown(enable_plugins=False)
-            result = md.convert(file_stream)
+            result = md.convert(stream)
             return result.text_content
         except Exception as e:
             raise ValueError(f"Text extraction failed: {e}")
+        finally:
+            file.file.seek(0)
+
+    async def extract_async(self, file: UploadFile) -> str:
+        """
+        Converts the file in a worker process of the pool, with its timeout and memory limit.
+        
+        The worker reads the spooled upload through its descriptor, with the
+        upload's extension as a format hint.
+        """
+        try:
+            return await self.worker_pool.convert(file.file, os.path.splitext(file.filename or "")[1])
+        except Exception as e:
+            raise ValueError(f"Text extraction failed: {e}")
+        finally:
+            file.file.seek(0)
+
+
+class _StreamReader(io.BufferedIOBase):
+    """
+    Seekable read-only view of a binary file object as an io.BufferedIOBase.
+
+    MarkItDown's content sniffing only accepts buffered io streams, which
+    SpooledTemporaryFile is not.
+    """
+    def __init__(self, file_obj):
+        self.file_obj = file_obj
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self.file_obj.read(size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.file_obj.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self.file_obj.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.file_obj.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file_obj.tell()
@@ -0,0 +1,88 @@
+import codecs
+from typing import BinaryIO, List, Optional
+from charset_normalizer import from_bytes
+from fastapi import UploadFile
+from app.infrastructure.config import settings
+from app.text_extraction.text_extractor import TextExtractor
+
+# Byte order marks and the codec that decodes the text after them
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Used when the charset cannot be detected, and preferred among equally likely
+# single-byte code pages; every byte sequence decodes in it
+FALLBACK_ENCODING = "cp1252"
+
+# Bytes from where UTF-8 decoding failed given to the charset detector
+DETECTION_SAMPLE_BYTES = 65536
+
+
+def decode_stream(file_obj: BinaryIO, block_size: Optional[int] = None) -> str:
+    """
+    Decodes a text file block by block, detecting its charset on the way.
+
+    The file is decoded as UTF-8 (or the encoding of its byte order mark) in a
+    single pass. Only if a block turns out not to be UTF-8 is the charset
+    detected, from the first block and a sample starting at the offending one,
+    and the file decoded again with it, replacing undecodable bytes.
+
+    Args:
+        file_obj: The binary file object, positioned at its start
+        block_size: Bytes decoded at a time (defaults to settings.INGEST_BLOCK_BYTES)
+
+    Returns:
+        The text
+    """
+    block_size = block_size or settings.INGEST_BLOCK_BYTES
+    first_block = file_obj.read(block_size)
+    encoding = next((name for bom, name in BYTE_ORDER_MARKS if first_block.startswith(bom)), "utf-8")
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts: List[str] = []
+    block = first_block
+    try:
+        while block:
+            parts.append(decoder.decode(block))
+            block = file_obj.read(block_size)
+        parts.append(decoder.decode(b"", final=True))
+        return "".join(parts)
+    except UnicodeDecodeError:
+        sample = first_block if block is first_block else first_block + block
+        sample += file_obj.read(DETECTION_SAMPLE_BYTES)
+
+    encoding = _detect_encoding(sample)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    file_obj.seek(0)
+    parts = []
+    while block := file_obj.read(block_size):
+        parts.append(decoder.decode(block))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def _detect_encoding(sample: bytes) -> str:
+    matches = from_bytes(sample)
+    best = matches.best()
+    if best is None:
+        return FALLBACK_ENCODING
+    # Code pages sharing the characters of the sample score the same
+    tied = [match.encoding for match in matches if (match.chaos, match.coherence) == (best.chaos, best.coherence)]
+    return FALLBACK_ENCODING if FALLBACK_ENCODING in tied else best.encoding
+
+
+class PlainTextExtractor(TextExtractor):
+    """
+    Passes text, markdown and CSV files through unchanged, only decoding them.
+    """
+    def extract(self, file: UploadFile) -> str:
+        file.file.seek(0)
+        try:
+            return decode_stream(file.file)
+        except Exception as e:
+            raise ValueError(f"Text extraction failed: {e}")
+        finally:
+            file.file.seek(0)
@@ -0,0 +1,113 @@
+from datetime import date, datetime, time
+from typing import Any, BinaryIO, Iterator, List
+from fastapi import UploadFile
+from openpyxl import load_workbook
+from app.text_extraction.text_extractor import TextExtractor
+from app.text_extraction.worker_pool import Converter, ExtractionWorkerPool, EXTRACTION_POOL
+
+
+def format_cell(value: Any) -> str:
+    """
+    Formats a cell value for a markdown table cell.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, datetime) and value.time() == time():
+        # Excel stores dates as datetimes at midnight
+        value = value.date().isoformat()
+    elif isinstance(value, (datetime, date, time)):
+        value = value.isoformat()
+    return " ".join(str(value).split()).replace("|", "\\|")
+
+
+def table_rows(rows: Iterator[tuple]) -> Iterator[str]:
+    """
+    Formats the rows of a sheet as markdown table lines, the first non-empty row as the header.
+
+    Empty rows are skipped and every row is padded to the widest one. The width
+    comes from the cells rather than from the dimensions the sheet declares,
+    which many producers leave stale (e.g. "A1" for a whole table).
+
+    Args:
+        rows: The cell values of each row
+
+    Yields:
+        The lines of the table
+    """
+    table: List[List[str]] = []
+    for row in rows:
+        cells = [format_cell(value) for value in row]
+        while cells and not cells[-1]:
+            cells.pop()
+        if cells:
+            table.append(cells)
+    width = max((len(cells) for cells in table), default=0)
+    for i, cells in enumerate(table):
+        yield "| " + " | ".join(cells + [""] * (width - len(cells))) + " |"
+        if i == 0:
+            yield "|" + " --- |" * width
+
+
+def convert_workbook(stream: BinaryIO) -> str:
+    """
+    Converts the sheets of a workbook into markdown tables, one heading per sheet.
+    """
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        lines = []
+        for sheet in workbook.worksheets:
+            lines.append(f"## {sheet.title}")
+            # Otherwise iter_rows cuts the rows to the declared dimensions
+            sheet.reset_dimensions()
+            lines.extend(table_rows(sheet.iter_rows(values_only=True)))
+            lines.append("")
+        return "\n".join(lines)
+    finally:
+        workbook.close()
+
+
+def create_xlsx_converter() -> Converter:
+    """
+    Builds the XLSX converter of an extraction worker.
+    """
+    return lambda stream, extension: convert_workbook(stream)
+
+
+class XlsxExtractor(TextExtractor):
+    """
+    Streams the sheets of an XLSX workbook into markdown tables, one heading per sheet.
+
+    The workbook is opened in read-only mode, which parses each sheet's XML as
+    rows are requested instead of loading every cell, so memory holds the text
+    of the cells rather than openpyxl's cell objects. extract_async converts it
+    in the extraction worker pool, under the same timeout and memory limit as
+    the other formats, since a compressed workbook can expand to far more cells
+    than its size suggests.
+    """
+    def __init__(self, worker_pool: ExtractionWorkerPool = None):
+        """
+        Initialize the extractor.
+
+        Args:
+            worker_pool: Pool of worker processes used by extract_async (defaults to the shared EXTRACTION_POOL)
+        """
+        self.worker_pool = worker_pool or EXTRACTION_POOL
+
+    def extract(self, file: UploadFile) -> str:
+        file.file.seek(0)
+        try:
+            return convert_workbook(file.file)
+        except Exception as e:
+            raise ValueError(f"Text extraction failed: {e}")
+        finally:
+            file.file.seek(0)
+
+    async def extract_async(self, file: UploadFile) -> str:
+        try:
+            return await self.worker_pool.convert(file.file, ".xlsx", create_xlsx_converter)
+        except Exception as e:
+            raise ValueError(f"Text extraction failed: {e}")
+        finally:
+            file.file.seek(0)
@@ -0,0 +1,25 @@
+import codecs
+import io
+from app.text_extraction.strategies.plain_text import decode_stream
+
+
+def test_decode_stream_keeps_utf8_split_across_blocks():
+    """Test that a character split between two blocks is decoded whole"""
+    text = "naïve café, ação " * 50
+
+    assert decode_stream(io.BytesIO(text.encode("utf-8")), block_size=7) == text
+
+
+def test_decode_stream_detects_other_charsets():
+    """Test that a file that is not UTF-8 past its first block is decoded in its detected charset"""
+    text = "id;name\n" + "1;plain ascii row\n" * 20 + "2;Conceição São João, avaliação e não conformidade técnica\n" * 20
+
+    assert decode_stream(io.BytesIO(text.encode("cp1252")), block_size=64) == text
+
+
+def test_decode_stream_strips_byte_order_marks():
+    """Test that UTF-16 text is recognised by its byte order mark"""
+    text = "id,name\n1,Zoë\n"
+
+    assert decode_stream(io.BytesIO(text.encode("utf-16")), block_size=5) == text
+    assert decode_stream(io.BytesIO(codecs.BOM_UTF8 + text.encode("utf-8"))) == text
@@ -0,0 +1,62 @@
+import io
+import zipfile
+import openpyxl
+import pytest
+from unittest.mock import MagicMock
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from app.text_extraction.registry import TextExtractorRegistry, sniff_format
+
+
+def make_upload(content: bytes, filename: str, content_type: str = "application/octet-stream") -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename=filename, headers=Headers({"content-type": content_type}))
+
+
+def make_xlsx() -> bytes:
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "Sales"
+    workbook.active.append(["id", "amount"])
+    workbook.active.append([1, 10.5])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("content, filename, content_type, expected", [
+    (b"id,name\n1,Alice\n", "people.csv", "text/csv", "text"),
+    (b"plain notes", "notes.bin", "text/plain; charset=utf-8", "text"),
+    (b"%PDF-1.7 ...", "report.txt", "text/plain", None),
+    (b"a\x00b\x00", "data.txt", "text/plain", None),
+    (b"<html></html>", "page.html", "text/html", None),
+])
+def test_sniff_format(content, filename, content_type, expected):
+    """Test that text is recognised from its declared type unless its bytes are binary"""
+    file = make_upload(content, filename, content_type)
+
+    assert sniff_format(file) == expected
+    assert file.file.tell() == 0
+
+
+def test_sniff_format_finds_xlsx_by_content():
+    """Test that a workbook is recognised whatever its name, and other ZIP files are not"""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as package:
+        package.writestr("word/document.xml", "<w:document/>")
+
+    assert sniff_format(make_upload(make_xlsx(), "upload")) == "xlsx"
+    assert sniff_format(make_upload(archive.getvalue(), "book.xlsx")) is None
+
+
+def test_registry_dispatches_to_the_fast_paths():
+    """Test that text and workbooks skip the fallback converter"""
+    fallback = MagicMock()
+    registry = TextExtractorRegistry(fallback=fallback)
+
+    assert registry.extract(make_upload(b"id,name\n1,Alice\n", "people.csv", "text/csv")) == "id,name\n1,Alice\n"
+    assert registry.extract(make_upload(make_xlsx(), "sales.xlsx")) == (
+        "## Sales\n| id | amount |\n| --- | --- |\n| 1 | 10.5 |\n"
+    )
+    fallback.extract.assert_not_called()
+
+    registry.extract(make_upload(b"%PDF-1.7", "report.pdf", "application/pdf"))
+    fallback.extract.assert_called_once()
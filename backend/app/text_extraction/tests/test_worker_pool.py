@@ -0,0 +1,143 @@
+import io
+import signal
+import tempfile
+import time
+import pytest
+from fastapi import UploadFile
+from app.text_extraction import worker_pool
+from app.text_extraction.worker_pool import ExtractionWorkerPool
+from app.text_extraction.strategies.markitdown import MarkItDownExtractor
+
+
+# Converter factories run in the worker processes, so they are module-level functions
+def upper_converter():
+    return lambda stream, extension: stream.read().decode().upper()
+
+
+def slow_converter():
+    def convert(stream, extension):
+        if extension == ".slow":
+            time.sleep(60)
+        return "done"
+    return convert
+
+
+def stuck_converter():
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    return lambda stream, extension: time.sleep(60)
+
+
+def hungry_converter():
+    return lambda stream, extension: str(len(bytearray(1024 * 1024 * 1024)))
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("hello")
+    with open(path, "rb") as file:
+        yield file
+
+
+@pytest.mark.asyncio
+async def test_workers_are_reused(text_file):
+    """Test that consecutive jobs run in the same warm worker"""
+    pool = ExtractionWorkerPool(max_workers=2, timeout_seconds=10, converter_factory=upper_converter)
+    try:
+        assert await pool.convert(text_file) == "HELLO"
+        worker = pool._idle[0]
+        assert await pool.convert(text_file) == "HELLO"
+        assert list(pool._idle) == [worker]
+    finally:
+        pool.close()
+
+
+@pytest.mark.asyncio
+async def test_timeout_interrupts_the_job_and_keeps_the_worker(text_file):
+    """Test that a conversion past the timeout fails while the worker serves the next job"""
+    pool = ExtractionWorkerPool(max_workers=1, timeout_seconds=0.5, converter_factory=slow_converter)
+    try:
+        with pytest.raises(TimeoutError):
+            await pool.convert(text_file, ".slow")
+        assert await pool.convert(text_file, ".pdf") == "done"
+        assert pool.restarts == 0
+    finally:
+        pool.close()
+
+
+@pytest.mark.asyncio
+async def test_dead_idle_worker_is_replaced_before_the_job(text_file):
+    """Test that a job sent to an idle worker that died runs in a new worker instead of failing"""
+    pool = ExtractionWorkerPool(max_workers=1, timeout_seconds=10, converter_factory=upper_converter)
+    try:
+        assert await pool.convert(text_file) == "HELLO"
+        dead = pool._idle[0]
+        dead.process.kill()
+        dead.process.join()
+
+        assert await pool.convert(text_file) == "HELLO"
+        assert pool.restarts == 1
+        assert pool._idle[0] is not dead
+    finally:
+        pool.close()
+
+
+@pytest.mark.asyncio
+async def test_files_on_disk_are_not_copied(monkeypatch):
+    """Test that a spooled upload on disk is read through its descriptor and one in memory through a copy"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=4)
+    spooled.write(b"spooled to disk")
+    copies = []
+    temporary_file = tempfile.TemporaryFile
+    monkeypatch.setattr(worker_pool.tempfile, "TemporaryFile", lambda: copies.append(1) or temporary_file())
+    pool = ExtractionWorkerPool(max_workers=1, timeout_seconds=10, converter_factory=upper_converter)
+    try:
+        assert await pool.convert(spooled) == "SPOOLED TO DISK"
+        assert not copies
+        assert await pool.convert(io.BytesIO(b"in memory")) == "IN MEMORY"
+        assert len(copies) == 1
+    finally:
+        spooled.close()
+        pool.close()
+
+
+@pytest.mark.asyncio
+async def test_stuck_worker_is_killed_and_replaced(text_file, monkeypatch):
+    """Test that a worker ignoring the timeout is killed without stalling the caller"""
+    monkeypatch.setattr(worker_pool, "KILL_GRACE_SECONDS", 0.5)
+    pool = ExtractionWorkerPool(max_workers=1, timeout_seconds=0.5, converter_factory=stuck_converter)
+    try:
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await pool.convert(text_file)
+        assert time.monotonic() - started < 10
+        assert pool.restarts == 1
+        assert not pool._idle
+    finally:
+        pool.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_limit_fails_the_job(text_file):
+    """Test that a conversion past the memory limit fails instead of exhausting the host"""
+    pool = ExtractionWorkerPool(max_workers=1, timeout_seconds=10, memory_limit_mb=256, converter_factory=hungry_converter)
+    try:
+        with pytest.raises(RuntimeError, match="MemoryError"):
+            await pool.convert(text_file)
+    finally:
+        pool.close()
+
+
+@pytest.mark.asyncio
+async def test_markitdown_extractor_converts_in_a_worker(tmp_path):
+    """Test that the MarkItDown extractor converts an upload in the worker pool"""
+    pool = ExtractionWorkerPool(max_workers=1, timeout_seconds=60)
+    file = UploadFile(open(tmp_path / "people.csv", "w+b"), filename="people.csv")
+    file.file.write(b"id,name\n1,Alice\n")
+    try:
+        text = await MarkItDownExtractor(pool).extract_async(file)
+        assert "| 1 | Alice |" in text
+        assert file.file.tell() == 0
+    finally:
+        file.file.close()
+        pool.close()
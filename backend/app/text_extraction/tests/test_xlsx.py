@@ -0,0 +1,55 @@
+import io
+import zipfile
+import openpyxl
+import pytest
+from fastapi import UploadFile
+from app.text_extraction.strategies.xlsx import XlsxExtractor
+from app.text_extraction.tests.test_worker_pool import upper_converter
+from app.text_extraction.worker_pool import ExtractionWorkerPool
+
+
+def declare_dimension(content: bytes, dimension: str) -> bytes:
+    """Rewrites the dimension declared by the first sheet of a workbook"""
+    rewritten = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(content)) as source, zipfile.ZipFile(rewritten, "w") as target:
+        for item in source.infolist():
+            data = source.read(item)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                start = data.index(b"<dimension ")
+                data = data[:start] + f'<dimension ref="{dimension}"/>'.encode() + data[data.index(b"/>", start) + 2:]
+            target.writestr(item, data)
+    return rewritten.getvalue()
+
+
+def make_xlsx() -> bytes:
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "Sales"
+    workbook.active.append(["id", "amount"])
+    workbook.active.append([1, 10.5, "late"])
+    workbook.active.append([2])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_extract_ignores_stale_dimensions():
+    """Test that every column and row is kept when the sheet declares a stale dimension"""
+    file = UploadFile(io.BytesIO(declare_dimension(make_xlsx(), "A1")), filename="sales.xlsx")
+
+    assert XlsxExtractor().extract(file) == (
+        "## Sales\n| id | amount |  |\n| --- | --- | --- |\n| 1 | 10.5 | late |\n| 2 |  |  |\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_extract_async_converts_in_a_worker():
+    """Test that workbooks are converted in the worker pool, next to its default converter"""
+    pool = ExtractionWorkerPool(max_workers=1, timeout_seconds=60, converter_factory=upper_converter)
+    file = UploadFile(io.BytesIO(make_xlsx()), filename="sales.xlsx")
+    try:
+        text = await XlsxExtractor(pool).extract_async(file)
+        assert "| 1 | 10.5 | late |" in text
+        assert file.file.tell() == 0
+        assert pool.restarts == 0 and len(pool._idle) == 1
+    finally:
+        pool.close()
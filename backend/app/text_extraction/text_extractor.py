@@ -1,7 +1,17 @@
 from abc import ABC, abstractmethod
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
 class TextExtractor(ABC):
     @abstractmethod
     def extract(self, file: UploadFile) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    async def extract_async(self, file: UploadFile) -> str:
+        """
+        Extracts the text without blocking the event loop.
+        
+        By default the synchronous extract runs in a worker thread; strategies
+        can convert in worker processes instead.
+        """
+        return await run_in_threadpool(self.extract, file)
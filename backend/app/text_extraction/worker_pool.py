@@ -0,0 +1,279 @@
+"""
+Pool of worker processes converting files to markdown with warm MarkItDown converters.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import resource
+import shutil
+import signal
+import tempfile
+from collections import deque
+from multiprocessing.reduction import recv_handle, send_handle
+from typing import BinaryIO, Callable, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.infrastructure.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Time a worker gets past the job timeout to report the interruption before it is killed
+KILL_GRACE_SECONDS = 5.0
+
+
+# A converter turns a seekable binary stream and its extension (a format hint) into markdown
+Converter = Callable[[BinaryIO, str], str]
+
+
+def create_markitdown_converter() -> Converter:
+    """
+    Builds the converter of a worker: one MarkItDown instance reused for every job.
+    """
+    from markitdown import MarkItDown, StreamInfo
+    converter = MarkItDown(enable_plugins=False)
+    return lambda stream, extension: converter.convert_stream(
+        stream, stream_info=StreamInfo(extension=extension or None)
+    ).text_content
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("Text extraction timed out")
+
+
+def _serve(connection, memory_limit_bytes: int, converter_factory: Callable[[], Converter]) -> None:
+    """
+    Main loop of a worker process: converts the files received until the pipe closes.
+
+    Each job is followed by the descriptor of its file, which the worker reads
+    in place, and names the factory of its converter: the worker builds the
+    converter of each format once and reuses it. Replies are (None, text) on success and (error type, message) on failure, so a
+    failed conversion, including one past its memory limit or its timeout, leaves
+    the worker ready for the next job.
+    """
+    if memory_limit_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    converters = {converter_factory: converter_factory()}
+    while True:
+        try:
+            factory, extension, timeout_seconds = connection.recv()
+            fd = recv_handle(connection)
+        except EOFError:
+            return
+        try:
+            if factory not in converters:
+                converters[factory] = factory()
+            convert = converters[factory]
+            # The descriptor shares its offset with the API process, which rewinds the file after the job
+            with os.fdopen(fd, "rb") as stream:
+                signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+                stream.seek(0)
+                reply = (None, convert(stream, extension))
+        except Exception as e:
+            reply = (type(e).__name__, str(e))
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        connection.send(reply)
+
+
+class _Worker:
+    """
+    One worker process and the parent end of its pipe.
+    """
+    def __init__(self, context, memory_limit_bytes: int, converter_factory: Callable[[], Converter]):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child_connection, memory_limit_bytes, converter_factory), daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+
+    def send(self, fd: int, extension: str, converter_factory: Callable[[], Converter], timeout_seconds: float) -> None:
+        """
+        Sends a job and the descriptor of its file.
+
+        Raises:
+            OSError: If the worker has died (e.g. BrokenPipeError)
+        """
+        self.connection.send((converter_factory, extension, timeout_seconds))
+        send_handle(self.connection, fd, self.process.pid)
+
+    async def wait(self, timeout_seconds: float) -> Tuple[Optional[str], str]:
+        """
+        Waits for the reply to the job sent without blocking the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = self.connection.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            # The worker interrupts a conversion after timeout_seconds; waiting longer means it is stuck
+            await asyncio.wait_for(readable, timeout_seconds + KILL_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Text extraction did not finish within {timeout_seconds} seconds")
+        finally:
+            loop.remove_reader(fd)
+        try:
+            return await run_in_threadpool(self.connection.recv)
+        except EOFError:
+            raise RuntimeError("Extraction worker died during the conversion, probably past its memory limit")
+
+    async def kill(self) -> None:
+        self.process.kill()
+        await run_in_threadpool(self.process.join)
+        self.connection.close()
+        logger.warning(f"Killed extraction worker {self.process.pid} (exit code {self.process.exitcode})")
+
+
+class ExtractionWorkerPool:
+    """
+    Converts files in a pool of worker processes, keeping the API's event loop free.
+
+    Each worker builds its converter once when it starts and reuses it for every
+    file; a job may name the converter factory of its format instead, and that
+    converter is likewise built once per worker. Each worker runs under an address space limit, and interrupts a conversion that
+    takes longer than the timeout. A worker that stays stuck past the timeout,
+    dies (e.g. killed past its memory limit), or whose job is cancelled is killed
+    and replaced by a new one on the next job; the other workers are unaffected.
+    An idle worker found dead when a job is sent to it is replaced at once, and
+    the job goes to the new worker.
+    Workers are started on demand, up to max_workers, so throughput grows with
+    the cores given to the pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        converter_factory: Callable[[], Converter] = create_markitdown_converter
+    ):
+        """
+        Initializes the pool; no process is started until the first job.
+
+        Args:
+            max_workers: Maximum number of worker processes (defaults to settings.EXTRACTION_WORKERS)
+            timeout_seconds: Maximum duration of one conversion (defaults to settings.EXTRACTION_TIMEOUT_SECONDS)
+            memory_limit_mb: Address space limit of each worker, 0 for none
+                (defaults to settings.EXTRACTION_MEMORY_LIMIT_MB)
+            converter_factory: Module-level function building a worker's default converter, called once per worker
+        """
+        self.max_workers = max_workers or settings.EXTRACTION_WORKERS
+        self.timeout_seconds = timeout_seconds or settings.EXTRACTION_TIMEOUT_SECONDS
+        memory_limit_mb = settings.EXTRACTION_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.converter_factory = converter_factory
+        # Fresh interpreters: forking the API process would copy its threads' locks
+        self.context = multiprocessing.get_context("spawn")
+        self._idle = deque()
+        self._loop = None
+        self._slots = None
+        self.restarts = 0
+
+    async def convert(
+        self,
+        file: BinaryIO,
+        extension: str = "",
+        converter_factory: Optional[Callable[[], Converter]] = None
+    ) -> str:
+        """
+        Converts a file in a worker process.
+
+        The worker reads the file through its descriptor, so a file on disk, like
+        an upload spooled past its memory threshold, is not copied. A file held in
+        memory is first written to a temporary file.
+
+        Args:
+            file: The binary file, read from its start; it is left at an undefined position
+            extension: Extension of the file's name, hinting its format
+            converter_factory: Module-level function building the converter of the file's format
+                (defaults to the pool's converter_factory)
+
+        Returns:
+            The markdown text
+
+        Raises:
+            TimeoutError: If the conversion takes longer than the timeout
+            RuntimeError: If the conversion fails or its worker dies
+        """
+        fd, copy = await run_in_threadpool(_descriptor, file)
+        try:
+            async with self._worker_slots():
+                error_type, value = await self._run(fd, extension, converter_factory or self.converter_factory)
+        finally:
+            if copy is not None:
+                copy.close()
+        if error_type == TimeoutError.__name__:
+            raise TimeoutError(f"Text extraction took longer than {self.timeout_seconds} seconds")
+        if error_type is not None:
+            raise RuntimeError(f"{error_type}: {value}")
+        return value
+
+    async def _run(self, fd: int, extension: str, converter_factory: Callable[[], Converter]) -> Tuple[Optional[str], str]:
+        """
+        Runs a job in an idle worker, or a new one, and returns the worker to the idle ones.
+        """
+        worker = self._idle.pop() if self._idle else self._start_worker()
+        try:
+            try:
+                worker.send(fd, extension, converter_factory, self.timeout_seconds)
+            except OSError:
+                # The idle worker died since its last job, which has not started on it yet
+                self.restarts += 1
+                await asyncio.shield(worker.kill())
+                worker = self._start_worker()
+                worker.send(fd, extension, converter_factory, self.timeout_seconds)
+            reply = await worker.wait(self.timeout_seconds)
+        except BaseException:
+            # A worker with a job in flight would send its reply to the next job
+            self.restarts += 1
+            await asyncio.shield(worker.kill())
+            raise
+        self._idle.append(worker)
+        return reply
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(self.context, self.memory_limit_bytes, self.converter_factory)
+
+    def close(self) -> None:
+        """
+        Stops the idle workers.
+        """
+        while self._idle:
+            worker = self._idle.pop()
+            worker.connection.close()
+            worker.process.join(timeout=KILL_GRACE_SECONDS)
+
+    def _worker_slots(self) -> asyncio.Semaphore:
+        """
+        Returns the semaphore limiting the jobs in flight, created for the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._slots = loop, asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+
+def _descriptor(file: BinaryIO) -> Tuple[int, Optional[BinaryIO]]:
+    """
+    Returns a descriptor of the file rewound to its start, and the temporary copy to close if one was needed.
+    """
+    file.seek(0)
+    try:
+        # A SpooledTemporaryFile still in memory is rolled over to disk, up to its memory threshold
+        return file.fileno(), None
+    except (AttributeError, io.UnsupportedOperation):
+        pass
+    copy = tempfile.TemporaryFile()
+    try:
+        shutil.copyfileobj(file, copy, settings.INGEST_BLOCK_BYTES)
+        copy.flush()
+    except BaseException:
+        copy.close()
+        raise
+    return copy.fileno(), copy
+
+
+# Shared by every request, like the explorers' thread pool
+EXTRACTION_POOL = ExtractionWorkerPool()
@@ -1,10 +1,16 @@
 import aioboto3
+import asyncio
 from botocore.exceptions import NoCredentialsError
+from contextlib import AsyncExitStack
+from typing import Optional
 from app.infrastructure.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Smallest size S3 accepts for every part of a multipart upload but the last
+MIN_PART_BYTES = 5 * 1024 * 1024
+
 class S3Client:
     def __init__(self):
         self.session = aioboto3.Session()
@@ -30,4 +36,200 @@ class S3Client:
             raise RuntimeError("AWS credentials not found")
         except Exception as e:
             logger.error(f"S3 upload failed: {str(e)}")
-            raise RuntimeError(f"S3 upload failed: {str(e)}") 
\ No newline at end of file
+            raise RuntimeError(f"S3 upload failed: {str(e)}")
+
+    async def put_object(self, key: str, data: bytes) -> None:
+        """
+        Stores an object in the bucket in one request.
+        
+        Args:
+            key: The object key
+            data: The content of the object
+        """
+        async with self.session.client("s3", region_name=settings.AWS_REGION) as s3:
+            await s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=key, Body=data)
+
+    async def get_object(self, key: str) -> Optional[bytes]:
+        """
+        Reads an object of the bucket.
+        
+        Args:
+            key: The object key
+            
+        Returns:
+            The content of the object, None if it does not exist
+        """
+        async with self.session.client("s3", region_name=settings.AWS_REGION) as s3:
+            try:
+                response = await s3.get_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+            except s3.exceptions.NoSuchKey:
+                return None
+            async with response["Body"] as body:
+                return await body.read()
+
+    async def open_multipart_upload(self, key: str, content_type: Optional[str] = None) -> "S3MultipartUpload":
+        """
+        Starts a multipart upload, to be fed block by block.
+        
+        Args:
+            key: The object key
+            content_type: The content type of the object
+            
+        Returns:
+            The started S3MultipartUpload
+        """
+        # A client of its own: the upload keeps it open across its parts
+        upload = S3MultipartUpload(
+            self.session.client("s3", region_name=settings.AWS_REGION),
+            key,
+            settings.S3_PART_BYTES,
+            settings.S3_MAX_CONCURRENT_PARTS
+        )
+        try:
+            await upload.start(content_type)
+            return upload
+        except NoCredentialsError:
+            await upload.abort()
+            logger.error("AWS credentials not found")
+            raise RuntimeError("AWS credentials not found")
+        except Exception as e:
+            await upload.abort()
+            logger.error(f"S3 multipart upload failed to start: {str(e)}")
+            raise RuntimeError(f"S3 multipart upload failed to start: {str(e)}")
+
+
+class S3MultipartUpload:
+    """
+    An S3 multipart upload fed with consecutive blocks of a file.
+
+    Blocks are buffered until a part of part_size bytes is full (S3 requires every
+    part but the last to be at least 5 MiB). Full parts are sent in the background,
+    at most max_concurrency at a time, so the caller only waits for S3 when that
+    many parts are in flight; memory stays bounded by those parts whatever the file
+    size. The object only appears in the bucket once the upload is completed; an
+    aborted upload leaves nothing behind.
+    """
+
+    def __init__(self, client_context, key: str, part_size: int, max_concurrency: int = 1):
+        """
+        Initializes the upload; call start before writing.
+
+        Args:
+            client_context: The aioboto3 client context manager
+            key: The object key
+            part_size: Bytes per uploaded part
+            max_concurrency: Maximum number of parts in flight
+        """
+        self.client_context = client_context
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_BYTES)
+        self.upload_id = None
+        self.parts = []
+        self.finished = False
+        self._buffer = bytearray()
+        self._part_count = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending = set()
+        self._exit_stack = AsyncExitStack()
+        self._s3 = None
+
+    @property
+    def url(self) -> str:
+        return f"https://{settings.S3_BUCKET_NAME}.s3.amazonaws.com/{self.key}"
+
+    async def start(self, content_type: Optional[str] = None) -> None:
+        """
+        Opens a client, kept for the whole upload, and creates the multipart upload.
+        """
+        self._s3 = await self._exit_stack.enter_async_context(self.client_context)
+        extra = {"ContentType": content_type} if content_type else {}
+        response = await self._s3.create_multipart_upload(Bucket=settings.S3_BUCKET_NAME, Key=self.key, **extra)
+        self.upload_id = response["UploadId"]
+        logger.info(f"Started multipart upload of {self.key} to bucket {settings.S3_BUCKET_NAME}")
+
+    async def write(self, block: bytes) -> None:
+        """
+        Adds the next block of the file, sending a part whenever one is full.
+
+        Raises:
+            Exception: The error of a part that failed since the last write
+        """
+        self._buffer += block
+        while len(self._buffer) >= self.part_size:
+            await self._send_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+
+    async def complete(self) -> str:
+        """
+        Sends the last part, waits for the parts in flight and completes the upload.
+
+        Returns:
+            The URL of the object
+        """
+        # The last part may be smaller than the minimum, and is sent even when empty
+        # because an upload needs at least one part
+        if self._buffer or not self._part_count:
+            await self._send_part(bytes(self._buffer))
+            self._buffer.clear()
+        await asyncio.gather(*self._pending)
+        await self._s3.complete_multipart_upload(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": sorted(self.parts, key=lambda part: part["PartNumber"])}
+        )
+        await self._close()
+        logger.info(f"Completed multipart upload of {self.key} ({len(self.parts)} parts)")
+        return self.url
+
+    async def abort(self) -> None:
+        """
+        Aborts the upload, discarding the parts sent; does nothing once it has finished.
+        """
+        if self.finished:
+            return
+        for task in self._pending:
+            task.cancel()
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        try:
+            if self.upload_id is not None:
+                await self._s3.abort_multipart_upload(
+                    Bucket=settings.S3_BUCKET_NAME, Key=self.key, UploadId=self.upload_id
+                )
+                logger.info(f"Aborted multipart upload of {self.key}")
+        except Exception as e:
+            logger.error(f"Failed to abort multipart upload of {self.key}: {str(e)}")
+        finally:
+            await self._close()
+
+    async def _send_part(self, data: bytes) -> None:
+        """
+        Starts sending a part once fewer than max_concurrency parts are in flight.
+        """
+        await self._slots.acquire()
+        # A failed part fails the upload at the next write instead of at completion
+        for task in [task for task in self._pending if task.done()]:
+            self._pending.discard(task)
+            if task.exception() is not None:
+                self._slots.release()
+                raise task.exception()
+        self._part_count += 1
+        task = asyncio.ensure_future(self._upload_part(self._part_count, data))
+        self._pending.add(task)
+        task.add_done_callback(lambda _: self._slots.release())
+
+    async def _upload_part(self, part_number: int, data: bytes) -> None:
+        response = await self._s3.upload_part(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    async def _close(self) -> None:
+        self.finished = True
+        self._buffer = bytearray()
+        self._pending = set()
+        await self._exit_stack.aclose()
@@ -1,7 +1,8 @@
 from .schemas import FileUploadResponse
-from .s3_client import S3Client
+from .s3_client import S3Client, S3MultipartUpload
 from fastapi import UploadFile
 from datetime import datetime
+import uuid
 
 class FileUploadService:
     def __init__(self, s3_client: S3Client):
@@ -9,6 +10,22 @@ class FileUploadService:
 
     async def upload(self, file: UploadFile, file_id: str) -> FileUploadResponse:
         file_url = await self.s3_client.upload_file(file.file, file_id)
+        return self._create_response(file, file_id, file_url)
+
+    async def start_upload(self, file: UploadFile) -> S3MultipartUpload:
+        """
+        Starts a multipart upload to be fed while the file is read.
+        
+        The file ID is only known once the whole file has been read, so the
+        object is stored under a key of its own; the URL is kept in the record.
+        """
+        return await self.s3_client.open_multipart_upload(uuid.uuid4().hex, file.content_type)
+
+    async def complete_upload(self, file: UploadFile, file_id: str, upload: S3MultipartUpload) -> FileUploadResponse:
+        file_url = await upload.complete()
+        return self._create_response(file, file_id, file_url)
+
+    def _create_response(self, file: UploadFile, file_id: str, file_url: str) -> FileUploadResponse:
         now = datetime.now().replace(microsecond=0)
         
         return FileUploadResponse(
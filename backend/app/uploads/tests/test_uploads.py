@@ -114,3 +114,62 @@ async def test_upload_method(mock_file):
     assert response.filename == mock_file.filename
     assert response.url == "https://test-bucket.s3.amazonaws.com/test-id"
     mock_s3_client.upload_file.assert_called_once_with(mock_file.file, file_id)
+
+@pytest.mark.asyncio
+async def test_multipart_upload_buffers_blocks_into_parts():
+    """Test that blocks are sent as parts of at least 5 MiB, with the remainder as the last part"""
+    from app.uploads.s3_client import S3MultipartUpload, MIN_PART_BYTES
+    s3 = AsyncMock()
+    s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    s3.upload_part.side_effect = lambda **kwargs: {"ETag": f"etag-{kwargs['PartNumber']}"}
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=s3)
+    context.__aexit__ = AsyncMock(return_value=False)
+    
+    upload = S3MultipartUpload(context, "object-key", part_size=1024)
+    await upload.start("text/csv")
+    for _ in range(11):
+        await upload.write(b"x" * (MIN_PART_BYTES // 5))
+    url = await upload.complete()
+    await upload.abort()
+    
+    sizes = [len(call.kwargs["Body"]) for call in s3.upload_part.call_args_list]
+    assert sizes == [MIN_PART_BYTES, MIN_PART_BYTES, MIN_PART_BYTES // 5]
+    assert s3.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"][-1] == {"ETag": "etag-3", "PartNumber": 3}
+    assert url.endswith("/object-key")
+    s3.abort_multipart_upload.assert_not_called()
+    context.__aexit__.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_multipart_upload_sends_parts_in_the_background():
+    """Test that writes only wait for S3 once max_concurrency parts are in flight"""
+    import asyncio
+    from app.uploads.s3_client import S3MultipartUpload, MIN_PART_BYTES
+    released = asyncio.Event()
+    in_flight = []
+    
+    async def upload_part(**kwargs):
+        in_flight.append(kwargs["PartNumber"])
+        await released.wait()
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+    
+    s3 = AsyncMock()
+    s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    s3.upload_part.side_effect = upload_part
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=s3)
+    context.__aexit__ = AsyncMock(return_value=False)
+    
+    upload = S3MultipartUpload(context, "object-key", part_size=MIN_PART_BYTES, max_concurrency=2)
+    await upload.start()
+    await upload.write(b"x" * MIN_PART_BYTES * 2)
+    third = asyncio.ensure_future(upload.write(b"x" * MIN_PART_BYTES))
+    await asyncio.sleep(0.01)
+    
+    assert in_flight == [1, 2]
+    assert not third.done()
+    released.set()
+    await third
+    await upload.complete()
+    parts = s3.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+    assert [part["PartNumber"] for part in parts] == [1, 2, 3]
@@ -0,0 +1,93 @@
+"""
+Load test for concurrent chat requests against explorers with a simulated model latency.
+
+Runs N chats one after the other, then N at once, through FileExplorationService.explore_async
+for an explorer awaiting an async client (like GeminiExplorer) and for a blocking explorer
+run in the explorer executor. Concurrent chats should take about the slowest latency
+(or latency x N / EXPLORER_MAX_WORKERS for blocking explorers) instead of their sum.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.concurrent_chat
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, UTC
+import numpy as np
+from app.common.schemas import FileDTO
+from app.file_exploration.file_explorer import FileExplorer
+from app.file_exploration.service import FileExplorationService
+from app.infrastructure.config import settings
+
+
+class AsyncModelExplorer(FileExplorer):
+    """
+    Awaits the model like an async client would.
+    """
+    def __init__(self, latencies):
+        self.latencies = latencies
+
+    async def explore_async(self, search: str, file_dto: FileDTO) -> str:
+        await asyncio.sleep(self.latencies[int(search)])
+        return search
+
+    def explore(self, search: str, file_dto: FileDTO) -> str:
+        time.sleep(self.latencies[int(search)])
+        return search
+
+
+class BlockingModelExplorer(FileExplorer):
+    """
+    Blocks on the model like a synchronous client would.
+    """
+    def __init__(self, latencies):
+        self.latencies = latencies
+
+    def explore(self, search: str, file_dto: FileDTO) -> str:
+        time.sleep(self.latencies[int(search)])
+        return search
+
+
+def make_file_dto() -> FileDTO:
+    now = datetime.now(UTC)
+    return FileDTO(
+        pk="benchmark", filename="benchmark.md", url="", content="", markdown_content="",
+        file_size=0, file_type="text/markdown", processing_status="completed",
+        embedding_status="completed", created_at=now, updated_at=now, metadata={}, history={}
+    )
+
+
+async def run(service: FileExplorationService, chats: int, concurrent: bool) -> float:
+    """
+    Answer the chats and return the elapsed time in seconds.
+    """
+    file_dto = make_file_dto()
+    start = time.perf_counter()
+    if concurrent:
+        await asyncio.gather(*(service.explore_async(str(i), file_dto) for i in range(chats)))
+    else:
+        for i in range(chats):
+            await service.explore_async(str(i), file_dto)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean model latency in seconds")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"explorer executor: {settings.EXPLORER_MAX_WORKERS} workers")
+    print(f"{'explorer':>9} {'chats':>6} {'max latency (s)':>16} {'sequential (s)':>15} {'concurrent (s)':>15}")
+    for chats in args.chats:
+        latencies = rng.uniform(0.5, 1.5, size=chats) * args.latency
+        for name, explorer_class in (("async", AsyncModelExplorer), ("blocking", BlockingModelExplorer)):
+            service = FileExplorationService(explorer=explorer_class(latencies), semantic_cache=None)
+            sequential = asyncio.run(run(service, chats, concurrent=False))
+            concurrent = asyncio.run(run(service, chats, concurrent=True))
+            print(f"{name:>9} {chats:>6} {latencies.max():>16.2f} {sequential:>15.2f} {concurrent:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Throughput and peak memory of the format-specific extractors vs MarkItDown.
+
+Generates a TXT, a CSV and an XLSX file of about --size-mb megabytes and extracts
+each one with the extractor the registry picks for it (pass-through for text and
+CSV, streaming read-only openpyxl for XLSX) and with MarkItDown, both in the calling
+thread. Every run happens in a fresh process so its peak RSS is its own; the table
+shows MB/s of input and the peak RSS growth during the extraction.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.extraction_formats --size-mb 5
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+CONTENT_TYPES = {
+    "txt": "text/plain",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def write_text(path: str, size_mb: float) -> None:
+    line = "Invoices are reconciled monthly; totals per region are reported to the finance team.\n"
+    with open(path, "w") as file:
+        file.write(line * int(size_mb * 1e6 / len(line)))
+
+
+def write_csv(path: str, size_mb: float) -> None:
+    with open(path, "w") as file:
+        file.write("id,customer,region,amount,date\n")
+        row = 0
+        while file.tell() < size_mb * 1e6:
+            file.write(f"{row},Customer {row % 977},Region {row % 13},{row * 7 % 10000}.{row % 100:02d},2024-01-{row % 28 + 1:02d}\n")
+            row += 1
+
+
+def write_xlsx(path: str, size_mb: float) -> None:
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Invoices")
+    sheet.append(["id", "customer", "region", "amount", "date"])
+    # About 25 bytes of compressed XML per row
+    for row in range(int(size_mb * 1e6 / 25)):
+        sheet.append([row, f"Customer {row % 977}", f"Region {row % 13}", row * 7 % 10000 + row % 100 / 100, f"2024-01-{row % 28 + 1:02d}"])
+    workbook.save(path)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def extract(path: str, file_format: str, extractor_name: str, results) -> None:
+    """
+    Runs one extraction in a fresh process and reports (seconds, peak RSS growth in MB, output characters).
+    """
+    from app.text_extraction.registry import TextExtractorRegistry
+    from app.text_extraction.strategies.markitdown import MarkItDownExtractor
+    registry = TextExtractorRegistry()
+    extractor = MarkItDownExtractor() if extractor_name == "markitdown" else None
+    with open(path, "rb") as stream:
+        file = UploadFile(stream, filename=os.path.basename(path), headers=Headers({"content-type": CONTENT_TYPES[file_format]}))
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        text = (extractor or registry.select(file)).extract(file)
+        elapsed = time.perf_counter() - start
+    results.put((elapsed, peak_rss_mb() - baseline, len(text)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=5)
+    parser.add_argument("--formats", nargs="+", default=["txt", "csv", "xlsx"], choices=list(CONTENT_TYPES))
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    writers = {"txt": write_text, "csv": write_csv, "xlsx": write_xlsx}
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'format':>6} {'size (MB)':>10} {'extractor':>10} {'seconds':>8} {'MB/s':>7} {'peak RSS (MB)':>14}")
+        for file_format in args.formats:
+            path = os.path.join(directory, f"benchmark.{file_format}")
+            writers[file_format](path, args.size_mb)
+            size_mb = os.path.getsize(path) / 1e6
+            for extractor_name in ("fast path", "markitdown"):
+                results = context.Queue()
+                process = context.Process(target=extract, args=(path, file_format, extractor_name, results))
+                process.start()
+                elapsed, rss_mb, _ = results.get()
+                process.join()
+                print(
+                    f"{file_format:>6} {size_mb:>10.1f} {extractor_name:>10} {elapsed:>8.2f} "
+                    f"{size_mb / elapsed:>7.1f} {rss_mb:>14.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
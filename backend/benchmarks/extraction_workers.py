@@ -0,0 +1,84 @@
+"""
+Throughput of text extraction in-process vs in the extraction worker pool.
+
+Converts the same set of generated HTML files (tables and paragraphs, like exported
+reports) with a new MarkItDown per file in the calling process, as the extractor did
+before the pool, then through ExtractionWorkerPool with 1, 2, ... workers running the
+files concurrently. The first pass of each pool starts its workers and is not timed.
+With several cores, files per second should grow with the number of workers.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.extraction_workers --files 32 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+from markitdown import MarkItDown
+from app.text_extraction.worker_pool import ExtractionWorkerPool
+
+
+def make_html(rows: int, seed: int) -> str:
+    table = "".join(
+        f"<tr><td>{seed}-{i}</td><td>Item {i * 7 % 101}</td><td>{i * 13 % 997}.{i % 100:02d}</td></tr>"
+        for i in range(rows)
+    )
+    paragraphs = "".join(f"<p>Section {i}: totals are reported per item and per region.</p>" for i in range(rows // 10))
+    return f"<html><body><h1>Report {seed}</h1>{paragraphs}<table>{table}</table></body></html>"
+
+
+def convert_in_process(paths) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        MarkItDown(enable_plugins=False).convert(path)
+    return time.perf_counter() - start
+
+
+async def convert_in_pool(pool: ExtractionWorkerPool, paths) -> float:
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        files = [stack.enter_context(open(path, "rb")) for path in paths]
+        await asyncio.gather(*(pool.convert(file, ".html") for file in files))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=2000, help="Table rows per file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for seed in range(args.files):
+            path = os.path.join(directory, f"report-{seed}.html")
+            with open(path, "w") as file:
+                file.write(make_html(args.rows, seed))
+            paths.append(path)
+        size_mb = sum(os.path.getsize(path) for path in paths) / 1e6
+
+        print(f"{args.files} files, {size_mb:.1f} MB, {os.cpu_count()} cores")
+        print(f"{'mode':>12} {'seconds':>8} {'files/s':>8} {'MB/s':>7}")
+        elapsed = convert_in_process(paths)
+        print(f"{'in-process':>12} {elapsed:>8.2f} {args.files / elapsed:>8.1f} {size_mb / elapsed:>7.1f}")
+
+        for workers in args.workers:
+            pool = ExtractionWorkerPool(max_workers=workers, timeout_seconds=600)
+
+            async def measure():
+                await convert_in_pool(pool, paths[:workers])
+                return await convert_in_pool(pool, paths)
+
+            try:
+                elapsed = asyncio.run(measure())
+            finally:
+                pool.close()
+            label = f"{workers} workers"
+            print(f"{label:>12} {elapsed:>8.2f} {args.files / elapsed:>8.1f} {size_mb / elapsed:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark for typo-tolerant lookups with the per-file trigram index.
+
+Builds a synthetic document of each size, then times the index build, the
+serialized size and lookups of misspelled words and two-word names.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.fuzzy_search
+"""
+import argparse
+import time
+import numpy as np
+from app.retrieval.trigram_index import TrigramIndex
+
+SYLLABLES = ["ka", "lo", "mi", "tre", "shan", "por", "vel", "dix", "un", "ar", "bo", "ze", "na", "rik"]
+
+
+def make_vocabulary(size: int, rng: np.random.Generator):
+    """
+    Builds distinct made-up words from random syllables.
+    """
+    return sorted({"".join(rng.choice(SYLLABLES, size=rng.integers(2, 5))) for _ in range(size)})
+
+
+def misspell(word: str, rng: np.random.Generator) -> str:
+    """
+    Replaces one character of the word.
+    """
+    position = int(rng.integers(len(word)))
+    return word[:position] + "x" + word[position + 1:]
+
+
+def time_lookups(search, queries) -> np.ndarray:
+    """
+    Run every lookup once and return the latencies in milliseconds.
+    """
+    latencies = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        search(query)
+        latencies[i] = (time.perf_counter() - start) * 1e3
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 4_000_000])
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    print(f"{'chars':>9} {'build (s)':>10} {'size (MB)':>10} {'1 word p50/p95 (ms)':>20} {'2 words p50/p95 (ms)':>21}")
+    for size in args.sizes:
+        words = [vocabulary[i] for i in rng.integers(len(vocabulary), size=size // 8)]
+        text = " ".join(words)[:size]
+        start = time.perf_counter()
+        index = TrigramIndex.build(text)
+        build = time.perf_counter() - start
+
+        picks = rng.integers(len(words) - 1, size=args.queries)
+        single = time_lookups(index.search, [misspell(words[i], rng) for i in picks])
+        double = time_lookups(index.search, [f"{misspell(words[i], rng)} {words[i + 1]}" for i in picks])
+        print(
+            f"{len(text):>9} {build:>10.2f} {len(index.to_bytes()) / 1e6:>10.1f} "
+            f"{np.percentile(single, 50):>10.2f}/{np.percentile(single, 95):<9.2f} "
+            f"{np.percentile(double, 50):>10.2f}/{np.percentile(double, 95):<9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Offline relevance benchmark for the retrieval strategies.
+
+Runs every query of a query/expected-passage fixture against the vector, lexical
+and hybrid retrievers and reports recall@k and mean query latency, so the hybrid
+weights can be tuned against accuracy and speed.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.hybrid_relevance
+    poetry run python -m benchmarks.hybrid_relevance --weights 1:0 1:1 1:2 0:1
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from app.common.schemas import FileDTO
+from app.embedding.service import EmbeddingService
+from app.retrieval.lexical_index import LexicalIndex, LEXICAL_INDEX_ARTIFACT
+from app.retrieval.strategies.hybrid_retriever import HybridRetriever
+from app.retrieval.strategies.lexical_retriever import LexicalRetriever
+from app.retrieval.strategies.vector_retriever import VectorRetriever
+from app.text_chunking.service import TextChunkingService
+from app.text_chunking.strategies.markdown import MarkdownChunker
+
+FIXTURE = Path(__file__).parent / "fixtures" / "relevance.json"
+
+
+class InMemoryStore:
+    """
+    Serves one file's chunks and artifacts from memory in place of DynamoDB.
+    """
+    def __init__(self, chunks, artifacts):
+        self.chunks = chunks
+        self.artifacts = artifacts
+
+    async def get_chunks(self, file_id, chunk_count):
+        return self.chunks
+
+    async def get_artifact(self, file_id, kind):
+        return self.artifacts.get(kind)
+
+
+def build_file(document: str, chunk_size: int, embedding_service: EmbeddingService):
+    """
+    Run the ingest steps (chunk, embed, index) on the fixture document.
+    """
+    chunks = TextChunkingService(MarkdownChunker(chunk_size=chunk_size, chunk_overlap=0)).chunk("benchmark", document)
+    embedding_service.embed_chunks(chunks)
+    store = InMemoryStore(chunks, {LEXICAL_INDEX_ARTIFACT: LexicalIndex.build([c.text for c in chunks]).to_bytes()})
+    now = datetime.utcnow()
+    file_dto = FileDTO(
+        pk="benchmark", filename="fixture.md", url="", content=document, markdown_content=document,
+        file_size=len(document), file_type="text/markdown", processing_status="completed",
+        embedding_status="completed", created_at=now, updated_at=now, history={},
+        metadata={
+            "chunk_count": len(chunks),
+            "embedding_model": embedding_service.embedder.model_name,
+            "artifacts": [LEXICAL_INDEX_ARTIFACT]
+        }
+    )
+    return store, file_dto
+
+
+async def evaluate(retriever, file_dto, queries, top_k: int):
+    """
+    Return (recall@k, mean latency in microseconds) of a retriever over the queries.
+    """
+    # Warm the per-file caches so latency measures queries, not loading
+    await retriever.retrieve(queries[0]["query"], file_dto, top_k)
+    hits = 0
+    elapsed = 0.0
+    for case in queries:
+        start = time.perf_counter()
+        passages = await retriever.retrieve(case["query"], file_dto, top_k)
+        elapsed += time.perf_counter() - start
+        hits += any(case["expected"] in passage.text for passage in passages)
+    return hits / len(queries), elapsed / len(queries) * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", type=Path, default=FIXTURE)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 3])
+    parser.add_argument("--chunk-size", type=int, default=300)
+    parser.add_argument("--weights", nargs="+", default=["1:1", "1:2", "2:1"],
+                        help="Hybrid vector:lexical weight pairs to evaluate")
+    args = parser.parse_args()
+
+    fixture = json.loads(args.fixture.read_text())
+    queries = fixture["queries"]
+    embedding_service = EmbeddingService()
+    store, file_dto = build_file(fixture["document"], args.chunk_size, embedding_service)
+
+    vector = VectorRetriever(embedding_service=embedding_service, chunk_repository=store)
+    lexical = LexicalRetriever(chunk_repository=store, artifact_repository=store)
+    strategies = [("vector", vector), ("lexical", lexical)]
+    for pair in args.weights:
+        vector_weight, lexical_weight = (float(value) for value in pair.split(":"))
+        strategies.append((f"hybrid {pair}", HybridRetriever(vector, lexical, vector_weight, lexical_weight)))
+
+    print(f"{len(queries)} queries over {file_dto.metadata['chunk_count']} chunks "
+          f"({embedding_service.embedder.model_name})")
+    header = "".join(f"{f'recall@{k}':>11}{'us/query':>10}" for k in args.top_k)
+    print(f"{'strategy':<14}{header}")
+    for name, retriever in strategies:
+        row = ""
+        for k in args.top_k:
+            recall, latency = await evaluate(retriever, file_dto, queries, k)
+            row += f"{recall:>11.2f}{latency:>10.0f}"
+        print(f"{name:<14}{row}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
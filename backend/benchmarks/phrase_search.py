@@ -0,0 +1,83 @@
+"""
+Micro-benchmark for exact phrase lookups with the per-file suffix array.
+
+Builds a synthetic document of each size, then times the suffix array build,
+the serialized size and phrase lookups against a str.find scan of the whole text.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.phrase_search
+"""
+import argparse
+import time
+import numpy as np
+from app.retrieval.suffix_array import SuffixArray
+
+WORDS = (
+    "the tenant shall pay rent invoice clause contract part number supplier delivery "
+    "warranty period notice termination agreement section schedule amount due"
+).split()
+
+
+def make_text(size: int, rng: np.random.Generator) -> str:
+    """
+    Builds a text of about size characters from random words and part numbers.
+    """
+    words = []
+    length = 0
+    while length < size:
+        word = WORDS[rng.integers(len(WORDS))] if rng.random() > 0.05 else f"AX-{rng.integers(10_000)}"
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def scan_find(text: str, phrase: str):
+    """
+    Reference implementation finding every occurrence with str.find.
+    """
+    offsets = []
+    start = text.find(phrase)
+    while start != -1:
+        offsets.append(start)
+        start = text.find(phrase, start + 1)
+    return offsets
+
+
+def time_lookups(find, phrases) -> np.ndarray:
+    """
+    Run every lookup once and return the latencies in microseconds.
+    """
+    latencies = np.empty(len(phrases))
+    for i, phrase in enumerate(phrases):
+        start = time.perf_counter()
+        find(phrase)
+        latencies[i] = (time.perf_counter() - start) * 1e6
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 4_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'chars':>9} {'build (s)':>10} {'size (MB)':>10} {'p50 (us)':>9} {'p95 (us)':>9} {'scan p50 (us)':>14}")
+    for size in args.sizes:
+        text = make_text(size, rng)
+        start = time.perf_counter()
+        suffix_array = SuffixArray.build(text)
+        build = time.perf_counter() - start
+        data = suffix_array.to_bytes()
+
+        phrases = [f"AX-{rng.integers(10_000)}" for _ in range(args.queries)]
+        latencies = time_lookups(suffix_array.find, phrases)
+        scan = time_lookups(lambda phrase: scan_find(text, phrase), phrases[:20])
+        print(
+            f"{size:>9} {build:>10.2f} {len(data) / 1e6:>10.1f} {np.percentile(latencies, 50):>9.0f} "
+            f"{np.percentile(latencies, 95):>9.0f} {np.percentile(scan, 50):>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
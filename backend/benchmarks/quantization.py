@@ -0,0 +1,85 @@
+"""
+Benchmark for quantized vector store segments.
+
+Builds one store per configuration over the same clustered synthetic embeddings
+and reports, per 100k chunks, the bytes a query scans (codes, scales and ids),
+the bytes on disk, the query latency and recall@k against exact float32 search.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.quantization
+    poetry run python -m benchmarks.quantization --chunks 200000 --rescore-factors 4 8 16
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from app.search.vector_store import VectorStore
+
+BLOCK_ROWS = 20_000
+
+
+def clustered_embeddings(rng, count: int, dimension: int, clusters: int) -> np.ndarray:
+    """
+    Unit vectors scattered around random topic centroids, closer to real chunk embeddings than pure noise.
+    """
+    centroids = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    vectors = centroids[rng.integers(0, clusters, count)] + 0.8 * rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build_store(directory: str, matrix: np.ndarray, dtype: str, rescore: bool, rescore_factor: int) -> VectorStore:
+    store = VectorStore(directory, dtype=dtype, rescore=rescore, rescore_factor=rescore_factor, max_segments=1)
+    for start in range(0, len(matrix), BLOCK_ROWS):
+        block = matrix[start:start + BLOCK_ROWS]
+        store.append([(f"file{start}", np.arange(len(block)), block)])
+    store.compact()
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rescore-factors", type=int, nargs="+", default=[8])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = clustered_embeddings(rng, args.chunks, args.dimension, args.clusters)
+    # Queries are perturbed corpus vectors, like a question close to one passage
+    queries = matrix[rng.choice(args.chunks, args.queries, replace=False)]
+    queries = queries + 0.5 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(args.dimension)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    exact = [set(np.argsort(-(matrix @ query))[:args.top_k].tolist()) for query in queries]
+
+    configurations = [("float32", False, 1)]
+    for factor in args.rescore_factors:
+        configurations += [("int8", True, factor), ("binary", True, factor)]
+    configurations += [("int8", False, 1), ("binary", False, 1)]
+
+    scale = 100_000 / args.chunks
+    print(f"{'dtype':>8} {'rescore':>8} {'scan MB/100k':>13} {'disk MB/100k':>13} "
+          f"{'p50 (ms)':>9} {'p95 (ms)':>9} {f'recall@{args.top_k}':>10}")
+    for dtype, rescore, factor in configurations:
+        with tempfile.TemporaryDirectory() as directory:
+            store = build_store(directory, matrix, dtype, rescore, factor)
+            disk_bytes = sum(os.path.getsize(os.path.join(directory, name)) for name in store.segments)
+
+            latencies, recalls = [], []
+            for query, expected in zip(queries, exact):
+                start = time.perf_counter()
+                results = store.search(query, args.top_k)
+                latencies.append((time.perf_counter() - start) * 1e3)
+                found = {int(file_id[4:]) + ordinal for file_id, ordinal, _ in results}
+                recalls.append(len(found & expected) / len(expected))
+
+            label = f"x{factor}" if rescore else "no"
+            print(f"{dtype:>8} {label:>8} {store.code_bytes * scale / 2**20:>13.1f} {disk_bytes * scale / 2**20:>13.1f} "
+                  f"{np.percentile(latencies, 50):>9.2f} {np.percentile(latencies, 95):>9.2f} {np.mean(recalls):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark for top-k cosine search over a file's chunk embeddings.
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.vector_search
+"""
+import argparse
+import time
+import numpy as np
+from app.retrieval.vector_index import VectorIndex
+
+
+def loop_search(matrix: np.ndarray, query: np.ndarray, top_k: int):
+    """
+    Reference implementation scoring one row at a time in Python.
+    """
+    scores = [(float(np.dot(row, query)), i) for i, row in enumerate(matrix)]
+    scores.sort(reverse=True)
+    return scores[:top_k]
+
+
+def time_queries(search, queries) -> np.ndarray:
+    """
+    Run every query once and return the latencies in microseconds.
+    """
+    latencies = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        search(query)
+        latencies[i] = (time.perf_counter() - start) * 1e6
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--loop-limit", type=int, default=10_000,
+                        help="Largest size also measured with the Python loop baseline")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'chunks':>8} {'p50 (us)':>10} {'p95 (us)':>10} {'loop p50 (us)':>14}")
+    for size in args.sizes:
+        matrix = rng.standard_normal((size, args.dimension)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        index = VectorIndex(matrix, np.arange(size))
+        queries = rng.standard_normal((args.queries, args.dimension)).astype(np.float32)
+
+        latencies = time_queries(lambda q: index.search(q, args.top_k), queries)
+        loop = "-"
+        if size <= args.loop_limit:
+            loop_latencies = time_queries(lambda q: loop_search(matrix, q, args.top_k), queries[:10])
+            loop = f"{np.percentile(loop_latencies, 50):.0f}"
+        print(f"{size:>8} {np.percentile(latencies, 50):>10.0f} {np.percentile(latencies, 95):>10.0f} {loop:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark for opening and querying the memory-mapped vector store.
+
+Compares a cold open of the on-disk store with loading the same embeddings into
+the heap, and reports the heap allocated by each (traced with tracemalloc, which
+sees numpy buffers but not pages mapped from the segment files).
+
+Usage (from the backend directory):
+    poetry run python -m benchmarks.vector_store
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from app.search.ivf_index import IVFIndex
+from app.search.vector_store import VectorStore
+
+
+def measure(action):
+    """
+    Run the action and return (result, seconds, peak heap in MB).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--chunks-per-file", type=int, default=50)
+    parser.add_argument("--segment-rows", type=int, default=20_000)
+    parser.add_argument("--dtype", choices=["float32", "int8"], default="float32")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'chunks':>8} {'open (ms)':>10} {'open heap (MB)':>15} {'query p50 (ms)':>15} "
+          f"{'load (ms)':>10} {'load heap (MB)':>15}")
+    for size in args.sizes:
+        matrix = rng.standard_normal((size, args.dimension)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        queries = rng.standard_normal((args.queries, args.dimension)).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as directory:
+            writer = VectorStore(directory, dtype=args.dtype, max_segments=1_000)
+            ordinals = np.arange(args.chunks_per_file)
+            for start in range(0, size, args.segment_rows):
+                block = matrix[start:start + args.segment_rows]
+                writer.append([
+                    (f"file{start + offset}", ordinals[:len(block) - offset], block[offset:offset + args.chunks_per_file])
+                    for offset in range(0, len(block), args.chunks_per_file)
+                ])
+
+            # Opening maps the segments; the first query pages them in through the OS cache
+            store, open_seconds, open_heap = measure(lambda: VectorStore(directory))
+            _, _, query_heap = measure(lambda: store.search(queries[0], 8))
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                store.search(query, 8)
+                latencies.append(time.perf_counter() - start)
+
+            def load():
+                index = IVFIndex(train_threshold=size + 1)
+                index.add(matrix.copy(), np.arange(size))
+                return index
+
+            _, load_seconds, load_heap = measure(load)
+
+        print(f"{size:>8} {open_seconds * 1e3:>10.1f} {max(open_heap, query_heap):>15.1f} "
+              f"{np.percentile(latencies, 50) * 1e3:>15.2f} {load_seconds * 1e3:>10.1f} {load_heap:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
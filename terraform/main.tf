@@ -157,6 +157,18 @@ resource "aws_s3_bucket_lifecycle_configuration" "app" {
       noncurrent_days = 30
     }
   }
+
+  # Parts of multipart uploads that were never completed nor aborted are billed until removed
+  rule {
+    id     = "abort_incomplete_multipart_uploads"
+    status = "Enabled"
+
+    filter {}
+
+    abort_incomplete_multipart_upload {
+      days_after_initiation = 1
+    }
+  }
 }
 
 # Add S3 bucket policy to allow Lambda access
@@ -176,7 +188,8 @@ resource "aws_s3_bucket_policy" "app" {
           "s3:PutObject",
           "s3:GetObject",
           "s3:DeleteObject",
-          "s3:ListBucket"
+          "s3:ListBucket",
+          "s3:AbortMultipartUpload"
         ]
         Resource = [
           aws_s3_bucket.app.arn,
@@ -198,6 +211,32 @@ resource "aws_dynamodb_table" "app" {
     type = "S"
   }
 
+  attribute {
+    name = "processing_status"
+    type = "S"
+  }
+
+  attribute {
+    name = "updated_at"
+    type = "S"
+  }
+
+  # Completed files by last update, read incrementally by the corpus search index;
+  # sparse, since only file records have a processing_status
+  global_secondary_index {
+    name               = "status-updated-index"
+    hash_key           = "processing_status"
+    range_key          = "updated_at"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["file_name", "embedding_status", "metadata"]
+  }
+
+  # Cached chat answers expire through DynamoDB TTL
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
   tags = {
     Name = "${var.lambda_function_name}-table"
   }
@@ -217,7 +256,8 @@ resource "aws_iam_role_policy" "lambda_s3" {
           "s3:GetObject",
           "s3:PutObject",
           "s3:ListBucket",
-          "s3:DeleteObject"
+          "s3:DeleteObject",
+          "s3:AbortMultipartUpload"
         ]
         Resource = [
           aws_s3_bucket.app.arn,
@@ -232,16 +272,28 @@ resource "aws_iam_role_policy" "lambda_s3" {
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
           "dynamodb:Query",
-          "dynamodb:Scan"
+          "dynamodb:Scan",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem"
         ]
         Resource = [
-          aws_dynamodb_table.app.arn
+          aws_dynamodb_table.app.arn,
+          "${aws_dynamodb_table.app.arn}/index/*"
         ]
       }
     ]
   })
 }
 
+# Lambda Function limits
+# The text extraction limits passed to the function are derived from these
+locals {
+  lambda_timeout_seconds = 60  # Increased from 30 to 60 seconds
+  lambda_memory_mb       = 512 # Increased from 256 to 512 MB
+  # One MarkItDown worker process per GB of memory, at least one
+  extraction_workers     = max(1, floor(local.lambda_memory_mb / 1024))
+}
+
 # Lambda Function
 # The main FastAPI application running in a container
 resource "aws_lambda_function" "app" {
@@ -249,17 +301,24 @@ resource "aws_lambda_function" "app" {
   package_type  = "Image"
   image_uri     = "${aws_ecr_repository.app.repository_url}:latest"
   role          = aws_iam_role.lambda_role.arn
-  timeout       = 60  # Increased from 30 to 60 seconds
-  memory_size   = 512 # Increased from 256 to 512 MB
+  timeout       = local.lambda_timeout_seconds
+  memory_size   = local.lambda_memory_mb
 
   environment {
     variables = {
-      ENVIRONMENT            = var.environment
-      ECR_REPOSITORY_NAME    = var.ecr_repository_name
-      LAMBDA_FUNCTION_NAME   = var.lambda_function_name
-      S3_BUCKET_NAME         = var.s3_bucket_name
-      GOOGLE_API_KEY         = var.google_api_key 
-      DYNAMODB_TABLE_NAME    = aws_dynamodb_table.app.name
+      ENVIRONMENT                = var.environment
+      ECR_REPOSITORY_NAME        = var.ecr_repository_name
+      LAMBDA_FUNCTION_NAME       = var.lambda_function_name
+      S3_BUCKET_NAME             = var.s3_bucket_name
+      GOOGLE_API_KEY             = var.google_api_key 
+      DYNAMODB_TABLE_NAME        = aws_dynamodb_table.app.name
+      LAMBDA_TIMEOUT_SECONDS     = local.lambda_timeout_seconds
+      LAMBDA_MEMORY_MB           = local.lambda_memory_mb
+      # Text extraction limits, under the function's own so that a runaway file kills
+      # one extraction worker instead of the whole invocation
+      EXTRACTION_WORKERS         = local.extraction_workers
+      EXTRACTION_TIMEOUT_SECONDS = floor(local.lambda_timeout_seconds / 2)
+      EXTRACTION_MEMORY_LIMIT_MB = floor(local.lambda_memory_mb * 3 / 4 / local.extraction_workers)
     }
   }
 }